@@ -0,0 +1,545 @@
+# services/drone-connection-service/src/clients/python-mock/camera_bench.py
+"""
+Camera throughput benchmark: achieved vs. target FPS per transport
+
+Runs camera drones of each transport against local receivers and measures
+whether both cameras of every drone sustain the configured camera_fps:
+
+  json     ProductionMockDroneWithCamera, base64 JSON camera_frame events
+  binary   OptimizedProductionDrone, gzip-compressed camera_frame_binary
+  webrtc   ProductionWebRTCDrone, binary frames over an unordered,
+           no-retransmit data channel to a loopback peer (needs aiortc, av)
+
+The Socket.IO receiver is a stand-in server in a child process, so sender
+and receiver CPU are measured separately; its camera queues drain at twice
+the target rate so queue feedback does not throttle the sender. The WebRTC
+receiver is a second peer connection in this process, so its CPU is part of
+the sender's. Drones keep their telemetry, heartbeat and MAVROS streams, as
+they would on a real host.
+
+Every transport x fps x drones combination is one level: the drones start,
+register and settle, then a --duration window is measured per camera stream
+on both sides. The report gives achieved FPS (mean and slowest stream),
+inter-frame jitter (standard deviation of the intervals), the largest gap,
+frame bytes/s and CPU per stream as a share of one core:
+
+  python camera_bench.py --transports json binary --fps 15 30 60 --drones 1 10 50
+  python camera_bench.py --transports binary --fps 30 --drones 5 --duration 60 --output camera.json
+
+Transports whose simulator cannot be imported here are recorded as skipped.
+"""
+import argparse
+import asyncio
+import importlib
+import itertools
+import json
+import logging
+import math
+import multiprocessing
+import statistics
+import struct
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional
+
+from seeded_random import jetson_serial
+from standin_server import StandinServer, StandinConfig
+
+logger = logging.getLogger(__name__)
+
+CAMERAS = ('front', 'bottom')
+CAMERA_FRAME_EVENTS = ('camera_frame', 'camera_frame_binary')
+CONNECT_TIMEOUT = 60.0
+CHANNEL_TIMEOUT = 15.0
+RECEIVER_START_TIMEOUT = 30.0
+
+
+@dataclass
+class TransportSpec:
+    module: str
+    class_name: str
+    id_prefix: str
+    description: str
+    fields: Dict[str, object] = field(default_factory=dict)   # extra DroneConfig fields
+
+
+TRANSPORTS = {
+    'json': TransportSpec('drone_simulator_prod_with_camera', 'ProductionMockDroneWithCamera', 'cam-json',
+                          'JSON base64 over Socket.IO'),
+    'binary': TransportSpec('drone_simulator_optimized', 'OptimizedProductionDrone', 'cam-binary',
+                            'binary Socket.IO, gzip', {'enable_binary_frames': True, 'enable_compression': True}),
+    'webrtc': TransportSpec('drone_simulator_prod_with_webrtc', 'ProductionWebRTCDrone', 'cam-webrtc',
+                            'WebRTC data channel', {'enable_webrtc': True})
+}
+
+
+def frame_bytes(data) -> int:
+    """Frame payload size of a camera event or data-channel message"""
+    if isinstance(data, (bytes, bytearray)):
+        return len(data)
+    if isinstance(data, dict):
+        frame = data.get('frameData', data.get('frame'))
+        return len(frame) if frame is not None else 0
+    return 0
+
+
+class FrameMeter:
+    """Frame times and sizes per drone camera stream, inside a measurement window"""
+
+    def __init__(self):
+        self.recording = False
+        self.frames: Dict[str, List[float]] = {}
+        self.bytes: Dict[str, int] = {}
+
+    def start(self):
+        self.frames = {}
+        self.bytes = {}
+        self.recording = True
+
+    def stop(self):
+        self.recording = False
+
+    def record(self, stream: str, nbytes: int):
+        if not self.recording:
+            return
+        times = self.frames.get(stream)
+        if times is None:
+            times = self.frames[stream] = []
+            self.bytes[stream] = 0
+        times.append(time.perf_counter())
+        self.bytes[stream] += nbytes
+
+
+@dataclass
+class StreamStats:
+    frames: int
+    fps: float
+    jitter_ms: float          # standard deviation of the inter-frame intervals
+    max_gap_ms: float
+    bytes_per_s: float
+
+    @classmethod
+    def from_frames(cls, times: List[float], nbytes: int, window_s: float) -> 'StreamStats':
+        intervals = [(b - a) * 1000 for a, b in zip(times, times[1:])]
+        return cls(
+            frames=len(times),
+            fps=len(times) / window_s if window_s else 0.0,
+            jitter_ms=statistics.pstdev(intervals) if len(intervals) > 1 else 0.0,
+            max_gap_ms=max(intervals) if intervals else 0.0,
+            bytes_per_s=nbytes / window_s if window_s else 0.0
+        )
+
+
+def stream_stats(meter_frames: Dict[str, List[float]], meter_bytes: Dict[str, int],
+                 window_s: float) -> Dict[str, StreamStats]:
+    return {stream: StreamStats.from_frames(times, meter_bytes[stream], window_s)
+            for stream, times in meter_frames.items()}
+
+
+@dataclass
+class LevelResult:
+    transport: str
+    fps: float
+    drones: int
+    window_s: float = 0.0
+    registered: int = 0
+    sent: Dict[str, StreamStats] = field(default_factory=dict)
+    received: Dict[str, StreamStats] = field(default_factory=dict)
+    sender_cpu_s: float = 0.0
+    receiver_cpu_s: Optional[float] = None    # None: receiver runs in this process
+    skipped: Optional[str] = None
+
+    @property
+    def streams(self) -> int:
+        """Camera streams the level should carry"""
+        return self.drones * len(CAMERAS)
+
+    def side(self, stats: Dict[str, StreamStats]) -> dict:
+        """Fleet view of one side; streams that delivered nothing count as 0 FPS"""
+        fps = [s.fps for s in stats.values()] + [0.0] * max(0, self.streams - len(stats))
+        return {
+            'streams': len(stats),
+            'mean_fps': statistics.mean(fps) if fps else 0.0,
+            'min_fps': min(fps) if fps else 0.0,
+            'mean_jitter_ms': statistics.mean(s.jitter_ms for s in stats.values()) if stats else 0.0,
+            'max_gap_ms': max((s.max_gap_ms for s in stats.values()), default=0.0),
+            'bytes_per_s': sum(s.bytes_per_s for s in stats.values())
+        }
+
+    def cpu_per_stream(self, cpu_s: Optional[float]) -> Optional[float]:
+        """CPU per stream as a fraction of one core"""
+        if cpu_s is None or not self.window_s:
+            return None
+        return cpu_s / self.window_s / self.streams
+
+    def to_dict(self) -> dict:
+        result = {'transport': self.transport, 'fps': self.fps, 'drones': self.drones}
+        if self.skipped:
+            return {**result, 'skipped': self.skipped}
+        return {
+            **result,
+            'window_s': self.window_s,
+            'registered': self.registered,
+            'sender': {**self.side(self.sent), 'cpu_per_stream': self.cpu_per_stream(self.sender_cpu_s)},
+            'receiver': {**self.side(self.received), 'cpu_per_stream': self.cpu_per_stream(self.receiver_cpu_s)},
+            'sent_streams': {stream: asdict(s) for stream, s in self.sent.items()},
+            'received_streams': {stream: asdict(s) for stream, s in self.received.items()}
+        }
+
+
+class FrameArrivalServer(StandinServer):
+    """Stand-in that also records the arrival time of every camera frame"""
+
+    def __init__(self, config: Optional[StandinConfig] = None):
+        super().__init__(config)
+        self.meter = FrameMeter()
+
+    async def on_camera_frame(self, sid, data):
+        drone_id = self.sessions.get(sid)
+        if drone_id and isinstance(data, dict):
+            self.meter.record(f"{drone_id}:{data.get('camera', 'front')}", frame_bytes(data))
+        await super().on_camera_frame(sid, data)
+
+
+def _receiver_process(conn, config: StandinConfig, log_level: str):
+    """Child process: serve a FrameArrivalServer and answer start/stop/exit over the pipe"""
+    logging.basicConfig(level=getattr(logging, log_level),
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    async def serve():
+        server = FrameArrivalServer(config)
+        await server.start()
+        conn.send(server.port)
+        loop = asyncio.get_running_loop()
+        cpu_start = window_start = 0.0
+        try:
+            while True:
+                command = await loop.run_in_executor(None, conn.recv)
+                if command == 'start':
+                    server.meter.start()
+                    cpu_start, window_start = time.process_time(), time.perf_counter()
+                    conn.send('ok')
+                elif command == 'stop':
+                    server.meter.stop()
+                    window_s = time.perf_counter() - window_start
+                    conn.send({'frames': server.meter.frames, 'bytes': server.meter.bytes,
+                               'window_s': window_s, 'cpu_s': time.process_time() - cpu_start})
+                else:
+                    break
+        finally:
+            await server.stop()
+
+    asyncio.run(serve())
+
+
+class SocketIOReceiver:
+    """Stand-in receiver in a child process, driven over a pipe"""
+
+    def __init__(self, fps: float, log_level: str = 'WARNING'):
+        # Drain faster than the target so the receiver's queue feedback never throttles the sender
+        self.config = StandinConfig(port=0, queue_drain_fps=fps * 2)
+        self.log_level = log_level
+        self.conn = None
+        self.process = None
+        self.port: Optional[int] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.config.host}:{self.port}"
+
+    async def request(self, command: str, timeout: float = RECEIVER_START_TIMEOUT):
+        loop = asyncio.get_running_loop()
+        self.conn.send(command)
+        return await asyncio.wait_for(loop.run_in_executor(None, self.conn.recv), timeout)
+
+    async def start(self):
+        context = multiprocessing.get_context('spawn')
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_receiver_process, args=(child_conn, self.config, self.log_level),
+                                       daemon=True)
+        self.process.start()
+        loop = asyncio.get_running_loop()
+        self.port = await asyncio.wait_for(loop.run_in_executor(None, self.conn.recv), RECEIVER_START_TIMEOUT)
+        return self
+
+    async def stop(self):
+        if self.process is None:
+            return
+        try:
+            self.conn.send('exit')
+        except (BrokenPipeError, OSError):
+            pass
+        await asyncio.get_running_loop().run_in_executor(None, self.process.join, 10)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process = None
+
+
+async def open_loopback_channel(on_message):
+    """Connected peer pair in this process; returns (sender, receiver, sender's camera_frames channel)"""
+    # Imported here: aiortc is optional, the webrtc transport is skipped without it
+    from aiortc import RTCPeerConnection
+
+    sender, receiver = RTCPeerConnection(), RTCPeerConnection()
+    # Same channel options as ProductionWebRTCDrone.setup_real_webrtc
+    channel = sender.createDataChannel('camera_frames', ordered=False, maxRetransmits=0)
+    opened = asyncio.Event()
+    channel.on('open', opened.set)
+
+    @receiver.on('datachannel')
+    def on_datachannel(remote_channel):
+        remote_channel.on('message', on_message)
+
+    await sender.setLocalDescription(await sender.createOffer())
+    await receiver.setRemoteDescription(sender.localDescription)
+    await receiver.setLocalDescription(await receiver.createAnswer())
+    await sender.setRemoteDescription(receiver.localDescription)
+    await asyncio.wait_for(opened.wait(), CHANNEL_TIMEOUT)
+    return sender, receiver, channel
+
+
+def webrtc_camera(message) -> str:
+    """Camera of a binary frame from its 16-byte header (camera ID at offset 8)"""
+    if len(message) < 16:
+        return 'unknown'
+    return 'front' if struct.unpack_from('>H', message, 8)[0] == 1 else 'bottom'
+
+
+class CameraBenchmark:
+    """Run every transport x fps x drones level and collect per-stream frame statistics"""
+
+    def __init__(self, transports: List[str], fps_levels: List[float], drone_levels: List[int],
+                 duration_s: float = 20.0, settle_s: float = 3.0, ramp_rate: float = 20.0,
+                 receiver_log_level: str = 'WARNING', seed: Optional[int] = None):
+        self.transports = transports
+        self.fps_levels = fps_levels
+        self.drone_levels = drone_levels
+        self.duration_s = duration_s
+        self.settle_s = settle_s
+        self.ramp_rate = ramp_rate
+        self.receiver_log_level = receiver_log_level
+        self.seed = seed
+        self.results: List[LevelResult] = []
+
+    async def run(self) -> List[LevelResult]:
+        for transport in self.transports:
+            spec = TRANSPORTS[transport]
+            try:
+                module = importlib.import_module(spec.module)
+            except ImportError as e:
+                logger.warning(f"⚠️ {transport} transport skipped: {e}")
+                self.results.extend(LevelResult(transport, fps, drones, skipped=str(e))
+                                    for fps, drones in itertools.product(self.fps_levels, self.drone_levels))
+                continue
+            for fps, drones in itertools.product(self.fps_levels, self.drone_levels):
+                self.results.append(await self.run_level(transport, module, fps, drones))
+        return self.results
+
+    def create_drones(self, transport: str, module, fps: float, count: int, server_url: str) -> list:
+        spec = TRANSPORTS[transport]
+        drone_class = getattr(module, spec.class_name)
+        drones = []
+        for i in range(count):
+            drone_id = f"{spec.id_prefix}-{i + 1:03d}"
+            config = module.DroneConfig(
+                drone_id=drone_id,
+                model='FlyOS_MQ7_Camera_Bench',
+                base_lat=18.5204,
+                base_lng=73.8567,
+                jetson_serial=jetson_serial('JETSON-CAMBENCH', self.seed, drone_id),
+                capabilities=['telemetry', 'camera', 'mavros', 'commands'],
+                camera_fps=fps,
+                enable_camera_streaming=True,
+                seed=self.seed,
+                **spec.fields
+            )
+            drones.append(drone_class(config, server_url))
+        return drones
+
+    def meter_socketio(self, drone, meter: FrameMeter):
+        """Record every camera frame the drone emits"""
+        emit = drone.sio.emit
+        drone_id = drone.config.drone_id
+
+        async def metered_emit(event, data=None, *args, **kwargs):
+            if event in CAMERA_FRAME_EVENTS and isinstance(data, dict):
+                meter.record(f"{drone_id}:{data.get('camera', 'front')}", frame_bytes(data))
+            return await emit(event, data, *args, **kwargs)
+
+        drone.sio.emit = metered_emit
+
+    async def attach_webrtc(self, drone, sent: FrameMeter, received: FrameMeter) -> list:
+        """Give the drone a loopback camera channel; both ends are metered"""
+        drone_id = drone.config.drone_id
+
+        def on_message(message):
+            if isinstance(message, bytes):
+                received.record(f"{drone_id}:{webrtc_camera(message)}", len(message))
+
+        sender, receiver, channel = await open_loopback_channel(on_message)
+        send = channel.send
+
+        def metered_send(message):
+            sent.record(f"{drone_id}:{webrtc_camera(message)}", len(message))
+            send(message)
+
+        channel.send = metered_send
+        # What the drone sets once its own signaling completes
+        drone.data_channels['camera_frames'] = channel
+        drone.use_webrtc_for_camera = True
+        drone.webrtc_connected = True
+        return [sender, receiver]
+
+    async def run_level(self, transport: str, module, fps: float, count: int) -> LevelResult:
+        """Start count drones streaming at fps, measure one window on both sides"""
+        logger.info(f"📹 {transport} ({TRANSPORTS[transport].description}): {count} drones at {fps:g} fps")
+        result = LevelResult(transport, fps, count)
+        sent = FrameMeter()
+        webrtc_received = FrameMeter() if transport == 'webrtc' else None
+        receiver = await SocketIOReceiver(fps, self.receiver_log_level).start()
+        drones = self.create_drones(transport, module, fps, count, receiver.url)
+        tasks: List[asyncio.Task] = []
+        peers = []
+        try:
+            for i, drone in enumerate(drones):
+                if webrtc_received is None:
+                    self.meter_socketio(drone, sent)
+                tasks.append(asyncio.create_task(drone.run()))
+                if i + 1 < len(drones):
+                    await asyncio.sleep(1.0 / self.ramp_rate)
+
+            deadline = time.time() + CONNECT_TIMEOUT
+            while time.time() < deadline and not all(d.registered for d in drones):
+                await asyncio.sleep(0.5)
+            result.registered = sum(1 for d in drones if d.registered)
+            if webrtc_received is not None:
+                for drone in drones:
+                    peers.extend(await self.attach_webrtc(drone, sent, webrtc_received))
+            await asyncio.sleep(self.settle_s)
+
+            await receiver.request('start')
+            sent.start()
+            if webrtc_received is not None:
+                webrtc_received.start()
+            cpu_start, window_start = time.process_time(), time.perf_counter()
+            await asyncio.sleep(self.duration_s)
+            sent.stop()
+            if webrtc_received is not None:
+                webrtc_received.stop()
+            result.window_s = time.perf_counter() - window_start
+            result.sender_cpu_s = time.process_time() - cpu_start
+            receiver_stats = await receiver.request('stop')
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for peer in peers:
+                await peer.close()
+            await receiver.stop()
+
+        result.sent = stream_stats(sent.frames, sent.bytes, result.window_s)
+        if webrtc_received is not None:
+            result.received = stream_stats(webrtc_received.frames, webrtc_received.bytes, result.window_s)
+        else:
+            result.received = stream_stats(receiver_stats['frames'], receiver_stats['bytes'],
+                                           receiver_stats['window_s'])
+            result.receiver_cpu_s = receiver_stats['cpu_s']
+
+        side = result.side(result.received)
+        logger.info(f"📹 {transport} {count}x{fps:g}fps: {result.registered}/{count} registered, "
+                    f"received {side['mean_fps']:.1f} fps per stream (slowest {side['min_fps']:.1f})")
+        return result
+
+    def summary(self) -> dict:
+        return {
+            'transports': self.transports,
+            'fps': self.fps_levels,
+            'drones': self.drone_levels,
+            'duration_s': self.duration_s,
+            'levels': [result.to_dict() for result in self.results]
+        }
+
+    def print_report(self):
+        """Print achieved FPS, jitter, bytes/s and CPU per stream for every level"""
+        print(f"\n📹 CAMERA THROUGHPUT REPORT (achieved vs. target FPS, {len(CAMERAS)} cameras per drone)")
+        print("=" * 100)
+        print(f"Window: {self.duration_s:g}s per level. FPS and jitter per camera stream, received side first; "
+              f"CPU in % of one core per stream")
+
+        for transport in self.transports:
+            print(f"\n{transport.upper()} ({TRANSPORTS[transport].description})")
+            print("-" * 100)
+            levels = [r for r in self.results if r.transport == transport]
+            if levels and levels[0].skipped:
+                print(f"  Skipped: {levels[0].skipped}")
+                continue
+            print(f"  {'fps':>4} {'drones':>6} {'reg':>4} {'recv fps':>9} {'slowest':>8} {'sent fps':>9} "
+                  f"{'jitter':>9} {'max gap':>9} {'KB/s/strm':>10} {'MB/s':>7} {'CPU send':>9} {'CPU recv':>9}")
+            for result in levels:
+                received, sent = result.side(result.received), result.side(result.sent)
+                per_stream_kb = received['bytes_per_s'] / result.streams / 1024
+                send_cpu = result.cpu_per_stream(result.sender_cpu_s)
+                recv_cpu = result.cpu_per_stream(result.receiver_cpu_s)
+                flag = ' ⚠️' if received['mean_fps'] < result.fps * 0.95 else ''
+                print(f"  {result.fps:>4g} {result.drones:>6} {result.registered:>4} {received['mean_fps']:>9.1f} "
+                      f"{received['min_fps']:>8.1f} {sent['mean_fps']:>9.1f} "
+                      f"{received['mean_jitter_ms']:>7.1f}ms {received['max_gap_ms']:>7.0f}ms "
+                      f"{per_stream_kb:>10.1f} {received['bytes_per_s'] / (1024 * 1024):>7.2f} "
+                      f"{send_cpu * 100:>8.1f}% "
+                      f"{f'{recv_cpu * 100:.1f}%' if recv_cpu is not None else 'in send':>9}{flag}")
+            if transport == 'webrtc':
+                print("  Receiver is a loopback peer in this process: its CPU is included in CPU send")
+
+        print("\n⚠️ marks levels whose streams averaged below 95% of the target FPS")
+        print("=" * 100)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Camera throughput per transport: achieved vs. target FPS')
+    parser.add_argument('--transports', nargs='+', choices=list(TRANSPORTS), default=list(TRANSPORTS),
+                        help=f"Transports to run (default: {' '.join(TRANSPORTS)})")
+    parser.add_argument('--fps', type=float, nargs='+', default=[15, 30, 60],
+                        help='Target camera FPS levels (default: 15 30 60)')
+    parser.add_argument('--drones', type=int, nargs='+', default=[1, 10, 50],
+                        help='Camera drones per level (default: 1 10 50)')
+    parser.add_argument('--duration', type=float, default=20.0,
+                        help='Seconds measured per level (default: 20)')
+    parser.add_argument('--settle', type=float, default=3.0,
+                        help='Seconds between registration and the window (default: 3)')
+    parser.add_argument('--ramp-rate', type=float, default=20.0, help='Drones started per second (default: 20)')
+    parser.add_argument('--seed', type=int,
+                        help='Seed every drone\'s random streams for reproducible frames (default: unseeded)')
+    parser.add_argument('--output', help='Write results JSON here (default: do not write)')
+    parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], default='INFO',
+                        help='Log level (default: INFO)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=getattr(logging, args.log_level),
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    # The simulators log every connect and stream start; keep the benchmark output readable
+    for spec in TRANSPORTS.values():
+        logging.getLogger(spec.module).setLevel(max(logging.WARNING, getattr(logging, args.log_level)))
+
+    if any(fps <= 0 or not math.isfinite(fps) for fps in args.fps):
+        parser.error("--fps levels must be positive")
+    if any(drones <= 0 for drones in args.drones):
+        parser.error("--drones levels must be positive")
+    if args.duration <= 0 or args.ramp_rate <= 0 or args.settle < 0:
+        parser.error("--duration and --ramp-rate must be positive, --settle not negative")
+
+    benchmark = CameraBenchmark(args.transports, args.fps, args.drones, args.duration, args.settle,
+                                args.ramp_rate, receiver_log_level='WARNING', seed=args.seed)
+    try:
+        asyncio.run(benchmark.run())
+    except KeyboardInterrupt:
+        logger.info("🛑 Camera benchmark stopped by user")
+    benchmark.print_report()
+
+    if args.output and benchmark.results:
+        with open(args.output, 'w') as f:
+            json.dump({'timestamp': time.time(), **benchmark.summary()}, f, indent=2)
+        logger.info(f"📁 Camera benchmark results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+# services/drone-connection-service/src/clients/python-mock/capacity_search.py
+"""
+Capacity search: find the fleet size where telemetry latency breaks its SLOs
+
+Instead of rerunning the fleet runner with a different --drones by hand,
+the search runs one stage per drone count. Each stage starts a fresh fleet
+through the usual ramp, waits for registration and a settle period, then
+holds for a measurement window. Telemetry sent in the window is matched to
+its acks by send timestamp, so every stage yields:
+
+  p50/p95/p99   telemetry round trip of the window's acked messages
+  throughput    telemetry acks per second
+  loss          share of the window's telemetry that was never acked
+  ack rate      acks over the telemetry the whole stage should have sent at
+                its configured rates (unconnected drones and a sender that
+                falls behind both pull it down)
+
+A stage passes while p99, loss and ack rate are all within the SLOs. The
+step search adds --capacity-step drones per stage until a stage fails; the
+bisect search checks --capacity-start and --capacity-max, then halves the
+interval between the largest passing and smallest failing count until it
+is narrower than --capacity-resolution. The knee is the largest passing
+stage; the report prints the whole drones vs. latency/throughput curve:
+
+  python multi_drone_prod.py --capacity-search step --capacity-start 10 \\
+      --capacity-step 10 --capacity-max 200 --capacity-hold 60 --slo-p99-ms 250
+  python multi_drone_prod.py --capacity-search bisect --capacity-start 10 \\
+      --capacity-max 500 --capacity-resolution 10 --export
+
+Event-loop lag is recorded per stage: a stage that failed while the
+simulator's own loop lagged measured this host, not the backend.
+"""
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Callable, List, Optional
+
+from latency_histogram import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+SEARCH_MODES = ('step', 'bisect')
+CONNECT_TIMEOUT = 60.0
+# Acks still in flight when the window closes count once they arrive
+ACK_GRACE_S = 2.0
+# Loop lag P99 above this means the stage measured the simulator host
+CLIENT_SATURATION_LAG_MS = 50.0
+
+
+class CapacitySearchError(ValueError):
+    """Invalid capacity search settings"""
+
+
+@dataclass
+class CapacitySLO:
+    p99_ms: float = 250.0
+    max_loss_pct: float = 1.0
+    min_ack_rate: float = 0.95
+
+    def validate(self):
+        if self.p99_ms <= 0:
+            raise CapacitySearchError("SLO p99 must be positive")
+        if not 0 <= self.max_loss_pct <= 100:
+            raise CapacitySearchError("SLO loss must be between 0 and 100%")
+        if not 0 <= self.min_ack_rate <= 1:
+            raise CapacitySearchError("SLO ack rate must be between 0 and 1")
+
+    def violations(self, stage: 'StageResult') -> List[str]:
+        """SLOs the stage broke, empty when it passed"""
+        if not stage.acks:
+            return ['no telemetry acks']
+        violations = []
+        if stage.p99_ms > self.p99_ms:
+            violations.append(f"p99 {stage.p99_ms:.1f}ms > {self.p99_ms:g}ms")
+        if stage.loss_pct > self.max_loss_pct:
+            violations.append(f"loss {stage.loss_pct:.2f}% > {self.max_loss_pct:g}%")
+        if stage.ack_rate < self.min_ack_rate:
+            violations.append(f"ack rate {stage.ack_rate:.3f} < {self.min_ack_rate:g}")
+        return violations
+
+
+@dataclass
+class StageResult:
+    drones: int
+    connected: int
+    window_s: float
+    sent: int
+    acks: int
+    expected: float                  # telemetry at configured rates for every stage drone
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    loop_lag_p99_ms: Optional[float] = None
+    violations: List[str] = field(default_factory=list)
+
+    @property
+    def passed(self) -> bool:
+        return not self.violations
+
+    @property
+    def throughput(self) -> float:
+        return self.acks / self.window_s if self.window_s else 0.0
+
+    @property
+    def loss_pct(self) -> float:
+        return max(0.0, (self.sent - self.acks) / self.sent * 100) if self.sent else 100.0
+
+    @property
+    def ack_rate(self) -> float:
+        return min(1.0, self.acks / self.expected) if self.expected else 0.0
+
+    @property
+    def client_saturated(self) -> bool:
+        return self.loop_lag_p99_ms is not None and self.loop_lag_p99_ms > CLIENT_SATURATION_LAG_MS
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), 'passed': self.passed, 'throughput': self.throughput,
+                'loss_pct': self.loss_pct, 'ack_rate': self.ack_rate}
+
+
+class CapacitySearch:
+    """Run fleet stages of growing size and find the largest one within the SLOs"""
+
+    def __init__(self, build_simulator: Callable[[int], object], slo: CapacitySLO, mode: str = 'step',
+                 start: int = 10, step: int = 10, max_drones: int = 200, resolution: int = 10,
+                 hold_s: float = 60.0, settle_s: float = 10.0, cooldown_s: float = 5.0):
+        self.build_simulator = build_simulator
+        self.slo = slo
+        self.mode = mode
+        self.start = start
+        self.step = step
+        self.max_drones = max_drones
+        self.resolution = resolution
+        self.hold_s = hold_s
+        self.settle_s = settle_s
+        self.cooldown_s = cooldown_s
+        self.stages: List[StageResult] = []
+
+    def validate(self):
+        if self.mode not in SEARCH_MODES:
+            raise CapacitySearchError(f"Unknown search mode '{self.mode}' (expected one of {', '.join(SEARCH_MODES)})")
+        if self.start <= 0 or self.step <= 0 or self.resolution <= 0:
+            raise CapacitySearchError("Start, step and resolution must be positive")
+        if self.max_drones < self.start:
+            raise CapacitySearchError(f"Max drones {self.max_drones} is below the start {self.start}")
+        if self.hold_s <= 0 or self.settle_s < 0 or self.cooldown_s < 0:
+            raise CapacitySearchError("Hold must be positive, settle and cooldown not negative")
+        self.slo.validate()
+
+    async def run(self) -> List[StageResult]:
+        """Run the search; stages are kept in the order they ran"""
+        logger.info(f"📈 Capacity search ({self.mode}): {self.start}-{self.max_drones} drones, "
+                    f"{self.hold_s:g}s windows, SLO p99 ≤ {self.slo.p99_ms:g}ms, "
+                    f"loss ≤ {self.slo.max_loss_pct:g}%, ack rate ≥ {self.slo.min_ack_rate:g}")
+        if self.mode == 'step':
+            await self.step_search()
+        else:
+            await self.bisect_search()
+        return self.stages
+
+    async def step_search(self):
+        drones = self.start
+        while drones <= self.max_drones:
+            stage = await self.run_stage(drones)
+            if not stage.passed:
+                return
+            drones += self.step
+
+    async def bisect_search(self):
+        low = await self.run_stage(self.start)
+        if not low.passed:
+            return
+        high = await self.run_stage(self.max_drones)
+        if high.passed:
+            return
+        good, bad = self.start, self.max_drones
+        while bad - good > self.resolution:
+            drones = (good + bad) // 2
+            stage = await self.run_stage(drones)
+            if stage.passed:
+                good = drones
+            else:
+                bad = drones
+
+    async def run_stage(self, num_drones: int) -> StageResult:
+        """Run one fleet of num_drones through ramp, settle and the measurement window"""
+        if self.stages and self.cooldown_s:
+            await asyncio.sleep(self.cooldown_s)
+        logger.info(f"📈 Stage {len(self.stages) + 1}: {num_drones} drones")
+
+        simulator = self.build_simulator(num_drones)
+        drones = simulator.drones = simulator.create_drones()
+        simulator.start_services()
+        try:
+            await simulator.start_drones(drones)
+            deadline = time.time() + CONNECT_TIMEOUT
+            while time.time() < deadline and not all(d.registered for d in drones):
+                await asyncio.sleep(0.5)
+            await asyncio.sleep(self.settle_s)
+
+            if simulator.loop_monitor:
+                simulator.loop_monitor.histogram.reset()
+            connected = sum(1 for d in drones if d.registered)
+            sent_before = [d.sequence_counters['telemetry'] for d in drones]
+            window_start = time.time()
+            await asyncio.sleep(self.hold_s)
+            window_end = time.time()
+            sent = sum(d.sequence_counters['telemetry'] - before for d, before in zip(drones, sent_before))
+            loop_lag_p99 = (simulator.loop_monitor.histogram.percentile(99)
+                            if simulator.loop_monitor and simulator.loop_monitor.histogram.count else None)
+            await asyncio.sleep(ACK_GRACE_S)
+        finally:
+            await simulator.shutdown()
+
+        histogram = LatencyHistogram()
+        for drone in drones:
+            for m in drone.latency_measurements:
+                if m.measurement_type == 'telemetry' and window_start <= m.send_timestamp < window_end:
+                    histogram.record(m.latency_ms)
+        window_s = window_end - window_start
+        stage = StageResult(
+            drones=num_drones,
+            connected=connected,
+            window_s=window_s,
+            sent=sent,
+            acks=histogram.count,
+            expected=sum(d.config.telemetry_rate for d in drones) * window_s,
+            p50_ms=histogram.percentile(50),
+            p95_ms=histogram.percentile(95),
+            p99_ms=histogram.percentile(99),
+            loop_lag_p99_ms=loop_lag_p99
+        )
+        stage.violations = self.slo.violations(stage)
+        self.stages.append(stage)
+
+        verdict = "✅ within SLO" if stage.passed else f"❌ {', '.join(stage.violations)}"
+        logger.info(f"📈 Stage {len(self.stages)}: {num_drones} drones ({connected} connected), "
+                    f"p99 {stage.p99_ms:.1f}ms, {stage.throughput:.1f} acks/s, loss {stage.loss_pct:.2f}%, "
+                    f"ack rate {stage.ack_rate:.3f}: {verdict}")
+        return stage
+
+    def curve(self) -> List[StageResult]:
+        """Stages ordered by drone count"""
+        return sorted(self.stages, key=lambda s: s.drones)
+
+    def knee(self) -> Optional[StageResult]:
+        """Largest stage within the SLOs"""
+        passing = [s for s in self.stages if s.passed]
+        return max(passing, key=lambda s: s.drones) if passing else None
+
+    def breaking_point(self) -> Optional[StageResult]:
+        """Smallest stage above the knee that broke an SLO"""
+        knee = self.knee()
+        failing = [s for s in self.stages if not s.passed and (knee is None or s.drones > knee.drones)]
+        return min(failing, key=lambda s: s.drones) if failing else None
+
+    def summary(self) -> dict:
+        knee = self.knee()
+        breaking = self.breaking_point()
+        return {
+            'mode': self.mode,
+            'slo': asdict(self.slo),
+            'hold_s': self.hold_s,
+            'settle_s': self.settle_s,
+            'knee_drones': knee.drones if knee else None,
+            'breaking_drones': breaking.drones if breaking else None,
+            'curve': [stage.to_dict() for stage in self.curve()]
+        }
+
+    def export(self, filename: str = None) -> str:
+        if not filename:
+            filename = f"capacity_search_{int(time.time())}.json"
+        with open(filename, 'w') as f:
+            json.dump({'timestamp': time.time(), **self.summary()}, f, indent=2)
+        logger.info(f"📁 Capacity search exported to {filename}")
+        return filename
+
+    def print_report(self):
+        """Print the drones vs. latency curve and the knee"""
+        print(f"\n📈 CAPACITY SEARCH REPORT ({self.mode})")
+        print("=" * 80)
+        print(f"SLO: telemetry p99 ≤ {self.slo.p99_ms:g}ms, loss ≤ {self.slo.max_loss_pct:g}%, "
+              f"ack rate ≥ {self.slo.min_ack_rate:g} over {self.hold_s:g}s windows")
+        if not self.stages:
+            print("No stages completed")
+            print("=" * 80)
+            return
+
+        print(f"\n{'Drones':>7} {'Conn':>6} {'P50':>9} {'P95':>9} {'P99':>9} {'Acks/s':>9} "
+              f"{'Loss':>7} {'AckRate':>8} {'LoopP99':>9}  Verdict")
+        print("-" * 80)
+        knee = self.knee()
+        for stage in self.curve():
+            loop_lag = f"{stage.loop_lag_p99_ms:.1f}ms" if stage.loop_lag_p99_ms is not None else '-'
+            verdict = '✅' if stage.passed else '❌'
+            if stage is knee:
+                verdict += ' ← knee'
+            print(f"{stage.drones:>7} {stage.connected:>6} {stage.p50_ms:>7.1f}ms {stage.p95_ms:>7.1f}ms "
+                  f"{stage.p99_ms:>7.1f}ms {stage.throughput:>9.1f} {stage.loss_pct:>6.2f}% "
+                  f"{stage.ack_rate:>8.3f} {loop_lag:>9}  {verdict}")
+
+        print()
+        breaking = self.breaking_point()
+        if knee:
+            print(f"Knee: {knee.drones} drones (p99 {knee.p99_ms:.1f}ms, {knee.throughput:.1f} acks/s)")
+        else:
+            print(f"Knee: none, the first stage ({self.stages[0].drones} drones) already broke the SLOs")
+        if breaking:
+            print(f"Breaks at: {breaking.drones} drones ({', '.join(breaking.violations)})")
+            if breaking.client_saturated:
+                print(f"  ⚠️ Simulator loop lag P99 {breaking.loop_lag_p99_ms:.1f}ms: this host saturated, "
+                      f"not necessarily the backend")
+        elif knee and knee.drones >= self.max_drones:
+            print(f"No stage broke the SLOs up to --capacity-max {self.max_drones}")
+        print("=" * 80)
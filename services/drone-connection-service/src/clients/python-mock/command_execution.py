@@ -0,0 +1,40 @@
+# services/drone-connection-service/src/clients/python-mock/command_execution.py
+"""
+Command execution delay models for simulated drones
+
+A simulated drone answers a command with command_response after an
+execution delay. The model is chosen per drone with DroneConfig.command_delay:
+
+  uniform   100-500ms for every command (the simulators' original behavior)
+  modeled   per command type ranges, roughly what a flight controller takes
+            to accept each one (takeoff waits for the arming checks, arm and
+            disarm are fast)
+  none      answer immediately, so command_response timing is pure dispatch
+
+  delay = command_delay('modeled', 'takeoff', self.rng['command'])
+"""
+from typing import Dict, Tuple
+
+COMMAND_DELAY_MODES = ('uniform', 'none', 'modeled')
+
+UNIFORM_DELAY_S = (0.1, 0.5)
+# Seconds (low, high) per command type; unknown types use the 'default' range
+MODELED_DELAY_S: Dict[str, Tuple[float, float]] = {
+    'arm': (0.05, 0.15),
+    'disarm': (0.05, 0.1),
+    'takeoff': (0.3, 0.8),
+    'land': (0.1, 0.3),
+    'rtl': (0.1, 0.3),
+    'default': (0.1, 0.3)
+}
+
+
+def command_delay(mode: str, command_type: str, rng) -> float:
+    """Execution delay in seconds for one command, drawn from rng"""
+    if mode == 'none':
+        return 0.0
+    if mode == 'modeled':
+        low, high = MODELED_DELAY_S.get(command_type, MODELED_DELAY_S['default'])
+    else:
+        low, high = UNIFORM_DELAY_S
+    return rng.uniform(low, high)
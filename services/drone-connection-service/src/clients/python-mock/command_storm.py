@@ -0,0 +1,315 @@
+# services/drone-connection-service/src/clients/python-mock/command_storm.py
+"""
+Command-storm benchmark: command dispatch latency under fleet and camera load
+
+Starts an in-process stand-in server, brings up a background fleet and
+fires commands at a fixed open-loop rate across every registered drone.
+The stand-in times each command from the emit to the drone's
+command_response, so the report gives P50/P95/P99/max per command type for
+every background load level. A load level is a number of telemetry drones
+(ProductionMockDrone) plus a number of camera drones
+(OptimizedProductionDrone, binary frames at --camera-fps); every
+combination of --drones and --camera-drones is run on a fresh server:
+
+  python command_storm.py --drones 5 20 50 --camera-drones 0 4 --rate 20
+  python command_storm.py --drones 10 --command-delay modeled --commands arm takeoff land rtl \\
+      --duration 60 --output storm.json
+
+--command-delay sets how long drones take to execute a command before they
+answer (command_execution.py): none (default) leaves pure dispatch latency,
+modeled adds per command type delays, uniform is the simulators' original
+100-500ms. Client and server share this process and its event loop, so the
+report includes loop lag P99 per level: when it is high the latency is this
+host's, not the protocol's. Commands still unanswered a grace period after
+the storm are counted as lost.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import random
+import sys
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional
+
+from command_execution import COMMAND_DELAY_MODES, MODELED_DELAY_S, UNIFORM_DELAY_S
+from fleet_scenario import ScenarioFleetSimulator, parse_scenario, ScenarioError
+from latency_histogram import LatencyHistogram
+from loop_monitor import EventLoopLagMonitor
+from ramp_profiles import RampProfile
+from send_schedule import SendSchedule
+from standin_server import StandinServer, StandinConfig
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COMMANDS = ['arm', 'takeoff', 'land', 'rtl']
+CONNECT_TIMEOUT = 60.0
+RESPONSE_GRACE_S = 2.0
+
+
+@dataclass
+class LoadLevel:
+    drones: int
+    camera_drones: int = 0
+    camera_fps: float = 30.0
+
+    @property
+    def total_drones(self) -> int:
+        return self.drones + self.camera_drones
+
+    def describe(self) -> str:
+        if not self.camera_drones:
+            return f"{self.drones} telemetry"
+        return f"{self.drones} telemetry + {self.camera_drones} camera @{self.camera_fps:g}fps"
+
+    def scenario(self, command_delay: str):
+        groups = []
+        if self.drones:
+            groups.append({'name': 'telemetry', 'class': 'ProductionMockDrone', 'count': self.drones,
+                           'command_delay': command_delay})
+        if self.camera_drones:
+            groups.append({'name': 'camera', 'class': 'OptimizedProductionDrone', 'count': self.camera_drones,
+                           'camera_fps': self.camera_fps, 'binary_frames': True, 'compression': True,
+                           'command_delay': command_delay})
+        return parse_scenario({'name': f"command-storm-{self.drones}-{self.camera_drones}", 'groups': groups})
+
+
+@dataclass
+class LevelResult:
+    level: LoadLevel
+    connected: int
+    storm_s: float
+    sent: Dict[str, int] = field(default_factory=dict)
+    rtt: Dict[str, LatencyHistogram] = field(default_factory=dict)
+    late_sends: int = 0
+    max_behind_ms: float = 0.0
+    loop_lag_p99_ms: Optional[float] = None
+
+    def responses(self, command_type: str) -> int:
+        histogram = self.rtt.get(command_type)
+        return histogram.count if histogram else 0
+
+    def lost(self, command_type: str) -> int:
+        return max(0, self.sent.get(command_type, 0) - self.responses(command_type))
+
+    def to_dict(self) -> dict:
+        return {
+            'level': asdict(self.level),
+            'connected': self.connected,
+            'storm_s': self.storm_s,
+            'late_sends': self.late_sends,
+            'max_behind_ms': self.max_behind_ms,
+            'loop_lag_p99_ms': self.loop_lag_p99_ms,
+            'commands': {command_type: {'sent': sent, 'responses': self.responses(command_type),
+                                        'lost': self.lost(command_type),
+                                        'rtt_ms': self.rtt[command_type].summary() if command_type in self.rtt
+                                        else None}
+                         for command_type, sent in self.sent.items()}
+        }
+
+
+class CommandStorm:
+    """Run a command storm at each background load level"""
+
+    def __init__(self, levels: List[LoadLevel], rate: float = 10.0, duration_s: float = 30.0,
+                 commands: Optional[List[str]] = None, command_delay: str = 'none', settle_s: float = 5.0,
+                 ramp_rate: float = 20.0, seed: Optional[int] = None):
+        self.levels = levels
+        self.rate = rate
+        self.duration_s = duration_s
+        self.commands = commands or DEFAULT_COMMANDS
+        self.command_delay = command_delay
+        self.settle_s = settle_s
+        self.ramp_rate = ramp_rate
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.results: List[LevelResult] = []
+
+    @property
+    def response_grace_s(self) -> float:
+        """Longest execution delay of the model plus a margin for the round trip"""
+        if self.command_delay == 'none':
+            return RESPONSE_GRACE_S
+        if self.command_delay == 'modeled':
+            return RESPONSE_GRACE_S + max(high for _, high in MODELED_DELAY_S.values())
+        return RESPONSE_GRACE_S + UNIFORM_DELAY_S[1]
+
+    async def run(self) -> List[LevelResult]:
+        for level in self.levels:
+            self.results.append(await self.run_level(level))
+        return self.results
+
+    async def run_level(self, level: LoadLevel) -> LevelResult:
+        """Bring up the level's fleet on a fresh stand-in, storm it and collect the round trips"""
+        logger.info(f"🌩️ Level {level.describe()}: {self.rate:g} commands/s for {self.duration_s:g}s")
+        loop_monitor = EventLoopLagMonitor()
+        async with StandinServer(StandinConfig(port=0)) as server:
+            simulator = ScenarioFleetSimulator(level.scenario(self.command_delay), server.url,
+                                               ramp=RampProfile('linear', self.ramp_rate, seed=self.seed),
+                                               seed=self.seed)
+            drones = simulator.drones = simulator.create_drones()
+            loop_monitor.start()
+            try:
+                await simulator.start_drones(drones)
+                deadline = time.time() + CONNECT_TIMEOUT
+                while time.time() < deadline and len(server.registered_drones) < level.total_drones:
+                    await asyncio.sleep(0.5)
+                await asyncio.sleep(self.settle_s)
+
+                targets = server.registered_drones
+                loop_monitor.histogram.reset()
+                schedule = SendSchedule(1.0 / self.rate)
+                storm_start = time.time()
+                if targets:
+                    end = storm_start + self.duration_s
+                    while True:
+                        intended = await schedule.next_send()
+                        if intended >= end:
+                            break
+                        await server.send_command(self.rng.choice(targets), self.rng.choice(self.commands))
+                storm_s = time.time() - storm_start
+
+                deadline = time.time() + self.response_grace_s
+                while server.pending_commands and time.time() < deadline:
+                    await asyncio.sleep(0.1)
+                loop_lag_p99 = loop_monitor.histogram.percentile(99) if loop_monitor.histogram.count else None
+            finally:
+                await loop_monitor.stop()
+                await simulator.cleanup()
+                for task in simulator.drone_tasks:
+                    task.cancel()
+                await asyncio.gather(*simulator.drone_tasks, return_exceptions=True)
+
+            result = LevelResult(level=level, connected=len(targets), storm_s=storm_s,
+                                 sent=dict(server.commands_sent), rtt=dict(server.command_rtt),
+                                 late_sends=schedule.late_sends, max_behind_ms=schedule.max_behind_ms,
+                                 loop_lag_p99_ms=loop_lag_p99)
+
+        if not targets:
+            logger.error(f"❌ Level {level.describe()}: no drone registered, no commands sent")
+        else:
+            sent = sum(result.sent.values())
+            lost = sum(result.lost(command_type) for command_type in result.sent)
+            logger.info(f"🌩️ Level {level.describe()}: {sent} commands to {len(targets)} drones, {lost} lost")
+        return result
+
+    def summary(self) -> dict:
+        return {
+            'rate': self.rate,
+            'duration_s': self.duration_s,
+            'commands': self.commands,
+            'command_delay': self.command_delay,
+            'seed': self.seed,
+            'levels': [result.to_dict() for result in self.results]
+        }
+
+    def print_report(self):
+        """Print command round trips by load level and command type"""
+        print(f"\n🌩️ COMMAND STORM REPORT (command -> command_response)")
+        print("=" * 80)
+        print(f"Rate: {self.rate:g} commands/s for {self.duration_s:g}s per level, "
+              f"commands: {' '.join(self.commands)}, execution delay: {self.command_delay}")
+
+        for result in self.results:
+            lag = f", loop lag P99 {result.loop_lag_p99_ms:.1f}ms" if result.loop_lag_p99_ms is not None else ''
+            print(f"\n{result.level.describe().upper()} ({result.connected}/{result.level.total_drones} "
+                  f"registered{lag})")
+            print("-" * 80)
+            if not result.sent:
+                print("  No commands sent")
+                continue
+            print(f"  {'command':<10} {'sent':>6} {'lost':>6} {'P50':>10} {'P95':>10} {'P99':>10} {'max':>10}")
+            for command_type in self.commands:
+                if command_type not in result.sent:
+                    continue
+                histogram = result.rtt.get(command_type)
+                if histogram is None or not histogram.count:
+                    print(f"  {command_type:<10} {result.sent[command_type]:>6} {result.lost(command_type):>6}"
+                          f"  no responses")
+                    continue
+                print(f"  {command_type:<10} {result.sent[command_type]:>6} {result.lost(command_type):>6} "
+                      f"{histogram.percentile(50):>8.1f}ms {histogram.percentile(95):>8.1f}ms "
+                      f"{histogram.percentile(99):>8.1f}ms {histogram.max_ms:>8.1f}ms")
+            if result.late_sends:
+                print(f"  ⚠️ {result.late_sends} commands left a full interval late "
+                      f"(max {result.max_behind_ms:.1f}ms behind): the storm did not hold its rate")
+
+        if len(self.results) > 1:
+            print(f"\nP99 by load level (ms):")
+            print(f"  {'level':<36}" + "".join(f"{command_type:>10}" for command_type in self.commands))
+            for result in self.results:
+                cells = []
+                for command_type in self.commands:
+                    histogram = result.rtt.get(command_type)
+                    cells.append(f"{histogram.percentile(99):>10.1f}" if histogram and histogram.count
+                                 else f"{'-':>10}")
+                print(f"  {result.level.describe():<36}" + "".join(cells))
+        print("=" * 80)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Command dispatch latency under fleet and camera load')
+    parser.add_argument('--drones', type=int, nargs='+', default=[10],
+                        help='Telemetry drones per load level (default: 10)')
+    parser.add_argument('--camera-drones', type=int, nargs='+', default=[0],
+                        help='Camera drones per load level (default: 0)')
+    parser.add_argument('--camera-fps', type=float, default=30.0, help='Camera drone frame rate (default: 30)')
+    parser.add_argument('--rate', type=float, default=10.0,
+                        help='Commands per second across the fleet (default: 10)')
+    parser.add_argument('--duration', type=float, default=30.0,
+                        help='Seconds of command storm per level (default: 30)')
+    parser.add_argument('--commands', nargs='+', default=DEFAULT_COMMANDS,
+                        help=f"Command types to send (default: {' '.join(DEFAULT_COMMANDS)})")
+    parser.add_argument('--command-delay', choices=COMMAND_DELAY_MODES, default='none',
+                        help='Drone command execution delay before command_response (default: none)')
+    parser.add_argument('--settle', type=float, default=5.0,
+                        help='Seconds between registration and the storm (default: 5)')
+    parser.add_argument('--ramp-rate', type=float, default=20.0,
+                        help='Drones started per second (default: 20)')
+    parser.add_argument('--seed', type=int, help='Seed drone streams and command targets (default: unseeded)')
+    parser.add_argument('--output', help='Write results JSON here (default: do not write)')
+    parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], default='INFO',
+                        help='Log level (default: INFO)')
+    args = parser.parse_args()
+
+    # fleet_scenario imports the fleet runner, which already configured logging
+    logging.getLogger().setLevel(getattr(logging, args.log_level))
+    # One line per command and per connect from every drone would bury the report
+    for name in ('drone_simulator_prod', 'drone_simulator_optimized'):
+        logging.getLogger(name).setLevel(max(logging.WARNING, getattr(logging, args.log_level)))
+
+    if args.rate <= 0 or args.duration <= 0 or args.ramp_rate <= 0:
+        parser.error("--rate, --duration and --ramp-rate must be positive")
+    if any(n < 0 for n in args.drones + args.camera_drones):
+        parser.error("drone counts cannot be negative")
+
+    levels = [LoadLevel(drones, camera_drones, args.camera_fps)
+              for camera_drones, drones in itertools.product(args.camera_drones, args.drones)
+              if drones + camera_drones > 0]
+    if not levels:
+        parser.error("every load level is empty")
+    try:
+        for level in levels:
+            level.scenario(args.command_delay)
+    except ScenarioError as e:
+        logger.error(f"❌ {e}")
+        sys.exit(1)
+
+    storm = CommandStorm(levels, args.rate, args.duration, args.commands, args.command_delay, args.settle,
+                         args.ramp_rate, args.seed)
+    try:
+        asyncio.run(storm.run())
+    except KeyboardInterrupt:
+        logger.info("🛑 Command storm stopped by user")
+    storm.print_report()
+
+    if args.output and storm.results:
+        with open(args.output, 'w') as f:
+            json.dump({'timestamp': time.time(), **storm.summary()}, f, indent=2)
+        logger.info(f"📁 Command storm results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
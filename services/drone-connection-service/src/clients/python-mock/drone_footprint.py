@@ -0,0 +1,138 @@
+# services/drone-connection-service/src/clients/python-mock/drone_footprint.py
+"""
+Compact per-drone state and fleet memory benchmark
+
+A simulated drone's fixed cost is dominated by its socketio.AsyncClient;
+what grows is the latency measurement list (one object and a small
+dict per ack received). The production drone therefore keeps:
+
+  - state, measurements and sequence counters in slotted objects
+  - capability lists shared by every drone of a fleet (immutable tuples)
+  - measurements in a MeasurementBuffer that is unbounded (default), keeps
+    only the latest N per drone, or stores nothing (N = 0; spike detection
+    still sees every measurement)
+
+Run directly to measure traced bytes per drone at startup and after a
+simulated run for each storage mode (acks are fed through the drone's real
+measurement path, no server needed):
+
+  python drone_footprint.py --drones 100 1000 --minutes 10
+
+Tracing slows the ack path several times over, so 1,000 drones for 10
+minutes takes a while per mode. Runs that would exceed --memory-limit-mb
+stop early and are projected linearly to the full duration (marked with *;
+an upper bound for bounded storage).
+"""
+import argparse
+import asyncio
+import gc
+import platform
+import time
+import tracemalloc
+from typing import List, Optional
+
+from drone_runtime import MeasurementBuffer
+from multi_drone_prod import MultiDroneProductionLatencySimulator
+
+STORAGE_MODES = ['full', 'bounded', 'off']
+
+
+def _traced_bytes() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+async def _footprint_run(num_drones: int, minutes: float, max_measurements: Optional[int],
+                         memory_limit_mb: float) -> dict:
+    tracemalloc.start()
+    baseline = _traced_bytes()
+    simulator = MultiDroneProductionLatencySimulator('http://127.0.0.1:9', num_drones,
+                                                     max_measurements=max_measurements)
+    drones = simulator.create_drones()
+    startup = _traced_bytes() - baseline
+
+    # Feed each drone's acks in simulated time: telemetry at its own rate, heartbeats alongside
+    seconds = minutes * 60
+    limit_bytes = memory_limit_mb * 1024 * 1024
+    t0 = time.time() * 1000
+    simulated = 0
+    heartbeat_due = [0.0] * num_drones
+    cpu_start = time.process_time()
+    while simulated < seconds:
+        for n, drone in enumerate(drones):
+            config = drone.config
+            for i in range(round(config.telemetry_rate)):
+                sent = t0 + (simulated + i / config.telemetry_rate) * 1000
+                await drone.measure_telemetry_latency({'timestamp': sent, 'sequence_id': i,
+                                                       'queueSize': 0, 'status': 'received'})
+            heartbeat_due[n] += config.heartbeat_rate
+            if heartbeat_due[n] >= 1:
+                heartbeat_due[n] -= 1
+                await drone.measure_heartbeat_latency({'serverTimestamp': t0 + simulated * 1000,
+                                                       'connectionQuality': 'excellent'})
+        simulated += 1
+        if simulated % 10 == 0 and tracemalloc.get_traced_memory()[0] > limit_bytes:
+            break
+    cpu = time.process_time() - cpu_start
+    final = _traced_bytes() - baseline
+    stored = sum(len(d.latency_measurements) for d in drones)
+    recorded = sum(d.latency_measurements.recorded for d in drones)
+    tracemalloc.stop()
+
+    projected = simulated < seconds
+    if projected:
+        final = startup + (final - startup) * seconds / simulated
+
+    del drones, simulator
+    gc.collect()
+    return {
+        'drones': num_drones,
+        'storage': MeasurementBuffer(max_measurements).describe(),
+        'startup_bytes_per_drone': startup / num_drones,
+        'final_bytes_per_drone': final / num_drones,
+        'stored_per_drone': stored / num_drones,
+        'recorded_per_drone': recorded / num_drones,
+        'simulated_seconds': simulated,
+        'projected': projected,
+        'cpu_s': cpu
+    }
+
+
+def benchmark(drone_counts: List[int], minutes: float, bounded_limit: int, memory_limit_mb: float,
+              modes: Optional[List[str]] = None):
+    """Traced bytes per drone at startup and after a simulated run, per storage mode"""
+    modes = modes or STORAGE_MODES
+    limits = {'full': None, 'bounded': bounded_limit, 'off': 0}
+    print(f"🧠 Drone memory benchmark: {minutes:g} simulated minutes, Python {platform.python_version()}, "
+          f"memory limit {memory_limit_mb:g}MB")
+    print(f"{'drones':>7} {'storage':<12} {'startup B/drone':>16} {'final B/drone':>15} {'growth':>9} "
+          f"{'stored':>8} {'CPU s':>7}")
+    print("-" * 80)
+    for num_drones in drone_counts:
+        for mode in modes:
+            r = asyncio.run(_footprint_run(num_drones, minutes, limits[mode], memory_limit_mb))
+            growth = r['final_bytes_per_drone'] / r['startup_bytes_per_drone'] if r['startup_bytes_per_drone'] else 0
+            print(f"{r['drones']:>7} {r['storage']:<12} {r['startup_bytes_per_drone']:>16,.0f} "
+                  f"{r['final_bytes_per_drone']:>14,.0f}{'*' if r['projected'] else ' '} {growth:>8.1f}x "
+                  f"{r['stored_per_drone']:>8,.0f} {r['cpu_s']:>7.1f}")
+    print("\n* stopped at the memory limit and projected linearly to the full duration")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-drone memory footprint benchmark')
+    parser.add_argument('--drones', type=int, nargs='+', default=[100, 1000],
+                        help='Fleet sizes to benchmark (default: 100 1000)')
+    parser.add_argument('--minutes', type=float, default=10.0,
+                        help='Simulated minutes of acks per run (default: 10)')
+    parser.add_argument('--bounded-limit', type=int, default=1000,
+                        help='Measurements kept per drone in bounded mode (default: 1000)')
+    parser.add_argument('--memory-limit-mb', type=float, default=2048.0,
+                        help='Stop a run and project once traced memory exceeds this (default: 2048)')
+    parser.add_argument('--modes', choices=STORAGE_MODES, nargs='+', default=STORAGE_MODES,
+                        help='Measurement storage modes to compare (default: full bounded off)')
+    args = parser.parse_args()
+    benchmark(args.drones, args.minutes, args.bounded_limit, args.memory_limit_mb, args.modes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# services/drone-connection-service/src/clients/python-mock/drone_runtime.py
+"""
+Compact per-drone runtime types
+
+Slotted building blocks the production drone keeps per instance, so a large
+fleet pays for its data and not for per-object dicts:
+
+  SequenceCounters   per-stream sequence IDs, indexable like a dict
+  MeasurementBuffer  latency measurements: unbounded, the latest N, or none
+
+drone_footprint.py measures what they save per drone.
+"""
+import collections
+import itertools
+import sys
+from typing import Iterator, Optional
+
+# slots=True needs Python 3.10; older interpreters keep per-instance dicts
+DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+class SequenceCounters:
+    """Per-stream sequence counters, indexable like the dict they replace"""
+
+    __slots__ = ('telemetry', 'camera', 'webrtc', 'command', 'heartbeat')
+
+    def __init__(self):
+        self.telemetry = 0
+        self.camera = 0
+        self.webrtc = 0
+        self.command = 0
+        self.heartbeat = 0
+
+    def __getitem__(self, stream: str) -> int:
+        return getattr(self, stream)
+
+    def __setitem__(self, stream: str, value: int):
+        setattr(self, stream, value)
+
+    def to_dict(self) -> dict:
+        return {stream: getattr(self, stream) for stream in self.__slots__}
+
+
+class MeasurementBuffer:
+    """Latency measurements of one drone: unbounded, the latest N, or none"""
+
+    __slots__ = ('limit', 'recorded', '_items')
+
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = limit
+        self.recorded = 0
+        self._items = collections.deque(maxlen=limit)
+
+    def append(self, measurement):
+        self.recorded += 1
+        self._items.append(measurement)
+
+    def extend(self, measurements):
+        for measurement in measurements:
+            self.append(measurement)
+
+    @property
+    def dropped(self) -> int:
+        """Measurements recorded but no longer stored"""
+        return self.recorded - len(self._items)
+
+    def since(self, recorded: int) -> list:
+        """Stored measurements recorded after the first `recorded` ones"""
+        start = max(0, recorded - self.dropped)
+        return list(itertools.islice(self._items, start, None))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator:
+        return iter(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._items)[index]
+        return self._items[index]
+
+    def describe(self) -> str:
+        if self.limit is None:
+            return 'unbounded'
+        return 'off' if self.limit == 0 else f'latest {self.limit}'
@@ -2,11 +2,9 @@
 import asyncio
 import json
 import time
-import random
 import math
 import logging
 import argparse
-import uuid
 import struct
 import gzip
 import base64
@@ -15,10 +13,18 @@ from dataclasses import dataclass, asdict
 import socketio
 import aiohttp
 import numpy as np
+from loop_monitor import EventLoopLagMonitor
+from send_path_timing import SendPathTimer
+from event_loops import install_event_loop, EVENT_LOOPS
+from seeded_random import drone_rngs, jetson_serial
+from command_execution import command_delay, COMMAND_DELAY_MODES
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Independent random streams per drone, so seeded runs don't depend on task interleaving
+RNG_STREAMS = ('motion', 'heartbeat', 'mavros', 'command', 'frame_front', 'frame_bottom')
+
 @dataclass
 class DroneConfig:
     drone_id: str
@@ -35,6 +41,8 @@ class DroneConfig:
     enable_binary_frames: bool = True
     enable_compression: bool = True
     frame_skip_threshold: int = 3
+    seed: Optional[int] = None
+    command_delay: str = 'uniform'
 
 @dataclass
 class DroneState:
@@ -63,9 +71,13 @@ class DroneState:
     latch_status: str
 
 class OptimizedProductionDrone:
-    def __init__(self, config: DroneConfig, server_url: str):
+    def __init__(self, config: DroneConfig, server_url: str,
+                 loop_monitor: Optional[EventLoopLagMonitor] = None,
+                 send_timer: Optional[SendPathTimer] = None):
         self.config = config
         self.server_url = server_url
+        self.loop_monitor = loop_monitor
+        self.send_timer = send_timer or SendPathTimer()
         self.ws_url = server_url.replace('http', 'ws')
         self.sio = socketio.AsyncClient(
             reconnection=True,
@@ -99,7 +111,8 @@ class OptimizedProductionDrone:
             latch_status='OK'
         )
         
-        self.direction = random.uniform(0, 360)
+        self.rng = drone_rngs(config.seed, config.drone_id, RNG_STREAMS)
+        self.direction = self.rng['motion'].uniform(0, 360)
         self.flight_time = 0
         self.registered = False
         self.session_token = None
@@ -192,7 +205,7 @@ class OptimizedProductionDrone:
             'droneId': self.config.drone_id,
             'model': self.config.model,
             'version': '2.0-optimized-binary-compression',
-            'capabilities': self.config.capabilities + [
+            'capabilities': list(self.config.capabilities) + [
                 'binary_frames', 
                 'frame_compression', 
                 'adaptive_quality',
@@ -214,11 +227,19 @@ class OptimizedProductionDrone:
         await self.sio.emit('drone_register_real', registration_data)
         logger.info(f"📝 [{self.config.drone_id}] Optimized registration sent")
 
+    def stop_stream_tasks(self):
+        """Cancel the stream tasks of a previous connection"""
+        for task in self.tasks:
+            task.cancel()
+        self.tasks = []
+
     async def start_data_streams(self):
         """Start all optimized data streams"""
         if not self.registered:
             return
             
+        # A quick reconnect can beat the old streams' registered check; never run two sets
+        self.stop_stream_tasks()
         self.tasks.append(asyncio.create_task(self.telemetry_stream()))
         self.tasks.append(asyncio.create_task(self.heartbeat_stream()))
         self.tasks.append(asyncio.create_task(self.mavros_stream()))
@@ -296,8 +317,10 @@ class OptimizedProductionDrone:
             self.frame_sequence += 1
             
             # Generate realistic binary frame data
+            stage_start = self.send_timer.now()
             frame_data = self.generate_realistic_binary_frame(camera)
             original_size = len(frame_data)
+            stage_start = self.send_timer.mark('camera', 'generate', stage_start)
             
             # Apply compression if enabled
             compressed_data = frame_data
@@ -310,10 +333,12 @@ class OptimizedProductionDrone:
             
             compressed_size = len(compressed_data)
             compression_ratio = original_size / compressed_size if compressed_size > 0 else 1.0
+            stage_start = self.send_timer.mark('camera', 'compress', stage_start)
             
             # Send binary frame
             if self.config.enable_binary_frames:
-                await self.sio.emit('camera_frame_binary', {
+                frame_event = 'camera_frame_binary'
+                frame_payload = {
                     'droneId': self.config.drone_id,
                     'camera': camera,
                     'timestamp': time.time() * 1000,
@@ -329,11 +354,12 @@ class OptimizedProductionDrone:
                         'compressionRatio': compression_ratio,
                         'transport': 'websocket_binary'
                     }
-                })
+                }
             else:
                 # Fallback to base64 for compatibility
                 frame_b64 = base64.b64encode(compressed_data).decode()
-                await self.sio.emit('camera_frame', {
+                frame_event = 'camera_frame'
+                frame_payload = {
                     'droneId': self.config.drone_id,
                     'camera': camera,
                     'timestamp': time.time() * 1000,
@@ -346,7 +372,10 @@ class OptimizedProductionDrone:
                         'compressionRatio': compression_ratio,
                         'transport': 'websocket_json'
                     }
-                })
+                }
+            self.send_timer.mark('camera', 'payload', stage_start)
+            
+            await self.send_timer.emit(self.sio, 'camera', frame_event, frame_payload)
             
             # Update performance metrics
             metrics = self.camera_performance_metrics[camera]
@@ -373,15 +402,15 @@ class OptimizedProductionDrone:
         """Generate realistic binary H.264-like frame data"""
         try:
             # Simulate realistic frame with varying content
-            timestamp = int(time.time() * 1000)
+            timestamp = int(time.time() * 1000) & 0xFFFFFFFF   # uint32 field wraps
             frame_number = self.camera_frame_counter[camera]
             
-            # Create header (32 bytes)
-            header = struct.pack('>IIHHIIFF', 
+            # Create header (28 bytes)
+            header = struct.pack('>IIHHIIff', 
                 0x12345678,                    # Magic number
                 timestamp,                     # Timestamp
                 1 if camera == 'front' else 2, # Camera ID
-                frame_number,                  # Frame number
+                frame_number & 0xFFFF,         # Frame number
                 0,                            # Reserved
                 self.frame_sequence,          # Global sequence
                 self.state.latitude,          # GPS lat
@@ -390,15 +419,16 @@ class OptimizedProductionDrone:
             
             # Generate realistic video data patterns
             frame_type = 'I' if frame_number % 30 == 0 else 'P'  # I-frame every 30 frames
+            rng = self.rng['frame_' + camera]
             
             if frame_type == 'I':
                 # I-frame: larger, more complex data
-                data_size = random.randint(15000, 25000)
-                base_pattern = self._generate_iframe_pattern()
+                data_size = rng.randint(15000, 25000)
+                base_pattern = self._generate_iframe_pattern(rng)
             else:
                 # P-frame: smaller, simpler data
-                data_size = random.randint(3000, 8000)
-                base_pattern = self._generate_pframe_pattern()
+                data_size = rng.randint(3000, 8000)
+                base_pattern = self._generate_pframe_pattern(rng)
             
             # Create frame payload with realistic variation
             payload = bytearray()
@@ -410,12 +440,12 @@ class OptimizedProductionDrone:
                     payload.extend(b'\x00\x00\x01')
                 elif i % 100 == 0:
                     # Motion vector-like data
-                    payload.append(random.randint(0x80, 0xFF))
+                    payload.append(rng.randint(0x80, 0xFF))
                 else:
                     # Use base pattern with noise
                     pattern_idx = i % pattern_len
                     base_byte = base_pattern[pattern_idx]
-                    noise = random.randint(-10, 10)
+                    noise = rng.randint(-10, 10)
                     final_byte = max(0, min(255, base_byte + noise))
                     payload.append(final_byte)
             
@@ -427,7 +457,7 @@ class OptimizedProductionDrone:
             # Fallback: simple frame
             return b'FALLBACK_FRAME_DATA' + struct.pack('>I', int(time.time()))
 
-    def _generate_iframe_pattern(self) -> bytes:
+    def _generate_iframe_pattern(self, rng) -> bytes:
         """Generate I-frame base pattern"""
         # Simulate H.264 I-frame with DCT coefficients
         pattern = bytearray()
@@ -441,17 +471,17 @@ class OptimizedProductionDrone:
             for coeff in range(64):
                 if coeff == 0:
                     # DC coefficient
-                    pattern.append(128 + random.randint(-20, 20))
+                    pattern.append(128 + rng.randint(-20, 20))
                 else:
                     # AC coefficients (mostly zeros with some values)
-                    if random.random() < 0.3:
-                        pattern.append(random.randint(1, 50))
+                    if rng.random() < 0.3:
+                        pattern.append(rng.randint(1, 50))
                     else:
                         pattern.append(0)
         
         return bytes(pattern)
 
-    def _generate_pframe_pattern(self) -> bytes:
+    def _generate_pframe_pattern(self, rng) -> bytes:
         """Generate P-frame base pattern"""
         # Simulate H.264 P-frame with motion vectors
         pattern = bytearray()
@@ -459,14 +489,14 @@ class OptimizedProductionDrone:
         # Motion vectors
         for mv in range(100):
             # X component
-            pattern.append(128 + random.randint(-30, 30))
+            pattern.append(128 + rng.randint(-30, 30))
             # Y component  
-            pattern.append(128 + random.randint(-30, 30))
+            pattern.append(128 + rng.randint(-30, 30))
         
         # Residual data (sparse)
         for i in range(200):
-            if random.random() < 0.4:
-                pattern.append(random.randint(1, 30))
+            if rng.random() < 0.4:
+                pattern.append(rng.randint(1, 30))
             else:
                 pattern.append(0)
         
@@ -480,7 +510,9 @@ class OptimizedProductionDrone:
             try:
                 current_time = time.time() * 1000
                 
+                stage_start = self.send_timer.now()
                 telemetry_data = asdict(self.state)
+                stage_start = self.send_timer.mark('telemetry', 'snapshot', stage_start)
                 telemetry_data.update({
                     'timestamp': current_time,
                     'jetsonTimestamp': current_time,
@@ -493,8 +525,9 @@ class OptimizedProductionDrone:
                     },
                     'cameraMetrics': self.get_camera_metrics_summary()
                 })
+                self.send_timer.mark('telemetry', 'payload', stage_start)
                 
-                await self.sio.emit('telemetry_real', telemetry_data)
+                await self.send_timer.emit(self.sio, 'telemetry', 'telemetry_real', telemetry_data)
                 await asyncio.sleep(interval)
                 
             except Exception as e:
@@ -522,18 +555,19 @@ class OptimizedProductionDrone:
         
         while self.registered:
             try:
+                stage_start = self.send_timer.now()
                 heartbeat_data = {
                     'timestamp': time.time() * 1000,
                     'jetsonMetrics': {
-                        'cpuUsage': random.uniform(20, 60),
-                        'memoryUsage': random.uniform(40, 80),
-                        'temperature': random.uniform(45, 65),
-                        'diskUsage': random.uniform(30, 70)
+                        'cpuUsage': self.rng['heartbeat'].uniform(20, 60),
+                        'memoryUsage': self.rng['heartbeat'].uniform(40, 80),
+                        'temperature': self.rng['heartbeat'].uniform(45, 65),
+                        'diskUsage': self.rng['heartbeat'].uniform(30, 70)
                     },
                     'networkMetrics': {
-                        'latency': random.uniform(10, 50),
-                        'packetLoss': random.uniform(0, 0.2),
-                        'bandwidth': random.uniform(80, 100)
+                        'latency': self.rng['heartbeat'].uniform(10, 50),
+                        'packetLoss': self.rng['heartbeat'].uniform(0, 0.2),
+                        'bandwidth': self.rng['heartbeat'].uniform(80, 100)
                     },
                     'optimizationMetrics': {
                         'totalFramesSent': sum(m['frames_sent'] for m in self.camera_performance_metrics.values()),
@@ -542,8 +576,9 @@ class OptimizedProductionDrone:
                         'totalBytesSaved': sum(m['bytes_sent'] - m['bytes_compressed'] for m in self.camera_performance_metrics.values())
                     }
                 }
+                self.send_timer.mark('heartbeat', 'payload', stage_start)
                 
-                await self.sio.emit('heartbeat_real', heartbeat_data)
+                await self.send_timer.emit(self.sio, 'heartbeat', 'heartbeat_real', heartbeat_data)
                 await asyncio.sleep(interval)
                 
             except Exception as e:
@@ -567,8 +602,9 @@ class OptimizedProductionDrone:
         
         while self.registered:
             try:
-                message = random.choice(mavros_messages)
-                if random.random() < 0.05:
+                stage_start = self.send_timer.now()
+                message = self.rng['mavros'].choice(mavros_messages)
+                if self.rng['mavros'].random() < 0.05:
                     message = "[ERROR] Communication timeout detected"
                     
                 mavros_data = {
@@ -578,8 +614,9 @@ class OptimizedProductionDrone:
                     'timestamp': time.time() * 1000,
                     'sessionId': self.session_token or 'default'
                 }
+                self.send_timer.mark('mavros', 'payload', stage_start)
                 
-                await self.sio.emit('mavros_real', mavros_data)
+                await self.send_timer.emit(self.sio, 'mavros', 'mavros_real', mavros_data)
                 await asyncio.sleep(interval)
                 
             except Exception as e:
@@ -614,8 +651,8 @@ class OptimizedProductionDrone:
                 self.state.percentage = max(20, self.state.percentage - 0.001)
                 self.state.voltage = 22.2 * (self.state.percentage / 100)
                 
-                self.state.hdop = 0.8 + random.uniform(-0.2, 0.2)
-                self.state.position_error = 1.0 + random.uniform(-0.3, 0.3)
+                self.state.hdop = 0.8 + self.rng['motion'].uniform(-0.2, 0.2)
+                self.state.position_error = 1.0 + self.rng['motion'].uniform(-0.3, 0.3)
                 
                 await asyncio.sleep(0.1)
                 
@@ -631,7 +668,9 @@ class OptimizedProductionDrone:
         
         logger.info(f"📡 [{self.config.drone_id}] Command: {command_type}")
         
-        await asyncio.sleep(random.uniform(0.1, 0.5))
+        delay = command_delay(self.config.command_delay, command_type, self.rng['command'])
+        if delay:
+            await asyncio.sleep(delay)
         
         if command_type == 'arm':
             self.state.armed = True
@@ -697,6 +736,9 @@ class OptimizedProductionDrone:
 
     async def run(self):
         """Main run loop for optimized system"""
+        if self.loop_monitor:
+            self.loop_monitor.start()
+            
         connected = await self.connect()
         if not connected:
             logger.error(f"❌ [{self.config.drone_id}] Failed to connect to optimized system")
@@ -733,6 +775,18 @@ class OptimizedProductionDrone:
                 logger.info(f"    Bandwidth saved: {bandwidth_saved:.2f} MB")
                 logger.info(f"    Queue feedback: {self.frame_queue_status[camera]}")
         
+        if self.loop_monitor and self.loop_monitor.histogram.count:
+            lag = self.loop_monitor.histogram
+            logger.info(f"  EVENT LOOP (simulator-induced delay):")
+            logger.info(f"    Lag avg/P99/max: {lag.mean:.1f}/{lag.percentile(99):.1f}/{lag.max_ms:.1f}ms")
+            logger.info(f"    Stall windows: {len(self.loop_monitor.flagged_windows)}/{self.loop_monitor.windows_total}")
+            logger.info(f"    Slow callbacks: {self.loop_monitor.slow_callback_count}")
+        
+        if self.send_timer.enabled and self.send_timer.histograms:
+            logger.info(f"  SEND-PATH TIMING:")
+            for line in self.send_timer.report_lines():
+                logger.info(f"    {line}")
+        
         logger.info("=" * 60)
 
 def main():
@@ -747,15 +801,29 @@ def main():
     parser.add_argument('--disable-camera', action='store_true', help='Disable camera streaming')
     parser.add_argument('--camera-fps', type=float, default=30.0, help='Camera FPS (default: 30)')
     parser.add_argument('--skip-threshold', type=int, default=3, help='Frame skip threshold (default: 3)')
+    parser.add_argument('--disable-loop-monitor', action='store_true', help='Disable event-loop lag monitor')
+    parser.add_argument('--loop-lag-threshold', type=float, default=50.0,
+                        help='Flag windows with event-loop lag above this many ms (default: 50)')
+    parser.add_argument('--detect-slow-callbacks', action='store_true',
+                        help='Use asyncio debug mode to name slow callbacks (adds overhead)')
+    parser.add_argument('--send-path-timing', action='store_true',
+                        help='Time generate/compress/payload/serialize/emit stages of every send')
+    parser.add_argument('--loop', choices=EVENT_LOOPS, default='asyncio',
+                        help='Event loop implementation, uvloop falls back to asyncio if missing (default: asyncio)')
+    parser.add_argument('--seed', type=int,
+                        help='Seed the drone\'s random streams for reproducible frames and telemetry (default: unseeded)')
+    parser.add_argument('--command-delay', choices=COMMAND_DELAY_MODES, default='uniform',
+                        help='Command execution delay before command_response (default: uniform)')
     
     args = parser.parse_args()
+    install_event_loop(args.loop)
     
     config = DroneConfig(
         drone_id=args.drone_id,
         model=args.model,
         base_lat=args.lat,
         base_lng=args.lng,
-        jetson_serial=f"JETSON-OPT-{uuid.uuid4().hex[:8].upper()}",
+        jetson_serial=jetson_serial('JETSON-OPT', args.seed, args.drone_id),
         capabilities=[
             'telemetry', 'camera', 'mavros', 'precision_landing',
             'commands', 'mission_planning', 'binary_frames',
@@ -765,10 +833,20 @@ def main():
         enable_binary_frames=not args.disable_binary,
         enable_compression=not args.disable_compression,
         enable_camera_streaming=not args.disable_camera,
-        frame_skip_threshold=args.skip_threshold
+        frame_skip_threshold=args.skip_threshold,
+        seed=args.seed,
+        command_delay=args.command_delay
     )
     
-    drone = OptimizedProductionDrone(config, args.server)
+    loop_monitor = None
+    if not args.disable_loop_monitor:
+        loop_monitor = EventLoopLagMonitor(
+            lag_threshold_ms=args.loop_lag_threshold,
+            detect_slow_callbacks=args.detect_slow_callbacks
+        )
+    
+    drone = OptimizedProductionDrone(config, args.server, loop_monitor,
+                                     SendPathTimer(enabled=args.send_path_timing))
     
     logger.info(f"🚁 Starting optimized drone: {config.drone_id}")
     logger.info(f"📹 Camera streaming: {config.enable_camera_streaming}")
@@ -781,6 +859,10 @@ def main():
         asyncio.run(drone.run())
     except KeyboardInterrupt:
         logger.info("🛑 Optimized drone simulator stopped by user")
+    finally:
+        if loop_monitor:
+            loop_monitor.print_report()
+        drone.send_timer.print_report()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
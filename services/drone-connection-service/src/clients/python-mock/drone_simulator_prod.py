@@ -1,22 +1,55 @@
 # services/drone-connection-service/src/clients/python-mock/drone_simulator_prod.py
 import asyncio
+import contextlib
 import json
 import time
-import random
 import math
 import logging
 import argparse
-import uuid
 import statistics
-from typing import Dict, Any, Optional, List
-from dataclasses import dataclass, asdict
+from typing import Dict, Any, Optional, List, Sequence
+from dataclasses import dataclass
 import socketio
 import aiohttp
+from loop_monitor import EventLoopLagMonitor
+from send_path_timing import SendPathTimer
+from send_schedule import SendSchedule, SEND_SCHEDULE_MODES
+from latency_histogram import LatencyHistogram
+from spike_detector import SpikeDetector
+from timer_wheel import HierarchicalTimerWheel
+from fleet_kinematics import FleetKinematics
+from ramp_profiles import ConnectionGate
+from http_pool import HttpSessionPool
+from event_loops import install_event_loop, EVENT_LOOPS
+from drone_runtime import DATACLASS_SLOTS, SequenceCounters, MeasurementBuffer
+from seeded_random import drone_rngs, jetson_serial
+from command_execution import command_delay, COMMAND_DELAY_MODES
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-@dataclass
+MAVROS_MESSAGES = [
+    "[INFO] MAVLink connection established",
+    "[INFO] GPS position received", 
+    "[INFO] Battery status updated",
+    "[WARN] Wind speed above normal",
+    "[INFO] Mission waypoint reached",
+    "[INFO] Altitude hold engaged",
+    "[WARN] Signal strength low",
+    "[INFO] Gimbal position updated"
+]
+
+# Independent random streams of a drone (one seeded RNG each with --seed)
+RNG_STREAMS = ('motion', 'heartbeat', 'mavros', 'command', 'landing')
+MOTION_STEP_S = 0.1
+
+# Shared by every production drone config
+PRODUCTION_CAPABILITIES = (
+    'telemetry', 'camera', 'mavros', 'precision_landing',
+    'webrtc', 'commands', 'mission_planning', 'latency_measurement'
+)
+
+@dataclass(**DATACLASS_SLOTS)
 class LatencyMeasurement:
     measurement_type: str
     send_timestamp: float
@@ -25,6 +58,10 @@ class LatencyMeasurement:
     payload_size_bytes: int
     sequence_id: int
     additional_data: dict = None
+    loop_lag_ms: float = 0.0
+    intended_send_timestamp: Optional[float] = None
+    # Only for senders that wait for the response before sending again: enables HDR back-fill
+    expected_interval_ms: float = 0.0
 
 @dataclass
 class LatencyStats:
@@ -37,6 +74,15 @@ class LatencyStats:
     p95_ms: float
     p99_ms: float
     payload_avg_bytes: int
+    loop_lag_avg_ms: float = 0.0
+    network_avg_ms: float = 0.0
+    network_p95_ms: float = 0.0
+    network_p99_ms: float = 0.0
+    p999_ms: float = 0.0
+    corrected_p50_ms: float = 0.0
+    corrected_p95_ms: float = 0.0
+    corrected_p99_ms: float = 0.0
+    corrected_p999_ms: float = 0.0
 
 @dataclass
 class DroneConfig:
@@ -45,13 +91,17 @@ class DroneConfig:
     base_lat: float
     base_lng: float
     jetson_serial: str
-    capabilities: list
+    capabilities: Sequence[str]
     telemetry_rate: float = 10.0
     heartbeat_rate: float = 0.1
     mavros_rate: float = 1.0
     enable_latency_measurement: bool = True
+    send_schedule: str = 'open'
+    max_measurements: Optional[int] = None  # None: unbounded, 0: none stored
+    seed: Optional[int] = None              # per-drone seeded RNGs, motion in lockstep with telemetry
+    command_delay: str = 'uniform'          # execution delay model, see command_execution.py
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class DroneState:
     latitude: float
     longitude: float
@@ -76,11 +126,37 @@ class DroneState:
     latency: float
     teensy_connected: bool
     latch_status: str
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Field values as a dict (every field is a scalar, so no deep copy like asdict)"""
+        return {f: getattr(self, f) for f in self.__dataclass_fields__}
+    
+    def update(self, values: Dict[str, Any]):
+        for name, value in values.items():
+            setattr(self, name, value)
 
 class ProductionMockDrone:
-    def __init__(self, config: DroneConfig, server_url: str):
+    def __init__(self, config: DroneConfig, server_url: str,
+                 loop_monitor: Optional[EventLoopLagMonitor] = None,
+                 send_timer: Optional[SendPathTimer] = None,
+                 spike_detector: Optional[SpikeDetector] = None,
+                 timer_wheel: Optional[HierarchicalTimerWheel] = None,
+                 kinematics: Optional[FleetKinematics] = None,
+                 connection_gate: Optional[ConnectionGate] = None,
+                 http_pool: Optional[HttpSessionPool] = None):
         self.config = config
         self.server_url = server_url
+        self.loop_monitor = loop_monitor
+        self.send_timer = send_timer or SendPathTimer()
+        self.spike_detector = spike_detector
+        self.timer_wheel = timer_wheel
+        self.wheel_handles = []
+        self.kinematics = kinematics
+        self.kinematics_row: Optional[int] = None
+        self.connection_gate = connection_gate or ConnectionGate()
+        self.http_pool = http_pool
+        self.connect_started_at: Optional[float] = None
+        self.time_to_connected_ms: Optional[float] = None
         self.ws_url = server_url.replace('http', 'ws')
         self.sio = socketio.AsyncClient(
             reconnection=True,
@@ -114,24 +190,29 @@ class ProductionMockDrone:
             latch_status='OK'
         )
         
-        self.direction = random.uniform(0, 360)
+        self.rng = drone_rngs(config.seed, config.drone_id, RNG_STREAMS)
+        self.direction = self.rng['motion'].uniform(0, 360)
         self.flight_time = 0
+        self.motion_steps = 0
+        # Seeded runs advance motion per telemetry message so payloads do not depend on timing
+        self.lockstep_motion = config.seed is not None and kinematics is None
         self.registered = False
         self.session_token = None
         self.tasks = []
         
         # Latency measurement variables
-        self.latency_measurements: List[LatencyMeasurement] = []
-        self.sequence_counters = {
-            'telemetry': 0,
-            'camera': 0,
-            'webrtc': 0,
-            'command': 0,
-            'heartbeat': 0
-        }
+        self.latency_measurements = MeasurementBuffer(config.max_measurements)
+        self.sequence_counters = SequenceCounters()
         self.pending_measurements = {}
         self.webrtc_session_start = None
         
+        # Open-loop send schedules and intended send times of unacked telemetry
+        self.send_schedules: Dict[str, SendSchedule] = {}
+        self.intended_send_times: Dict[float, float] = {}
+        
+        # Latest queue/connection feedback from server acks
+        self.server_feedback: Dict[str, Any] = {}
+        
         self.setup_event_handlers()
         
     def setup_event_handlers(self):
@@ -145,10 +226,14 @@ class ProductionMockDrone:
             logger.warning(f"📴 [{self.config.drone_id}] Disconnected from production system")
             self.state.connected = False
             self.registered = False
+            self.cancel_wheel_streams()
+            self.pause_kinematics()
             
         @self.sio.event
         async def registration_success(data):
             logger.info(f"✅ [{self.config.drone_id}] Production registration successful")
+            if self.time_to_connected_ms is None and self.connect_started_at is not None:
+                self.time_to_connected_ms = (time.time() - self.connect_started_at) * 1000
             self.registered = True
             self.state.connected = True
             await self.start_data_streams()
@@ -171,11 +256,13 @@ class ProductionMockDrone:
             
         @self.sio.event
         async def heartbeat_ack(data):
+            self.update_server_feedback(data)
             if self.config.enable_latency_measurement:
                 await self.measure_heartbeat_latency(data)
                 
         @self.sio.event
         async def telemetry_ack(data):
+            self.update_server_feedback(data)
             if self.config.enable_latency_measurement:
                 await self.measure_telemetry_latency(data)
 
@@ -194,11 +281,16 @@ class ProductionMockDrone:
                     latency_ms=latency_ms,
                     payload_size_bytes=self.calculate_telemetry_size(),
                     sequence_id=self.sequence_counters['telemetry'],
-                    additional_data={'ack_data': ack_data}
+                    additional_data={'connection_quality': ack_data.get('connectionQuality')},
+                    loop_lag_ms=self.loop_lag_between(send_time, receive_time),
+                    intended_send_timestamp=self.intended_send_times.pop(float(ack_data['timestamp']), None)
                 )
                 
-                self.latency_measurements.append(measurement)
-                self.state.latency = latency_ms
+                self.record_measurement(measurement)
+                # Seeded runs keep the initial latency so same-seed payloads match; the
+                # measurement above is still recorded
+                if self.config.seed is None:
+                    self.state.latency = latency_ms
                 
         except Exception as e:
             logger.error(f"Error measuring telemetry latency: {e}")
@@ -218,17 +310,69 @@ class ProductionMockDrone:
                     latency_ms=latency_ms,
                     payload_size_bytes=len(json.dumps(ack_data).encode()),
                     sequence_id=self.sequence_counters['heartbeat'],
-                    additional_data={'connection_quality': ack_data.get('connectionQuality')}
+                    additional_data={'connection_quality': ack_data.get('connectionQuality')},
+                    loop_lag_ms=self.loop_lag_between(server_time, receive_time)
                 )
                 
-                self.latency_measurements.append(measurement)
+                self.record_measurement(measurement)
                 
         except Exception as e:
             logger.error(f"Error measuring heartbeat latency: {e}")
 
+    def record_measurement(self, measurement: LatencyMeasurement):
+        """Store a latency measurement and feed the spike detector"""
+        self.latency_measurements.append(measurement)
+        if self.spike_detector:
+            self.spike_detector.observe(self.config.drone_id, measurement, self.spike_context)
+
+    def update_server_feedback(self, ack_data):
+        """Keep the queue and connection-quality hints from the latest ack"""
+        if not isinstance(ack_data, dict):
+            return
+        for key in ('queueSize', 'connectionQuality', 'recommendedDataRate', 'status'):
+            if key in ack_data:
+                self.server_feedback[key] = ack_data[key]
+
+    def spike_context(self) -> dict:
+        """Connection state and server feedback captured when a latency spike fires"""
+        now = time.time()
+        context = {
+            'connected': self.sio.connected,
+            'registered': self.registered,
+            'transport': self.sio.transport() if self.sio.connected else None,
+            'server_feedback': dict(self.server_feedback),
+            'flight_mode': self.state.flight_mode
+        }
+        if self.loop_monitor:
+            context['loop_stall_last_1s_ms'] = round(self.loop_monitor.stall_ms_between(now - 1.0, now), 3)
+        return context
+
+    def loop_lag_between(self, start_time: float, end_time: float) -> float:
+        """Event-loop stall time (ms) inside a measurement interval"""
+        if not self.loop_monitor:
+            return 0.0
+        return self.loop_monitor.stall_ms_between(start_time, end_time)
+
+    def track_intended_send(self, timestamp_ms: float, intended_time: float):
+        """Remember when a telemetry message was due so its ack can be measured from then"""
+        self.intended_send_times[timestamp_ms] = intended_time
+        if len(self.intended_send_times) > 1000:
+            del self.intended_send_times[next(iter(self.intended_send_times))]
+
+    def corrected_histogram(self, measurements: List[LatencyMeasurement]) -> LatencyHistogram:
+        """Coordinated-omission-corrected latencies: measured from the intended send time"""
+        histogram = LatencyHistogram()
+        for m in measurements:
+            if m.intended_send_timestamp is not None:
+                histogram.record((m.receive_timestamp - m.intended_send_timestamp) * 1000)
+            else:
+                histogram.record_corrected(m.latency_ms, m.expected_interval_ms)
+        return histogram
+
     def calculate_telemetry_size(self):
         """Calculate approximate telemetry payload size"""
-        sample_data = asdict(self.state)
+        self.sync_kinematics()
+        sample_data = self.state.snapshot()
         sample_data['timestamp'] = time.time() * 1000
         return len(json.dumps(sample_data).encode())
 
@@ -248,6 +392,8 @@ class ProductionMockDrone:
                 
             latencies = [m.latency_ms for m in measurements]
             payload_sizes = [m.payload_size_bytes for m in measurements]
+            network_latencies = [max(0.0, m.latency_ms - m.loop_lag_ms) for m in measurements]
+            corrected = self.corrected_histogram(measurements)
             
             stats[measurement_type] = LatencyStats(
                 measurement_type=measurement_type,
@@ -258,7 +404,16 @@ class ProductionMockDrone:
                 median_ms=statistics.median(latencies),
                 p95_ms=self.percentile(latencies, 95),
                 p99_ms=self.percentile(latencies, 99),
-                payload_avg_bytes=int(statistics.mean(payload_sizes))
+                payload_avg_bytes=int(statistics.mean(payload_sizes)),
+                loop_lag_avg_ms=statistics.mean([m.loop_lag_ms for m in measurements]),
+                network_avg_ms=statistics.mean(network_latencies),
+                network_p95_ms=self.percentile(network_latencies, 95),
+                network_p99_ms=self.percentile(network_latencies, 99),
+                p999_ms=self.percentile(latencies, 99.9),
+                corrected_p50_ms=corrected.percentile(50),
+                corrected_p95_ms=corrected.percentile(95),
+                corrected_p99_ms=corrected.percentile(99),
+                corrected_p999_ms=corrected.percentile(99.9)
             )
         
         return stats
@@ -274,12 +429,19 @@ class ProductionMockDrone:
         weight = index - lower
         return sorted_data[lower] * (1 - weight) + sorted_data[upper] * weight
 
+    def http_session(self):
+        """Shared pooled session when one is injected, otherwise a throwaway session per request"""
+        if self.http_pool:
+            return contextlib.nullcontext(self.http_pool.session())
+        return aiohttp.ClientSession()
+
     async def discover_server(self) -> bool:
         """Discover production server with latency measurement"""
         try:
+            phases = {}
             start_time = time.time()
-            async with aiohttp.ClientSession() as session:
-                async with session.post(f"{self.server_url}/drone/discover") as response:
+            async with self.http_session() as session:
+                async with session.post(f"{self.server_url}/drone/discover", trace_request_ctx=phases) as response:
                     end_time = time.time()
                     
                     if response.status == 200:
@@ -294,9 +456,10 @@ class ProductionMockDrone:
                                 latency_ms=discovery_latency,
                                 payload_size_bytes=len(json.dumps(data).encode()),
                                 sequence_id=0,
-                                additional_data={'http_status': response.status}
+                                additional_data={'http_status': response.status, 'phases': phases},
+                                loop_lag_ms=self.loop_lag_between(start_time, end_time)
                             )
-                            self.latency_measurements.append(measurement)
+                            self.record_measurement(measurement)
                         
                         logger.info(f"🔍 [{self.config.drone_id}] Production server discovered ({discovery_latency:.2f}ms)")
                         return True
@@ -325,11 +488,13 @@ class ProductionMockDrone:
                 }
             }
             
+            phases = {}
             start_time = time.time()
-            async with aiohttp.ClientSession() as session:
+            async with self.http_session() as session:
                 async with session.post(
                     f"{self.server_url}/drone/register",
-                    json=registration_data
+                    json=registration_data,
+                    trace_request_ctx=phases
                 ) as response:
                     end_time = time.time()
                     
@@ -347,9 +512,10 @@ class ProductionMockDrone:
                                 latency_ms=registration_latency,
                                 payload_size_bytes=len(json.dumps(registration_data).encode()),
                                 sequence_id=0,
-                                additional_data={'session_token': self.session_token[:8] + '...'}
+                                additional_data={'session_token': self.session_token[:8] + '...', 'phases': phases},
+                                loop_lag_ms=self.loop_lag_between(start_time, end_time)
                             )
-                            self.latency_measurements.append(measurement)
+                            self.record_measurement(measurement)
                         
                         logger.info(f"📝 [{self.config.drone_id}] Production HTTP registration successful ({registration_latency:.2f}ms)")
                         return True
@@ -377,146 +543,226 @@ class ProductionMockDrone:
         await self.sio.emit('drone_register_real', registration_data)
         logger.info(f"📝 [{self.config.drone_id}] Production WebSocket registration sent")
 
+    def stop_stream_tasks(self):
+        """Cancel the stream tasks of a previous connection"""
+        for task in self.tasks:
+            task.cancel()
+        self.tasks = []
+
     async def start_data_streams(self):
         """Start all production data streams"""
         if not self.registered:
             return
-            
-        self.tasks.append(asyncio.create_task(self.telemetry_stream()))
-        self.tasks.append(asyncio.create_task(self.heartbeat_stream()))
-        self.tasks.append(asyncio.create_task(self.mavros_stream()))
-        self.tasks.append(asyncio.create_task(self.animate_state()))
+        
+        # A quick reconnect can beat the old streams' registered check; never run two sets
+        self.stop_stream_tasks()
+        if self.kinematics:
+            self.resume_kinematics()
+        
+        if self.timer_wheel:
+            self.register_wheel_streams()
+        else:
+            self.tasks.append(asyncio.create_task(self.telemetry_stream()))
+            self.tasks.append(asyncio.create_task(self.heartbeat_stream()))
+            self.tasks.append(asyncio.create_task(self.mavros_stream()))
+            if not self.kinematics and not self.lockstep_motion:
+                self.tasks.append(asyncio.create_task(self.animate_state()))
         
         logger.info(f"🎬 [{self.config.drone_id}] Production data streams started")
 
+    def register_wheel_streams(self):
+        """Drive all periodic streams from the fleet timer wheel instead of per-stream tasks"""
+        self.cancel_wheel_streams()
+        streams = [
+            ('telemetry', 1.0 / self.config.telemetry_rate, self.send_telemetry),
+            ('heartbeat', 1.0 / self.config.heartbeat_rate, self.send_heartbeat),
+            ('mavros', 1.0 / self.config.mavros_rate, self.send_mavros)
+        ]
+        for stream, interval, step in streams:
+            # The wheel always fires on a fixed grid of intended times, so config.send_schedule
+            # does not apply here (multi_drone_prod refuses --timer-wheel with a closed schedule)
+            schedule = self.send_schedules[stream] = SendSchedule(interval, 'open')
+            self.wheel_handles.append(self.timer_wheel.schedule_periodic(interval, step, schedule=schedule))
+        if not self.kinematics and not self.lockstep_motion:
+            self.wheel_handles.append(self.timer_wheel.schedule_periodic(MOTION_STEP_S, self.animate_step))
+
+    def cancel_wheel_streams(self):
+        for handle in self.wheel_handles:
+            handle.cancel()
+        self.wheel_handles = []
+
+    def resume_kinematics(self):
+        """Claim (or re-activate) this drone's row in the shared fleet state array"""
+        if self.kinematics_row is None:
+            self.kinematics_row = self.kinematics.add(self.config.base_lat, self.config.base_lng, self.state.snapshot())
+        self.kinematics.set_active(self.kinematics_row, True)
+
+    def pause_kinematics(self):
+        if self.kinematics_row is not None:
+            self.kinematics.set_active(self.kinematics_row, False)
+
+    def sync_kinematics(self):
+        """Copy this drone's row of the fleet state array into self.state"""
+        if self.kinematics_row is not None:
+            self.state.update(self.kinematics.read(self.kinematics_row))
+
     async def telemetry_stream(self):
         """Send production telemetry data with latency measurement"""
         interval = 1.0 / self.config.telemetry_rate
+        schedule = self.send_schedules['telemetry'] = SendSchedule(interval, self.config.send_schedule)
         
         while self.registered:
-            try:
-                self.sequence_counters['telemetry'] += 1
-                current_time = time.time() * 1000
-                
-                telemetry_data = asdict(self.state)
-                telemetry_data.update({
-                    'timestamp': current_time,
-                    'jetsonTimestamp': current_time,
-                    'droneType': 'REAL',
-                    'sessionId': self.session_token,
-                    'sequence_id': self.sequence_counters['telemetry']
-                })
-                
-                await self.sio.emit('telemetry_real', telemetry_data)
-                await asyncio.sleep(interval)
-                
-            except Exception as e:
-                logger.error(f"❌ [{self.config.drone_id}] Telemetry error: {e}")
-                await asyncio.sleep(interval)
+            intended_time = await schedule.next_send()
+            await self.send_telemetry(intended_time)
+
+    async def send_telemetry(self, intended_time: float):
+        """Send one telemetry message"""
+        if not self.registered:
+            return
+        try:
+            self.sequence_counters['telemetry'] += 1
+            current_time = time.time() * 1000
+            
+            stage_start = self.send_timer.now()
+            self.sync_kinematics()
+            if self.lockstep_motion:
+                self.advance_motion()
+            telemetry_data = self.state.snapshot()
+            stage_start = self.send_timer.mark('telemetry', 'snapshot', stage_start)
+            telemetry_data.update({
+                'timestamp': current_time,
+                'jetsonTimestamp': current_time,
+                'droneType': 'REAL',
+                'sessionId': self.session_token,
+                'sequence_id': self.sequence_counters['telemetry']
+            })
+            self.send_timer.mark('telemetry', 'payload', stage_start)
+            
+            self.track_intended_send(current_time, intended_time)
+            await self.send_timer.emit(self.sio, 'telemetry', 'telemetry_real', telemetry_data)
+            
+        except Exception as e:
+            logger.error(f"❌ [{self.config.drone_id}] Telemetry error: {e}")
 
     async def heartbeat_stream(self):
         """Send production heartbeat with latency measurement"""
         interval = 1.0 / self.config.heartbeat_rate
+        schedule = self.send_schedules['heartbeat'] = SendSchedule(interval, self.config.send_schedule)
         
         while self.registered:
-            try:
-                self.sequence_counters['heartbeat'] += 1
-                
-                heartbeat_data = {
-                    'timestamp': time.time() * 1000,
-                    'sequence_id': self.sequence_counters['heartbeat'],
-                    'jetsonMetrics': {
-                        'cpuUsage': random.uniform(20, 60),
-                        'memoryUsage': random.uniform(40, 80),
-                        'temperature': random.uniform(45, 65),
-                        'diskUsage': random.uniform(30, 70)
-                    },
-                    'networkMetrics': {
-                        'latency': random.uniform(10, 100),
-                        'packetLoss': random.uniform(0, 0.5),
-                        'bandwidth': random.uniform(50, 100)
-                    }
+            intended_time = await schedule.next_send()
+            await self.send_heartbeat(intended_time)
+
+    async def send_heartbeat(self, intended_time: float = None):
+        """Send one heartbeat"""
+        if not self.registered:
+            return
+        try:
+            self.sequence_counters['heartbeat'] += 1
+            
+            stage_start = self.send_timer.now()
+            heartbeat_data = {
+                'timestamp': time.time() * 1000,
+                'sequence_id': self.sequence_counters['heartbeat'],
+                'jetsonMetrics': {
+                    'cpuUsage': self.rng['heartbeat'].uniform(20, 60),
+                    'memoryUsage': self.rng['heartbeat'].uniform(40, 80),
+                    'temperature': self.rng['heartbeat'].uniform(45, 65),
+                    'diskUsage': self.rng['heartbeat'].uniform(30, 70)
+                },
+                'networkMetrics': {
+                    'latency': self.rng['heartbeat'].uniform(10, 100),
+                    'packetLoss': self.rng['heartbeat'].uniform(0, 0.5),
+                    'bandwidth': self.rng['heartbeat'].uniform(50, 100)
                 }
-                
-                await self.sio.emit('heartbeat_real', heartbeat_data)
-                await asyncio.sleep(interval)
-                
-            except Exception as e:
-                logger.error(f"❌ [{self.config.drone_id}] Heartbeat error: {e}")
-                await asyncio.sleep(interval)
+            }
+            self.send_timer.mark('heartbeat', 'payload', stage_start)
+            
+            await self.send_timer.emit(self.sio, 'heartbeat', 'heartbeat_real', heartbeat_data)
+            
+        except Exception as e:
+            logger.error(f"❌ [{self.config.drone_id}] Heartbeat error: {e}")
 
     async def mavros_stream(self):
         """Send production MAVROS messages"""
         interval = 1.0 / self.config.mavros_rate
-        
-        mavros_messages = [
-            "[INFO] MAVLink connection established",
-            "[INFO] GPS position received", 
-            "[INFO] Battery status updated",
-            "[WARN] Wind speed above normal",
-            "[INFO] Mission waypoint reached",
-            "[INFO] Altitude hold engaged",
-            "[WARN] Signal strength low",
-            "[INFO] Gimbal position updated"
-        ]
+        schedule = self.send_schedules['mavros'] = SendSchedule(interval, self.config.send_schedule)
         
         while self.registered:
-            try:
-                message = random.choice(mavros_messages)
-                if random.random() < 0.05:
-                    message = "[ERROR] Communication timeout detected"
-                    
-                mavros_data = {
-                    'message': message,
-                    'rawMessage': f"[{time.strftime('%H:%M:%S')}] {message}",
-                    'source': 'jetson_mavros',
-                    'timestamp': time.time() * 1000,
-                    'sessionId': self.session_token or 'default'
-                }
-                
-                await self.sio.emit('mavros_real', mavros_data)
-                await asyncio.sleep(interval)
+            intended_time = await schedule.next_send()
+            await self.send_mavros(intended_time)
+
+    async def send_mavros(self, intended_time: float = None):
+        """Send one MAVROS message"""
+        if not self.registered:
+            return
+        try:
+            stage_start = self.send_timer.now()
+            message = self.rng['mavros'].choice(MAVROS_MESSAGES)
+            if self.rng['mavros'].random() < 0.05:
+                message = "[ERROR] Communication timeout detected"
                 
-            except Exception as e:
-                logger.error(f"❌ [{self.config.drone_id}] MAVROS error: {e}")
-                await asyncio.sleep(interval)
+            mavros_data = {
+                'message': message,
+                'rawMessage': f"[{time.strftime('%H:%M:%S')}] {message}",
+                'source': 'jetson_mavros',
+                'timestamp': time.time() * 1000,
+                'sessionId': self.session_token or 'default'
+            }
+            self.send_timer.mark('mavros', 'payload', stage_start)
+            
+            await self.send_timer.emit(self.sio, 'mavros', 'mavros_real', mavros_data)
+            
+        except Exception as e:
+            logger.error(f"❌ [{self.config.drone_id}] MAVROS error: {e}")
 
     async def animate_state(self):
         """Animate drone state for realistic movement"""
         while self.registered:
-            try:
-                self.flight_time += 0.1
-                
-                radius_km = 0.001
-                angular_speed = 0.1
-                
-                angle = self.flight_time * angular_speed
-                self.state.latitude = self.config.base_lat + math.sin(angle) * radius_km
-                self.state.longitude = self.config.base_lng + math.cos(angle) * radius_km
-                
-                self.state.altitude_relative = 100 + math.sin(self.flight_time * 0.5) * 10
-                self.state.altitude_msl = self.state.altitude_relative + 500
-                
-                self.state.yaw = angle
-                self.state.roll = math.sin(self.flight_time) * 0.1
-                self.state.pitch = math.cos(self.flight_time * 0.7) * 0.1
-                
-                speed = 5.0
-                self.state.velocity_x = speed * math.cos(angle)
-                self.state.velocity_y = speed * math.sin(angle)
-                self.state.velocity_z = math.sin(self.flight_time * 0.3) * 0.5
-                
-                self.state.percentage = max(20, self.state.percentage - 0.001)
-                self.state.voltage = 22.2 * (self.state.percentage / 100)
-                
-                self.state.hdop = 0.8 + random.uniform(-0.2, 0.2)
-                self.state.position_error = 1.0 + random.uniform(-0.3, 0.3)
-                
-                await asyncio.sleep(0.1)
-                
-            except Exception as e:
-                logger.error(f"❌ [{self.config.drone_id}] Animation error: {e}")
-                await asyncio.sleep(0.1)
+            self.animate_step()
+            await asyncio.sleep(MOTION_STEP_S)
+
+    def advance_motion(self):
+        """Animate up to the current telemetry message's flight time (seeded runs)"""
+        target = int(self.sequence_counters['telemetry'] / self.config.telemetry_rate / MOTION_STEP_S)
+        while self.motion_steps < target:
+            self.animate_step()
+
+    def animate_step(self, intended_time: float = None):
+        """Advance the simulated flight by one 100ms step"""
+        if not self.registered:
+            return
+        try:
+            self.motion_steps += 1
+            self.flight_time += MOTION_STEP_S
+            
+            radius_km = 0.001
+            angular_speed = 0.1
+            
+            angle = self.flight_time * angular_speed
+            self.state.latitude = self.config.base_lat + math.sin(angle) * radius_km
+            self.state.longitude = self.config.base_lng + math.cos(angle) * radius_km
+            
+            self.state.altitude_relative = 100 + math.sin(self.flight_time * 0.5) * 10
+            self.state.altitude_msl = self.state.altitude_relative + 500
+            
+            self.state.yaw = angle
+            self.state.roll = math.sin(self.flight_time) * 0.1
+            self.state.pitch = math.cos(self.flight_time * 0.7) * 0.1
+            
+            speed = 5.0
+            self.state.velocity_x = speed * math.cos(angle)
+            self.state.velocity_y = speed * math.sin(angle)
+            self.state.velocity_z = math.sin(self.flight_time * 0.3) * 0.5
+            
+            self.state.percentage = max(20, self.state.percentage - 0.001)
+            self.state.voltage = 22.2 * (self.state.percentage / 100)
+            
+            self.state.hdop = 0.8 + self.rng['motion'].uniform(-0.2, 0.2)
+            self.state.position_error = 1.0 + self.rng['motion'].uniform(-0.3, 0.3)
+            
+        except Exception as e:
+            logger.error(f"❌ [{self.config.drone_id}] Animation error: {e}")
 
     async def handle_command(self, data):
         """Handle production commands with latency measurement"""
@@ -526,7 +772,9 @@ class ProductionMockDrone:
         
         logger.info(f"📡 [{self.config.drone_id}] Production command: {command_type}")
         
-        await asyncio.sleep(random.uniform(0.1, 0.5))
+        delay = command_delay(self.config.command_delay, command_type, self.rng['command'])
+        if delay:
+            await asyncio.sleep(delay)
         
         if command_type == 'arm':
             self.state.armed = True
@@ -574,10 +822,11 @@ class ProductionMockDrone:
                     additional_data={
                         'command_type': command_data.get('type'),
                         'status': response_data.get('status')
-                    }
+                    },
+                    loop_lag_ms=self.loop_lag_between(send_time, receive_time)
                 )
                 
-                self.latency_measurements.append(measurement)
+                self.record_measurement(measurement)
                 
         except Exception as e:
             logger.error(f"Error measuring command latency: {e}")
@@ -621,12 +870,12 @@ class ProductionMockDrone:
                 'output': f"Precision landing {stage.lower()} phase initiated",
                 'stage': stage,
                 'altitude': self.state.altitude_relative,
-                'target_detected': random.random() > 0.2,
-                'target_confidence': random.uniform(0.7, 0.95),
-                'lateral_error': random.uniform(0, 2.0),
-                'vertical_error': random.uniform(0, 1.0),
+                'target_detected': self.rng['landing'].random() > 0.2,
+                'target_confidence': self.rng['landing'].uniform(0.7, 0.95),
+                'lateral_error': self.rng['landing'].uniform(0, 2.0),
+                'vertical_error': self.rng['landing'].uniform(0, 1.0),
                 'battery_level': self.state.percentage,
-                'wind_speed': random.uniform(0, 5.0)
+                'wind_speed': self.rng['landing'].uniform(0, 5.0)
             }
             
             await self.sio.emit('precision_land_real', precision_data)
@@ -653,14 +902,16 @@ class ProductionMockDrone:
 
     async def connect(self):
         """Connect to production system"""
+        self.connect_started_at = time.time()
         try:
-            if not await self.discover_server():
-                return False
-                
-            if not await self.register_with_server():
-                return False
-                
-            await self.sio.connect(self.ws_url)
+            async with self.connection_gate.slot():
+                if not await self.discover_server():
+                    return False
+                    
+                if not await self.register_with_server():
+                    return False
+                    
+                await self.sio.connect(self.ws_url)
             return True
             
         except Exception as e:
@@ -672,6 +923,8 @@ class ProductionMockDrone:
         try:
             for task in self.tasks:
                 task.cancel()
+            self.cancel_wheel_streams()
+            self.pause_kinematics()
                 
             await self.sio.disconnect()
             logger.info(f"👋 [{self.config.drone_id}] Disconnected from production")
@@ -681,6 +934,9 @@ class ProductionMockDrone:
 
     async def run(self):
         """Main run loop for production"""
+        if self.loop_monitor:
+            self.loop_monitor.start()
+            
         connected = await self.connect()
         if not connected:
             logger.error(f"❌ [{self.config.drone_id}] Failed to connect to production system")
@@ -714,8 +970,16 @@ class ProductionMockDrone:
             print(f"  Median: {stat.median_ms:.2f}ms")
             print(f"  P95: {stat.p95_ms:.2f}ms")
             print(f"  P99: {stat.p99_ms:.2f}ms")
+            print(f"  P99.9: {stat.p999_ms:.2f}ms")
             print(f"  Max: {stat.max_ms:.2f}ms")
+            print(f"  Corrected (from intended send time): P50 {stat.corrected_p50_ms:.2f}ms, "
+                  f"P95 {stat.corrected_p95_ms:.2f}ms, P99 {stat.corrected_p99_ms:.2f}ms, "
+                  f"P99.9 {stat.corrected_p999_ms:.2f}ms")
             print(f"  Avg Payload: {stat.payload_avg_bytes} bytes")
+            if self.loop_monitor:
+                print(f"  Simulator loop lag avg: {stat.loop_lag_avg_ms:.2f}ms")
+                print(f"  Network/server avg: {stat.network_avg_ms:.2f}ms "
+                      f"(P95: {stat.network_p95_ms:.2f}ms, P99: {stat.network_p99_ms:.2f}ms)")
         
         all_measurements = [m.latency_ms for m in self.latency_measurements]
         if all_measurements:
@@ -724,6 +988,20 @@ class ProductionMockDrone:
             print(f"  Overall avg latency: {statistics.mean(all_measurements):.2f}ms")
             print(f"  Overall median: {statistics.median(all_measurements):.2f}ms")
         
+        if self.send_schedules:
+            print(f"\nSEND SCHEDULE ({self.config.send_schedule}-loop):")
+            for stream, schedule in self.send_schedules.items():
+                print(f"  {stream}: {schedule.sends} sends, {schedule.late_sends} late by a full interval, "
+                      f"max {schedule.max_behind_ms:.1f}ms behind")
+        
+        if self.loop_monitor:
+            self.loop_monitor.print_report()
+        
+        self.send_timer.print_report()
+        
+        if self.spike_detector:
+            self.spike_detector.print_report()
+        
         print("=" * 60)
 
 def main():
@@ -734,23 +1012,58 @@ def main():
     parser.add_argument('--lat', type=float, default=18.5204, help='Base latitude')
     parser.add_argument('--lng', type=float, default=73.8567, help='Base longitude')
     parser.add_argument('--disable-latency', action='store_true', help='Disable latency measurement')
+    parser.add_argument('--disable-loop-monitor', action='store_true', help='Disable event-loop lag monitor')
+    parser.add_argument('--loop-lag-threshold', type=float, default=50.0,
+                        help='Flag windows with event-loop lag above this many ms (default: 50)')
+    parser.add_argument('--detect-slow-callbacks', action='store_true',
+                        help='Use asyncio debug mode to name slow callbacks (adds overhead)')
+    parser.add_argument('--send-path-timing', action='store_true',
+                        help='Time snapshot/payload/serialize/emit stages of every send')
+    parser.add_argument('--spike-threshold', type=float, default=4.0,
+                        help='EWMA z-score that flags a latency spike (default: 4.0)')
+    parser.add_argument('--disable-spike-detection', action='store_true',
+                        help='Disable streaming latency spike detection')
+    parser.add_argument('--send-schedule', choices=SEND_SCHEDULE_MODES, default='open',
+                        help='open: fixed intended send times, closed: sleep after each send (default: open)')
+    parser.add_argument('--loop', choices=EVENT_LOOPS, default='asyncio',
+                       help='Event loop implementation, uvloop falls back to asyncio if missing (default: asyncio)')
+    parser.add_argument('--max-measurements', type=int,
+                        help='Keep only the latest N latency measurements, 0 stores none (default: unbounded)')
+    parser.add_argument('--seed', type=int,
+                        help='Seed the drone\'s random streams for reproducible payloads (default: unseeded)')
+    parser.add_argument('--command-delay', choices=COMMAND_DELAY_MODES, default='uniform',
+                        help='Command execution delay before command_response (default: uniform)')
     
     args = parser.parse_args()
+    install_event_loop(args.loop)
     
     config = DroneConfig(
         drone_id=args.drone_id,
         model=args.model,
         base_lat=args.lat,
         base_lng=args.lng,
-        jetson_serial=f"JETSON-PROD-{uuid.uuid4().hex[:8].upper()}",
-        capabilities=[
-            'telemetry', 'camera', 'mavros', 'precision_landing',
-            'webrtc', 'commands', 'mission_planning', 'latency_measurement'
-        ],
-        enable_latency_measurement=not args.disable_latency
+        jetson_serial=jetson_serial('JETSON-PROD', args.seed, args.drone_id),
+        capabilities=PRODUCTION_CAPABILITIES,
+        enable_latency_measurement=not args.disable_latency,
+        send_schedule=args.send_schedule,
+        max_measurements=args.max_measurements,
+        seed=args.seed,
+        command_delay=args.command_delay
     )
     
-    drone = ProductionMockDrone(config, args.server)
+    loop_monitor = None
+    if not args.disable_loop_monitor:
+        loop_monitor = EventLoopLagMonitor(
+            lag_threshold_ms=args.loop_lag_threshold,
+            detect_slow_callbacks=args.detect_slow_callbacks
+        )
+    
+    spike_detector = None
+    if not args.disable_spike_detection:
+        spike_detector = SpikeDetector(z_threshold=args.spike_threshold)
+    
+    drone = ProductionMockDrone(config, args.server, loop_monitor,
+                                SendPathTimer(enabled=args.send_path_timing), spike_detector)
     
     try:
         asyncio.run(drone.run())
@@ -6,17 +6,22 @@ import random
 import math
 import logging
 import argparse
-import uuid
 import statistics
 import base64
 from typing import Dict, Any, Optional, List
 from dataclasses import dataclass, asdict
 import socketio
 import aiohttp
+from loop_monitor import EventLoopLagMonitor
+from event_loops import install_event_loop, EVENT_LOOPS
+from seeded_random import drone_rngs, jetson_serial
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Independent random streams per drone, so seeded runs don't depend on task interleaving
+RNG_STREAMS = ('motion', 'heartbeat', 'mavros', 'command', 'landing', 'frame_front', 'frame_bottom')
+
 @dataclass
 class LatencyMeasurement:
     measurement_type: str
@@ -26,6 +31,7 @@ class LatencyMeasurement:
     payload_size_bytes: int
     sequence_id: int
     additional_data: dict = None
+    loop_lag_ms: float = 0.0
 
 @dataclass
 class LatencyStats:
@@ -38,6 +44,10 @@ class LatencyStats:
     p95_ms: float
     p99_ms: float
     payload_avg_bytes: int
+    loop_lag_avg_ms: float = 0.0
+    network_avg_ms: float = 0.0
+    network_p95_ms: float = 0.0
+    network_p99_ms: float = 0.0
 
 @dataclass
 class DroneConfig:
@@ -53,6 +63,7 @@ class DroneConfig:
     camera_fps: float = 15.0
     enable_latency_measurement: bool = True
     enable_camera_streaming: bool = True
+    seed: Optional[int] = None
 
 @dataclass
 class DroneState:
@@ -81,9 +92,11 @@ class DroneState:
     latch_status: str
 
 class ProductionMockDroneWithCamera:
-    def __init__(self, config: DroneConfig, server_url: str):
+    def __init__(self, config: DroneConfig, server_url: str,
+                 loop_monitor: Optional[EventLoopLagMonitor] = None):
         self.config = config
         self.server_url = server_url
+        self.loop_monitor = loop_monitor
         self.ws_url = server_url.replace('http', 'ws')
         self.sio = socketio.AsyncClient(
             reconnection=True,
@@ -117,7 +130,8 @@ class ProductionMockDroneWithCamera:
             latch_status='OK'
         )
         
-        self.direction = random.uniform(0, 360)
+        self.rng = drone_rngs(config.seed, config.drone_id, RNG_STREAMS)
+        self.direction = self.rng['motion'].uniform(0, 360)
         self.flight_time = 0
         self.registered = False
         self.session_token = None
@@ -218,11 +232,15 @@ class ProductionMockDroneWithCamera:
                     latency_ms=latency_ms,
                     payload_size_bytes=self.calculate_telemetry_size(),
                     sequence_id=self.sequence_counters['telemetry'],
-                    additional_data={'ack_data': ack_data}
+                    additional_data={'ack_data': ack_data},
+                    loop_lag_ms=self.loop_lag_between(send_time, receive_time)
                 )
                 
                 self.latency_measurements.append(measurement)
-                self.state.latency = latency_ms
+                # Seeded runs keep the initial latency so same-seed payloads match; the
+                # measurement above is still recorded
+                if self.config.seed is None:
+                    self.state.latency = latency_ms
                 
         except Exception as e:
             logger.error(f"Error measuring telemetry latency: {e}")
@@ -242,7 +260,8 @@ class ProductionMockDroneWithCamera:
                     latency_ms=latency_ms,
                     payload_size_bytes=len(json.dumps(ack_data).encode()),
                     sequence_id=self.sequence_counters['heartbeat'],
-                    additional_data={'connection_quality': ack_data.get('connectionQuality')}
+                    additional_data={'connection_quality': ack_data.get('connectionQuality')},
+                    loop_lag_ms=self.loop_lag_between(server_time, receive_time)
                 )
                 
                 self.latency_measurements.append(measurement)
@@ -265,7 +284,8 @@ class ProductionMockDroneWithCamera:
                     latency_ms=latency_ms,
                     payload_size_bytes=self.calculate_camera_frame_size(),
                     sequence_id=self.sequence_counters['camera'],
-                    additional_data={'camera': ack_data.get('camera'), 'status': ack_data.get('status')}
+                    additional_data={'camera': ack_data.get('camera'), 'status': ack_data.get('status')},
+                    loop_lag_ms=self.loop_lag_between(send_time, receive_time)
                 )
                 
                 self.latency_measurements.append(measurement)
@@ -273,6 +293,12 @@ class ProductionMockDroneWithCamera:
         except Exception as e:
             logger.error(f"Error measuring camera latency: {e}")
 
+    def loop_lag_between(self, start_time: float, end_time: float) -> float:
+        """Event-loop stall time (ms) inside a measurement interval"""
+        if not self.loop_monitor:
+            return 0.0
+        return self.loop_monitor.stall_ms_between(start_time, end_time)
+
     def calculate_telemetry_size(self):
         """Calculate approximate telemetry payload size"""
         sample_data = asdict(self.state)
@@ -281,7 +307,8 @@ class ProductionMockDroneWithCamera:
 
     def calculate_camera_frame_size(self):
         """Calculate approximate camera frame size"""
-        frame_data = self.generate_professional_frame('front')
+        # Size estimate only: draw from the global random module, not the seeded frame stream
+        frame_data = self.generate_professional_frame('front', random)
         metadata = {
             'resolution': '1920x1080',
             'fps': 15,
@@ -295,8 +322,9 @@ class ProductionMockDroneWithCamera:
         }
         return len(json.dumps(payload).encode())
 
-    def generate_professional_frame(self, camera: str) -> str:
+    def generate_professional_frame(self, camera: str, rng=None) -> str:
         """Generate realistic camera frame data"""
+        rng = rng or self.rng['frame_' + camera]
         timestamp = time.time() * 1000
         frame_number = self.camera_frame_counter[camera]
         
@@ -309,14 +337,14 @@ class ProductionMockDroneWithCamera:
             
             # Realistic camera parameters
             'exposure': 1/500 if camera == 'front' else 1/250,
-            'iso': 100 + random.random() * 200,
-            'focus_distance': 5 + random.random() * 95,
-            'white_balance': 5600 + random.random() * 400,
+            'iso': 100 + rng.random() * 200,
+            'focus_distance': 5 + rng.random() * 95,
+            'white_balance': 5600 + rng.random() * 400,
             
             # Scene simulation
-            'scene_brightness': 180 + random.random() * 40 if camera == 'front' else 120 + random.random() * 60,
-            'contrast': 1.0 + (random.random() - 0.5) * 0.2,
-            'saturation': 1.0 + (random.random() - 0.5) * 0.1,
+            'scene_brightness': 180 + rng.random() * 40 if camera == 'front' else 120 + rng.random() * 60,
+            'contrast': 1.0 + (rng.random() - 0.5) * 0.2,
+            'saturation': 1.0 + (rng.random() - 0.5) * 0.1,
             
             # Motion simulation
             'gimbal_roll': math.sin(timestamp / 5000) * 2,
@@ -324,14 +352,14 @@ class ProductionMockDroneWithCamera:
             'gimbal_yaw': math.sin(timestamp / 10000) * 5,
             
             # AI/CV features
-            'objects_detected': math.floor(random.random() * 3),
-            'faces_detected': math.floor(random.random() * 2) if camera == 'front' else 0,
-            'motion_vectors': [{'x': (random.random() - 0.5) * 10, 'y': (random.random() - 0.5) * 10} for _ in range(5)],
+            'objects_detected': math.floor(rng.random() * 3),
+            'faces_detected': math.floor(rng.random() * 2) if camera == 'front' else 0,
+            'motion_vectors': [{'x': (rng.random() - 0.5) * 10, 'y': (rng.random() - 0.5) * 10} for _ in range(5)],
             
             # Quality metrics
-            'sharpness': 0.8 + random.random() * 0.2,
-            'noise_level': random.random() * 0.1,
-            'compression_ratio': 0.15 + random.random() * 0.05
+            'sharpness': 0.8 + rng.random() * 0.2,
+            'noise_level': rng.random() * 0.1,
+            'compression_ratio': 0.15 + rng.random() * 0.05
         }
         
         # Convert to base64 for realistic frame size
@@ -354,6 +382,7 @@ class ProductionMockDroneWithCamera:
                 
             latencies = [m.latency_ms for m in measurements]
             payload_sizes = [m.payload_size_bytes for m in measurements]
+            network_latencies = [max(0.0, m.latency_ms - m.loop_lag_ms) for m in measurements]
             
             stats[measurement_type] = LatencyStats(
                 measurement_type=measurement_type,
@@ -364,7 +393,11 @@ class ProductionMockDroneWithCamera:
                 median_ms=statistics.median(latencies),
                 p95_ms=self.percentile(latencies, 95),
                 p99_ms=self.percentile(latencies, 99),
-                payload_avg_bytes=int(statistics.mean(payload_sizes))
+                payload_avg_bytes=int(statistics.mean(payload_sizes)),
+                loop_lag_avg_ms=statistics.mean([m.loop_lag_ms for m in measurements]),
+                network_avg_ms=statistics.mean(network_latencies),
+                network_p95_ms=self.percentile(network_latencies, 95),
+                network_p99_ms=self.percentile(network_latencies, 99)
             )
         
         return stats
@@ -400,7 +433,8 @@ class ProductionMockDroneWithCamera:
                                 latency_ms=discovery_latency,
                                 payload_size_bytes=len(json.dumps(data).encode()),
                                 sequence_id=0,
-                                additional_data={'http_status': response.status}
+                                additional_data={'http_status': response.status},
+                                loop_lag_ms=self.loop_lag_between(start_time, end_time)
                             )
                             self.latency_measurements.append(measurement)
                         
@@ -453,7 +487,8 @@ class ProductionMockDroneWithCamera:
                                 latency_ms=registration_latency,
                                 payload_size_bytes=len(json.dumps(registration_data).encode()),
                                 sequence_id=0,
-                                additional_data={'session_token': self.session_token[:8] + '...'}
+                                additional_data={'session_token': self.session_token[:8] + '...'},
+                                loop_lag_ms=self.loop_lag_between(start_time, end_time)
                             )
                             self.latency_measurements.append(measurement)
                         
@@ -483,11 +518,19 @@ class ProductionMockDroneWithCamera:
         await self.sio.emit('drone_register_real', registration_data)
         logger.info(f"📝 [{self.config.drone_id}] WebSocket registration sent")
 
+    def stop_stream_tasks(self):
+        """Cancel the stream tasks of a previous connection"""
+        for task in self.tasks:
+            task.cancel()
+        self.tasks = []
+
     async def start_data_streams(self):
         """Start all production data streams including camera"""
         if not self.registered:
             return
             
+        # A quick reconnect can beat the old streams' registered check; never run two sets
+        self.stop_stream_tasks()
         self.tasks.append(asyncio.create_task(self.telemetry_stream()))
         self.tasks.append(asyncio.create_task(self.heartbeat_stream()))
         self.tasks.append(asyncio.create_task(self.mavros_stream()))
@@ -584,15 +627,15 @@ class ProductionMockDroneWithCamera:
                     'timestamp': time.time() * 1000,
                     'sequence_id': self.sequence_counters['heartbeat'],
                     'jetsonMetrics': {
-                        'cpuUsage': random.uniform(20, 60),
-                        'memoryUsage': random.uniform(40, 80),
-                        'temperature': random.uniform(45, 65),
-                        'diskUsage': random.uniform(30, 70)
+                        'cpuUsage': self.rng['heartbeat'].uniform(20, 60),
+                        'memoryUsage': self.rng['heartbeat'].uniform(40, 80),
+                        'temperature': self.rng['heartbeat'].uniform(45, 65),
+                        'diskUsage': self.rng['heartbeat'].uniform(30, 70)
                     },
                     'networkMetrics': {
-                        'latency': random.uniform(10, 100),
-                        'packetLoss': random.uniform(0, 0.5),
-                        'bandwidth': random.uniform(50, 100)
+                        'latency': self.rng['heartbeat'].uniform(10, 100),
+                        'packetLoss': self.rng['heartbeat'].uniform(0, 0.5),
+                        'bandwidth': self.rng['heartbeat'].uniform(50, 100)
                     }
                 }
                 
@@ -620,8 +663,8 @@ class ProductionMockDroneWithCamera:
         
         while self.registered:
             try:
-                message = random.choice(mavros_messages)
-                if random.random() < 0.05:
+                message = self.rng['mavros'].choice(mavros_messages)
+                if self.rng['mavros'].random() < 0.05:
                     message = "[ERROR] Communication timeout detected"
                     
                 mavros_data = {
@@ -667,8 +710,8 @@ class ProductionMockDroneWithCamera:
                 self.state.percentage = max(20, self.state.percentage - 0.001)
                 self.state.voltage = 22.2 * (self.state.percentage / 100)
                 
-                self.state.hdop = 0.8 + random.uniform(-0.2, 0.2)
-                self.state.position_error = 1.0 + random.uniform(-0.3, 0.3)
+                self.state.hdop = 0.8 + self.rng['motion'].uniform(-0.2, 0.2)
+                self.state.position_error = 1.0 + self.rng['motion'].uniform(-0.3, 0.3)
                 
                 await asyncio.sleep(0.1)
                 
@@ -761,7 +804,7 @@ class ProductionMockDroneWithCamera:
         
         logger.info(f"📡 [{self.config.drone_id}] Production command: {command_type}")
         
-        await asyncio.sleep(random.uniform(0.1, 0.5))
+        await asyncio.sleep(self.rng['command'].uniform(0.1, 0.5))
         
         if command_type == 'arm':
             self.state.armed = True
@@ -809,7 +852,8 @@ class ProductionMockDroneWithCamera:
                     additional_data={
                         'command_type': command_data.get('type'),
                         'status': response_data.get('status')
-                    }
+                    },
+                    loop_lag_ms=self.loop_lag_between(send_time, receive_time)
                 )
                 
                 self.latency_measurements.append(measurement)
@@ -856,12 +900,12 @@ class ProductionMockDroneWithCamera:
                 'output': f"Precision landing {stage.lower()} phase initiated",
                 'stage': stage,
                 'altitude': self.state.altitude_relative,
-                'target_detected': random.random() > 0.2,
-                'target_confidence': random.uniform(0.7, 0.95),
-                'lateral_error': random.uniform(0, 2.0),
-                'vertical_error': random.uniform(0, 1.0),
+                'target_detected': self.rng['landing'].random() > 0.2,
+                'target_confidence': self.rng['landing'].uniform(0.7, 0.95),
+                'lateral_error': self.rng['landing'].uniform(0, 2.0),
+                'vertical_error': self.rng['landing'].uniform(0, 1.0),
                 'battery_level': self.state.percentage,
-                'wind_speed': random.uniform(0, 5.0)
+                'wind_speed': self.rng['landing'].uniform(0, 5.0)
             }
             
             await self.sio.emit('precision_land_real', precision_data)
@@ -927,6 +971,9 @@ class ProductionMockDroneWithCamera:
 
     async def run(self):
         """Main run loop for production"""
+        if self.loop_monitor:
+            self.loop_monitor.start()
+            
         connected = await self.connect()
         if not connected:
             logger.error(f"❌ [{self.config.drone_id}] Failed to connect to production system")
@@ -970,6 +1017,10 @@ class ProductionMockDroneWithCamera:
             print(f"  P99: {stat.p99_ms:.2f}ms")
             print(f"  Max: {stat.max_ms:.2f}ms")
             print(f"  Avg Payload: {stat.payload_avg_bytes:,} bytes")
+            if self.loop_monitor:
+                print(f"  Simulator loop lag avg: {stat.loop_lag_avg_ms:.2f}ms")
+                print(f"  Network/server avg: {stat.network_avg_ms:.2f}ms "
+                      f"(P95: {stat.network_p95_ms:.2f}ms, P99: {stat.network_p99_ms:.2f}ms)")
             
             # Special camera metrics
             if measurement_type == 'camera':
@@ -998,6 +1049,9 @@ class ProductionMockDroneWithCamera:
             print(f"  Avg camera latency: {statistics.mean(camera_latencies):.2f}ms")
             print(f"  Camera bandwidth: {sum(m.payload_size_bytes for m in camera_measurements) / (1024 * 1024):.2f} MB total")
         
+        if self.loop_monitor:
+            self.loop_monitor.print_report()
+        
         print("=" * 70)
 
 def main():
@@ -1011,15 +1065,25 @@ def main():
     parser.add_argument('--disable-camera', action='store_true', help='Disable camera streaming')
     parser.add_argument('--camera-fps', type=float, default=15.0, help='Camera FPS (default: 15)')
     parser.add_argument('--telemetry-rate', type=float, default=10.0, help='Telemetry rate Hz (default: 10)')
+    parser.add_argument('--disable-loop-monitor', action='store_true', help='Disable event-loop lag monitor')
+    parser.add_argument('--loop-lag-threshold', type=float, default=50.0,
+                        help='Flag windows with event-loop lag above this many ms (default: 50)')
+    parser.add_argument('--detect-slow-callbacks', action='store_true',
+                        help='Use asyncio debug mode to name slow callbacks (adds overhead)')
+    parser.add_argument('--seed', type=int,
+                        help='Seed the drone\'s random streams for reproducible frames and telemetry (default: unseeded)')
+    parser.add_argument('--loop', choices=EVENT_LOOPS, default='asyncio',
+                        help='Event loop implementation, uvloop falls back to asyncio if missing (default: asyncio)')
     
     args = parser.parse_args()
+    install_event_loop(args.loop)
     
     config = DroneConfig(
         drone_id=args.drone_id,
         model=args.model,
         base_lat=args.lat,
         base_lng=args.lng,
-        jetson_serial=f"JETSON-CAM-{uuid.uuid4().hex[:8].upper()}",
+        jetson_serial=jetson_serial('JETSON-CAM', args.seed, args.drone_id),
         capabilities=[
             'telemetry', 'camera', 'mavros', 'precision_landing',
             'webrtc', 'commands', 'mission_planning', 'latency_measurement',
@@ -1028,10 +1092,18 @@ def main():
         telemetry_rate=args.telemetry_rate,
         camera_fps=args.camera_fps,
         enable_latency_measurement=not args.disable_latency,
-        enable_camera_streaming=not args.disable_camera
+        enable_camera_streaming=not args.disable_camera,
+        seed=args.seed
     )
     
-    drone = ProductionMockDroneWithCamera(config, args.server)
+    loop_monitor = None
+    if not args.disable_loop_monitor:
+        loop_monitor = EventLoopLagMonitor(
+            lag_threshold_ms=args.loop_lag_threshold,
+            detect_slow_callbacks=args.detect_slow_callbacks
+        )
+    
+    drone = ProductionMockDroneWithCamera(config, args.server, loop_monitor)
     
     try:
         asyncio.run(drone.run())
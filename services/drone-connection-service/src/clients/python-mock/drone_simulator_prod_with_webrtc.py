@@ -3,11 +3,9 @@
 import asyncio
 import json
 import time
-import random
 import math
 import logging
 import argparse
-import uuid
 import statistics
 import base64
 import struct
@@ -20,10 +18,42 @@ import aiohttp
 from aiortc import RTCPeerConnection, RTCSessionDescription, RTCDataChannel, RTCConfiguration, RTCIceServer
 from aiortc.contrib.signaling import object_from_string, object_to_string
 import av
+from loop_monitor import EventLoopLagMonitor
+from event_loops import install_event_loop, EVENT_LOOPS
+from seeded_random import drone_rngs, jetson_serial
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Independent random streams per drone, so seeded runs don't depend on task interleaving
+RNG_STREAMS = ('motion', 'heartbeat', 'mavros', 'command', 'landing', 'frame_front', 'frame_bottom')
+
+@dataclass
+class LatencyMeasurement:
+    measurement_type: str
+    send_timestamp: float
+    receive_timestamp: float
+    latency_ms: float
+    payload_size_bytes: int
+    sequence_id: int
+    loop_lag_ms: float = 0.0
+
+@dataclass
+class LatencyStats:
+    measurement_type: str
+    count: int
+    min_ms: float
+    max_ms: float
+    avg_ms: float
+    median_ms: float
+    p95_ms: float
+    p99_ms: float
+    payload_avg_bytes: int
+    loop_lag_avg_ms: float = 0.0
+    network_avg_ms: float = 0.0
+    network_p95_ms: float = 0.0
+    network_p99_ms: float = 0.0
+
 @dataclass
 class DroneConfig:
     drone_id: str
@@ -38,6 +68,8 @@ class DroneConfig:
     camera_fps: float = 30.0
     enable_webrtc: bool = True
     enable_camera_streaming: bool = True
+    enable_latency_measurement: bool = True
+    seed: Optional[int] = None
 
 @dataclass
 class DroneState:
@@ -66,9 +98,11 @@ class DroneState:
     latch_status: str
 
 class ProductionWebRTCDrone:
-    def __init__(self, config: DroneConfig, server_url: str):
+    def __init__(self, config: DroneConfig, server_url: str,
+                 loop_monitor: Optional[EventLoopLagMonitor] = None):
         self.config = config
         self.server_url = server_url
+        self.loop_monitor = loop_monitor
         self.ws_url = server_url.replace('http', 'ws')
         self.sio = socketio.AsyncClient(
             reconnection=True,
@@ -102,7 +136,8 @@ class ProductionWebRTCDrone:
             latch_status='OK'
         )
         
-        self.direction = random.uniform(0, 360)
+        self.rng = drone_rngs(config.seed, config.drone_id, RNG_STREAMS)
+        self.direction = self.rng['motion'].uniform(0, 360)
         self.flight_time = 0
         self.registered = False
         self.session_token = None
@@ -122,6 +157,10 @@ class ProductionWebRTCDrone:
         # Frame generation
         self.frame_sequence = 0
         
+        # Latency measurement from server acks
+        self.latency_measurements: List[LatencyMeasurement] = []
+        self.sequence_counters = {'telemetry': 0, 'heartbeat': 0}
+        
         self.setup_event_handlers()
         
     def setup_event_handlers(self):
@@ -166,6 +205,16 @@ class ProductionWebRTCDrone:
         async def waypoint_mission(data):
             await self.handle_waypoint_mission(data)
             
+        @self.sio.event
+        async def heartbeat_ack(data):
+            if self.config.enable_latency_measurement:
+                await self.measure_heartbeat_latency(data)
+                
+        @self.sio.event
+        async def telemetry_ack(data):
+            if self.config.enable_latency_measurement:
+                await self.measure_telemetry_latency(data)
+                
         # REAL WebRTC signaling handlers
         @self.sio.event
         async def webrtc_request_offer(data):
@@ -183,6 +232,92 @@ class ProductionWebRTCDrone:
         async def webrtc_close(data):
             await self.cleanup_webrtc()
 
+    async def measure_telemetry_latency(self, ack_data):
+        """Measure telemetry round-trip latency"""
+        try:
+            if 'timestamp' in ack_data:
+                send_time = float(ack_data['timestamp']) / 1000
+                receive_time = time.time()
+                
+                self.latency_measurements.append(LatencyMeasurement(
+                    measurement_type='telemetry',
+                    send_timestamp=send_time,
+                    receive_timestamp=receive_time,
+                    latency_ms=(receive_time - send_time) * 1000,
+                    payload_size_bytes=len(json.dumps(ack_data).encode()),
+                    sequence_id=self.sequence_counters['telemetry'],
+                    loop_lag_ms=self.loop_lag_between(send_time, receive_time)
+                ))
+                
+        except Exception as e:
+            logger.error(f"Error measuring telemetry latency: {e}")
+
+    async def measure_heartbeat_latency(self, ack_data):
+        """Measure heartbeat latency from the server timestamp"""
+        try:
+            if 'serverTimestamp' in ack_data:
+                server_time = float(ack_data['serverTimestamp']) / 1000
+                receive_time = time.time()
+                
+                self.latency_measurements.append(LatencyMeasurement(
+                    measurement_type='heartbeat',
+                    send_timestamp=server_time,
+                    receive_timestamp=receive_time,
+                    latency_ms=(receive_time - server_time) * 1000,
+                    payload_size_bytes=len(json.dumps(ack_data).encode()),
+                    sequence_id=self.sequence_counters['heartbeat'],
+                    loop_lag_ms=self.loop_lag_between(server_time, receive_time)
+                ))
+                
+        except Exception as e:
+            logger.error(f"Error measuring heartbeat latency: {e}")
+
+    def loop_lag_between(self, start_time: float, end_time: float) -> float:
+        """Event-loop stall time (ms) inside a measurement interval"""
+        if not self.loop_monitor:
+            return 0.0
+        return self.loop_monitor.stall_ms_between(start_time, end_time)
+
+    def get_latency_statistics(self) -> Dict[str, LatencyStats]:
+        """Calculate latency statistics by measurement type"""
+        by_type: Dict[str, List[LatencyMeasurement]] = {}
+        for measurement in self.latency_measurements:
+            by_type.setdefault(measurement.measurement_type, []).append(measurement)
+        
+        stats = {}
+        for measurement_type, measurements in by_type.items():
+            latencies = [m.latency_ms for m in measurements]
+            network_latencies = [max(0.0, m.latency_ms - m.loop_lag_ms) for m in measurements]
+            
+            stats[measurement_type] = LatencyStats(
+                measurement_type=measurement_type,
+                count=len(measurements),
+                min_ms=min(latencies),
+                max_ms=max(latencies),
+                avg_ms=statistics.mean(latencies),
+                median_ms=statistics.median(latencies),
+                p95_ms=self.percentile(latencies, 95),
+                p99_ms=self.percentile(latencies, 99),
+                payload_avg_bytes=int(statistics.mean([m.payload_size_bytes for m in measurements])),
+                loop_lag_avg_ms=statistics.mean([m.loop_lag_ms for m in measurements]),
+                network_avg_ms=statistics.mean(network_latencies),
+                network_p95_ms=self.percentile(network_latencies, 95),
+                network_p99_ms=self.percentile(network_latencies, 99)
+            )
+        
+        return stats
+
+    def percentile(self, data: List[float], p: float) -> float:
+        """Calculate percentile"""
+        if not data:
+            return 0.0
+        sorted_data = sorted(data)
+        index = (len(sorted_data) - 1) * p / 100
+        lower = int(index)
+        upper = min(lower + 1, len(sorted_data) - 1)
+        weight = index - lower
+        return sorted_data[lower] * (1 - weight) + sorted_data[upper] * weight
+
     async def setup_real_webrtc(self):
         """Setup REAL WebRTC peer connection with aiortc"""
         try:
@@ -371,11 +506,11 @@ class ProductionWebRTCDrone:
         """Generate binary H.264-like camera frame with proper header"""
         try:
             self.frame_sequence += 1
-            timestamp = int(time.time() * 1000)
+            timestamp = int(time.time() * 1000) & 0xFFFFFFFF   # uint32 field wraps
             camera_id = 1 if camera == 'front' else 2
             
             # Generate realistic frame payload (simulated H.264 data)
-            frame_payload = self.generate_h264_like_payload()
+            frame_payload = self.generate_h264_like_payload(self.rng['frame_' + camera])
             frame_size = len(frame_payload)
             
             # Create binary header (16 bytes)
@@ -388,7 +523,7 @@ class ProductionWebRTCDrone:
                 0x12345678,           # Magic number (big endian)
                 timestamp,            # Timestamp
                 camera_id,            # Camera ID
-                self.frame_sequence,  # Frame number
+                self.frame_sequence & 0xFFFF,  # Frame number
                 frame_size            # Frame size
             )
             
@@ -404,7 +539,7 @@ class ProductionWebRTCDrone:
             logger.error(f"❌ [{self.config.drone_id}] Error generating binary frame: {e}")
             return b''
 
-    def generate_h264_like_payload(self) -> bytes:
+    def generate_h264_like_payload(self, rng) -> bytes:
         """Generate realistic H.264-like binary payload"""
         try:
             # Simulate H.264 NAL units with realistic patterns
@@ -432,7 +567,7 @@ class ProductionWebRTCDrone:
             frame_data.extend(b'\x00\x00\x00\x01')
             
             # Slice data (simulated with random data that looks realistic)
-            slice_size = random.randint(5000, 15000)  # Realistic slice size
+            slice_size = rng.randint(5000, 15000)  # Realistic slice size
             slice_data = bytearray()
             
             # Slice header
@@ -445,10 +580,10 @@ class ProductionWebRTCDrone:
                     slice_data.append(0x00)
                 elif i % 50 == 0:
                     # Motion vector-like data
-                    slice_data.append(random.randint(0x80, 0xFF))
+                    slice_data.append(rng.randint(0x80, 0xFF))
                 else:
                     # Compressed texture data
-                    slice_data.append(random.randint(0x20, 0x7F))
+                    slice_data.append(rng.randint(0x20, 0x7F))
             
             frame_data.extend(slice_data)
             
@@ -513,6 +648,7 @@ class ProductionWebRTCDrone:
 
     def generate_professional_frame(self, camera: str) -> str:
         """Generate professional camera frame data for WebSocket fallback"""
+        rng = self.rng['frame_' + camera]
         timestamp = time.time() * 1000
         frame_number = self.camera_frame_counter[camera]
         
@@ -523,21 +659,21 @@ class ProductionWebRTCDrone:
             'timestamp': timestamp,
             'frameNumber': frame_number,
             'exposure': 1/500 if camera == 'front' else 1/250,
-            'iso': 100 + random.random() * 200,
-            'focus_distance': 5 + random.random() * 95,
-            'white_balance': 5600 + random.random() * 400,
-            'scene_brightness': 180 + random.random() * 40 if camera == 'front' else 120 + random.random() * 60,
-            'contrast': 1.0 + (random.random() - 0.5) * 0.2,
-            'saturation': 1.0 + (random.random() - 0.5) * 0.1,
+            'iso': 100 + rng.random() * 200,
+            'focus_distance': 5 + rng.random() * 95,
+            'white_balance': 5600 + rng.random() * 400,
+            'scene_brightness': 180 + rng.random() * 40 if camera == 'front' else 120 + rng.random() * 60,
+            'contrast': 1.0 + (rng.random() - 0.5) * 0.2,
+            'saturation': 1.0 + (rng.random() - 0.5) * 0.1,
             'gimbal_roll': math.sin(timestamp / 5000) * 2,
             'gimbal_pitch': math.cos(timestamp / 7000) * 3,
             'gimbal_yaw': math.sin(timestamp / 10000) * 5,
-            'objects_detected': math.floor(random.random() * 3),
-            'faces_detected': math.floor(random.random() * 2) if camera == 'front' else 0,
-            'motion_vectors': [{'x': (random.random() - 0.5) * 10, 'y': (random.random() - 0.5) * 10} for _ in range(5)],
-            'sharpness': 0.8 + random.random() * 0.2,
-            'noise_level': random.random() * 0.1,
-            'compression_ratio': 0.15 + random.random() * 0.05
+            'objects_detected': math.floor(rng.random() * 3),
+            'faces_detected': math.floor(rng.random() * 2) if camera == 'front' else 0,
+            'motion_vectors': [{'x': (rng.random() - 0.5) * 10, 'y': (rng.random() - 0.5) * 10} for _ in range(5)],
+            'sharpness': 0.8 + rng.random() * 0.2,
+            'noise_level': rng.random() * 0.1,
+            'compression_ratio': 0.15 + rng.random() * 0.05
         }
         
         frame_json = json.dumps(frame_data)
@@ -561,11 +697,19 @@ class ProductionWebRTCDrone:
         await self.sio.emit('drone_register_real', registration_data)
         logger.info(f"📝 [{self.config.drone_id}] WebSocket registration sent")
 
+    def stop_stream_tasks(self):
+        """Cancel the stream tasks of a previous connection"""
+        for task in self.tasks:
+            task.cancel()
+        self.tasks = []
+
     async def start_data_streams(self):
         """Start all production data streams"""
         if not self.registered:
             return
             
+        # A quick reconnect can beat the old streams' registered check; never run two sets
+        self.stop_stream_tasks()
         self.tasks.append(asyncio.create_task(self.telemetry_stream()))
         self.tasks.append(asyncio.create_task(self.heartbeat_stream()))
         self.tasks.append(asyncio.create_task(self.mavros_stream()))
@@ -640,6 +784,7 @@ class ProductionWebRTCDrone:
                 })
                 
                 await self.sio.emit('telemetry_real', telemetry_data)
+                self.sequence_counters['telemetry'] += 1
                 await asyncio.sleep(interval)
                 
             except Exception as e:
@@ -662,19 +807,20 @@ class ProductionWebRTCDrone:
                         'udpOptimized': self.use_webrtc_for_camera
                     },
                     'jetsonMetrics': {
-                        'cpuUsage': random.uniform(20, 60),
-                        'memoryUsage': random.uniform(40, 80),
-                        'temperature': random.uniform(45, 65),
-                        'diskUsage': random.uniform(30, 70)
+                        'cpuUsage': self.rng['heartbeat'].uniform(20, 60),
+                        'memoryUsage': self.rng['heartbeat'].uniform(40, 80),
+                        'temperature': self.rng['heartbeat'].uniform(45, 65),
+                        'diskUsage': self.rng['heartbeat'].uniform(30, 70)
                     },
                     'networkMetrics': {
-                        'latency': random.uniform(5, 25) if self.webrtc_connected else random.uniform(10, 100),
-                        'packetLoss': random.uniform(0, 0.1) if self.webrtc_connected else random.uniform(0, 0.5),
-                        'bandwidth': random.uniform(80, 100) if self.webrtc_connected else random.uniform(50, 100)
+                        'latency': self.rng['heartbeat'].uniform(5, 25) if self.webrtc_connected else self.rng['heartbeat'].uniform(10, 100),
+                        'packetLoss': self.rng['heartbeat'].uniform(0, 0.1) if self.webrtc_connected else self.rng['heartbeat'].uniform(0, 0.5),
+                        'bandwidth': self.rng['heartbeat'].uniform(80, 100) if self.webrtc_connected else self.rng['heartbeat'].uniform(50, 100)
                     }
                 }
                 
                 await self.sio.emit('heartbeat_real', heartbeat_data)
+                self.sequence_counters['heartbeat'] += 1
                 await asyncio.sleep(interval)
                 
             except Exception as e:
@@ -700,8 +846,8 @@ class ProductionWebRTCDrone:
         
         while self.registered:
             try:
-                message = random.choice(mavros_messages)
-                if random.random() < 0.05:
+                message = self.rng['mavros'].choice(mavros_messages)
+                if self.rng['mavros'].random() < 0.05:
                     message = "[ERROR] Communication timeout detected"
                     
                 mavros_data = {
@@ -747,8 +893,8 @@ class ProductionWebRTCDrone:
                 self.state.percentage = max(20, self.state.percentage - 0.001)
                 self.state.voltage = 22.2 * (self.state.percentage / 100)
                 
-                self.state.hdop = 0.8 + random.uniform(-0.2, 0.2)
-                self.state.position_error = 1.0 + random.uniform(-0.3, 0.3)
+                self.state.hdop = 0.8 + self.rng['motion'].uniform(-0.2, 0.2)
+                self.state.position_error = 1.0 + self.rng['motion'].uniform(-0.3, 0.3)
                 
                 await asyncio.sleep(0.1)
                 
@@ -764,7 +910,7 @@ class ProductionWebRTCDrone:
         
         logger.info(f"📡 [{self.config.drone_id}] Production command: {command_type}")
         
-        await asyncio.sleep(random.uniform(0.1, 0.5))
+        await asyncio.sleep(self.rng['command'].uniform(0.1, 0.5))
         
         if command_type == 'arm':
             self.state.armed = True
@@ -830,12 +976,12 @@ class ProductionWebRTCDrone:
                 'output': f"Precision landing {stage.lower()} phase initiated",
                 'stage': stage,
                 'altitude': self.state.altitude_relative,
-                'target_detected': random.random() > 0.2,
-                'target_confidence': random.uniform(0.7, 0.95),
-                'lateral_error': random.uniform(0, 2.0),
-                'vertical_error': random.uniform(0, 1.0),
+                'target_detected': self.rng['landing'].random() > 0.2,
+                'target_confidence': self.rng['landing'].uniform(0.7, 0.95),
+                'lateral_error': self.rng['landing'].uniform(0, 2.0),
+                'vertical_error': self.rng['landing'].uniform(0, 1.0),
                 'battery_level': self.state.percentage,
-                'wind_speed': random.uniform(0, 5.0),
+                'wind_speed': self.rng['landing'].uniform(0, 5.0),
                 'webrtc_active': self.webrtc_connected
             }
             
@@ -899,6 +1045,9 @@ class ProductionWebRTCDrone:
 
     async def run(self):
         """Main run loop"""
+        if self.loop_monitor:
+            self.loop_monitor.start()
+            
         connected = await self.connect()
         if not connected:
             logger.error(f"❌ [{self.config.drone_id}] Failed to connect to production system")
@@ -918,6 +1067,41 @@ class ProductionWebRTCDrone:
             logger.info(f"🛑 [{self.config.drone_id}] Shutdown requested")
         finally:
             await self.disconnect()
+            if self.loop_monitor:
+                await self.loop_monitor.stop()
+
+    def print_latency_report(self):
+        """Print latency report with simulator loop lag split out"""
+        stats = self.get_latency_statistics()
+        
+        print(f"\n📊 PRODUCTION LATENCY REPORT WITH WEBRTC - {self.config.drone_id}")
+        print("=" * 70)
+        
+        if not stats:
+            print("No latency measurements collected")
+            return
+        
+        print(f"Total measurements: {sum(stat.count for stat in stats.values())}")
+        print(f"Camera transport: {'webrtc_udp' if self.use_webrtc_for_camera else 'websocket'}")
+        
+        for measurement_type, stat in stats.items():
+            print(f"\n{measurement_type.upper()} LATENCY:")
+            print(f"  Count: {stat.count}")
+            print(f"  Min: {stat.min_ms:.2f}ms")
+            print(f"  Avg: {stat.avg_ms:.2f}ms")
+            print(f"  Median: {stat.median_ms:.2f}ms")
+            print(f"  P95: {stat.p95_ms:.2f}ms")
+            print(f"  P99: {stat.p99_ms:.2f}ms")
+            print(f"  Max: {stat.max_ms:.2f}ms")
+            if self.loop_monitor:
+                print(f"  Simulator loop lag avg: {stat.loop_lag_avg_ms:.2f}ms")
+                print(f"  Network/server avg: {stat.network_avg_ms:.2f}ms "
+                      f"(P95: {stat.network_p95_ms:.2f}ms, P99: {stat.network_p99_ms:.2f}ms)")
+        
+        if self.loop_monitor:
+            self.loop_monitor.print_report()
+        
+        print("=" * 70)
 
 def main():
     parser = argparse.ArgumentParser(description='Production Mock Drone with REAL WebRTC UDP Data Channels')
@@ -930,15 +1114,26 @@ def main():
     parser.add_argument('--disable-camera', action='store_true', help='Disable camera streaming')
     parser.add_argument('--camera-fps', type=float, default=30.0, help='Camera FPS (default: 30)')
     parser.add_argument('--telemetry-rate', type=float, default=10.0, help='Telemetry rate Hz (default: 10)')
+    parser.add_argument('--disable-latency', action='store_true', help='Disable latency measurement')
+    parser.add_argument('--disable-loop-monitor', action='store_true', help='Disable event-loop lag monitor')
+    parser.add_argument('--loop-lag-threshold', type=float, default=50.0,
+                       help='Flag windows with event-loop lag above this many ms (default: 50)')
+    parser.add_argument('--detect-slow-callbacks', action='store_true',
+                       help='Use asyncio debug mode to name slow callbacks (adds overhead)')
+    parser.add_argument('--seed', type=int,
+                       help='Seed the drone\'s random streams for reproducible frames and telemetry (default: unseeded)')
+    parser.add_argument('--loop', choices=EVENT_LOOPS, default='asyncio',
+                       help='Event loop implementation, uvloop falls back to asyncio if missing (default: asyncio)')
     
     args = parser.parse_args()
+    install_event_loop(args.loop)
     
     config = DroneConfig(
         drone_id=args.drone_id,
         model=args.model,
         base_lat=args.lat,
         base_lng=args.lng,
-        jetson_serial=f"JETSON-WEBRTC-UDP-{uuid.uuid4().hex[:8].upper()}",
+        jetson_serial=jetson_serial('JETSON-WEBRTC-UDP', args.seed, args.drone_id),
         capabilities=[
             'telemetry', 'camera', 'mavros', 'precision_landing',
             'webrtc', 'webrtc_udp_datachannel', 'commands', 
@@ -947,10 +1142,19 @@ def main():
         telemetry_rate=args.telemetry_rate,
         camera_fps=args.camera_fps,
         enable_webrtc=not args.disable_webrtc,
-        enable_camera_streaming=not args.disable_camera
+        enable_camera_streaming=not args.disable_camera,
+        enable_latency_measurement=not args.disable_latency,
+        seed=args.seed
     )
     
-    drone = ProductionWebRTCDrone(config, args.server)
+    loop_monitor = None
+    if not args.disable_loop_monitor:
+        loop_monitor = EventLoopLagMonitor(
+            lag_threshold_ms=args.loop_lag_threshold,
+            detect_slow_callbacks=args.detect_slow_callbacks
+        )
+    
+    drone = ProductionWebRTCDrone(config, args.server, loop_monitor)
     
     logger.info(f"🚁 Starting production WebRTC UDP drone: {config.drone_id}")
     logger.info(f"📡 WebRTC UDP enabled: {config.enable_webrtc}")
@@ -962,6 +1166,9 @@ def main():
         asyncio.run(drone.run())
     except KeyboardInterrupt:
         logger.info("🛑 Production WebRTC UDP drone simulator stopped by user")
+    finally:
+        if config.enable_latency_measurement:
+            drone.print_latency_report()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,205 @@
+# services/drone-connection-service/src/clients/python-mock/event_loops.py
+"""
+Event loop selection and asyncio vs uvloop benchmark
+
+Every entry point takes --loop {asyncio,uvloop}. uvloop is optional: when
+it is not installed the simulators log a warning and keep the default
+asyncio loop. Sharded fleet workers install the same loop as the
+coordinator.
+
+Run directly to benchmark both loops on the same synthetic fleet (10 Hz
+open-loop telemetry, JSON-encoded and written to a loopback TCP sink):
+
+  python event_loops.py --drones 250 500 1000 2000 --duration 5
+
+A fleet size is sustainable when the process stays under --cpu-budget of
+one core, P99 send jitter stays under --jitter-slo-ms and at least 99% of
+the intended sends go out.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import time
+from dataclasses import asdict
+from typing import Callable, List, Optional
+
+from latency_histogram import LatencyHistogram
+from send_schedule import SendSchedule
+
+logger = logging.getLogger(__name__)
+
+EVENT_LOOPS = ['asyncio', 'uvloop']
+
+
+def uvloop_available() -> bool:
+    try:
+        import uvloop  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def install_event_loop(name: str) -> str:
+    """Install the requested event loop policy and return the loop actually in use"""
+    if name == 'uvloop':
+        try:
+            import uvloop
+        except ImportError:
+            logger.warning("⚠️ uvloop is not installed (pip install uvloop), falling back to asyncio")
+            return 'asyncio'
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        logger.info(f"⚡ Using uvloop {uvloop.__version__}")
+        return 'uvloop'
+    asyncio.set_event_loop_policy(None)
+    return 'asyncio'
+
+
+def active_event_loop() -> str:
+    """Name of the loop implementation the current policy creates"""
+    return 'uvloop' if type(asyncio.get_event_loop_policy()).__module__.startswith('uvloop') else 'asyncio'
+
+
+def loop_factory(name: str) -> Callable[[], asyncio.AbstractEventLoop]:
+    if name == 'uvloop':
+        import uvloop
+        return uvloop.new_event_loop
+    return asyncio.new_event_loop
+
+
+async def _sink(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        while await reader.read(65536):
+            pass
+    finally:
+        writer.close()
+
+
+async def _bench_drone(state: dict, writer: asyncio.StreamWriter, lateness: LatencyHistogram,
+                       counts: List[int], first_delay: float):
+    schedule = SendSchedule(0.1, 'open')
+    await asyncio.sleep(first_delay)
+    sequence = 0
+    while True:
+        intended = await schedule.next_send()
+        now = time.time()
+        lateness.record((now - intended) * 1000)
+        sequence += 1
+        payload = dict(state, timestamp=now * 1000, sequence_id=sequence)
+        writer.write(json.dumps(payload).encode() + b'\n')
+        counts[0] += 1
+
+
+async def _bench_run(num_drones: int, duration: float, connections: int) -> dict:
+    # Imported here: only the benchmark needs the full drone model
+    from drone_simulator_prod import DroneState
+
+    state = asdict(DroneState(
+        latitude=18.5204, longitude=73.8567, altitude_msl=500.0, altitude_relative=100.0, armed=True,
+        flight_mode='AUTO', connected=True, gps_fix='GPS_OK', satellites=12, hdop=0.8, position_error=1.0,
+        voltage=22.2, current=15.0, percentage=85.0, roll=0.0, pitch=0.0, yaw=0.0, velocity_x=0.0,
+        velocity_y=0.0, velocity_z=0.0, latency=50.0, teensy_connected=True, latch_status='OK'
+    ))
+
+    server = await asyncio.start_server(_sink, '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    writers = []
+    for _ in range(min(connections, num_drones)):
+        _, writer = await asyncio.open_connection('127.0.0.1', port)
+        writers.append(writer)
+
+    lateness = LatencyHistogram()
+    counts = [0]
+    tasks = [asyncio.create_task(_bench_drone(state, writers[i % len(writers)], lateness, counts,
+                                              (i % 100) / 1000))
+             for i in range(num_drones)]
+
+    # Let every drone send once before measuring
+    await asyncio.sleep(0.5)
+    lateness.reset()
+    counts[0] = 0
+    cpu_start = time.process_time()
+    await asyncio.sleep(duration)
+    cpu = time.process_time() - cpu_start
+    sent = counts[0]
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    for writer in writers:
+        writer.close()
+        await writer.wait_closed()
+    # Let the sink handlers see EOF before the server goes away
+    await asyncio.sleep(0.1)
+    server.close()
+    await server.wait_closed()
+
+    return {
+        'drones': num_drones,
+        'cpu_s_per_s': cpu / duration,
+        'rate_accuracy': sent / (num_drones * 10 * duration),
+        'jitter_p50_ms': lateness.percentile(50),
+        'jitter_p99_ms': lateness.percentile(99),
+        'jitter_max_ms': lateness.max_ms
+    }
+
+
+def benchmark(drone_counts: List[int], duration: float, connections: int, cpu_budget: float,
+              jitter_slo_ms: float, loops: Optional[List[str]] = None):
+    """Compare event loops on the same synthetic fleet and report max sustainable drones per core"""
+    loops = loops or EVENT_LOOPS
+    print(f"⚡ Event loop benchmark: {duration:g}s per run, Python {platform.python_version()}, "
+          f"SLO: CPU < {cpu_budget:.0%} of a core, P99 jitter < {jitter_slo_ms:g}ms, >= 99% of sends")
+    print(f"{'loop':<8} {'drones':>7} {'CPU s/s':>8} {'sends':>7} {'jitter P50':>11} {'P99':>9} "
+          f"{'max':>9}  sustainable")
+    print("-" * 80)
+
+    capacity = {}
+    for name in loops:
+        if name == 'uvloop' and not uvloop_available():
+            print(f"{name:<8} skipped: uvloop is not installed (pip install uvloop)")
+            continue
+        best = None
+        for num_drones in drone_counts:
+            with asyncio.Runner(loop_factory=loop_factory(name)) as runner:
+                r = runner.run(_bench_run(num_drones, duration, connections))
+            ok = (r['cpu_s_per_s'] < cpu_budget and r['jitter_p99_ms'] < jitter_slo_ms
+                  and r['rate_accuracy'] >= 0.99)
+            if ok:
+                best = r
+            print(f"{name:<8} {r['drones']:>7} {r['cpu_s_per_s']:>8.3f} {r['rate_accuracy'] * 100:>6.1f}% "
+                  f"{r['jitter_p50_ms']:>9.2f}ms {r['jitter_p99_ms']:>7.2f}ms {r['jitter_max_ms']:>7.2f}ms  "
+                  f"{'yes' if ok else 'no'}")
+        capacity[name] = best
+
+    print("\n📈 MAX SUSTAINABLE DRONES PER CORE")
+    print("-" * 50)
+    for name, best in capacity.items():
+        if best is None:
+            print(f"  {name}: none of the tested fleet sizes met the SLO")
+            continue
+        projected = best['drones'] * cpu_budget / best['cpu_s_per_s'] if best['cpu_s_per_s'] else 0
+        print(f"  {name}: {best['drones']} drones sustained (P99 jitter {best['jitter_p99_ms']:.2f}ms), "
+              f"~{projected:.0f} projected at {cpu_budget:.0%} CPU")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='asyncio vs uvloop fleet benchmark')
+    parser.add_argument('--drones', type=int, nargs='+', default=[250, 500, 1000, 2000],
+                        help='Fleet sizes to benchmark (default: 250 500 1000 2000)')
+    parser.add_argument('--duration', type=float, default=5.0, help='Seconds per run (default: 5)')
+    parser.add_argument('--connections', type=int, default=32,
+                        help='Loopback sink connections shared by the fleet (default: 32)')
+    parser.add_argument('--cpu-budget', type=float, default=0.9,
+                        help='Fraction of one core a sustainable fleet may use (default: 0.9)')
+    parser.add_argument('--jitter-slo-ms', type=float, default=20.0,
+                        help='Max P99 send jitter for a sustainable fleet in ms (default: 20)')
+    parser.add_argument('--loops', choices=EVENT_LOOPS, nargs='+', default=EVENT_LOOPS,
+                        help='Event loops to compare (default: asyncio uvloop)')
+    args = parser.parse_args()
+    benchmark(args.drones, args.duration, args.connections, args.cpu_budget, args.jitter_slo_ms, args.loops)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+# services/drone-connection-service/src/clients/python-mock/fleet_cluster.py
+"""
+Multi-host coordinator/agent fleet runner
+
+One host runs the coordinator, any number of hosts run agents that connect to
+it over TCP (newline-delimited JSON):
+
+  agent -> hello                       name, host, cores
+  coordinator -> welcome               coordinator clock, for the offset estimate
+  agent -> clock                       estimated clock offset and RTT
+  coordinator -> assign                drone config slice, instrumentation
+                                       options, ramp offsets and a start time
+  agent -> update / final              drone state, mergeable instrumentation
+                                       stats and measurement sketches
+  coordinator -> stop
+
+Agents run their slice with the sharded worker loop, starting at the shared
+start time translated to their own clock. Instead of raw measurements they
+stream FleetSketch deltas, which the coordinator merges into one fleet sketch
+that the regular fleet report runs on. Each agent is one process; run several
+agents per host to use more cores.
+
+Everything works on one box:
+
+  python multi_drone_prod.py --coordinator 127.0.0.1:7700 --agents 2 --drones 20
+  python multi_drone_prod.py --agent 127.0.0.1:7700    # in two more shells
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+from dataclasses import asdict
+from typing import Dict, List, Optional, Tuple
+
+from drone_simulator_prod import DroneConfig, ProductionMockDrone
+from event_loops import active_event_loop
+from fleet_shards import ShardedProductionLatencySimulator, RemoteDroneView, WORKER_STOP_TIMEOUT
+from fleet_shards import _run_worker, _new_measurements, _drone_states
+from fleet_sketch import FleetSketch
+from loop_monitor import EventLoopLagMonitor
+from send_path_timing import SendPathTimer
+from spike_detector import SpikeDetector
+from timer_wheel import HierarchicalTimerWheel
+from fleet_kinematics import FleetKinematics
+from ramp_profiles import RampProfile, ConnectionGate
+from http_pool import HttpSessionPool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 7700
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+AGENT_JOIN_TIMEOUT = 300.0
+AGENT_CONNECT_TIMEOUT = 60.0
+START_DELAY = 5.0
+
+
+def parse_address(address: str, default_host: str = '127.0.0.1') -> Tuple[str, int]:
+    """HOST:PORT, :PORT or PORT"""
+    host, _, port = address.rpartition(':')
+    return host or default_host, int(port or DEFAULT_PORT)
+
+
+def _send_message(writer: asyncio.StreamWriter, message: dict):
+    writer.write(json.dumps(message, separators=(',', ':')).encode() + b'\n')
+
+
+async def _read_message(reader: asyncio.StreamReader) -> Optional[dict]:
+    """Next message, or None once the peer has gone"""
+    try:
+        line = await reader.readline()
+    except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        return None
+    return json.loads(line) if line else None
+
+
+def _agent_update(drones: List[ProductionMockDrone], sent: Dict[str, int], stats: dict) -> dict:
+    """Sketch of the measurements since the last update plus drone state and stats"""
+    sketch = FleetSketch.from_measurement_lists(_new_measurements(drones, sent).items())
+    return {'sketch': sketch.to_dict(), 'drones': _drone_states(drones), 'stats': stats}
+
+
+class AgentChannel:
+    """Pipe-like view of the agent's coordinator connection for the shard worker loop"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.inbox: List[dict] = []
+        self.closed = False
+        self.interrupted = False
+        self._reader_task = asyncio.create_task(self._read(reader))
+
+    async def _read(self, reader: asyncio.StreamReader):
+        try:
+            while True:
+                message = await _read_message(reader)
+                if message is None:
+                    break
+                self.inbox.append(message)
+        finally:
+            self.closed = True
+
+    def interrupt(self, signum, frame):
+        # Ctrl-C on an agent stops its drones and still sends the final report
+        self.interrupted = True
+
+    def poll(self) -> bool:
+        if self.inbox or self.interrupted:
+            return True
+        if self.closed:
+            raise EOFError("coordinator connection closed")
+        return False
+
+    def recv(self) -> tuple:
+        if self.interrupted:
+            self.interrupted = False
+            return ('stop',)
+        message = self.inbox.pop(0)
+        return (message['type'], message)
+
+    def send(self, item: tuple):
+        if self.writer.is_closing():
+            raise BrokenPipeError("coordinator connection closed")
+        kind, agent_id, payload = item
+        _send_message(self.writer, {'type': kind, 'agent_id': agent_id, 'payload': payload})
+
+    async def close(self):
+        self._reader_task.cancel()
+        if not self.writer.is_closing():
+            await self.writer.drain()
+            self.writer.close()
+
+
+async def _connect(host: str, port: int, timeout: float):
+    """Connect to the coordinator, retrying until it is listening"""
+    deadline = time.time() + timeout
+    while True:
+        try:
+            return await asyncio.open_connection(host, port, limit=MAX_MESSAGE_BYTES)
+        except OSError as e:
+            if time.time() >= deadline:
+                raise ConnectionError(f"coordinator {host}:{port} not reachable: {e}")
+            await asyncio.sleep(1.0)
+
+
+async def run_agent(coordinator: str, name: Optional[str] = None,
+                    connect_timeout: float = AGENT_CONNECT_TIMEOUT):
+    """Join a coordinator, run the assigned drones and stream sketches back"""
+    host, port = parse_address(coordinator)
+    name = name or f"{socket.gethostname()}-{os.getpid()}"
+    reader, writer = await _connect(host, port, connect_timeout)
+    logger.info(f"🛰️ Agent {name}: connected to coordinator {host}:{port}")
+
+    hello_sent = time.time()
+    _send_message(writer, {'type': 'hello', 'agent': name, 'host': socket.gethostname(), 'pid': os.getpid(),
+                           'cores': os.cpu_count(), 'event_loop': active_event_loop()})
+    welcome = await _read_message(reader)
+    received = time.time()
+    if welcome is None or welcome['type'] != 'welcome':
+        writer.close()
+        raise ConnectionError(welcome['message'] if welcome else "coordinator closed the connection")
+    # The coordinator stamped its clock roughly halfway through the round trip
+    clock_offset = welcome['coordinator_time'] - (hello_sent + received) / 2
+    _send_message(writer, {'type': 'clock', 'offset_ms': clock_offset * 1000,
+                           'rtt_ms': (received - hello_sent) * 1000})
+    logger.info(f"🕒 Clock offset to coordinator: {clock_offset * 1000:+.1f}ms "
+                f"(RTT {(received - hello_sent) * 1000:.1f}ms); waiting for assignment")
+
+    assign = await _read_message(reader)
+    if assign is None or assign['type'] != 'assign':
+        logger.info("🛑 Coordinator stopped before assigning drones")
+        writer.close()
+        return
+
+    agent_id = assign['agent_id']
+    configs = [DroneConfig(**config) for config in assign['configs']]
+    start_in = assign['start_at'] - clock_offset - time.time()
+    logger.info(f"🧩 Agent {agent_id}: {len(configs)} drones against {assign['server_url']}, "
+                f"starting in {max(0.0, start_in):.1f}s")
+    channel = AgentChannel(reader, writer)
+    await asyncio.sleep(max(0.0, start_in))
+
+    try:
+        await _run_worker(agent_id, configs, assign['server_url'], assign['options'], channel,
+                          make_update=_agent_update, sigint_handler=channel.interrupt)
+    except Exception as e:
+        logger.error(f"❌ Agent {agent_id} failed: {e}")
+        try:
+            channel.send(('error', agent_id, str(e)))
+        except BrokenPipeError:
+            pass
+    finally:
+        await channel.close()
+    logger.info(f"✅ Agent {agent_id}: final report sent")
+
+
+class ClusterCoordinator(ShardedProductionLatencySimulator):
+    """Coordinator that runs the fleet on agents connecting over TCP"""
+
+    def __init__(self, server_url: str, num_drones: int, num_agents: int, listen: str = f':{DEFAULT_PORT}',
+                 start_delay: float = START_DELAY,
+                 loop_monitor: Optional[EventLoopLagMonitor] = None,
+                 send_timer: Optional[SendPathTimer] = None, send_schedule: str = 'open',
+                 spike_detector: Optional[SpikeDetector] = None,
+                 timer_wheel: Optional[HierarchicalTimerWheel] = None,
+                 kinematics: Optional[FleetKinematics] = None,
+                 ramp: Optional[RampProfile] = None,
+                 connection_gate: Optional[ConnectionGate] = None,
+                 http_pool: Optional[HttpSessionPool] = None,
+                 max_measurements: Optional[int] = None,
+                 seed: Optional[int] = None):
+        super().__init__(server_url, num_drones, num_agents, loop_monitor, send_timer, send_schedule,
+                         spike_detector, timer_wheel, kinematics, ramp, connection_gate, http_pool,
+                         max_measurements, seed)
+        self.host, self.port = parse_address(listen, default_host='0.0.0.0')
+        self.start_delay = start_delay
+        self.fleet_sketch = FleetSketch()
+        self.agents: List[dict] = []
+        self._writers: List[asyncio.StreamWriter] = []
+        # Agents holding a slot while their clock exchange is still in flight
+        self._joining = 0
+        self._all_joined: Optional[asyncio.Event] = None
+
+    def measurement_count(self, drone) -> int:
+        return self.fleet_sketch.drone_count(drone.config.drone_id)
+
+    def build_stats_engine(self, drones) -> FleetSketch:
+        return self.fleet_sketch
+
+    def apply_worker_update(self, shard_id: int, update: dict):
+        self.fleet_sketch.merge(FleetSketch.from_dict(update['sketch']))
+        super().apply_worker_update(shard_id, dict(update, measurements={}))
+
+    async def handle_agent(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Register one agent, then apply its updates until it sends its final report"""
+        hello = await _read_message(reader)
+        if hello is None or hello.get('type') != 'hello':
+            writer.close()
+            return
+        if len(self.agents) + self._joining >= self.num_workers:
+            _send_message(writer, {'type': 'error', 'message': 'all agent slots are taken'})
+            writer.close()
+            return
+        # Reserve the slot before awaiting, so agents joining together can't overfill the fleet
+        self._joining += 1
+        try:
+            _send_message(writer, {'type': 'welcome', 'coordinator_time': time.time()})
+            clock = await _read_message(reader)
+        finally:
+            self._joining -= 1
+        if clock is None:
+            writer.close()
+            return
+
+        agent_id = len(self.agents)
+        self.agents.append({
+            'agent': hello['agent'],
+            'address': writer.get_extra_info('peername')[0],
+            'cores': hello['cores'],
+            'event_loop': hello['event_loop'],
+            'clock_offset_ms': clock['offset_ms'],
+            'rtt_ms': clock['rtt_ms'],
+            'drones': 0
+        })
+        self._writers.append(writer)
+        logger.info(f"🛰️ Agent {agent_id} joined: {hello['agent']} ({self.agents[agent_id]['address']}, "
+                    f"{hello['cores']} cores, clock offset {clock['offset_ms']:+.1f}ms) "
+                    f"[{len(self.agents)}/{self.num_workers}]")
+        if len(self.agents) == self.num_workers:
+            self._all_joined.set()
+
+        try:
+            while True:
+                message = await _read_message(reader)
+                if message is None:
+                    break
+                if message['type'] == 'error':
+                    logger.error(f"❌ Agent {agent_id} reported: {message['payload']}")
+                    continue
+                self.apply_worker_update(agent_id, message['payload'])
+                self.merge_worker_stats()
+                if message['type'] == 'final':
+                    self._finished.add(agent_id)
+                    break
+        finally:
+            if agent_id not in self._finished:
+                logger.error(f"❌ Agent {agent_id} disconnected without a final report")
+                self._finished.add(agent_id)
+            writer.close()
+
+    def assign_agents(self, configs: List[DroneConfig]) -> float:
+        """Send every agent its slice and the shared start time; returns the start time"""
+        options = self.worker_options()
+        # Start times are planned fleet-wide so the agents together follow the ramp profile
+        offsets = self.ramp.start_offsets(len(configs))
+        start_at = time.time() + self.start_delay
+        for agent_id, writer in enumerate(self._writers):
+            shard = configs[agent_id::self.num_workers]
+            self.agents[agent_id]['drones'] = len(shard)
+            _send_message(writer, {
+                'type': 'assign',
+                'agent_id': agent_id,
+                'server_url': self.server_url,
+                'configs': [asdict(config) for config in shard],
+                'options': dict(options, ramp_offsets=offsets[agent_id::self.num_workers],
+                                max_concurrent_connects=self.worker_connect_limit(agent_id)),
+                'start_at': start_at
+            })
+            logger.info(f"🧩 Agent {agent_id} ({self.agents[agent_id]['agent']}): {len(shard)} drones")
+        return start_at
+
+    async def run_production_latency_simulation(self, duration_minutes: int = 5):
+        """Wait for the agents, run the fleet on them and report as a single fleet"""
+        logger.info(f"🎯 Cluster Production Latency Simulation: {self.num_drones} drones "
+                    f"across {self.num_workers} agents")
+        logger.info(f"📡 Target server: {self.server_url}")
+        logger.info(f"⏱️ Duration: {duration_minutes} minutes")
+
+        configs = self.create_drone_configs()
+        self._drone_views = {config.drone_id: RemoteDroneView(config) for config in configs}
+        self.drones = list(self._drone_views.values())
+        self.display_production_drone_summary()
+
+        self._all_joined = asyncio.Event()
+        server = await asyncio.start_server(self.handle_agent, self.host, self.port, limit=MAX_MESSAGE_BYTES)
+        logger.info(f"🛰️ Waiting for {self.num_workers} agents on {self.host}:{self.port}")
+
+        try:
+            try:
+                await asyncio.wait_for(self._all_joined.wait(), AGENT_JOIN_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.error(f"❌ Only {len(self.agents)}/{self.num_workers} agents joined "
+                             f"within {AGENT_JOIN_TIMEOUT:g}s")
+                return
+
+            start_at = self.assign_agents(configs)
+            await asyncio.sleep(max(0.0, start_at - time.time()))
+            logger.info("🚀 Agents started")
+            await self.monitor_production_latency_simulation(duration_minutes)
+
+        except KeyboardInterrupt:
+            logger.info("🛑 Cluster latency simulation stopped by user")
+        finally:
+            await self.cleanup()
+            server.close()
+            self.generate_production_fleet_latency_report()
+            self.print_agent_report()
+
+    async def cleanup(self):
+        """Ask agents to stop and collect their final reports"""
+        logger.info("🧹 Stopping fleet agents...")
+        for writer in self._writers:
+            if not writer.is_closing():
+                _send_message(writer, {'type': 'stop'})
+
+        deadline = time.time() + WORKER_STOP_TIMEOUT
+        while len(self._finished) < len(self._writers) and time.time() < deadline:
+            await asyncio.sleep(0.2)
+        for writer in self._writers:
+            writer.close()
+
+        logger.info(f"✅ {len(self._finished)}/{len(self._writers)} agents reported")
+
+    def print_agent_report(self):
+        """Print per-agent share of the fleet and clock offsets"""
+        print("\n🛰️ CLUSTER AGENTS")
+        print("=" * 60)
+        if not self.agents:
+            print("No agents joined")
+            return
+        for agent_id, agent in enumerate(self.agents):
+            views = self.drones[agent_id::self.num_workers]
+            connected = sum(1 for view in views if view.time_to_connected_ms is not None)
+            measurements = sum(self.measurement_count(view) for view in views)
+            print(f"  {agent_id}: {agent['agent']} ({agent['address']}, {agent['cores']} cores, "
+                  f"{agent['event_loop']})")
+            print(f"     {connected}/{agent['drones']} drones connected, {measurements} measurements, "
+                  f"clock offset {agent['clock_offset_ms']:+.1f}ms (RTT {agent['rtt_ms']:.1f}ms)")
+        print("=" * 60)
+
+    def export_production_latency_data(self, filename: str = None):
+        """Export fleet and per-drone sketch statistics to JSON"""
+        if not filename:
+            filename = f"production_latency_data_{int(time.time())}.json"
+
+        export_data = {
+            'metadata': dict(self.production_export_metadata(), test_type='cluster_fleet_latency',
+                             agents=self.agents),
+            'fleet_statistics': self.fleet_sketch.fleet_statistics(),
+            'drone_data': []
+        }
+        for drone in self.drones:
+            types = self.fleet_sketch.sketches.get(drone.config.drone_id)
+            if types:
+                export_data['drone_data'].append({
+                    'drone_id': drone.config.drone_id,
+                    'model': drone.config.model,
+                    'location': [drone.config.base_lat, drone.config.base_lng],
+                    'jetson_serial': drone.config.jetson_serial,
+                    'latency': {name: sketch.latency.summary() for name, sketch in types.items()}
+                })
+
+        with open(filename, 'w') as f:
+            json.dump(export_data, f, indent=2)
+
+        logger.info(f"📁 Cluster latency data exported to {filename}")
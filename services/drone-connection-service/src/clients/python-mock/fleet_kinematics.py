@@ -0,0 +1,272 @@
+# services/drone-connection-service/src/clients/python-mock/fleet_kinematics.py
+"""
+Vectorized fleet kinematics
+
+ProductionMockDrone.animate_step advances one drone's orbit with a dozen
+math.sin/cos calls and two random.uniform draws every 100ms, so motion cost
+grows linearly with the fleet in pure interpreter overhead. FleetKinematics
+keeps every drone's position, attitude, velocity and battery in one NumPy
+structured array (one row per drone) and advances all rows in a single
+vectorized step per tick. Drones read their own row when building telemetry.
+
+Run directly to benchmark:  python fleet_kinematics.py --drones 100 1000 5000
+"""
+import argparse
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Row fields mirrored into DroneState, in telemetry order
+STATE_FIELDS = (
+    'latitude', 'longitude', 'altitude_msl', 'altitude_relative',
+    'hdop', 'position_error', 'voltage', 'percentage',
+    'roll', 'pitch', 'yaw', 'velocity_x', 'velocity_y', 'velocity_z'
+)
+
+KINEMATICS_DTYPE = np.dtype(
+    [(name, np.float64) for name in STATE_FIELDS] + [
+        ('base_lat', np.float64),
+        ('base_lng', np.float64),
+        ('flight_time', np.float64),
+        ('active', np.bool_)
+    ]
+)
+
+ORBIT_RADIUS_KM = 0.001
+ANGULAR_SPEED = 0.1
+CRUISE_SPEED = 5.0
+MIN_BATTERY_PERCENTAGE = 20.0
+BATTERY_DRAIN_PER_STEP = 0.001
+FULL_VOLTAGE = 22.2
+
+
+class FleetKinematics:
+    def __init__(self, dt: float = 0.1, capacity: int = 64, seed: Optional[int] = None):
+        self.dt = dt
+        self.rows = np.zeros(max(1, capacity), dtype=KINEMATICS_DTYPE)
+        self.size = 0
+        self.steps = 0
+        self.step_time_s = 0.0
+        # Drones and engines stepped in other processes (merge_state), not rows of this array
+        self.merged_drones = 0
+        self.merged_active = 0
+        self.merged_engines = 0
+        self.rng = np.random.default_rng(seed)
+        self._handle = None
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, base_lat: float, base_lng: float, initial: Dict[str, float]) -> int:
+        """Allocate a row for one drone and return its index"""
+        if self.size == len(self.rows):
+            grown = np.zeros(len(self.rows) * 2, dtype=KINEMATICS_DTYPE)
+            grown[:self.size] = self.rows[:self.size]
+            self.rows = grown
+
+        row = self.size
+        self.size += 1
+        record = self.rows[row]
+        for name in STATE_FIELDS:
+            record[name] = initial[name]
+        record['base_lat'] = base_lat
+        record['base_lng'] = base_lng
+        record['active'] = False
+        return row
+
+    def set_active(self, row: int, active: bool):
+        """Frozen rows keep their last state and flight time"""
+        self.rows[row]['active'] = active
+
+    def read(self, row: int) -> Dict[str, float]:
+        """One drone's current kinematic state as plain Python floats"""
+        return dict(zip(STATE_FIELDS, self.rows[row].tolist()))
+
+    @property
+    def active_count(self) -> int:
+        return int(np.count_nonzero(self.rows['active'][:self.size]))
+
+    def step(self, intended_time: float = None):
+        """Advance every active drone by dt"""
+        step_start = time.perf_counter()
+        rows = self.rows[:self.size]
+        active = rows['active']
+        if active.all():
+            sel = slice(None)
+            count = self.size
+        else:
+            sel = np.flatnonzero(active)
+            count = len(sel)
+        if count == 0:
+            return
+
+        flight_time = rows['flight_time'][sel] + self.dt
+        rows['flight_time'][sel] = flight_time
+
+        angle = flight_time * ANGULAR_SPEED
+        sin_angle = np.sin(angle)
+        cos_angle = np.cos(angle)
+        rows['latitude'][sel] = rows['base_lat'][sel] + sin_angle * ORBIT_RADIUS_KM
+        rows['longitude'][sel] = rows['base_lng'][sel] + cos_angle * ORBIT_RADIUS_KM
+
+        altitude_relative = 100 + np.sin(flight_time * 0.5) * 10
+        rows['altitude_relative'][sel] = altitude_relative
+        rows['altitude_msl'][sel] = altitude_relative + 500
+
+        rows['yaw'][sel] = angle
+        rows['roll'][sel] = np.sin(flight_time) * 0.1
+        rows['pitch'][sel] = np.cos(flight_time * 0.7) * 0.1
+
+        rows['velocity_x'][sel] = CRUISE_SPEED * cos_angle
+        rows['velocity_y'][sel] = CRUISE_SPEED * sin_angle
+        rows['velocity_z'][sel] = np.sin(flight_time * 0.3) * 0.5
+
+        percentage = np.maximum(MIN_BATTERY_PERCENTAGE, rows['percentage'][sel] - BATTERY_DRAIN_PER_STEP)
+        rows['percentage'][sel] = percentage
+        rows['voltage'][sel] = FULL_VOLTAGE * (percentage / 100)
+
+        rows['hdop'][sel] = 0.8 + self.rng.uniform(-0.2, 0.2, count)
+        rows['position_error'][sel] = 1.0 + self.rng.uniform(-0.3, 0.3, count)
+
+        self.steps += 1
+        self.step_time_s += time.perf_counter() - step_start
+
+    def start(self, timer_wheel=None):
+        """Step on the fleet timer wheel when there is one, otherwise on a single task"""
+        if timer_wheel is not None:
+            self._handle = timer_wheel.schedule_periodic(self.dt, self.step)
+        else:
+            self._task = asyncio.create_task(self._run())
+        logger.info(f"🧮 Fleet kinematics started (dt: {self.dt * 1000:.0f}ms)")
+
+    async def stop(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_at = loop.time()
+        while True:
+            self.step()
+            next_at += self.dt
+            await asyncio.sleep(max(0.0, next_at - loop.time()))
+
+    def export_state(self) -> dict:
+        """Mergeable snapshot of the step counters (for sharded fleet workers)"""
+        return {
+            'drones': self.size + self.merged_drones,
+            'active_drones': self.active_count + self.merged_active,
+            'steps': self.steps,
+            'step_time_s': self.step_time_s
+        }
+
+    def merge_state(self, state: dict):
+        """Add another engine's export_state() into this one"""
+        self.merged_drones += state['drones']
+        self.merged_active += state['active_drones']
+        self.merged_engines += 1
+        self.steps += state['steps']
+        self.step_time_s += state['step_time_s']
+
+    def summary(self) -> dict:
+        """Step statistics for reports and JSON export"""
+        return {
+            'drones': self.size + self.merged_drones,
+            'active_drones': self.active_count + self.merged_active,
+            'dt_ms': self.dt * 1000,
+            'steps': self.steps,
+            'avg_step_ms': self.step_time_s / self.steps * 1000 if self.steps else 0.0,
+            'merged_engines': self.merged_engines
+        }
+
+    def print_report(self):
+        """Print fleet kinematics step cost"""
+        summary = self.summary()
+        print("\n🧮 FLEET KINEMATICS")
+        print("-" * 50)
+        print(f"  Drones: {summary['drones']} ({summary['active_drones']} active), "
+              f"steps: {summary['steps']}, avg step: {summary['avg_step_ms']:.3f}ms")
+        if summary['merged_engines']:
+            print(f"  Merged from {summary['merged_engines']} worker processes: "
+                  f"steps are summed, each step advances one worker's drones")
+
+
+def benchmark(drone_counts: List[int], steps: int):
+    """Compare per-drone animate_step against one vectorized step"""
+    # Imported here: drone_simulator_prod builds on this module
+    from drone_simulator_prod import ProductionMockDrone, DroneConfig, DroneState
+    from seeded_random import drone_rngs
+
+    class _AnimatedDrone:
+        animate_step = ProductionMockDrone.animate_step
+
+        def __init__(self, config: DroneConfig, state: DroneState):
+            self.config = config
+            self.state = state
+            self.flight_time = 0
+            self.motion_steps = 0
+            self.rng = drone_rngs(None, config.drone_id, ('motion',))
+            self.registered = True
+
+    print(f"🧮 Fleet kinematics benchmark: {steps} steps per run")
+    print(f"{'drones':>7} {'per-drone ms/step':>18} {'vectorized ms/step':>19} {'speedup':>8}")
+    print("-" * 56)
+    for num_drones in drone_counts:
+        drones = []
+        kinematics = FleetKinematics(capacity=num_drones)
+        for i in range(num_drones):
+            config = DroneConfig(drone_id=f"bench-{i:05d}", model='FlyOS_MQ7', base_lat=18.5 + i * 1e-4,
+                                 base_lng=73.8, jetson_serial='', capabilities=[])
+            state = DroneState(latitude=config.base_lat, longitude=config.base_lng, altitude_msl=500.0,
+                               altitude_relative=100.0, armed=True, flight_mode='AUTO', connected=True,
+                               gps_fix='GPS_OK', satellites=12, hdop=0.8, position_error=1.0, voltage=22.2,
+                               current=15.0, percentage=85.0, roll=0.0, pitch=0.0, yaw=0.0, velocity_x=0.0,
+                               velocity_y=0.0, velocity_z=0.0, latency=50.0, teensy_connected=True,
+                               latch_status='OK')
+            drones.append(_AnimatedDrone(config, state))
+            row = kinematics.add(config.base_lat, config.base_lng, state.snapshot())
+            kinematics.set_active(row, True)
+
+        start = time.perf_counter()
+        for _ in range(steps):
+            for drone in drones:
+                drone.animate_step()
+        per_drone_ms = (time.perf_counter() - start) / steps * 1000
+
+        start = time.perf_counter()
+        for _ in range(steps):
+            kinematics.step()
+        vectorized_ms = (time.perf_counter() - start) / steps * 1000
+
+        # Both paths follow the same orbit
+        expected = drones[-1].state
+        actual = kinematics.read(num_drones - 1)
+        assert abs(actual['latitude'] - expected.latitude) < 1e-9
+        assert abs(actual['altitude_relative'] - expected.altitude_relative) < 1e-9
+
+        print(f"{num_drones:>7} {per_drone_ms:>18.3f} {vectorized_ms:>19.3f} "
+              f"{per_drone_ms / vectorized_ms:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fleet kinematics benchmark')
+    parser.add_argument('--drones', type=int, nargs='+', default=[100, 1000, 5000, 10000],
+                        help='Fleet sizes to benchmark (default: 100 1000 5000 10000)')
+    parser.add_argument('--steps', type=int, default=100, help='Steps per run (default: 100)')
+    args = parser.parse_args()
+    benchmark(args.drones, args.steps)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+# services/drone-connection-service/src/clients/python-mock/fleet_preflight.py
+"""
+Resource preflight for large headless fleets
+
+Before a large run, checks that the host can actually hold the fleet:
+
+  1. file descriptors: each drone keeps a WebSocket (plus HTTP connections
+     while registering) open; the soft RLIMIT_NOFILE is raised to the hard
+     limit when that is enough
+  2. a short calibration run with a handful of real drones against the
+     target server measures CPU, memory and file descriptors per drone
+  3. the measurements are projected to per-process and whole-host capacity
+
+The fleet then runs as requested, is auto-sharded across worker processes
+when one process would saturate, or is refused when the host cannot hold it.
+"""
+import asyncio
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+LARGE_FLEET_THRESHOLD = 50
+FD_RESERVE = 64                  # stdio, logging, loop internals, worker pipes
+DEFAULT_FDS_PER_DRONE = 2.0      # WebSocket + pooled/throwaway HTTP connection
+CONNECT_TIMEOUT = 15.0
+
+
+@dataclass
+class CalibrationResult:
+    drones: int
+    connected: int
+    seconds: float
+    cpu_per_drone: float         # fraction of one core
+    memory_per_drone_mb: float
+    fds_per_drone: float
+
+
+@dataclass
+class PreflightResult:
+    num_drones: int
+    requested_workers: int
+    cores: int
+    fd_soft_limit: Optional[int]
+    fd_hard_limit: Optional[int]
+    available_memory_mb: Optional[float]
+    calibration: Optional[CalibrationResult]
+    capacity_per_process: Optional[int] = None    # None: no limit could be projected
+    capacity_host: Optional[int] = None
+    verdict: str = 'ok'          # ok, shard or refuse
+    workers: int = 1
+    reasons: List[str] = field(default_factory=list)
+
+    @property
+    def refused(self) -> bool:
+        return self.verdict == 'refuse'
+
+
+def _process():
+    return psutil.Process() if psutil else None
+
+
+def _rss_mb() -> float:
+    process = _process()
+    if process:
+        return process.memory_info().rss / (1024 * 1024)
+    if resource:
+        # ru_maxrss is a high-water mark in KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return 0.0
+
+
+def _open_fds() -> Optional[int]:
+    process = _process()
+    if process and hasattr(process, 'num_fds'):
+        return process.num_fds()
+    if os.path.isdir('/proc/self/fd'):
+        return len(os.listdir('/proc/self/fd'))
+    return None
+
+
+def _available_memory_mb() -> Optional[float]:
+    if psutil:
+        return psutil.virtual_memory().available / (1024 * 1024)
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def fd_limits():
+    if resource is None:
+        return None, None
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    infinity = resource.RLIM_INFINITY
+    return (None if soft == infinity else soft), (None if hard == infinity else hard)
+
+
+def raise_fd_limit(needed: int) -> Optional[int]:
+    """Raise the soft file-descriptor limit towards needed (capped at the hard limit)"""
+    soft, hard = fd_limits()
+    if soft is None or soft >= needed:
+        return soft
+    target = needed if hard is None else min(needed, hard)
+    try:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard if hard is not None else resource.RLIM_INFINITY))
+        logger.info(f"📂 Raised file descriptor limit {soft} -> {target}")
+        return target
+    except (ValueError, OSError) as e:
+        logger.warning(f"⚠️ Could not raise file descriptor limit: {e}")
+        return soft
+
+
+async def calibrate(simulator, seconds: float = 10.0) -> CalibrationResult:
+    """Run a few real drones from a small simulator and measure their per-drone cost"""
+    drones = simulator.create_drones()
+    for drone in drones:
+        drone.config.drone_id = drone.config.drone_id.replace('prod-latency', 'preflight')
+    simulator.drones = drones
+    if simulator.kinematics:
+        simulator.kinematics.start()
+
+    # Fixed per-process cost (loop, kinematics step) is not per-drone cost
+    idle_seconds = min(2.0, seconds / 3)
+    idle_start = time.process_time()
+    await asyncio.sleep(idle_seconds)
+    idle_cpu_per_s = (time.process_time() - idle_start) / idle_seconds
+
+    rss_before = _rss_mb()
+    fds_before = _open_fds()
+    tasks = await simulator.start_drones(drones, [0.0] * len(drones))
+
+    deadline = time.time() + CONNECT_TIMEOUT
+    while time.time() < deadline and not all(d.registered for d in drones):
+        await asyncio.sleep(0.2)
+    connected = sum(1 for d in drones if d.registered)
+
+    cpu_start = time.process_time()
+    await asyncio.sleep(seconds)
+    cpu = time.process_time() - cpu_start
+    rss_after = _rss_mb()
+    fds_after = _open_fds()
+
+    await simulator.cleanup()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if simulator.kinematics:
+        await simulator.kinematics.stop()
+    if simulator.http_pool:
+        await simulator.http_pool.close()
+
+    per = max(connected, 1)
+    fds_per_drone = DEFAULT_FDS_PER_DRONE
+    if fds_before is not None and fds_after is not None and connected:
+        fds_per_drone = max(1.0, (fds_after - fds_before) / connected)
+    return CalibrationResult(
+        drones=len(drones),
+        connected=connected,
+        seconds=seconds,
+        cpu_per_drone=max(0.0, cpu / seconds - idle_cpu_per_s) / per,
+        memory_per_drone_mb=max(0.0, rss_after - rss_before) / per,
+        fds_per_drone=fds_per_drone
+    )
+
+
+def plan_fleet(num_drones: int, requested_workers: int, calibration: Optional[CalibrationResult],
+               cpu_budget: float = 0.8, memory_budget: float = 0.8, auto_shard: bool = True) -> PreflightResult:
+    """Project host capacity from calibration and decide whether to run, shard or refuse"""
+    cores = os.cpu_count() or 1
+    fds_per_drone = calibration.fds_per_drone if calibration else DEFAULT_FDS_PER_DRONE
+
+    # Raise the soft limit for the largest per-process share we might need
+    needed_fds = FD_RESERVE + math.ceil(num_drones / requested_workers * fds_per_drone)
+    raise_fd_limit(needed_fds)
+    soft, hard = fd_limits()
+
+    result = PreflightResult(
+        num_drones=num_drones,
+        requested_workers=requested_workers,
+        cores=cores,
+        fd_soft_limit=soft,
+        fd_hard_limit=hard,
+        available_memory_mb=_available_memory_mb(),
+        calibration=calibration,
+        workers=requested_workers
+    )
+
+    fd_capacity = math.inf if soft is None else max(0, int((soft - FD_RESERVE) / fds_per_drone))
+    cpu_capacity = math.inf
+    memory_capacity = math.inf
+    if calibration and calibration.connected:
+        if calibration.cpu_per_drone > 0:
+            cpu_capacity = int(cpu_budget / calibration.cpu_per_drone)
+        if calibration.memory_per_drone_mb > 0 and result.available_memory_mb:
+            memory_capacity = int(result.available_memory_mb * memory_budget / calibration.memory_per_drone_mb)
+    elif calibration:
+        result.reasons.append("calibration drones never connected; CPU and memory are not projected")
+
+    per_process = min(cpu_capacity, fd_capacity)
+    host = min(per_process * cores, memory_capacity)
+    result.capacity_per_process = per_process if per_process != math.inf else None
+    result.capacity_host = host if host != math.inf else None
+
+    if num_drones > memory_capacity:
+        result.verdict = 'refuse'
+        result.reasons.append(f"{num_drones} drones need more than {memory_budget:.0%} of available memory "
+                              f"(capacity ~{memory_capacity})")
+        return result
+
+    if num_drones / requested_workers <= per_process:
+        return result
+
+    if per_process == 0:
+        result.verdict = 'refuse'
+        result.reasons.append("file descriptor limit leaves no room for drones")
+        return result
+
+    required_workers = math.ceil(num_drones / per_process)
+    if required_workers > cores:
+        result.verdict = 'refuse'
+        result.reasons.append(f"{num_drones} drones need {required_workers} worker processes "
+                              f"but the host has {cores} cores (capacity ~{result.capacity_host})")
+    elif auto_shard:
+        result.verdict = 'shard'
+        result.workers = required_workers
+        result.reasons.append(f"one process saturates at ~{per_process} drones; sharding across "
+                              f"{required_workers} workers")
+    else:
+        result.verdict = 'refuse'
+        result.reasons.append(f"one process saturates at ~{per_process} drones and auto-sharding is disabled")
+    return result
+
+
+def print_preflight_report(result: PreflightResult):
+    """Print preflight measurements, projected capacity and the decision"""
+    print("\n🧪 FLEET PREFLIGHT")
+    print("=" * 60)
+    print(f"Requested: {result.num_drones} drones, {result.requested_workers} worker(s), {result.cores} cores")
+    limit = 'unlimited' if result.fd_soft_limit is None else result.fd_soft_limit
+    print(f"File descriptor limit: {limit} (hard: {result.fd_hard_limit or 'unlimited'})")
+    if result.available_memory_mb is not None:
+        print(f"Available memory: {result.available_memory_mb:.0f}MB")
+
+    calibration = result.calibration
+    if calibration:
+        print(f"\nCalibration ({calibration.connected}/{calibration.drones} drones connected, "
+              f"{calibration.seconds:g}s):")
+        print(f"  CPU per drone: {calibration.cpu_per_drone * 100:.2f}% of a core")
+        print(f"  Memory per drone: {calibration.memory_per_drone_mb:.2f}MB")
+        print(f"  File descriptors per drone: {calibration.fds_per_drone:.1f}")
+
+    print("\nProjected capacity:")
+    for label, capacity in (('Per process', result.capacity_per_process), ('Host', result.capacity_host)):
+        print(f"  {label}: " + ('unbounded' if capacity is None else f"~{capacity} drones"))
+
+    icon = {'ok': '✅', 'shard': '🧩', 'refuse': '⛔'}[result.verdict]
+    print(f"\n{icon} Decision: {result.verdict.upper()}"
+          + (f" ({result.workers} workers)" if result.verdict == 'shard' else ""))
+    for reason in result.reasons:
+        print(f"  - {reason}")
+    print("=" * 60)
@@ -0,0 +1,491 @@
+# services/drone-connection-service/src/clients/python-mock/fleet_scenario.py
+"""
+Declarative heterogeneous fleet scenarios
+
+A scenario file describes a mixed fleet as groups of drones:
+
+  {
+    "name": "mixed-fleet",
+    "description": "Camera drones over a telemetry-only majority",
+    "groups": [
+      {"class": "ProductionMockDrone", "count": 10, "telemetry_rate": 10, "rate_jitter": 0.2},
+      {"name": "camera", "class": "OptimizedProductionDrone", "count": 4, "camera_fps": 15,
+       "binary_frames": true, "compression": true, "locations": [[18.5204, 73.8567]]},
+      {"class": "ProductionWebRTCDrone", "count": 2, "camera_fps": 30, "webrtc": true},
+      {"class": "TelemetryOnly", "count": 20, "telemetry_rate": 5}
+    ]
+  }
+
+Classes:
+
+  ProductionMockDrone       latency-measuring drone (full fleet report)
+  OptimizedProductionDrone  binary/compressed camera frames with queue feedback
+  ProductionWebRTCDrone     camera over WebRTC data channels (needs aiortc, av)
+  TelemetryOnly             OptimizedProductionDrone with the camera off
+
+Every class but ProductionWebRTCDrone also takes "command_delay" (uniform,
+modeled or none, see command_execution.py).
+
+Files are validated as a whole before any drone is built, and every error
+names the offending field. The fleet runner instantiates the mix and reports
+per-group throughput and latency from a ClassTrafficMeter attached to each
+drone's Socket.IO client: messages and bytes sent (Socket.IO packets, so
+WebRTC data-channel frames are not included), telemetry ack RTT from the
+echoed timestamp and camera ack RTT matched to frames in send order.
+"""
+import collections
+import importlib
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from latency_histogram import LatencyHistogram
+from multi_drone_prod import MultiDroneProductionLatencySimulator
+from drone_simulator_prod import PRODUCTION_CAPABILITIES
+from loop_monitor import EventLoopLagMonitor
+from send_path_timing import SendPathTimer
+from spike_detector import SpikeDetector
+from timer_wheel import HierarchicalTimerWheel
+from fleet_kinematics import FleetKinematics
+from ramp_profiles import RampProfile, ConnectionGate
+from http_pool import HttpSessionPool
+from seeded_random import drone_rng, jetson_serial
+from soak_monitor import SoakMonitor
+from traffic_log import TrafficRecorder
+from command_execution import COMMAND_DELAY_MODES
+
+logger = logging.getLogger(__name__)
+
+CAMERA_FRAME_EVENTS = ('camera_frame', 'camera_frame_binary')
+MAX_PENDING_FRAMES = 256
+
+
+class ScenarioError(ValueError):
+    pass
+
+
+@dataclass
+class DroneClassSpec:
+    module: str
+    class_name: str
+    id_prefix: str
+    serial_prefix: str
+    model: str
+    capabilities: Tuple[str, ...]    # shared by every drone of the class
+    options: Dict[str, str] = field(default_factory=dict)   # scenario key -> DroneConfig field
+    fixed: Dict[str, object] = field(default_factory=dict)
+
+
+RATE_FIELDS = ['telemetry_rate', 'heartbeat_rate', 'mavros_rate']
+
+DRONE_CLASSES = {
+    'ProductionMockDrone': DroneClassSpec(
+        'drone_simulator_prod', 'ProductionMockDrone', 'prod-latency', 'JETSON-PROD-LAT',
+        'FlyOS_MQ7_Production_Latency',
+        PRODUCTION_CAPABILITIES
+    ),
+    'OptimizedProductionDrone': DroneClassSpec(
+        'drone_simulator_optimized', 'OptimizedProductionDrone', 'opt-drone', 'JETSON-OPT',
+        'FlyOS_MQ7_Optimized',
+        ('telemetry', 'camera', 'mavros', 'precision_landing', 'commands', 'mission_planning', 'binary_frames',
+         'frame_compression', 'adaptive_quality', 'queue_feedback'),
+        options={'camera_fps': 'camera_fps', 'camera': 'enable_camera_streaming',
+                 'binary_frames': 'enable_binary_frames', 'compression': 'enable_compression',
+                 'frame_skip_threshold': 'frame_skip_threshold'}
+    ),
+    'ProductionWebRTCDrone': DroneClassSpec(
+        'drone_simulator_prod_with_webrtc', 'ProductionWebRTCDrone', 'prod-webrtc', 'JETSON-WEBRTC-UDP',
+        'FlyOS_MQ7_Production_WebRTC_UDP',
+        ('telemetry', 'camera', 'mavros', 'precision_landing', 'webrtc', 'webrtc_udp_datachannel', 'commands',
+         'mission_planning', 'camera_webrtc_udp', 'binary_frames'),
+        options={'camera_fps': 'camera_fps', 'camera': 'enable_camera_streaming', 'webrtc': 'enable_webrtc'}
+    ),
+    'TelemetryOnly': DroneClassSpec(
+        'drone_simulator_optimized', 'OptimizedProductionDrone', 'telemetry', 'JETSON-TLM',
+        'FlyOS_MQ5_Telemetry',
+        ('telemetry', 'mavros', 'commands', 'mission_planning'),
+        fixed={'enable_camera_streaming': False}
+    )
+}
+
+GROUP_FIELDS = {'class', 'name', 'count', 'model', 'locations', 'location_jitter', 'rate_jitter'} | set(RATE_FIELDS)
+# Config types with a command execution delay model (command_execution.py)
+COMMAND_DELAY_MODULES = ('drone_simulator_prod', 'drone_simulator_optimized')
+
+
+@dataclass
+class DroneGroup:
+    drone_class: str
+    count: int
+    name: str
+    model: Optional[str] = None
+    rates: Dict[str, float] = field(default_factory=dict)
+    options: Dict[str, object] = field(default_factory=dict)
+    locations: List[Tuple[float, float]] = field(default_factory=list)
+    location_jitter: float = 0.01
+    rate_jitter: float = 0.0
+    command_delay: Optional[str] = None
+
+
+@dataclass
+class Scenario:
+    name: str
+    groups: List[DroneGroup]
+    description: str = ''
+
+    @property
+    def total_drones(self) -> int:
+        return sum(group.count for group in self.groups)
+
+    def describe(self) -> str:
+        return ", ".join(f"{group.count} {group.name}" for group in self.groups)
+
+
+def _number(value, where: str, minimum: float = 0.0, positive: bool = False) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ScenarioError(f"{where}: expected a number, got {value!r}")
+    if value < minimum or (positive and value <= 0):
+        raise ScenarioError(f"{where}: must be {'positive' if positive else f'>= {minimum:g}'}")
+    return float(value)
+
+
+def _location(value, where: str) -> Tuple[float, float]:
+    if not isinstance(value, (list, tuple)) or len(value) != 2:
+        raise ScenarioError(f"{where}: expected [lat, lng]")
+    lat = _number(value[0], f"{where}[0]", minimum=-90.0)
+    lng = _number(value[1], f"{where}[1]", minimum=-180.0)
+    if lat > 90 or lng > 180:
+        raise ScenarioError(f"{where}: [{lat:g}, {lng:g}] is not a valid position")
+    return lat, lng
+
+
+def _parse_group(data, index: int) -> DroneGroup:
+    where = f"groups[{index}]"
+    if not isinstance(data, dict):
+        raise ScenarioError(f"{where}: expected an object")
+    drone_class = data.get('class')
+    if drone_class not in DRONE_CLASSES:
+        raise ScenarioError(f"{where}.class: expected one of {', '.join(DRONE_CLASSES)}, got {drone_class!r}")
+    spec = DRONE_CLASSES[drone_class]
+
+    allowed = GROUP_FIELDS | set(spec.options)
+    if spec.module in COMMAND_DELAY_MODULES:
+        allowed.add('command_delay')
+    unknown = set(data) - allowed
+    if unknown:
+        raise ScenarioError(f"{where}: unknown field(s) for {drone_class}: {', '.join(sorted(unknown))}")
+
+    count = data.get('count')
+    if isinstance(count, bool) or not isinstance(count, int) or count <= 0:
+        raise ScenarioError(f"{where}.count: expected a positive integer, got {count!r}")
+
+    group = DroneGroup(drone_class=drone_class, count=count, name=str(data.get('name', drone_class)))
+    if 'model' in data:
+        group.model = str(data['model'])
+    for rate in RATE_FIELDS:
+        if rate in data:
+            group.rates[rate] = _number(data[rate], f"{where}.{rate}", positive=True)
+    group.rate_jitter = _number(data.get('rate_jitter', 0.0), f"{where}.rate_jitter")
+    if group.rate_jitter >= 1:
+        raise ScenarioError(f"{where}.rate_jitter: must be below 1")
+    group.location_jitter = _number(data.get('location_jitter', 0.01), f"{where}.location_jitter")
+    if 'command_delay' in data:
+        if data['command_delay'] not in COMMAND_DELAY_MODES:
+            raise ScenarioError(f"{where}.command_delay: expected one of {', '.join(COMMAND_DELAY_MODES)}, "
+                                f"got {data['command_delay']!r}")
+        group.command_delay = data['command_delay']
+
+    locations = data.get('locations', [])
+    if not isinstance(locations, list):
+        raise ScenarioError(f"{where}.locations: expected a list of [lat, lng]")
+    group.locations = [_location(value, f"{where}.locations[{i}]") for i, value in enumerate(locations)]
+
+    for key in spec.options:
+        if key not in data:
+            continue
+        value = data[key]
+        if key == 'camera_fps':
+            value = _number(value, f"{where}.{key}", positive=True)
+        elif key == 'frame_skip_threshold':
+            if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+                raise ScenarioError(f"{where}.{key}: expected a non-negative integer, got {value!r}")
+        elif not isinstance(value, bool):
+            raise ScenarioError(f"{where}.{key}: expected true or false, got {value!r}")
+        group.options[key] = value
+    return group
+
+
+def parse_scenario(data, check_imports: bool = True) -> Scenario:
+    """Validate a decoded scenario document"""
+    if not isinstance(data, dict):
+        raise ScenarioError("scenario: expected an object")
+    unknown = set(data) - {'name', 'description', 'groups'}
+    if unknown:
+        raise ScenarioError(f"scenario: unknown field(s): {', '.join(sorted(unknown))}")
+    groups = data.get('groups')
+    if not isinstance(groups, list) or not groups:
+        raise ScenarioError("scenario.groups: expected a non-empty list")
+
+    scenario = Scenario(name=str(data.get('name', 'scenario')),
+                        groups=[_parse_group(group, i) for i, group in enumerate(groups)],
+                        description=str(data.get('description', '')))
+    names = [group.name for group in scenario.groups]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ScenarioError(f"scenario.groups: duplicate group name(s) {', '.join(duplicates)}; "
+                            f"set \"name\" to tell them apart in the report")
+
+    if check_imports:
+        for drone_class in sorted({group.drone_class for group in scenario.groups}):
+            try:
+                importlib.import_module(DRONE_CLASSES[drone_class].module)
+            except ImportError as e:
+                raise ScenarioError(f"{drone_class} is not available here: {e}")
+    return scenario
+
+
+def load_scenario(path: str, check_imports: bool = True) -> Scenario:
+    """Load and validate a scenario file"""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except OSError as e:
+        raise ScenarioError(f"{path}: {e.strerror}")
+    except json.JSONDecodeError as e:
+        raise ScenarioError(f"{path}: invalid JSON at line {e.lineno} column {e.colno}: {e.msg}")
+    return parse_scenario(data, check_imports)
+
+
+class ClassTraffic:
+    """Traffic and ack latency of one scenario group"""
+
+    def __init__(self, name: str, drone_class: str):
+        self.name = name
+        self.drone_class = drone_class
+        self.drones = 0
+        self.connected = set()
+        self.messages: Dict[str, int] = {}
+        self.bytes_sent = 0
+        self.first_send: Optional[float] = None
+        self.last_send: Optional[float] = None
+        self.telemetry_rtt = LatencyHistogram()
+        self.camera_rtt = LatencyHistogram()
+
+    def summary(self) -> dict:
+        elapsed = (self.last_send - self.first_send) if self.first_send is not None else 0.0
+        total = sum(self.messages.values())
+        return {
+            'class': self.drone_class,
+            'drones': self.drones,
+            'connected': len(self.connected),
+            'messages': dict(self.messages),
+            'messages_per_s': total / elapsed if elapsed > 0 else 0.0,
+            'bytes_sent': self.bytes_sent,
+            'throughput_bps': self.bytes_sent * 8 / elapsed if elapsed > 0 else 0.0,
+            'telemetry_ack_rtt': self.telemetry_rtt.summary(),
+            'camera_ack_rtt': self.camera_rtt.summary()
+        }
+
+
+class ClassTrafficMeter:
+    """Per-group message, byte and ack latency counters hooked into each drone's Socket.IO client"""
+
+    def __init__(self):
+        self.classes: Dict[str, ClassTraffic] = {}
+
+    def attach(self, drone, group: str):
+        traffic = self.classes.get(group)
+        if traffic is None:
+            traffic = self.classes[group] = ClassTraffic(group, type(drone).__name__)
+        traffic.drones += 1
+        drone_id = drone.config.drone_id
+        pending = collections.defaultdict(collections.deque)
+        sio = drone.sio
+
+        emit = sio.emit
+
+        async def metered_emit(event, data=None, *args, **kwargs):
+            now = time.time()
+            traffic.messages[event] = traffic.messages.get(event, 0) + 1
+            if traffic.first_send is None:
+                traffic.first_send = now
+            traffic.last_send = now
+            if event in CAMERA_FRAME_EVENTS and isinstance(data, dict):
+                frames = pending[data.get('camera')]
+                frames.append(now)
+                if len(frames) > MAX_PENDING_FRAMES:
+                    frames.popleft()
+            return await emit(event, data, *args, **kwargs)
+
+        send = sio.eio.send
+
+        async def metered_send(data):
+            # Socket.IO encodes with ensure_ascii, so text packets are one byte per character
+            traffic.bytes_sent += len(data)
+            return await send(data)
+
+        sio.emit = metered_emit
+        sio.eio.send = metered_send
+
+        def on_registered(data):
+            traffic.connected.add(drone_id)
+
+        def on_telemetry_ack(data):
+            if isinstance(data, dict) and data.get('timestamp') is not None:
+                traffic.telemetry_rtt.record((time.time() - float(data['timestamp']) / 1000) * 1000)
+
+        def on_camera_ack(data):
+            frames = pending.get(data.get('camera')) if isinstance(data, dict) else None
+            if frames:
+                traffic.camera_rtt.record((time.time() - frames.popleft()) * 1000)
+
+        self._observe(sio, 'registration_success', on_registered)
+        self._observe(sio, 'telemetry_ack', on_telemetry_ack)
+        self._observe(sio, 'camera_frame_ack', on_camera_ack)
+
+    @staticmethod
+    def _observe(sio, event: str, observer):
+        """Run observer on an inbound event ahead of the drone's own handler, if any"""
+        handlers = sio.handlers.setdefault('/', {})
+        original = handlers.get(event)
+
+        async def handler(*args):
+            observer(args[0] if args else None)
+            if original is None:
+                return None
+            result = original(*args)
+            if hasattr(result, '__await__'):
+                result = await result
+            return result
+
+        handlers[event] = handler
+
+    def summary(self) -> Dict[str, dict]:
+        return {name: traffic.summary() for name, traffic in self.classes.items()}
+
+    def print_report(self):
+        """Print per-group throughput and ack latency"""
+        print("\n🧬 PER-CLASS FLEET BREAKDOWN")
+        print("=" * 60)
+        for name, traffic in self.classes.items():
+            summary = traffic.summary()
+            print(f"\n{name} ({summary['class']}): {summary['connected']}/{summary['drones']} drones connected")
+            total = sum(summary['messages'].values())
+            print(f"  Sent: {total:,} messages, {summary['bytes_sent'] / 1024 / 1024:.2f}MB "
+                  f"({summary['messages_per_s']:.1f} msg/s, {summary['throughput_bps'] / 1000:.1f} kbps)")
+            top = sorted(summary['messages'].items(), key=lambda item: -item[1])[:4]
+            if top:
+                print(f"  Events: " + ", ".join(f"{event} {count:,}" for event, count in top))
+            for label, key in (('Telemetry ack RTT', 'telemetry_ack_rtt'), ('Camera ack RTT', 'camera_ack_rtt')):
+                rtt = summary[key]
+                if rtt['count']:
+                    print(f"  {label}: avg {rtt['avg_ms']:.2f}ms, P50 {rtt['p50_ms']:.2f}ms, "
+                          f"P95 {rtt['p95_ms']:.2f}ms, P99 {rtt['p99_ms']:.2f}ms ({rtt['count']} acks)")
+        print("=" * 60)
+
+
+class ScenarioFleetSimulator(MultiDroneProductionLatencySimulator):
+    """Fleet runner that builds a mixed fleet from a scenario"""
+
+    def __init__(self, scenario: Scenario, server_url: str,
+                 loop_monitor: Optional[EventLoopLagMonitor] = None,
+                 send_timer: Optional[SendPathTimer] = None, send_schedule: str = 'open',
+                 spike_detector: Optional[SpikeDetector] = None,
+                 timer_wheel: Optional[HierarchicalTimerWheel] = None,
+                 kinematics: Optional[FleetKinematics] = None,
+                 ramp: Optional[RampProfile] = None,
+                 connection_gate: Optional[ConnectionGate] = None,
+                 http_pool: Optional[HttpSessionPool] = None,
+                 max_measurements: Optional[int] = None,
+                 seed: Optional[int] = None,
+                 soak_monitor: Optional[SoakMonitor] = None,
+                 recorder: Optional[TrafficRecorder] = None):
+        super().__init__(server_url, scenario.total_drones, loop_monitor, send_timer, send_schedule,
+                         spike_detector, timer_wheel, kinematics, ramp, connection_gate, http_pool,
+                         max_measurements, seed, soak_monitor, recorder)
+        self.scenario = scenario
+        self.meter = ClassTrafficMeter()
+
+    def group_config(self, group: DroneGroup, module, index: int, position: int):
+        """DroneConfig for one drone of a group, in the drone class's own config type"""
+        spec = DRONE_CLASSES[group.drone_class]
+        drone_id = f"{spec.id_prefix}-{index:03d}"
+        rng = drone_rng(self.seed, drone_id, 'config')
+        locations = group.locations or self.base_locations
+        lat, lng = locations[position % len(locations)]
+        lat += rng.uniform(-group.location_jitter, group.location_jitter)
+        lng += rng.uniform(-group.location_jitter, group.location_jitter)
+
+        fields = {
+            'drone_id': drone_id,
+            'model': group.model or (rng.choice(self.drone_models) if spec.module == 'drone_simulator_prod'
+                                     else spec.model),
+            'base_lat': lat,
+            'base_lng': lng,
+            'jetson_serial': jetson_serial(spec.serial_prefix, self.seed, drone_id),
+            'capabilities': spec.capabilities
+        }
+        for rate, value in group.rates.items():
+            fields[rate] = value * rng.uniform(1 - group.rate_jitter, 1 + group.rate_jitter)
+        for key, value in group.options.items():
+            fields[spec.options[key]] = value
+        fields.update(spec.fixed)
+        if spec.module == 'drone_simulator_prod':
+            fields['send_schedule'] = self.send_schedule
+            fields['max_measurements'] = self.max_measurements
+        fields['seed'] = self.seed
+        if group.command_delay:
+            fields['command_delay'] = group.command_delay
+        return module.DroneConfig(**fields)
+
+    def create_drones(self) -> list:
+        """Instantiate every group of the scenario and attach the per-class meter"""
+        drones = []
+        counters: Dict[str, int] = {}
+        for group in self.scenario.groups:
+            spec = DRONE_CLASSES[group.drone_class]
+            module = importlib.import_module(spec.module)
+            drone_class = getattr(module, spec.class_name)
+            for position in range(group.count):
+                index = counters[spec.id_prefix] = counters.get(spec.id_prefix, 0) + 1
+                config = self.group_config(group, module, index, position)
+                if spec.module == 'drone_simulator_prod':
+                    drone = drone_class(config, self.server_url, self.loop_monitor, self.send_timer,
+                                        self.spike_detector, self.timer_wheel, self.kinematics,
+                                        self.connection_gate, self.http_pool)
+                elif spec.module == 'drone_simulator_optimized':
+                    drone = drone_class(config, self.server_url, self.loop_monitor, self.send_timer)
+                else:
+                    drone = drone_class(config, self.server_url)
+                self.meter.attach(drone, group.name)
+                drones.append(drone)
+        logger.info(f"🧬 Scenario '{self.scenario.name}': {self.scenario.describe()}")
+        return drones
+
+    def measurement_count(self, drone) -> int:
+        # Only ProductionMockDrone keeps per-measurement latency records
+        return len(getattr(drone, 'latency_measurements', ()))
+
+    def measuring_drones(self, drones: list) -> list:
+        return [drone for drone in drones if hasattr(drone, 'latency_measurements')]
+
+    def ramp_summary(self, drones: list) -> Dict:
+        return super().ramp_summary(self.measuring_drones(drones))
+
+    def send_schedule_summary(self, drones: list) -> Dict:
+        return super().send_schedule_summary(self.measuring_drones(drones))
+
+    def generate_production_fleet_latency_report(self):
+        """Standard report for the latency-measuring drones plus the per-class breakdown"""
+        super().generate_production_fleet_latency_report()
+        self.meter.print_report()
+
+    def production_export_metadata(self) -> Dict:
+        metadata = super().production_export_metadata()
+        metadata['test_type'] = 'scenario_fleet_latency'
+        metadata['scenario'] = {'name': self.scenario.name, 'description': self.scenario.description,
+                                'groups': self.scenario.describe()}
+        metadata['classes'] = self.meter.summary()
+        return metadata
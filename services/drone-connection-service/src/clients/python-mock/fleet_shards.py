@@ -0,0 +1,408 @@
+# services/drone-connection-service/src/clients/python-mock/fleet_shards.py
+"""
+Multi-process sharded fleet runner
+
+Shards drone configs across worker processes, each with its own event loop,
+so JSON encoding and frame generation are no longer capped by one core.
+Workers stream new measurements, drone state and mergeable loop-lag /
+send-path / spike statistics back over a pipe; the coordinator folds them
+into lightweight drone views so the regular fleet report, export and
+interim status work unchanged.
+"""
+import asyncio
+import logging
+import multiprocessing
+import signal
+import time
+from dataclasses import asdict, replace
+from typing import Callable, Dict, List, Optional
+
+from drone_simulator_prod import ProductionMockDrone, DroneConfig
+from loop_monitor import EventLoopLagMonitor
+from multi_drone_prod import MultiDroneProductionLatencySimulator
+from send_path_timing import SendPathTimer
+from send_schedule import SendSchedule
+from spike_detector import SpikeDetector
+from timer_wheel import HierarchicalTimerWheel
+from fleet_kinematics import FleetKinematics
+from latency_histogram import LatencyHistogram
+from ramp_profiles import RampProfile, ConnectionGate
+from http_pool import HttpSessionPool, HttpPhaseTimer
+from drone_runtime import MeasurementBuffer
+from event_loops import install_event_loop, active_event_loop
+
+logger = logging.getLogger(__name__)
+
+WORKER_UPDATE_INTERVAL = 5.0
+WORKER_STOP_TIMEOUT = 60.0
+
+
+class RemoteDroneView:
+    """Coordinator-side stand-in for a drone running in a worker process"""
+
+    def __init__(self, config: DroneConfig):
+        self.config = config
+        self.latency_measurements = MeasurementBuffer(config.max_measurements)
+        self.registered = False
+        self.send_schedules: Dict[str, SendSchedule] = {}
+        self.time_to_connected_ms: Optional[float] = None
+
+
+def _new_measurements(drones: List[ProductionMockDrone], sent: Dict[str, int]) -> Dict[str, list]:
+    """Measurements recorded since the last update, by drone"""
+    measurements = {}
+    for drone in drones:
+        drone_id = drone.config.drone_id
+        new = drone.latency_measurements.since(sent[drone_id])
+        sent[drone_id] = drone.latency_measurements.recorded
+        if new:
+            measurements[drone_id] = new
+    return measurements
+
+
+def _drone_states(drones: List[ProductionMockDrone]) -> Dict[str, dict]:
+    return {
+        drone.config.drone_id: {
+            'registered': drone.registered,
+            'send_schedules': {stream: s.summary() for stream, s in drone.send_schedules.items()},
+            'time_to_connected_ms': drone.time_to_connected_ms
+        }
+        for drone in drones
+    }
+
+
+def _worker_update(drones: List[ProductionMockDrone], sent: Dict[str, int], stats: dict) -> dict:
+    """New measurements since the last update plus current drone state and stats"""
+    measurements = {
+        # Raw ack payloads are only needed in-process
+        drone_id: [replace(m, additional_data=None) for m in new]
+        for drone_id, new in _new_measurements(drones, sent).items()
+    }
+    return {'measurements': measurements, 'drones': _drone_states(drones), 'stats': stats}
+
+
+def _worker_stats(loop_monitor, send_timer, spike_detector, connection_gate, http_pool, kinematics,
+                  timer_wheel) -> dict:
+    return {
+        'http_phases': http_pool.timer.export_state() if http_pool and http_pool.timer else None,
+        'loop_monitor': loop_monitor.export_state() if loop_monitor else None,
+        'send_timer': send_timer.export_state() if send_timer.enabled else None,
+        'spike_detector': spike_detector.export_state() if spike_detector else None,
+        'kinematics': kinematics.export_state() if kinematics else None,
+        'timer_wheel': timer_wheel.export_state() if timer_wheel else None,
+        'connection_gate': {
+            'wait_time': connection_gate.wait_time.to_dict(),
+            'peak_in_flight': connection_gate.peak_in_flight
+        }
+    }
+
+
+def _stop_requested(conn) -> bool:
+    try:
+        while conn.poll():
+            if conn.recv()[0] == 'stop':
+                return True
+    except (EOFError, OSError):
+        return True
+    return False
+
+
+async def _run_worker(shard_id: int, configs: List[DroneConfig], server_url: str, options: dict, conn,
+                      make_update: Callable = _worker_update, sigint_handler=signal.SIG_IGN):
+    loop_monitor = None
+    if options['loop_monitor']:
+        loop_monitor = EventLoopLagMonitor(
+            lag_threshold_ms=options['loop_lag_threshold'],
+            detect_slow_callbacks=options['detect_slow_callbacks']
+        )
+    send_timer = SendPathTimer(enabled=options['send_path_timing'])
+    spike_detector = SpikeDetector(z_threshold=options['spike_threshold']) if options['spike_detection'] else None
+    timer_wheel = HierarchicalTimerWheel(tick_ms=options['wheel_tick_ms']) if options['timer_wheel'] else None
+    kinematics = FleetKinematics(capacity=len(configs)) if options['vectorized_kinematics'] else None
+    ramp = RampProfile(**options['ramp'])
+    connection_gate = ConnectionGate(options['max_concurrent_connects'])
+    http_pool = None
+    if options['shared_http_session']:
+        http_pool = HttpSessionPool(limit=options['http_pool_limit'], dns_cache_ttl=options['dns_cache_ttl'])
+
+    simulator = MultiDroneProductionLatencySimulator(server_url, len(configs), loop_monitor, send_timer,
+                                                     options['send_schedule'], spike_detector, timer_wheel,
+                                                     kinematics, ramp, connection_gate, http_pool)
+    simulator.drones = [ProductionMockDrone(config, server_url, loop_monitor, send_timer, spike_detector,
+                                            timer_wheel, kinematics, connection_gate, http_pool)
+                        for config in configs]
+    # socketio/engineio clients hook SIGINT on construction and on connect; keep ours in place
+    signal.signal(signal.SIGINT, sigint_handler)
+    for drone in simulator.drones:
+        drone.sio.eio.handle_sigint = False
+    sent = {drone.config.drone_id: 0 for drone in simulator.drones}
+
+    if loop_monitor:
+        loop_monitor.start()
+    if timer_wheel:
+        timer_wheel.start()
+    if kinematics:
+        kinematics.start(timer_wheel)
+    logger.info(f"🧩 Worker {shard_id}: starting {len(configs)} drones")
+    start_task = asyncio.create_task(simulator.start_drones(simulator.drones, options['ramp_offsets']))
+
+    next_update = time.time() + WORKER_UPDATE_INTERVAL
+    try:
+        while not _stop_requested(conn):
+            await asyncio.sleep(0.5)
+            if time.time() >= next_update:
+                conn.send(('update', shard_id, make_update(simulator.drones, sent,
+                                                           _worker_stats(loop_monitor, send_timer, spike_detector,
+                                                                         connection_gate, http_pool, kinematics,
+                                                                         timer_wheel))))
+                next_update += WORKER_UPDATE_INTERVAL
+    finally:
+        start_task.cancel()
+        await simulator.cleanup()
+        if http_pool:
+            await http_pool.close()
+        if kinematics:
+            await kinematics.stop()
+        if timer_wheel:
+            await timer_wheel.stop()
+        if loop_monitor:
+            await loop_monitor.stop()
+        if spike_detector:
+            spike_detector.flush()
+        try:
+            conn.send(('final', shard_id, make_update(simulator.drones, sent,
+                                                      _worker_stats(loop_monitor, send_timer, spike_detector,
+                                                                    connection_gate, http_pool, kinematics,
+                                                                    timer_wheel))))
+        except (BrokenPipeError, OSError):
+            pass
+
+
+def run_fleet_worker(shard_id: int, configs: List[DroneConfig], server_url: str, options: dict, conn):
+    """Worker process entry point"""
+    # Ctrl-C is handled by the coordinator, which asks workers to stop and report
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.getLogger().setLevel(options['log_level'])
+    install_event_loop(options['event_loop'])
+    try:
+        asyncio.run(_run_worker(shard_id, configs, server_url, options, conn))
+    except Exception as e:
+        logger.error(f"❌ Worker {shard_id} failed: {e}")
+        try:
+            conn.send(('error', shard_id, str(e)))
+        except (BrokenPipeError, OSError):
+            pass
+    finally:
+        conn.close()
+
+
+class ShardedProductionLatencySimulator(MultiDroneProductionLatencySimulator):
+    """Coordinator that runs the fleet across worker processes"""
+
+    def __init__(self, server_url: str, num_drones: int, num_workers: int,
+                 loop_monitor: Optional[EventLoopLagMonitor] = None,
+                 send_timer: Optional[SendPathTimer] = None, send_schedule: str = 'open',
+                 spike_detector: Optional[SpikeDetector] = None,
+                 timer_wheel: Optional[HierarchicalTimerWheel] = None,
+                 kinematics: Optional[FleetKinematics] = None,
+                 ramp: Optional[RampProfile] = None,
+                 connection_gate: Optional[ConnectionGate] = None,
+                 http_pool: Optional[HttpSessionPool] = None,
+                 max_measurements: Optional[int] = None,
+                 seed: Optional[int] = None):
+        super().__init__(server_url, num_drones, loop_monitor, send_timer, send_schedule, spike_detector,
+                         timer_wheel, kinematics, ramp, connection_gate, http_pool, max_measurements, seed)
+        self.num_workers = max(1, min(num_workers, num_drones))
+        self._drone_views: Dict[str, RemoteDroneView] = {}
+        self._processes: List[multiprocessing.Process] = []
+        self._conns: List[Optional[object]] = []
+        self._worker_stats: Dict[int, dict] = {}
+        self._finished = set()
+
+    def worker_options(self) -> dict:
+        """Instrumentation settings mirrored into every worker"""
+        monitor = self.loop_monitor
+        return {
+            'loop_monitor': monitor is not None,
+            'loop_lag_threshold': monitor.lag_threshold_ms if monitor else 50.0,
+            'detect_slow_callbacks': monitor.detect_slow_callbacks if monitor else False,
+            'send_path_timing': self.send_timer.enabled,
+            'spike_detection': self.spike_detector is not None,
+            'spike_threshold': self.spike_detector.z_threshold if self.spike_detector else 4.0,
+            'send_schedule': self.send_schedule,
+            'timer_wheel': self.timer_wheel is not None,
+            'wheel_tick_ms': self.timer_wheel.tick * 1000 if self.timer_wheel else 5.0,
+            'vectorized_kinematics': self.kinematics is not None,
+            'ramp': asdict(self.ramp),
+            'shared_http_session': self.http_pool is not None,
+            'http_pool_limit': self.http_pool.limit if self.http_pool else 100,
+            'dns_cache_ttl': self.http_pool.dns_cache_ttl if self.http_pool else 300,
+            'event_loop': active_event_loop(),
+            'log_level': logging.getLogger().level
+        }
+
+    def worker_connect_limit(self, shard_id: int) -> int:
+        """This shard's share of the fleet-wide handshake limit (0 = unlimited)
+
+        The limit is split evenly and the first shards take the remainder, so
+        the shares add up to the fleet limit. Every shard gets at least one
+        slot, which only exceeds the limit when it is below the shard count.
+        """
+        limit = self.connection_gate.max_concurrent
+        if limit <= 0:
+            return 0
+        share, remainder = divmod(limit, self.num_workers)
+        return max(1, share + (1 if shard_id < remainder else 0))
+
+    def start_workers(self, configs: List[DroneConfig]):
+        """Spawn one process per shard of drone configs"""
+        context = multiprocessing.get_context('spawn')
+        options = self.worker_options()
+        # Start times are planned fleet-wide so the shards together follow the ramp profile
+        offsets = self.ramp.start_offsets(len(configs))
+        for shard_id in range(self.num_workers):
+            shard = configs[shard_id::self.num_workers]
+            shard_options = dict(options, ramp_offsets=offsets[shard_id::self.num_workers],
+                                 max_concurrent_connects=self.worker_connect_limit(shard_id))
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(target=run_fleet_worker, name=f"fleet-worker-{shard_id}",
+                                      args=(shard_id, shard, self.server_url, shard_options, child_conn),
+                                      daemon=True)
+            process.start()
+            child_conn.close()
+            self._processes.append(process)
+            self._conns.append(parent_conn)
+            logger.info(f"🧩 Worker {shard_id} (pid {process.pid}): {len(shard)} drones")
+
+    def drain_workers(self):
+        """Apply every message currently waiting on the worker pipes"""
+        updated = False
+        for shard_id, conn in enumerate(self._conns):
+            if conn is None:
+                continue
+            try:
+                while conn.poll():
+                    kind, _, payload = conn.recv()
+                    if kind == 'error':
+                        logger.error(f"❌ Worker {shard_id} reported: {payload}")
+                        continue
+                    self.apply_worker_update(shard_id, payload)
+                    updated = True
+                    if kind == 'final':
+                        self._finished.add(shard_id)
+            except (EOFError, OSError):
+                if shard_id not in self._finished:
+                    logger.error(f"❌ Worker {shard_id} exited without a final report")
+                self._finished.add(shard_id)
+                self._conns[shard_id] = None
+        if updated:
+            self.merge_worker_stats()
+
+    def apply_worker_update(self, shard_id: int, update: dict):
+        for drone_id, measurements in update['measurements'].items():
+            self._drone_views[drone_id].latency_measurements.extend(measurements)
+        for drone_id, state in update['drones'].items():
+            view = self._drone_views[drone_id]
+            view.registered = state['registered']
+            view.send_schedules = {stream: SendSchedule.from_summary(s)
+                                   for stream, s in state['send_schedules'].items()}
+            view.time_to_connected_ms = state['time_to_connected_ms']
+        self._worker_stats[shard_id] = update['stats']
+
+    def merge_worker_stats(self):
+        """Rebuild fleet-wide instrumentation from the latest cumulative worker stats"""
+        if self.loop_monitor:
+            template = self.loop_monitor
+            self.loop_monitor = EventLoopLagMonitor(
+                interval_ms=template.interval * 1000,
+                window_seconds=template.window_seconds,
+                lag_threshold_ms=template.lag_threshold_ms,
+                detect_slow_callbacks=template.detect_slow_callbacks,
+                slow_callback_ms=template.slow_callback_ms
+            )
+        if self.send_timer.enabled:
+            self.send_timer = SendPathTimer(enabled=True)
+        if self.spike_detector:
+            template = self.spike_detector
+            self.spike_detector = SpikeDetector(z_threshold=template.z_threshold, alpha=template.alpha)
+        if self.kinematics:
+            self.kinematics = FleetKinematics(dt=self.kinematics.dt, capacity=1)
+        if self.timer_wheel:
+            template = self.timer_wheel
+            self.timer_wheel = HierarchicalTimerWheel(tick_ms=template.tick * 1000, dispatchers=template.dispatchers)
+        self.connection_gate = ConnectionGate(self.connection_gate.max_concurrent)
+        if self.http_pool and self.http_pool.timer:
+            self.http_pool.timer = HttpPhaseTimer()
+
+        for stats in self._worker_stats.values():
+            if self.loop_monitor and stats['loop_monitor']:
+                self.loop_monitor.merge_state(stats['loop_monitor'])
+            if self.send_timer.enabled and stats['send_timer']:
+                self.send_timer.merge_state(stats['send_timer'])
+            if self.spike_detector and stats['spike_detector']:
+                self.spike_detector.merge_state(stats['spike_detector'])
+            if self.kinematics and stats['kinematics']:
+                self.kinematics.merge_state(stats['kinematics'])
+            if self.timer_wheel and stats['timer_wheel']:
+                self.timer_wheel.merge_state(stats['timer_wheel'])
+            if self.http_pool and self.http_pool.timer and stats['http_phases']:
+                self.http_pool.timer.merge_state(stats['http_phases'])
+            gate = stats['connection_gate']
+            self.connection_gate.wait_time.merge(LatencyHistogram.from_dict(gate['wait_time']))
+            # A sum of per-worker peaks (an upper bound): worker peaks need not coincide
+            self.connection_gate.peak_in_flight += gate['peak_in_flight']
+            self.connection_gate.merged_gates += 1
+
+    async def pump_workers(self):
+        while True:
+            self.drain_workers()
+            await asyncio.sleep(0.2)
+
+    async def run_production_latency_simulation(self, duration_minutes: int = 5):
+        """Run the fleet across worker processes and report as a single fleet"""
+        logger.info(f"🎯 Sharded Production Latency Simulation: {self.num_drones} drones "
+                    f"across {self.num_workers} worker processes")
+        logger.info(f"📡 Target server: {self.server_url}")
+        logger.info(f"⏱️ Duration: {duration_minutes} minutes")
+
+        configs = self.create_drone_configs()
+        self._drone_views = {config.drone_id: RemoteDroneView(config) for config in configs}
+        self.drones = list(self._drone_views.values())
+        self.display_production_drone_summary()
+
+        self.start_workers(configs)
+        pump_task = asyncio.create_task(self.pump_workers())
+
+        try:
+            await self.monitor_production_latency_simulation(duration_minutes)
+
+        except KeyboardInterrupt:
+            logger.info("🛑 Sharded latency simulation stopped by user")
+        finally:
+            pump_task.cancel()
+            await self.cleanup()
+            self.generate_production_fleet_latency_report()
+
+    async def cleanup(self):
+        """Ask workers to stop, collect their final reports and reap the processes"""
+        logger.info("🧹 Stopping fleet workers...")
+        for conn in self._conns:
+            if conn is not None:
+                try:
+                    conn.send(('stop',))
+                except (BrokenPipeError, OSError):
+                    pass
+
+        deadline = time.time() + WORKER_STOP_TIMEOUT
+        while len(self._finished) < len(self._processes) and time.time() < deadline:
+            self.drain_workers()
+            await asyncio.sleep(0.2)
+        self.drain_workers()
+
+        for shard_id, process in enumerate(self._processes):
+            process.join(timeout=5)
+            if process.is_alive():
+                logger.warning(f"⚠️ Worker {shard_id} did not exit, terminating")
+                process.terminate()
+
+        logger.info(f"✅ {len(self._finished)}/{len(self._processes)} workers reported")
@@ -0,0 +1,239 @@
+# services/drone-connection-service/src/clients/python-mock/fleet_sketch.py
+"""
+Mergeable per-drone measurement sketches
+
+Raw LatencyMeasurement lists grow with every send, which is fine inside one
+host but too heavy to stream between hosts. A MeasurementSketch summarises
+one (drone, measurement type) pair in bounded space: latency, network and
+coordinated-omission-corrected histograms, payload/loop-lag sums, the send
+window and the report latency buckets. Sketches of disjoint measurement sets
+merge by addition.
+
+FleetSketch answers the same queries as FleetStatsEngine, so the regular
+fleet report runs unchanged on merged sketches. Means, counts, buckets and
+throughput are exact; percentiles carry the histogram's ~1.6% relative
+precision.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from fleet_stats import FleetStatsEngine, LATENCY_BUCKET_EDGES_MS
+from latency_histogram import LatencyHistogram
+
+
+class MeasurementSketch:
+    """Bounded summary of one drone's measurements of one type"""
+
+    __slots__ = ('latency', 'network', 'corrected', 'payload_bytes', 'loop_lag_ms',
+                 'first_send', 'last_receive', 'buckets')
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.network = LatencyHistogram()
+        self.corrected = LatencyHistogram()
+        self.payload_bytes = 0
+        self.loop_lag_ms = 0.0
+        self.first_send: Optional[float] = None
+        self.last_receive: Optional[float] = None
+        self.buckets = [0] * len(LATENCY_BUCKET_EDGES_MS)
+
+    @property
+    def count(self) -> int:
+        return self.latency.count
+
+    @classmethod
+    def from_rows(cls, engine: FleetStatsEngine, rows: np.ndarray) -> 'MeasurementSketch':
+        """Summarise the given engine rows"""
+        sketch = cls()
+        latency = engine.latency_ms[rows]
+        for value in latency.tolist():
+            sketch.latency.record(value)
+        for value in np.maximum(latency - engine.loop_lag_ms[rows], 0.0).tolist():
+            sketch.network.record(value)
+        for value in engine.corrected_latencies(rows).tolist():
+            sketch.corrected.record(value)
+        sketch.payload_bytes = int(engine.payload_bytes[rows].sum())
+        sketch.loop_lag_ms = float(engine.loop_lag_ms[rows].sum())
+        sketch.first_send = float(engine.send_ts[rows].min())
+        sketch.last_receive = float(engine.receive_ts[rows].max())
+        slots = np.searchsorted(np.asarray(LATENCY_BUCKET_EDGES_MS[1:]), latency, side='right')
+        sketch.buckets = np.bincount(slots, minlength=len(LATENCY_BUCKET_EDGES_MS)).tolist()
+        return sketch
+
+    def merge(self, other: 'MeasurementSketch'):
+        """Add a sketch of a disjoint set of measurements"""
+        self.latency.merge(other.latency)
+        self.network.merge(other.network)
+        self.corrected.merge(other.corrected)
+        self.payload_bytes += other.payload_bytes
+        self.loop_lag_ms += other.loop_lag_ms
+        if other.first_send is not None:
+            self.first_send = other.first_send if self.first_send is None else min(self.first_send, other.first_send)
+        if other.last_receive is not None:
+            self.last_receive = (other.last_receive if self.last_receive is None
+                                 else max(self.last_receive, other.last_receive))
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+
+    def to_dict(self) -> dict:
+        return {
+            'latency': self.latency.to_dict(),
+            'network': self.network.to_dict(),
+            'corrected': self.corrected.to_dict(),
+            'payload_bytes': self.payload_bytes,
+            'loop_lag_ms': self.loop_lag_ms,
+            'first_send': self.first_send,
+            'last_receive': self.last_receive,
+            'buckets': self.buckets
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'MeasurementSketch':
+        sketch = cls()
+        sketch.latency = LatencyHistogram.from_dict(data['latency'])
+        sketch.network = LatencyHistogram.from_dict(data['network'])
+        sketch.corrected = LatencyHistogram.from_dict(data['corrected'])
+        sketch.payload_bytes = data['payload_bytes']
+        sketch.loop_lag_ms = data['loop_lag_ms']
+        sketch.first_send = data['first_send']
+        sketch.last_receive = data['last_receive']
+        sketch.buckets = list(data['buckets'])
+        return sketch
+
+
+class FleetSketch:
+    """Per-drone, per-type sketches with the FleetStatsEngine report interface"""
+
+    def __init__(self):
+        self.sketches: Dict[str, Dict[str, MeasurementSketch]] = {}
+
+    @classmethod
+    def from_engine(cls, engine: FleetStatsEngine) -> 'FleetSketch':
+        """Sketch every (drone, type) group of an engine's columns"""
+        fleet = cls()
+        if not engine.total_measurements:
+            return fleet
+        key = engine.drone_idx.astype(np.int64) * engine.num_types + engine.type_idx
+        order = np.argsort(key, kind='stable')
+        sorted_keys = key[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        ends = np.r_[starts[1:], sorted_keys.size]
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            d, t = divmod(int(sorted_keys[start]), engine.num_types)
+            drone = fleet.sketches.setdefault(engine.drone_ids[d], {})
+            drone[engine.type_names[t]] = MeasurementSketch.from_rows(engine, order[start:end])
+        return fleet
+
+    @classmethod
+    def from_measurement_lists(cls, items) -> 'FleetSketch':
+        return cls.from_engine(FleetStatsEngine.from_measurement_lists(items))
+
+    def merge(self, other: 'FleetSketch'):
+        for drone_id, types in other.sketches.items():
+            drone = self.sketches.setdefault(drone_id, {})
+            for name, sketch in types.items():
+                if name in drone:
+                    drone[name].merge(sketch)
+                else:
+                    drone[name] = sketch
+
+    def drone_count(self, drone_id: str) -> int:
+        """Measurements recorded for one drone"""
+        return sum(s.count for s in self.sketches.get(drone_id, {}).values())
+
+    @property
+    def total_measurements(self) -> int:
+        return sum(s.count for types in self.sketches.values() for s in types.values())
+
+    @property
+    def type_names(self) -> List[str]:
+        names = {}
+        for types in self.sketches.values():
+            names.update(dict.fromkeys(types))
+        return list(names)
+
+    def type_sketch(self, measurement_type: str) -> Optional[MeasurementSketch]:
+        """All drones' sketches of one type merged"""
+        merged = None
+        for types in self.sketches.values():
+            sketch = types.get(measurement_type)
+            if sketch is None:
+                continue
+            if merged is None:
+                merged = MeasurementSketch()
+            merged.merge(sketch)
+        return merged
+
+    def fleet_statistics(self) -> Dict[str, dict]:
+        """Fleet-wide statistics by measurement type (FleetStatsEngine.fleet_statistics format)"""
+        fleet_stats = {}
+        for name in self.type_names:
+            merged = self.type_sketch(name)
+            n = merged.count
+            drone_avgs = [types[name].latency.mean for types in self.sketches.values() if name in types]
+            fleet_stats[name] = {
+                'drone_count': len(drone_avgs),
+                'total_measurements': n,
+                'fleet_avg': merged.latency.mean,
+                'fleet_median': merged.latency.percentile(50),
+                'fleet_p95': merged.latency.percentile(95),
+                'fleet_p99': merged.latency.percentile(99),
+                'best_drone_avg': min(drone_avgs),
+                'worst_drone_avg': max(drone_avgs),
+                'avg_payload_size': int(merged.payload_bytes / n),
+                'fleet_loop_lag_avg': merged.loop_lag_ms / n,
+                'fleet_network_avg': merged.network.mean,
+                'fleet_network_p99': merged.network.percentile(99),
+                'fleet_p999': merged.latency.percentile(99.9),
+                'fleet_corrected_p50': merged.corrected.percentile(50),
+                'fleet_corrected_p95': merged.corrected.percentile(95),
+                'fleet_corrected_p99': merged.corrected.percentile(99),
+                'fleet_corrected_p999': merged.corrected.percentile(99.9)
+            }
+        return fleet_stats
+
+    def per_drone_statistics(self) -> Dict[str, Dict[str, Tuple[float, int]]]:
+        """{drone_id: {type: (avg_ms, count)}} for the per-drone breakdown"""
+        return {
+            drone_id: {name: (s.latency.mean, s.count) for name, s in types.items()}
+            for drone_id, types in self.sketches.items()
+        }
+
+    def latency_histogram(self, measurement_type: str, edges_ms: List[float] = None) -> List[int]:
+        """Bucket counts for one measurement type; exact for the default report edges"""
+        edges_ms = edges_ms or LATENCY_BUCKET_EDGES_MS
+        merged = self.type_sketch(measurement_type)
+        if merged is None:
+            return [0] * len(edges_ms)
+        if list(edges_ms) == LATENCY_BUCKET_EDGES_MS:
+            return list(merged.buckets)
+        return merged.latency.buckets(edges_ms)
+
+    def throughput(self, measurement_type: str) -> dict:
+        """Data volume and throughput for one measurement type"""
+        merged = self.type_sketch(measurement_type)
+        if merged is None or not merged.count:
+            return {'total_bytes': 0, 'throughput_bps': 0.0, 'avg_payload_bytes': 0.0}
+        duration = merged.last_receive - merged.first_send
+        return {
+            'total_bytes': merged.payload_bytes,
+            'throughput_bps': (merged.payload_bytes * 8) / duration if duration > 0 else 0,
+            'avg_payload_bytes': merged.payload_bytes / merged.count
+        }
+
+    def type_mean(self, measurement_type: str) -> Optional[float]:
+        merged = self.type_sketch(measurement_type)
+        if merged is None or not merged.count:
+            return None
+        return merged.latency.mean
+
+    def to_dict(self) -> dict:
+        return {drone_id: {name: s.to_dict() for name, s in types.items()}
+                for drone_id, types in self.sketches.items()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'FleetSketch':
+        fleet = cls()
+        fleet.sketches = {drone_id: {name: MeasurementSketch.from_dict(s) for name, s in types.items()}
+                          for drone_id, types in data.items()}
+        return fleet
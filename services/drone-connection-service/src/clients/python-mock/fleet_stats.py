@@ -0,0 +1,338 @@
+# services/drone-connection-service/src/clients/python-mock/fleet_stats.py
+"""
+Single-pass vectorized fleet statistics engine
+
+Collects every drone's latency measurements once into flat NumPy columns
+keyed by (drone, measurement type), then computes fleet aggregates,
+percentiles, latency histograms and per-drone best/worst with vectorized
+operations instead of rescanning each drone's list per measurement type.
+Coordinated-omission-corrected percentiles are computed alongside the raw
+ones: latency from the intended send time when the sender recorded one,
+HDR-style back-fill of missed sends only for senders that block on the
+response (those that set expected_interval_ms).
+
+Run directly to benchmark:  python fleet_stats.py --measurements 1000000
+"""
+import argparse
+import random
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+LATENCY_BUCKET_EDGES_MS = [0.0, 30.0, 50.0, 100.0]
+LATENCY_BUCKET_LABELS = ['< 30ms', '30-50ms', '50-100ms', '> 100ms']
+
+
+class FleetStatsEngine:
+    def __init__(self, drone_ids: List[str], type_names: List[str], drone_idx: np.ndarray,
+                 type_idx: np.ndarray, latency_ms: np.ndarray, payload_bytes: np.ndarray,
+                 send_ts: np.ndarray, receive_ts: np.ndarray, loop_lag_ms: np.ndarray,
+                 intended_ts: Optional[np.ndarray] = None, interval_ms: Optional[np.ndarray] = None):
+        self.drone_ids = drone_ids
+        self.type_names = type_names
+        self.drone_idx = drone_idx
+        self.type_idx = type_idx
+        self.latency_ms = latency_ms
+        self.payload_bytes = payload_bytes
+        self.send_ts = send_ts
+        self.receive_ts = receive_ts
+        self.loop_lag_ms = loop_lag_ms
+        self.intended_ts = intended_ts if intended_ts is not None else np.full(latency_ms.size, np.nan)
+        self.interval_ms = interval_ms if interval_ms is not None else np.zeros(latency_ms.size)
+
+        self.num_drones = len(drone_ids)
+        self.num_types = len(type_names)
+        self._type_slices: Optional[Dict[int, Tuple[int, int]]] = None
+        self._order: Optional[np.ndarray] = None
+        self._sorted_latency: Optional[np.ndarray] = None
+        self._sorted_network: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_drones(cls, drones) -> 'FleetStatsEngine':
+        """Build from drone objects exposing config.drone_id and latency_measurements"""
+        return cls.from_measurement_lists((d.config.drone_id, d.latency_measurements) for d in drones)
+
+    @classmethod
+    def from_measurement_lists(cls, items: Iterable[Tuple[str, list]]) -> 'FleetStatsEngine':
+        """Single pass over (drone_id, measurements) pairs into flat columns"""
+        drone_ids: List[str] = []
+        type_codes: Dict[str, int] = {}
+        drone_col: List[int] = []
+        type_col: List[int] = []
+        latency_col: List[float] = []
+        payload_col: List[int] = []
+        send_col: List[float] = []
+        receive_col: List[float] = []
+        lag_col: List[float] = []
+        intended_col: List[float] = []
+        interval_col: List[float] = []
+        nan = float('nan')
+
+        for drone_id, measurements in items:
+            if not measurements:
+                continue
+            drone_code = len(drone_ids)
+            drone_ids.append(drone_id)
+            drone_col.extend([drone_code] * len(measurements))
+            for m in measurements:
+                code = type_codes.get(m.measurement_type)
+                if code is None:
+                    code = type_codes[m.measurement_type] = len(type_codes)
+                type_col.append(code)
+                latency_col.append(m.latency_ms)
+                payload_col.append(m.payload_size_bytes)
+                send_col.append(m.send_timestamp)
+                receive_col.append(m.receive_timestamp)
+                lag_col.append(getattr(m, 'loop_lag_ms', 0.0))
+                intended = getattr(m, 'intended_send_timestamp', None)
+                intended_col.append(nan if intended is None else intended)
+                interval_col.append(getattr(m, 'expected_interval_ms', 0.0))
+
+        type_names = [None] * len(type_codes)
+        for name, code in type_codes.items():
+            type_names[code] = name
+
+        return cls(
+            drone_ids, type_names,
+            np.asarray(drone_col, dtype=np.int32),
+            np.asarray(type_col, dtype=np.int16),
+            np.asarray(latency_col, dtype=np.float64),
+            np.asarray(payload_col, dtype=np.int64),
+            np.asarray(send_col, dtype=np.float64),
+            np.asarray(receive_col, dtype=np.float64),
+            np.asarray(lag_col, dtype=np.float64),
+            np.asarray(intended_col, dtype=np.float64),
+            np.asarray(interval_col, dtype=np.float64)
+        )
+
+    @property
+    def total_measurements(self) -> int:
+        return int(self.latency_ms.size)
+
+    def _prepare(self):
+        """Group columns by type once and sort each slice so percentiles are index lookups"""
+        if self._type_slices is not None:
+            return
+        order = self._order = np.argsort(self.type_idx, kind='stable')
+        boundaries = np.searchsorted(self.type_idx[order], np.arange(self.num_types + 1))
+        self._type_slices = {t: (int(boundaries[t]), int(boundaries[t + 1])) for t in range(self.num_types)}
+
+        self._sorted_latency = self.latency_ms[order]
+        self._sorted_network = np.maximum(self._sorted_latency - self.loop_lag_ms[order], 0.0)
+        for start, end in self._type_slices.values():
+            self._sorted_latency[start:end].sort()
+            self._sorted_network[start:end].sort()
+
+    @staticmethod
+    def _percentile_sorted(sorted_values: np.ndarray, p: float) -> float:
+        """Linear-interpolated percentile of an already sorted slice"""
+        n = sorted_values.size
+        if n == 0:
+            return 0.0
+        index = (n - 1) * p / 100
+        lower = int(index)
+        upper = min(lower + 1, n - 1)
+        weight = index - lower
+        return float(sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight)
+
+    def corrected_latencies(self, rows: np.ndarray) -> np.ndarray:
+        """Coordinated-omission-corrected latency samples for the given rows
+
+        Measurements with an intended send time are measured from it. Without
+        one, measurements from a blocking sender (expected_interval_ms set) that
+        are longer than the interval also get the samples HdrHistogram's
+        recordValueWithExpectedInterval would back-fill: value - k * interval
+        for every k while that is still >= interval.
+        """
+        intended = self.intended_ts[rows]
+        open_loop = ~np.isnan(intended)
+        values = np.where(open_loop, (self.receive_ts[rows] - np.where(open_loop, intended, 0.0)) * 1000,
+                          self.latency_ms[rows])
+        intervals = self.interval_ms[rows]
+
+        backfill = ~open_loop & (intervals > 0)
+        missed = np.zeros(values.size, dtype=np.int64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            missed[backfill] = np.maximum(np.floor(values[backfill] / intervals[backfill]).astype(np.int64) - 1, 0)
+        total = int(missed.sum())
+        if total == 0:
+            return values
+
+        source = np.repeat(np.arange(values.size), missed)
+        k = np.arange(total) - np.repeat(np.cumsum(missed) - missed, missed) + 1
+        return np.concatenate([values, values[source] - k * intervals[source]])
+
+    def per_drone_type_means(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(counts, mean latency) matrices shaped [drones, types]"""
+        key = self.drone_idx.astype(np.int64) * self.num_types + self.type_idx
+        size = self.num_drones * self.num_types
+        counts = np.bincount(key, minlength=size).reshape(self.num_drones, self.num_types)
+        sums = np.bincount(key, weights=self.latency_ms, minlength=size).reshape(self.num_drones, self.num_types)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+        return counts, means
+
+    def fleet_statistics(self) -> Dict[str, dict]:
+        """Fleet-wide statistics by measurement type (calculate_production_fleet_statistics format)"""
+        self._prepare()
+        counts, means = self.per_drone_type_means()
+
+        type_counts = np.bincount(self.type_idx, minlength=self.num_types)
+        latency_sums = np.bincount(self.type_idx, weights=self.latency_ms, minlength=self.num_types)
+        payload_sums = np.bincount(self.type_idx, weights=self.payload_bytes, minlength=self.num_types)
+        lag_sums = np.bincount(self.type_idx, weights=self.loop_lag_ms, minlength=self.num_types)
+        network_sums = np.bincount(self.type_idx, weights=np.maximum(self.latency_ms - self.loop_lag_ms, 0.0),
+                                   minlength=self.num_types)
+
+        fleet_stats = {}
+        for t, name in enumerate(self.type_names):
+            n = int(type_counts[t])
+            if n == 0:
+                continue
+            start, end = self._type_slices[t]
+            latencies = self._sorted_latency[start:end]
+            network = self._sorted_network[start:end]
+            drone_avgs = means[:, t][counts[:, t] > 0]
+            corrected = np.sort(self.corrected_latencies(self._order[start:end]))
+
+            fleet_stats[name] = {
+                'drone_count': int(drone_avgs.size),
+                'total_measurements': n,
+                'fleet_avg': float(latency_sums[t] / n),
+                'fleet_median': self._percentile_sorted(latencies, 50),
+                'fleet_p95': self._percentile_sorted(latencies, 95),
+                'fleet_p99': self._percentile_sorted(latencies, 99),
+                'best_drone_avg': float(drone_avgs.min()) if drone_avgs.size else 0,
+                'worst_drone_avg': float(drone_avgs.max()) if drone_avgs.size else 0,
+                'avg_payload_size': int(payload_sums[t] / n),
+                'fleet_loop_lag_avg': float(lag_sums[t] / n),
+                'fleet_network_avg': float(network_sums[t] / n),
+                'fleet_network_p99': self._percentile_sorted(network, 99),
+                'fleet_p999': self._percentile_sorted(latencies, 99.9),
+                'fleet_corrected_p50': self._percentile_sorted(corrected, 50),
+                'fleet_corrected_p95': self._percentile_sorted(corrected, 95),
+                'fleet_corrected_p99': self._percentile_sorted(corrected, 99),
+                'fleet_corrected_p999': self._percentile_sorted(corrected, 99.9)
+            }
+        return fleet_stats
+
+    def per_drone_statistics(self) -> Dict[str, Dict[str, Tuple[float, int]]]:
+        """{drone_id: {type: (avg_ms, count)}} for the per-drone breakdown"""
+        counts, means = self.per_drone_type_means()
+        result = {}
+        for d, drone_id in enumerate(self.drone_ids):
+            result[drone_id] = {
+                self.type_names[t]: (float(means[d, t]), int(counts[d, t]))
+                for t in range(self.num_types) if counts[d, t] > 0
+            }
+        return result
+
+    def type_mask(self, measurement_type: str) -> Optional[np.ndarray]:
+        if measurement_type not in self.type_names:
+            return None
+        return self.type_idx == self.type_names.index(measurement_type)
+
+    def latency_histogram(self, measurement_type: str, edges_ms: List[float] = None) -> List[int]:
+        """Bucket counts for one measurement type; last bucket is open-ended"""
+        edges_ms = edges_ms or LATENCY_BUCKET_EDGES_MS
+        mask = self.type_mask(measurement_type)
+        if mask is None:
+            return [0] * len(edges_ms)
+        latencies = self.latency_ms[mask]
+        slots = np.searchsorted(np.asarray(edges_ms[1:]), latencies, side='right')
+        return np.bincount(slots, minlength=len(edges_ms)).tolist()
+
+    def throughput(self, measurement_type: str) -> dict:
+        """Data volume and throughput for one measurement type"""
+        mask = self.type_mask(measurement_type)
+        if mask is None or not mask.any():
+            return {'total_bytes': 0, 'throughput_bps': 0.0, 'avg_payload_bytes': 0.0}
+        payloads = self.payload_bytes[mask]
+        total_bytes = int(payloads.sum())
+        duration = float(self.receive_ts[mask].max() - self.send_ts[mask].min())
+        return {
+            'total_bytes': total_bytes,
+            'throughput_bps': (total_bytes * 8) / duration if duration > 0 else 0,
+            'avg_payload_bytes': float(payloads.mean())
+        }
+
+    def type_mean(self, measurement_type: str) -> Optional[float]:
+        mask = self.type_mask(measurement_type)
+        if mask is None or not mask.any():
+            return None
+        return float(self.latency_ms[mask].mean())
+
+
+def _synthetic_measurements(num_measurements: int, num_drones: int, seed: int = 42):
+    """Generate LatencyMeasurement lists resembling a fleet run"""
+    from drone_simulator_prod import LatencyMeasurement
+
+    rng = random.Random(seed)
+    per_drone = max(1, num_measurements // num_drones)
+    mix = ['telemetry'] * 90 + ['heartbeat'] * 2 + ['command'] * 1 + ['camera'] * 7
+    start = time.time() - 3600
+    for d in range(num_drones):
+        measurements = []
+        for i in range(per_drone):
+            kind = mix[i % len(mix)]
+            latency = rng.lognormvariate(3.2, 0.5)
+            send_ts = start + i * 0.1 + rng.expovariate(200)
+            measurements.append(LatencyMeasurement(
+                measurement_type=kind,
+                send_timestamp=send_ts,
+                receive_timestamp=send_ts + latency / 1000,
+                latency_ms=latency,
+                payload_size_bytes=620 if kind == 'telemetry' else 180,
+                sequence_id=i,
+                intended_send_timestamp=start + i * 0.1 if kind == 'telemetry' else None
+            ))
+        for kind in ('discovery', 'registration'):
+            measurements.append(LatencyMeasurement(kind, start, start + 0.05, 50.0, 200, 0))
+        yield f"bench-{d + 1:04d}", measurements
+
+
+def benchmark(num_measurements: int, num_drones: int):
+    """Time engine build and every report computation"""
+    print(f"📊 Fleet stats benchmark: {num_measurements:,} measurements across {num_drones} drones")
+    t0 = time.perf_counter()
+    fleet = list(_synthetic_measurements(num_measurements, num_drones))
+    print(f"  Synthetic data generation: {time.perf_counter() - t0:.2f}s (not part of the engine)")
+
+    timings = {}
+    t0 = time.perf_counter()
+    engine = FleetStatsEngine.from_measurement_lists(fleet)
+    timings['build (single pass)'] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    fleet_stats = engine.fleet_statistics()
+    timings['fleet_statistics'] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    engine.per_drone_statistics()
+    timings['per_drone_statistics'] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    engine.latency_histogram('telemetry')
+    engine.throughput('telemetry')
+    timings['network analysis'] = time.perf_counter() - t0
+
+    for name, seconds in timings.items():
+        print(f"  {name:<22} {seconds * 1000:9.1f}ms")
+    print(f"  {'total':<22} {sum(timings.values()) * 1000:9.1f}ms "
+          f"({engine.total_measurements / sum(timings.values()) / 1e6:.2f}M measurements/s)")
+    telemetry = fleet_stats.get('telemetry', {})
+    print(f"  Telemetry P99 check: {telemetry.get('fleet_p99', 0):.2f}ms over "
+          f"{telemetry.get('total_measurements', 0):,} samples")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fleet statistics engine benchmark')
+    parser.add_argument('--measurements', type=int, default=1_000_000, help='Total measurements (default: 1M)')
+    parser.add_argument('--drones', type=int, default=500, help='Number of drones (default: 500)')
+    args = parser.parse_args()
+    benchmark(args.measurements, args.drones)
+
+
+if __name__ == "__main__":
+    main()
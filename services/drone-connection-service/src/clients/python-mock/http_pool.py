@@ -0,0 +1,196 @@
+# services/drone-connection-service/src/clients/python-mock/http_pool.py
+"""
+Shared pooled aiohttp session for drone discovery and registration
+
+Each drone used to open and close its own aiohttp.ClientSession for
+/drone/discover and again for /drone/register, paying a fresh TCP (and for
+HTTPS, TLS) handshake and DNS lookup per request. HttpSessionPool hands every
+drone in the process one session backed by a tuned TCPConnector: a bounded
+connection pool, keep-alive so registration reuses the discovery connection,
+and a DNS cache.
+
+aiohttp trace hooks break each request into phases:
+
+  queue     waiting for a free connection in the pool
+  dns       host resolution (0 on a DNS cache hit)
+  connect   TCP connect plus TLS handshake for https (aiohttp has no
+            separate TLS hook)
+  request   connection ready until the request body is sent
+  response  request sent until response headers arrive
+"""
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from latency_histogram import LatencyHistogram
+
+HTTP_PHASES = ['queue', 'dns', 'connect', 'request', 'response']
+
+
+class HttpPhaseTimer:
+    """Collects per-phase request timings from aiohttp trace hooks"""
+
+    def __init__(self):
+        self.phases: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.requests: Dict[str, int] = {}
+        self.reused: Dict[str, int] = {}
+        self.dns_cache_hits = 0
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(self._on_request_start)
+        trace.on_connection_queued_start.append(self._on_queued_start)
+        trace.on_connection_queued_end.append(self._on_queued_end)
+        trace.on_dns_resolvehost_start.append(self._on_dns_start)
+        trace.on_dns_resolvehost_end.append(self._on_dns_end)
+        trace.on_dns_cache_hit.append(self._on_dns_cache_hit)
+        trace.on_connection_create_start.append(self._on_create_start)
+        trace.on_connection_create_end.append(self._on_create_end)
+        trace.on_connection_reuseconn.append(self._on_reuseconn)
+        trace.on_request_headers_sent.append(self._on_sent)
+        trace.on_request_chunk_sent.append(self._on_sent)
+        trace.on_request_end.append(self._on_request_end)
+        return trace
+
+    async def _on_request_start(self, session, ctx, params):
+        now = time.perf_counter()
+        ctx.start = now
+        ctx.ready = now
+        ctx.sent = now
+        ctx.phases = {phase: 0.0 for phase in HTTP_PHASES}
+        ctx.reused = False
+
+    async def _on_queued_start(self, session, ctx, params):
+        ctx.queued_at = time.perf_counter()
+
+    async def _on_queued_end(self, session, ctx, params):
+        ctx.phases['queue'] = (time.perf_counter() - ctx.queued_at) * 1000
+
+    async def _on_dns_start(self, session, ctx, params):
+        ctx.dns_at = time.perf_counter()
+
+    async def _on_dns_end(self, session, ctx, params):
+        ctx.phases['dns'] = (time.perf_counter() - ctx.dns_at) * 1000
+
+    async def _on_dns_cache_hit(self, session, ctx, params):
+        self.dns_cache_hits += 1
+
+    async def _on_create_start(self, session, ctx, params):
+        ctx.create_at = time.perf_counter()
+
+    async def _on_create_end(self, session, ctx, params):
+        now = time.perf_counter()
+        # Host resolution runs inside connection creation
+        ctx.phases['connect'] = max(0.0, (now - ctx.create_at) * 1000 - ctx.phases['dns'])
+        ctx.ready = now
+
+    async def _on_reuseconn(self, session, ctx, params):
+        ctx.reused = True
+        ctx.ready = time.perf_counter()
+
+    async def _on_sent(self, session, ctx, params):
+        ctx.sent = time.perf_counter()
+
+    async def _on_request_end(self, session, ctx, params):
+        now = time.perf_counter()
+        ctx.phases['request'] = max(0.0, (ctx.sent - ctx.ready) * 1000)
+        ctx.phases['response'] = (now - ctx.sent) * 1000
+
+        path = urlsplit(str(params.url)).path or '/'
+        for phase, value in ctx.phases.items():
+            histogram = self.phases.get((path, phase))
+            if histogram is None:
+                histogram = self.phases[(path, phase)] = LatencyHistogram()
+            histogram.record(value)
+        self.requests[path] = self.requests.get(path, 0) + 1
+        if ctx.reused:
+            self.reused[path] = self.reused.get(path, 0) + 1
+
+        # Callers that pass a dict as trace_request_ctx get this request's breakdown
+        if isinstance(ctx.trace_request_ctx, dict):
+            ctx.trace_request_ctx.update(ctx.phases)
+            ctx.trace_request_ctx['reused_connection'] = ctx.reused
+
+    def export_state(self) -> dict:
+        """Mergeable snapshot of phase histograms and counters"""
+        return {
+            'phases': [[path, phase, h.to_dict()] for (path, phase), h in self.phases.items()],
+            'requests': dict(self.requests),
+            'reused': dict(self.reused),
+            'dns_cache_hits': self.dns_cache_hits
+        }
+
+    def merge_state(self, state: dict):
+        """Add another timer's export_state() into this one"""
+        for path, phase, data in state['phases']:
+            histogram = self.phases.setdefault((path, phase), LatencyHistogram())
+            histogram.merge(LatencyHistogram.from_dict(data))
+        for path, count in state['requests'].items():
+            self.requests[path] = self.requests.get(path, 0) + count
+        for path, count in state['reused'].items():
+            self.reused[path] = self.reused.get(path, 0) + count
+        self.dns_cache_hits += state['dns_cache_hits']
+
+    def summary(self) -> dict:
+        """Per-endpoint phase percentiles for reports and JSON export"""
+        endpoints = {}
+        for path in sorted(self.requests):
+            endpoints[path] = {
+                'requests': self.requests[path],
+                'reused_connections': self.reused.get(path, 0),
+                'phases': {phase: self.phases[(path, phase)].summary()
+                           for phase in HTTP_PHASES if (path, phase) in self.phases}
+            }
+        return {'dns_cache_hits': self.dns_cache_hits, 'endpoints': endpoints}
+
+    def print_report(self):
+        """Print HTTP request phase breakdown per endpoint"""
+        summary = self.summary()
+        print("\n🌐 HTTP REQUEST PHASES (shared session):")
+        print("-" * 50)
+        if not summary['endpoints']:
+            print("  No HTTP requests traced")
+            return
+        print(f"  DNS cache hits: {summary['dns_cache_hits']}")
+        for path, endpoint in summary['endpoints'].items():
+            print(f"  {path}: {endpoint['requests']} requests, "
+                  f"{endpoint['reused_connections']} on reused connections")
+            for phase, stats in endpoint['phases'].items():
+                print(f"    {phase:<9} avg {stats['avg_ms']:>7.2f}ms  P50 {stats['p50_ms']:>7.2f}ms  "
+                      f"P99 {stats['p99_ms']:>7.2f}ms  max {stats['max_ms']:>7.2f}ms")
+
+
+class HttpSessionPool:
+    """One pooled aiohttp session per process, shared by every drone"""
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 0, keepalive_timeout: float = 30.0,
+                 dns_cache_ttl: int = 300, trace_phases: bool = True):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timer = HttpPhaseTimer() if trace_phases else None
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def session(self) -> aiohttp.ClientSession:
+        """The shared session, created on first use inside the running loop"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_cache_ttl
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                trace_configs=[self.timer.trace_config()] if self.timer else None
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
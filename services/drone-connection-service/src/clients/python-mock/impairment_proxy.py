@@ -0,0 +1,630 @@
+# services/drone-connection-service/src/clients/python-mock/impairment_proxy.py
+"""
+Network impairment proxy for LTE-like links
+
+Sits between the simulators and the server and degrades the link the way a
+drone's LTE modem does. A TCP proxy carries HTTP discovery/registration and
+the Socket.IO WebSocket unchanged; an optional UDP relay does the same for
+a UDP port on the WebRTC path. Any simulator works through it without code
+changes, just point --server at the proxy:
+
+  python standin_server.py --port 4005
+  python impairment_proxy.py --profile network_profiles/lte_congested.json \\
+      --listen 127.0.0.1:4006 --upstream 127.0.0.1:4005
+  python drone_simulator_optimized.py --server http://127.0.0.1:4006
+
+Profiles are JSON. "link" applies to both directions and "uplink"
+(simulator -> server) / "downlink" override it key by key:
+
+  {
+    "name": "lte-handover",
+    "link": {"delay_ms": 45, "jitter_ms": 15, "distribution": "uniform", "loss": 0.005},
+    "uplink": {"bandwidth_kbps": 5000},
+    "outages": {"every_s": 45, "duration_s": 5, "mode": "reset"},
+    "tcp_retransmit_ms": 250
+  }
+
+Delay distributions: constant, uniform (delay +- jitter), normal (jitter is
+the standard deviation, clipped at 0) and pareto (a heavy tail of scale
+jitter above delay). Bandwidth is a per-connection (per drone) token bucket.
+TCP cannot lose bytes, so a lost TCP segment arrives tcp_retransmit_ms late
+and holds up everything behind it; UDP datagrams are dropped and may be
+reordered by jitter. During an outage "stall" holds all traffic until the
+link comes back, "reset" also aborts every open TCP connection and refuses
+new ones, which exercises the simulators' reconnection.
+
+WebRTC media goes wherever ICE negotiates, so the UDP relay is only in the
+path when the far end's candidate (or TURN server) is the relay's address:
+point --udp-upstream at the real UDP endpoint and advertise the relay.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+from latency_histogram import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LISTEN_PORT = 4006
+DELAY_DISTRIBUTIONS = ['constant', 'uniform', 'normal', 'pareto']
+OUTAGE_MODES = ['stall', 'reset']
+PARETO_ALPHA = 2.5
+READ_CHUNK = 64 * 1024
+MAX_PENDING_BYTES = 1024 * 1024      # per direction of a connection; reads pause beyond this
+
+LINK_FIELDS = {'delay_ms', 'jitter_ms', 'distribution', 'loss', 'bandwidth_kbps'}
+
+
+class ProfileError(ValueError):
+    pass
+
+
+@dataclass
+class LinkProfile:
+    delay_ms: float = 0.0
+    jitter_ms: float = 0.0
+    distribution: str = 'constant'
+    loss: float = 0.0                    # probability a segment/datagram is lost
+    bandwidth_kbps: float = 0.0          # 0: unlimited
+
+    def sample_delay(self, rng: random.Random) -> float:
+        """One-way delay in seconds"""
+        if self.distribution == 'uniform':
+            delay = self.delay_ms + rng.uniform(-self.jitter_ms, self.jitter_ms)
+        elif self.distribution == 'normal':
+            delay = rng.gauss(self.delay_ms, self.jitter_ms)
+        elif self.distribution == 'pareto':
+            delay = self.delay_ms + self.jitter_ms * (rng.paretovariate(PARETO_ALPHA) - 1)
+        else:
+            delay = self.delay_ms
+        return max(0.0, delay) / 1000
+
+    def describe(self) -> str:
+        parts = [f"{self.delay_ms:g}ms"]
+        if self.jitter_ms and self.distribution != 'constant':
+            parts.append(f"{self.distribution} jitter {self.jitter_ms:g}ms")
+        if self.loss:
+            parts.append(f"loss {self.loss:.1%}")
+        if self.bandwidth_kbps:
+            parts.append(f"{self.bandwidth_kbps:g}kbps")
+        return ", ".join(parts)
+
+
+@dataclass
+class OutageSchedule:
+    every_s: float
+    duration_s: float
+    start_s: Optional[float] = None      # first outage; defaults to every_s
+    mode: str = 'stall'
+
+    def remaining(self, elapsed: float) -> float:
+        """Seconds left of the outage in progress at elapsed, 0 if the link is up"""
+        start = self.every_s if self.start_s is None else self.start_s
+        if elapsed < start:
+            return 0.0
+        into = (elapsed - start) % self.every_s
+        return self.duration_s - into if into < self.duration_s else 0.0
+
+    def next_start(self, elapsed: float) -> float:
+        start = self.every_s if self.start_s is None else self.start_s
+        if elapsed <= start:
+            return start
+        return start + ((elapsed - start) // self.every_s + 1) * self.every_s
+
+
+@dataclass
+class ImpairmentProfile:
+    name: str = 'clean'
+    description: str = ''
+    uplink: LinkProfile = field(default_factory=LinkProfile)
+    downlink: LinkProfile = field(default_factory=LinkProfile)
+    outages: Optional[OutageSchedule] = None
+    tcp_retransmit_ms: float = 200.0
+
+
+def _number(value, where: str, maximum: Optional[float] = None) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ProfileError(f"{where}: expected a number, got {value!r}")
+    if value < 0 or (maximum is not None and value > maximum):
+        raise ProfileError(f"{where}: must be between 0 and {maximum:g}" if maximum is not None
+                           else f"{where}: must be >= 0")
+    return float(value)
+
+
+def _link_fields(data, where: str) -> dict:
+    if not isinstance(data, dict):
+        raise ProfileError(f"{where}: expected an object")
+    unknown = set(data) - LINK_FIELDS
+    if unknown:
+        raise ProfileError(f"{where}: unknown field(s): {', '.join(sorted(unknown))}")
+    values = {}
+    for key, value in data.items():
+        if key == 'distribution':
+            if value not in DELAY_DISTRIBUTIONS:
+                raise ProfileError(f"{where}.distribution: expected one of {', '.join(DELAY_DISTRIBUTIONS)}, "
+                                   f"got {value!r}")
+            values[key] = value
+        else:
+            values[key] = _number(value, f"{where}.{key}", maximum=1.0 if key == 'loss' else None)
+    return values
+
+
+def _parse_outages(data) -> OutageSchedule:
+    if not isinstance(data, dict):
+        raise ProfileError("outages: expected an object")
+    unknown = set(data) - {'every_s', 'duration_s', 'start_s', 'mode'}
+    if unknown:
+        raise ProfileError(f"outages: unknown field(s): {', '.join(sorted(unknown))}")
+    if 'every_s' not in data or 'duration_s' not in data:
+        raise ProfileError("outages: every_s and duration_s are required")
+    every = _number(data['every_s'], 'outages.every_s')
+    duration = _number(data['duration_s'], 'outages.duration_s')
+    if duration >= every:
+        raise ProfileError("outages.duration_s: must be shorter than every_s")
+    mode = data.get('mode', 'stall')
+    if mode not in OUTAGE_MODES:
+        raise ProfileError(f"outages.mode: expected one of {', '.join(OUTAGE_MODES)}, got {mode!r}")
+    start = _number(data['start_s'], 'outages.start_s') if 'start_s' in data else None
+    return OutageSchedule(every_s=every, duration_s=duration, start_s=start, mode=mode)
+
+
+def parse_profile(data) -> ImpairmentProfile:
+    """Validate a decoded impairment profile"""
+    if not isinstance(data, dict):
+        raise ProfileError("profile: expected an object")
+    unknown = set(data) - {'name', 'description', 'link', 'uplink', 'downlink', 'outages', 'tcp_retransmit_ms'}
+    if unknown:
+        raise ProfileError(f"profile: unknown field(s): {', '.join(sorted(unknown))}")
+    shared = _link_fields(data.get('link', {}), 'link')
+    profile = ImpairmentProfile(
+        name=str(data.get('name', 'profile')),
+        description=str(data.get('description', '')),
+        uplink=LinkProfile(**{**shared, **_link_fields(data.get('uplink', {}), 'uplink')}),
+        downlink=LinkProfile(**{**shared, **_link_fields(data.get('downlink', {}), 'downlink')}),
+        tcp_retransmit_ms=_number(data.get('tcp_retransmit_ms', 200.0), 'tcp_retransmit_ms')
+    )
+    if 'outages' in data:
+        profile.outages = _parse_outages(data['outages'])
+    return profile
+
+
+def load_profile(path: str) -> ImpairmentProfile:
+    """Load and validate a profile file"""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except OSError as e:
+        raise ProfileError(f"{path}: {e.strerror}")
+    except json.JSONDecodeError as e:
+        raise ProfileError(f"{path}: invalid JSON at line {e.lineno} column {e.colno}: {e.msg}")
+    return parse_profile(data)
+
+
+def parse_endpoint(address: str, default_port: int) -> Tuple[str, int]:
+    """http(s)://HOST:PORT, HOST:PORT, :PORT or PORT"""
+    if '://' in address:
+        url = urlparse(address)
+        return url.hostname, url.port or (443 if url.scheme in ('https', 'wss') else 80)
+    host, _, port = address.rpartition(':')
+    return host or '127.0.0.1', int(port or default_port)
+
+
+class LinkStats:
+    """What one direction of the proxy did to the traffic crossing it"""
+
+    __slots__ = ('segments', 'bytes', 'lost', 'outage_dropped', 'delay')
+
+    def __init__(self):
+        self.segments = 0
+        self.bytes = 0
+        self.lost = 0                    # TCP: retransmitted, UDP: dropped
+        self.outage_dropped = 0          # UDP datagrams sent into an outage
+        self.delay = LatencyHistogram()  # added delay, ms
+
+    def summary(self) -> dict:
+        return {
+            'segments': self.segments,
+            'bytes': self.bytes,
+            'lost': self.lost,
+            'outage_dropped': self.outage_dropped,
+            'added_delay_ms': self.delay.summary()
+        }
+
+
+class LinkShaper:
+    """Arrival times for data crossing one direction of one impaired connection"""
+
+    def __init__(self, link: LinkProfile, rng: random.Random, stats: LinkStats, ordered: bool,
+                 retransmit_s: float = 0.0):
+        self.link = link
+        self.rng = rng
+        self.stats = stats
+        self.ordered = ordered
+        self.retransmit_s = retransmit_s
+        self.link_free = 0.0
+        self.last_arrival = 0.0
+
+    def schedule(self, nbytes: int, now: float) -> Optional[float]:
+        """Loop time nbytes sent at now arrive, None if lost (unordered links only)"""
+        self.stats.segments += 1
+        self.stats.bytes += nbytes
+        departure = now
+        if self.link.bandwidth_kbps:
+            departure = max(now, self.link_free) + nbytes * 8 / (self.link.bandwidth_kbps * 1000)
+            self.link_free = departure
+        arrival = departure + self.link.sample_delay(self.rng)
+        if self.link.loss and self.rng.random() < self.link.loss:
+            self.stats.lost += 1
+            if not self.ordered:
+                return None
+            arrival += self.retransmit_s
+        if self.ordered:
+            # TCP delivers in order: a late segment holds up the ones behind it
+            arrival = max(arrival, self.last_arrival)
+            self.last_arrival = arrival
+        self.stats.delay.record((arrival - now) * 1000)
+        return arrival
+
+
+class _Pipe:
+    """One direction of a proxied TCP connection"""
+
+    def __init__(self, proxy: 'ImpairmentProxy', reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                 shaper: LinkShaper):
+        self.proxy = proxy
+        self.reader = reader
+        self.writer = writer
+        self.shaper = shaper
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.pending = 0
+        self.space = asyncio.Event()
+        self.space.set()
+
+    async def run(self):
+        deliver = asyncio.create_task(self._deliver())
+        try:
+            await self._read()
+            await deliver
+        finally:
+            deliver.cancel()
+
+    async def _read(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Back-pressure: stop reading while too much is in flight so the sender's writes block
+            await self.space.wait()
+            data = await self.reader.read(READ_CHUNK)
+            if not data:
+                self.queue.put_nowait((0.0, b''))
+                return
+            self.queue.put_nowait((self.shaper.schedule(len(data), loop.time()), data))
+            self.pending += len(data)
+            if self.pending > MAX_PENDING_BYTES:
+                self.space.clear()
+
+    async def _deliver(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            arrival, data = await self.queue.get()
+            if not data:
+                if self.writer.can_write_eof():
+                    self.writer.write_eof()
+                return
+            await asyncio.sleep(max(0.0, arrival - loop.time()))
+            await self.proxy.link_up()
+            self.writer.write(data)
+            await self.writer.drain()
+            self.pending -= len(data)
+            if self.pending <= MAX_PENDING_BYTES:
+                self.space.set()
+
+
+class _UdpUpstream(asyncio.DatagramProtocol):
+    """Relay socket of one UDP client towards the upstream endpoint"""
+
+    def __init__(self, relay: 'UdpRelay', client: Tuple[str, int]):
+        self.relay = relay
+        self.client = client
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.backlog = []
+        self.uplink = LinkShaper(relay.proxy.profile.uplink, relay.proxy.rng, relay.proxy.udp_stats['uplink'],
+                                 ordered=False)
+        self.downlink = LinkShaper(relay.proxy.profile.downlink, relay.proxy.rng,
+                                   relay.proxy.udp_stats['downlink'], ordered=False)
+
+    def connection_made(self, transport):
+        self.transport = transport
+        for data in self.backlog:
+            transport.sendto(data)
+        self.backlog = []
+
+    def datagram_received(self, data, addr):
+        self.relay.forward(self.downlink, self.relay.send_to_client, data, self.client)
+
+    def send(self, data: bytes):
+        if self.transport is None:
+            self.backlog.append(data)
+        else:
+            self.transport.sendto(data)
+
+
+class UdpRelay(asyncio.DatagramProtocol):
+    """UDP relay with one upstream socket per client address"""
+
+    def __init__(self, proxy: 'ImpairmentProxy', upstream: Tuple[str, int]):
+        self.proxy = proxy
+        self.upstream = upstream
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.sessions: Dict[Tuple[str, int], _UdpUpstream] = {}
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        session = self.sessions.get(addr)
+        if session is None:
+            session = self.sessions[addr] = _UdpUpstream(self, addr)
+            asyncio.ensure_future(asyncio.get_running_loop().create_datagram_endpoint(
+                lambda: session, remote_addr=self.upstream))
+        self.forward(session.uplink, session.send, data)
+
+    def forward(self, shaper: LinkShaper, send, data: bytes, *args):
+        loop = asyncio.get_running_loop()
+        arrival = shaper.schedule(len(data), loop.time())
+        if arrival is not None:
+            loop.call_at(arrival, self._arrive, shaper.stats, send, data, *args)
+
+    def _arrive(self, stats: LinkStats, send, data: bytes, *args):
+        if self.proxy.outage_remaining() > 0:
+            stats.outage_dropped += 1
+            return
+        send(data, *args)
+
+    def send_to_client(self, data: bytes, client: Tuple[str, int]):
+        if self.transport is not None:
+            self.transport.sendto(data, client)
+
+    def close(self):
+        for session in self.sessions.values():
+            if session.transport is not None:
+                session.transport.close()
+        if self.transport is not None:
+            self.transport.close()
+
+
+class ImpairmentProxy:
+    """TCP proxy (and optional UDP relay) applying an ImpairmentProfile"""
+
+    def __init__(self, profile: ImpairmentProfile, upstream: Tuple[str, int],
+                 listen: Tuple[str, int] = ('127.0.0.1', DEFAULT_LISTEN_PORT),
+                 udp_listen: Optional[Tuple[str, int]] = None, udp_upstream: Optional[Tuple[str, int]] = None,
+                 seed: Optional[int] = None):
+        self.profile = profile
+        self.upstream = upstream
+        self.listen = listen
+        self.udp_listen = udp_listen
+        self.udp_upstream = udp_upstream
+        self.rng = random.Random(seed)
+        self.tcp_stats = {'uplink': LinkStats(), 'downlink': LinkStats()}
+        self.udp_stats = {'uplink': LinkStats(), 'downlink': LinkStats()}
+        self.connections: Set[Tuple[asyncio.StreamWriter, asyncio.StreamWriter]] = set()
+        self.connections_opened = 0
+        self.connections_reset = 0
+        self.connections_refused = 0
+        self.upstream_errors = 0
+        self.outages = 0
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.udp_relay: Optional[UdpRelay] = None
+        self.port: Optional[int] = None
+        self.started = 0.0
+        self.started_at = 0.0
+        self.outage_task: Optional[asyncio.Task] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.listen[0]}:{self.port}"
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self.started = loop.time()
+        self.started_at = time.time()
+        self.server = await asyncio.start_server(self._handle_client, *self.listen)
+        self.port = self.server.sockets[0].getsockname()[1]
+        logger.info(f"🌐 Impairment proxy {self.url} -> {self.upstream[0]}:{self.upstream[1]} "
+                    f"(profile {self.profile.name})")
+        if self.udp_listen and self.udp_upstream:
+            _, self.udp_relay = await loop.create_datagram_endpoint(
+                lambda: UdpRelay(self, self.udp_upstream), local_addr=self.udp_listen)
+            logger.info(f"🌐 UDP relay {self.udp_listen[0]}:{self.udp_listen[1]} -> "
+                        f"{self.udp_upstream[0]}:{self.udp_upstream[1]}")
+        if self.profile.outages:
+            self.outage_task = asyncio.create_task(self._outage_loop())
+        return self
+
+    async def stop(self):
+        if self.outage_task:
+            self.outage_task.cancel()
+            self.outage_task = None
+        if self.server:
+            self.server.close()
+            self._abort_connections()
+            await self.server.wait_closed()
+            self.server = None
+        if self.udp_relay:
+            self.udp_relay.close()
+            self.udp_relay = None
+
+    async def __aenter__(self) -> 'ImpairmentProxy':
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def outage_remaining(self) -> float:
+        if not self.profile.outages:
+            return 0.0
+        return self.profile.outages.remaining(asyncio.get_running_loop().time() - self.started)
+
+    async def link_up(self):
+        """Wait out the outage in progress, if any"""
+        remaining = self.outage_remaining()
+        while remaining > 0:
+            await asyncio.sleep(remaining)
+            remaining = self.outage_remaining()
+
+    def _abort_connections(self):
+        for client_writer, upstream_writer in list(self.connections):
+            client_writer.transport.abort()
+            upstream_writer.transport.abort()
+        self.connections.clear()
+
+    async def _outage_loop(self):
+        outages = self.profile.outages
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(outages.next_start(loop.time() - self.started) - (loop.time() - self.started))
+            self.outages += 1
+            if outages.mode == 'reset':
+                self.connections_reset += len(self.connections)
+                logger.warning(f"🌩️ Outage {self.outages}: link down for {outages.duration_s:g}s, "
+                               f"resetting {len(self.connections)} connection(s)")
+                self._abort_connections()
+            else:
+                logger.warning(f"🌩️ Outage {self.outages}: link stalled for {outages.duration_s:g}s")
+            await asyncio.sleep(outages.duration_s)
+            logger.info(f"🌤️ Outage {self.outages} over")
+
+    async def _handle_client(self, client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter):
+        if self.profile.outages and self.profile.outages.mode == 'reset' and self.outage_remaining() > 0:
+            self.connections_refused += 1
+            client_writer.transport.abort()
+            return
+        try:
+            upstream_reader, upstream_writer = await asyncio.open_connection(*self.upstream)
+        except OSError as e:
+            self.upstream_errors += 1
+            logger.warning(f"⚠️ Upstream {self.upstream[0]}:{self.upstream[1]} unreachable: {e}")
+            client_writer.transport.abort()
+            return
+
+        self.connections_opened += 1
+        connection = (client_writer, upstream_writer)
+        self.connections.add(connection)
+        retransmit_s = self.profile.tcp_retransmit_ms / 1000
+        uplink = _Pipe(self, client_reader, upstream_writer,
+                       LinkShaper(self.profile.uplink, self.rng, self.tcp_stats['uplink'], True, retransmit_s))
+        downlink = _Pipe(self, upstream_reader, client_writer,
+                         LinkShaper(self.profile.downlink, self.rng, self.tcp_stats['downlink'], True, retransmit_s))
+        try:
+            results = await asyncio.gather(uplink.run(), downlink.run(), return_exceptions=True)
+            if any(isinstance(r, Exception) for r in results):
+                client_writer.transport.abort()
+                upstream_writer.transport.abort()
+        finally:
+            self.connections.discard(connection)
+            client_writer.close()
+            upstream_writer.close()
+
+    def summary(self) -> dict:
+        return {
+            'profile': self.profile.name,
+            'connections_opened': self.connections_opened,
+            'connections_active': len(self.connections),
+            'connections_reset': self.connections_reset,
+            'connections_refused': self.connections_refused,
+            'upstream_errors': self.upstream_errors,
+            'outages': self.outages,
+            'tcp': {direction: stats.summary() for direction, stats in self.tcp_stats.items()},
+            'udp': {direction: stats.summary() for direction, stats in self.udp_stats.items()}
+        }
+
+    def print_report(self):
+        profile = self.profile
+        print("\n" + "=" * 60)
+        print("🌐 IMPAIRMENT PROXY REPORT")
+        print("=" * 60)
+        print(f"Profile: {profile.name}" + (f" - {profile.description}" if profile.description else ""))
+        print(f"Uplink: {profile.uplink.describe()}, downlink: {profile.downlink.describe()}")
+        if profile.outages:
+            print(f"Outages: {self.outages} ({profile.outages.duration_s:g}s every {profile.outages.every_s:g}s, "
+                  f"{profile.outages.mode})")
+        print(f"Uptime: {time.time() - self.started_at:.1f}s, TCP connections: {self.connections_opened} opened, "
+              f"{len(self.connections)} active, {self.connections_reset} reset, {self.connections_refused} refused, "
+              f"{self.upstream_errors} upstream errors")
+
+        print(f"\n{'link':<14} {'segments':>9} {'kB':>10} {'lost':>7} {'outage':>7} "
+              f"{'delay P50':>10} {'P99':>9} {'max':>9}")
+        print("-" * 80)
+        for protocol, link_stats in (('tcp', self.tcp_stats), ('udp', self.udp_stats)):
+            for direction, stats in link_stats.items():
+                if not stats.segments:
+                    continue
+                delay = stats.delay.summary()
+                p50 = f"{delay['p50_ms']:.1f}ms" if delay['count'] else '-'
+                p99 = f"{delay['p99_ms']:.1f}ms" if delay['count'] else '-'
+                peak = f"{delay['max_ms']:.1f}ms" if delay['count'] else '-'
+                print(f"{protocol + ' ' + direction:<14} {stats.segments:>9,} {stats.bytes / 1024:>10,.1f} "
+                      f"{stats.lost:>7,} {stats.outage_dropped:>7,} {p50:>10} {p99:>9} {peak:>9}")
+        print("=" * 60)
+
+
+async def serve(proxy: ImpairmentProxy, report_interval: float = 0.0):
+    await proxy.start()
+    try:
+        while True:
+            await asyncio.sleep(report_interval or 3600)
+            if report_interval:
+                proxy.print_report()
+    finally:
+        await proxy.stop()
+        proxy.print_report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Network impairment proxy between simulators and server')
+    parser.add_argument('--upstream', default='http://65.1.63.189:4005',
+                        help='Server to forward to, URL or HOST:PORT (default: http://65.1.63.189:4005)')
+    parser.add_argument('--listen', default=f'127.0.0.1:{DEFAULT_LISTEN_PORT}',
+                        help=f'Proxy address, point --server here (default: 127.0.0.1:{DEFAULT_LISTEN_PORT})')
+    parser.add_argument('--profile', help='Impairment profile JSON file (default: clean pass-through)')
+    parser.add_argument('--udp-listen', help='UDP relay address HOST:PORT (default: no UDP relay)')
+    parser.add_argument('--udp-upstream', help='UDP endpoint the relay forwards to, HOST:PORT')
+    parser.add_argument('--seed', type=int, help='Seed for delay and loss sampling (default: random)')
+    parser.add_argument('--report-interval', type=float, default=0.0,
+                        help='Print the impairment report every N seconds (default: only on exit)')
+    parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], default='INFO',
+                        help='Logging level (default: INFO)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=getattr(logging, args.log_level),
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if bool(args.udp_listen) != bool(args.udp_upstream):
+        parser.error('--udp-listen and --udp-upstream go together')
+    try:
+        profile = load_profile(args.profile) if args.profile else ImpairmentProfile()
+    except ProfileError as e:
+        logger.error(f"❌ Invalid profile: {e}")
+        raise SystemExit(2)
+
+    proxy = ImpairmentProxy(
+        profile,
+        parse_endpoint(args.upstream, 4005),
+        listen=parse_endpoint(args.listen, DEFAULT_LISTEN_PORT),
+        udp_listen=parse_endpoint(args.udp_listen, 0) if args.udp_listen else None,
+        udp_upstream=parse_endpoint(args.udp_upstream, 0) if args.udp_upstream else None,
+        seed=args.seed
+    )
+    try:
+        asyncio.run(serve(proxy, args.report_interval))
+    except KeyboardInterrupt:
+        logger.info("🛑 Impairment proxy stopped")
+
+
+if __name__ == "__main__":
+    main()
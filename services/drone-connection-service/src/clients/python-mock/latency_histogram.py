@@ -0,0 +1,160 @@
+# services/drone-connection-service/src/clients/python-mock/latency_histogram.py
+"""
+Compact log-linear latency histogram (HDR-style bucketing)
+
+Values are recorded in milliseconds and stored as microsecond buckets with
+~1.6% relative precision, so memory stays bounded no matter how many samples
+are recorded and histograms from different drones/processes can be merged.
+"""
+import math
+from typing import Dict, List, Optional
+
+SUB_BUCKET_BITS = 7
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS          # 128 exact buckets below 128us
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT >> 1          # 64 buckets per power of two above
+
+
+def bucket_index(value_us: int) -> int:
+    """Map a microsecond value to its bucket index"""
+    if value_us < SUB_BUCKET_COUNT:
+        return max(0, value_us)
+    shift = value_us.bit_length() - SUB_BUCKET_BITS
+    return SUB_BUCKET_COUNT + (shift - 1) * SUB_BUCKET_HALF + ((value_us >> shift) - SUB_BUCKET_HALF)
+
+
+def bucket_bounds(index: int) -> tuple:
+    """Return the [low, high) microsecond range covered by a bucket"""
+    if index < SUB_BUCKET_COUNT:
+        return index, index + 1
+    offset = index - SUB_BUCKET_COUNT
+    shift = offset // SUB_BUCKET_HALF + 1
+    sub = offset % SUB_BUCKET_HALF + SUB_BUCKET_HALF
+    return sub << shift, (sub + 1) << shift
+
+
+class LatencyHistogram:
+    """Mergeable latency histogram with percentile queries"""
+
+    __slots__ = ('counts', 'count', 'total_ms', 'min_ms', 'max_ms')
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = float('inf')
+        self.max_ms = 0.0
+
+    def record(self, value_ms: float, count: int = 1):
+        """Record a latency sample in milliseconds"""
+        if value_ms < 0:
+            value_ms = 0.0
+        index = bucket_index(int(value_ms * 1000))
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.total_ms += value_ms * count
+        if value_ms < self.min_ms:
+            self.min_ms = value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def record_corrected(self, value_ms: float, expected_interval_ms: float, count: int = 1):
+        """Record a sample from a blocking sender, back-filling the sends a stall suppressed
+
+        A sender that waits for each response before sending the next request
+        never records the samples that should have gone out while it waited. As in
+        HdrHistogram's recordValueWithExpectedInterval, a value longer than the
+        expected interval also records value - k * interval for every missed slot.
+        """
+        self.record(value_ms, count)
+        if expected_interval_ms <= 0:
+            return
+        missing_ms = value_ms - expected_interval_ms
+        while missing_ms >= expected_interval_ms:
+            self.record(missing_ms, count)
+            missing_ms -= expected_interval_ms
+
+    def merge(self, other: 'LatencyHistogram'):
+        """Merge another histogram into this one"""
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total_ms += other.total_ms
+        if other.count:
+            self.min_ms = min(self.min_ms, other.min_ms)
+            self.max_ms = max(self.max_ms, other.max_ms)
+
+    def reset(self):
+        """Clear all recorded samples"""
+        self.counts.clear()
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = float('inf')
+        self.max_ms = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Calculate percentile in milliseconds"""
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(self.count * p / 100.0))
+        cumulative = 0
+        for index in sorted(self.counts):
+            cumulative += self.counts[index]
+            if cumulative >= target:
+                low, high = bucket_bounds(index)
+                value_ms = (low + high - 1) / 2000.0
+                return min(max(value_ms, self.min_ms), self.max_ms)
+        return self.max_ms
+
+    def percentiles(self, ps: Optional[List[float]] = None) -> Dict[str, float]:
+        """Calculate a set of percentiles keyed as p50/p95/p99..."""
+        ps = ps or [50, 95, 99, 99.9]
+        return {f"p{p:g}": self.percentile(p) for p in ps}
+
+    def buckets(self, edges_ms: List[float]) -> List[int]:
+        """Count samples falling into [edge_i, edge_i+1) ranges, last bucket open-ended"""
+        edges_us = [int(e * 1000) for e in edges_ms]
+        result = [0] * len(edges_us)
+        for index, count in self.counts.items():
+            low, _ = bucket_bounds(index)
+            slot = 0
+            for i, edge in enumerate(edges_us):
+                if low >= edge:
+                    slot = i
+            result[slot] += count
+        return result
+
+    def summary(self) -> dict:
+        """Compact summary for reports and JSON export"""
+        return {
+            'count': self.count,
+            'min_ms': self.min_ms if self.count else 0.0,
+            'avg_ms': self.mean,
+            'max_ms': self.max_ms,
+            **{f"{k}_ms": v for k, v in self.percentiles().items()}
+        }
+
+    def to_dict(self) -> dict:
+        """Serialize to a JSON-friendly sketch"""
+        return {
+            'counts': {str(k): v for k, v in self.counts.items()},
+            'count': self.count,
+            'total_ms': self.total_ms,
+            'min_ms': self.min_ms if self.count else None,
+            'max_ms': self.max_ms
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LatencyHistogram':
+        """Rebuild a histogram from to_dict() output"""
+        histogram = cls()
+        histogram.counts = {int(k): v for k, v in data.get('counts', {}).items()}
+        histogram.count = data.get('count', 0)
+        histogram.total_ms = data.get('total_ms', 0.0)
+        min_ms = data.get('min_ms')
+        histogram.min_ms = float('inf') if min_ms is None else min_ms
+        histogram.max_ms = data.get('max_ms', 0.0)
+        return histogram
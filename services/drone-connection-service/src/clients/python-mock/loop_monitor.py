@@ -0,0 +1,245 @@
+# services/drone-connection-service/src/clients/python-mock/loop_monitor.py
+"""
+Event-loop lag monitor
+
+Every simulator measures latency on the same asyncio loop that generates
+frames, compresses them and formats logs. When that loop stalls, the stall
+shows up as "network latency". This monitor runs a high-frequency timer,
+records how late each wake-up was, flags measurement windows where lag
+exceeded a threshold, and can attribute stall time to any [send, receive]
+interval so reports can split simulator-induced latency from network/server
+latency.
+"""
+import asyncio
+import bisect
+import logging
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from typing import Deque, List, Optional
+
+from latency_histogram import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+SLOW_CALLBACK_PATTERN = re.compile(r'Executing (?P<handle>.+) took (?P<seconds>[\d.]+) seconds')
+
+
+@dataclass
+class LagWindow:
+    start_timestamp: float
+    end_timestamp: float
+    samples: int
+    max_lag_ms: float
+    total_lag_ms: float
+    slow_callbacks: List[str] = field(default_factory=list)
+
+
+class _SlowCallbackHandler(logging.Handler):
+    """Capture asyncio debug-mode 'Executing <Handle> took N seconds' warnings"""
+
+    def __init__(self, monitor: 'EventLoopLagMonitor'):
+        super().__init__(level=logging.WARNING)
+        self.monitor = monitor
+
+    def emit(self, record: logging.LogRecord):
+        match = SLOW_CALLBACK_PATTERN.search(record.getMessage())
+        if match:
+            self.monitor.record_slow_callback(match.group('handle'), float(match.group('seconds')) * 1000)
+
+
+class EventLoopLagMonitor:
+    def __init__(self, interval_ms: float = 5.0, window_seconds: float = 1.0,
+                 lag_threshold_ms: float = 50.0, detect_slow_callbacks: bool = False,
+                 slow_callback_ms: float = 20.0, max_stall_samples: int = 200000,
+                 max_flagged_windows: int = 1000):
+        self.interval = interval_ms / 1000.0
+        self.window_seconds = window_seconds
+        self.lag_threshold_ms = lag_threshold_ms
+        self.detect_slow_callbacks = detect_slow_callbacks
+        self.slow_callback_ms = slow_callback_ms
+        self.max_stall_samples = max_stall_samples
+
+        self.histogram = LatencyHistogram()
+        self.flagged_windows: Deque[LagWindow] = deque(maxlen=max_flagged_windows)
+        self.windows_total = 0
+        self.slow_callback_count = 0
+        self.slow_callback_histogram = LatencyHistogram()
+
+        # Wall-clock wake-up times and the cumulative lag before each one, for
+        # attributing stalls to latency measurements (time.time() timestamps)
+        self._stall_times: List[float] = []
+        self._stall_cumsum: List[float] = []
+        self._stall_total_ms = 0.0
+
+        self._window: Optional[LagWindow] = None
+        self._task: Optional[asyncio.Task] = None
+        self._slow_callback_handler: Optional[_SlowCallbackHandler] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.running = False
+
+    def start(self):
+        """Start the monitor task on the running loop (idempotent)"""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self.running = True
+
+        if self.detect_slow_callbacks:
+            self._loop.set_debug(True)
+            self._loop.slow_callback_duration = self.slow_callback_ms / 1000.0
+            self._slow_callback_handler = _SlowCallbackHandler(self)
+            logging.getLogger('asyncio').addHandler(self._slow_callback_handler)
+
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"⏱️ Event-loop lag monitor started "
+                    f"(interval: {self.interval * 1000:.1f}ms, threshold: {self.lag_threshold_ms:.0f}ms)")
+
+    async def stop(self):
+        """Stop the monitor task and close the current window"""
+        if not self.running:
+            return
+        self.running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._close_window(time.time())
+        if self._slow_callback_handler:
+            logging.getLogger('asyncio').removeHandler(self._slow_callback_handler)
+            self._slow_callback_handler = None
+
+    async def _run(self):
+        interval = self.interval
+        expected = time.perf_counter() + interval
+        while self.running:
+            await asyncio.sleep(interval)
+            now = time.perf_counter()
+            lag_ms = max(0.0, (now - expected) * 1000)
+            self.record_lag(lag_ms, time.time())
+            expected = now + interval
+
+    def record_lag(self, lag_ms: float, wall_time: float):
+        """Record one wake-up lag sample"""
+        self.histogram.record(lag_ms)
+
+        window = self._window
+        if window is None or wall_time - window.start_timestamp >= self.window_seconds:
+            self._close_window(wall_time)
+            window = self._window = LagWindow(wall_time, wall_time, 0, 0.0, 0.0)
+        window.samples += 1
+        window.total_lag_ms += lag_ms
+        window.end_timestamp = wall_time
+        if lag_ms > window.max_lag_ms:
+            window.max_lag_ms = lag_ms
+
+        if lag_ms > 0.5:
+            self._stall_times.append(wall_time)
+            self._stall_cumsum.append(self._stall_total_ms)
+            self._stall_total_ms += lag_ms
+            if len(self._stall_times) > self.max_stall_samples:
+                drop = self.max_stall_samples // 2
+                del self._stall_times[:drop]
+                del self._stall_cumsum[:drop]
+
+        if not self.detect_slow_callbacks and lag_ms >= self.slow_callback_ms:
+            # Without debug mode a late wake-up is the best evidence of a slow callback
+            self.slow_callback_count += 1
+            self.slow_callback_histogram.record(lag_ms)
+
+    def record_slow_callback(self, handle: str, duration_ms: float):
+        """Record a slow callback reported by asyncio debug mode"""
+        self.slow_callback_count += 1
+        self.slow_callback_histogram.record(duration_ms)
+        if self._window is not None and len(self._window.slow_callbacks) < 5:
+            self._window.slow_callbacks.append(f"{handle[:120]} ({duration_ms:.1f}ms)")
+
+    def _close_window(self, wall_time: float):
+        window = self._window
+        if window is None:
+            return
+        self.windows_total += 1
+        if window.max_lag_ms >= self.lag_threshold_ms:
+            self.flagged_windows.append(window)
+            logger.warning(f"⚠️ Event-loop stall: {window.max_lag_ms:.1f}ms max lag "
+                           f"({window.total_lag_ms:.1f}ms total) in {self.window_seconds:.1f}s window")
+        self._window = None
+
+    def stall_ms_between(self, start_timestamp: float, end_timestamp: float) -> float:
+        """Total loop lag observed between two time.time() timestamps
+
+        A wake-up at time t that was L ms late means the loop was blocked for
+        (t - L, t), so summing lag for wake-ups inside the interval gives the
+        share of that interval the simulator itself spent stalled.
+        """
+        if end_timestamp <= start_timestamp or not self._stall_times:
+            return 0.0
+        lo = bisect.bisect_left(self._stall_times, start_timestamp)
+        hi = bisect.bisect_right(self._stall_times, end_timestamp)
+        if hi <= lo:
+            return 0.0
+        after = self._stall_cumsum[hi] if hi < len(self._stall_cumsum) else self._stall_total_ms
+        stalled_ms = after - self._stall_cumsum[lo]
+        return min(stalled_ms, (end_timestamp - start_timestamp) * 1000)
+
+    def summary(self) -> dict:
+        """Lag statistics for reports and JSON export"""
+        return {
+            'interval_ms': self.interval * 1000,
+            'lag_threshold_ms': self.lag_threshold_ms,
+            'lag': self.histogram.summary(),
+            'windows_total': self.windows_total,
+            'windows_flagged': len(self.flagged_windows),
+            'slow_callbacks': self.slow_callback_count,
+            'slow_callback_max_ms': self.slow_callback_histogram.max_ms,
+            'total_stall_ms': self._stall_total_ms
+        }
+
+    def export_state(self) -> dict:
+        """Mergeable snapshot of the lag statistics (for sharded fleet workers)"""
+        return {
+            'histogram': self.histogram.to_dict(),
+            'windows_total': self.windows_total,
+            'flagged_windows': [asdict(w) for w in self.flagged_windows],
+            'slow_callback_count': self.slow_callback_count,
+            'slow_callback_histogram': self.slow_callback_histogram.to_dict(),
+            'total_stall_ms': self._stall_total_ms
+        }
+
+    def merge_state(self, state: dict):
+        """Add another monitor's export_state() into this one"""
+        self.histogram.merge(LatencyHistogram.from_dict(state['histogram']))
+        self.windows_total += state['windows_total']
+        self.flagged_windows.extend(LagWindow(**w) for w in state['flagged_windows'])
+        self.slow_callback_count += state['slow_callback_count']
+        self.slow_callback_histogram.merge(LatencyHistogram.from_dict(state['slow_callback_histogram']))
+        self._stall_total_ms += state['total_stall_ms']
+
+    def print_report(self):
+        """Print event-loop lag report"""
+        self._close_window(time.time())
+        lag = self.histogram
+        print(f"\n⏱️ EVENT-LOOP LAG (simulator-induced delay)")
+        print("-" * 50)
+        if not lag.count:
+            print("  No loop lag samples collected")
+            return
+        print(f"  Samples: {lag.count} @ {self.interval * 1000:.1f}ms interval")
+        print(f"  Avg lag: {lag.mean:.2f}ms")
+        print(f"  P50: {lag.percentile(50):.2f}ms  P95: {lag.percentile(95):.2f}ms  "
+              f"P99: {lag.percentile(99):.2f}ms  Max: {lag.max_ms:.2f}ms")
+        edges = [0, 1, 5, 20, 50, 100]
+        labels = ['<1ms', '1-5ms', '5-20ms', '20-50ms', '50-100ms', '>100ms']
+        for label, count in zip(labels, lag.buckets(edges)):
+            print(f"    {label:<9} {count} ({count / lag.count * 100:.1f}%)")
+        print(f"  Stall windows (> {self.lag_threshold_ms:.0f}ms): "
+              f"{len(self.flagged_windows)}/{self.windows_total}")
+        print(f"  Slow callbacks (>= {self.slow_callback_ms:.0f}ms): {self.slow_callback_count}")
+        for window in list(self.flagged_windows)[-5:]:
+            print(f"    {time.strftime('%H:%M:%S', time.localtime(window.start_timestamp))} "
+                  f"max {window.max_lag_ms:.1f}ms, total {window.total_lag_ms:.1f}ms")
+            for callback in window.slow_callbacks:
+                print(f"      ↳ {callback}")
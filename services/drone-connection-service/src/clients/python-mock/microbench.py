@@ -0,0 +1,480 @@
+# services/drone-connection-service/src/clients/python-mock/microbench.py
+"""
+Microbenchmarks for the simulator hot paths
+
+run_latency_test.sh measures end to end against a live server; these time
+the client-side work on its own, with no server or network:
+
+  frame.*      the three camera frame generators (JSON+base64 camera drone,
+               optimized binary, WebRTC binary)
+  compress.*   gzip level 6 over a GOP of binary frames, base64 fallback
+  serialize.*  Socket.IO packet encoding of a telemetry message
+  stats.*      percentile(), LatencyHistogram and the FleetStatsEngine
+  report.*     the full fleet latency report (stdout discarded)
+  emit.*       ProductionMockDrone.send_telemetry into an in-memory
+               engine.io sink, with and without send-path timing
+
+Each benchmark is calibrated to --min-time per round and reports the median
+and fastest of --rounds rounds as ns per operation. Results are written as
+JSON together with machine and package info. compare flags a benchmark when
+its fastest round got slower than the baseline's (the fastest round is the
+least disturbed by other load on the machine) by more than --tolerance and
+by more than the round-to-round spread of either run, (max - min) / min, so
+a slowdown the rounds already vary by is reported as noise instead:
+
+  python microbench.py run --output results.json
+  python microbench.py compare baselines/microbench.json results.json
+  python microbench.py run --filter frame compress --compare baselines/microbench.json
+
+Benchmarks whose module cannot be imported here (WebRTC needs aiortc and
+av) are recorded as skipped. Only compare results from the same machine;
+compare warns when the machine info (CPU count included) or the package
+versions differ from the baseline's. baselines/microbench.json is a
+reference run from one development machine (1 CPU, with newer
+python-socketio and aiohttp than requirements.txt pins) for before/after
+comparisons, not a CI gate: record a fresh baseline on the machine you
+compare on.
+"""
+import argparse
+import asyncio
+import base64
+import contextlib
+import gc
+import gzip
+import io
+import json
+import logging
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'microbench.json')
+DEFAULT_TOLERANCE = 0.15
+MACHINE_KEYS = ['python', 'implementation', 'machine', 'processor', 'cpu_count']
+PACKAGES = ['python-socketio', 'python-engineio', 'numpy', 'aiohttp']
+SEED = 42
+
+
+@dataclass
+class Microbenchmark:
+    name: str
+    setup: Callable[[], Callable]        # returns the operation to time
+    is_async: bool = False
+    batch: int = 1                       # operations per call; results are per operation
+
+
+class _MemorySink:
+    """engine.io client stand-in that counts the encoded packets it is sent"""
+
+    def __init__(self):
+        self.packets = 0
+        self.bytes = 0
+
+    async def send(self, data):
+        self.packets += 1
+        self.bytes += len(data)
+
+
+def _config(module, drone_id: str):
+    return module.DroneConfig(
+        drone_id=drone_id,
+        model='FlyOS_MQ7_Bench',
+        base_lat=18.5204,
+        base_lng=73.8567,
+        jetson_serial='JETSON-BENCH-0001',
+        capabilities=['telemetry', 'camera']
+    )
+
+
+def _camera_drone():
+    import drone_simulator_prod_with_camera as module
+    return module.ProductionMockDroneWithCamera(_config(module, 'bench-camera'), 'http://127.0.0.1:9')
+
+
+def _optimized_drone():
+    import drone_simulator_optimized as module
+    return module.OptimizedProductionDrone(_config(module, 'bench-optimized'), 'http://127.0.0.1:9')
+
+
+def _binary_gop() -> List[bytes]:
+    """One group of pictures (an I-frame and 29 P-frames) from the optimized generator"""
+    drone = _optimized_drone()
+    frames = []
+    for _ in range(30):
+        frames.append(drone.generate_realistic_binary_frame('front'))
+        drone.camera_frame_counter['front'] += 1
+    return frames
+
+
+def _cycle(items: list) -> Callable:
+    """Callable returning the items in turn, cheap enough not to skew the timing"""
+    state = {'i': 0}
+
+    def next_item():
+        state['i'] = (state['i'] + 1) % len(items)
+        return items[state['i']]
+    return next_item
+
+
+def _production_simulator(num_drones: int):
+    from multi_drone_prod import MultiDroneProductionLatencySimulator
+    return MultiDroneProductionLatencySimulator('http://127.0.0.1:9', num_drones)
+
+
+# Setups: each returns the operation timed
+
+def bench_frame_camera_json():
+    drone = _camera_drone()
+    return lambda: drone.generate_professional_frame('front')
+
+
+def bench_frame_optimized_binary():
+    drone = _optimized_drone()
+
+    def op():
+        # A whole GOP per call so every round has the same I/P-frame mix
+        for _ in range(30):
+            drone.camera_frame_counter['front'] += 1
+            drone.generate_realistic_binary_frame('front')
+    return op
+
+
+def bench_frame_webrtc_binary():
+    import drone_simulator_prod_with_webrtc as module
+    drone = module.ProductionWebRTCDrone(_config(module, 'bench-webrtc'), 'http://127.0.0.1:9')
+    return lambda: drone.generate_binary_camera_frame('front')
+
+
+def bench_compress_gzip():
+    frame = _cycle(_binary_gop())
+    return lambda: gzip.compress(frame(), compresslevel=6)
+
+
+def bench_compress_base64():
+    frame = _cycle([gzip.compress(f, compresslevel=6) for f in _binary_gop()])
+    return lambda: base64.b64encode(frame()).decode()
+
+
+def bench_serialize_telemetry():
+    from socketio import packet
+    drone = _production_simulator(1).create_drones()[0]
+    payload = drone.state.snapshot()
+    payload.update({'timestamp': time.time() * 1000, 'jetsonTimestamp': time.time() * 1000,
+                    'droneType': 'REAL', 'sessionId': 'bench-session', 'sequence_id': 1})
+    return lambda: packet.Packet(packet.EVENT, namespace='/', data=['telemetry_real', payload]).encode()
+
+
+def bench_stats_percentile():
+    simulator = _production_simulator(1)
+    rng = random.Random(SEED)
+    data = [rng.lognormvariate(3.2, 0.5) for _ in range(10_000)]
+    return lambda: [simulator.percentile(data, p) for p in (50, 95, 99, 99.9)]
+
+
+def bench_stats_histogram():
+    from latency_histogram import LatencyHistogram
+    rng = random.Random(SEED)
+    data = [rng.lognormvariate(3.2, 0.5) for _ in range(10_000)]
+
+    def op():
+        histogram = LatencyHistogram()
+        for value in data:
+            histogram.record(value)
+        return histogram.percentiles()
+    return op
+
+
+def bench_stats_fleet_engine():
+    from fleet_stats import FleetStatsEngine, _synthetic_measurements
+    fleet = list(_synthetic_measurements(100_000, 100, SEED))
+    return lambda: FleetStatsEngine.from_measurement_lists(fleet).fleet_statistics()
+
+
+def bench_report_fleet():
+    from fleet_stats import _synthetic_measurements
+    simulator = _production_simulator(50)
+    simulator.drones = simulator.create_drones()
+    for drone, (_, measurements) in zip(simulator.drones, _synthetic_measurements(50_000, 50, SEED)):
+        drone.latency_measurements.extend(measurements)
+
+    def op():
+        with contextlib.redirect_stdout(io.StringIO()):
+            simulator.generate_production_fleet_latency_report()
+    return op
+
+
+def _emit_drone(timed: bool):
+    from send_path_timing import SendPathTimer
+    from send_schedule import SendSchedule
+    simulator = _production_simulator(1)
+    simulator.send_timer = SendPathTimer(enabled=timed)
+    drone = simulator.create_drones()[0]
+    drone.send_schedules['telemetry'] = SendSchedule(1.0 / drone.config.telemetry_rate, drone.config.send_schedule)
+    drone.sio.eio = _MemorySink()
+    drone.sio.namespaces = {'/': 'bench-sid'}
+    drone.registered = True
+    drone.session_token = 'bench-session'
+    return lambda: drone.send_telemetry(time.time())
+
+
+def bench_emit_telemetry():
+    return _emit_drone(timed=False)
+
+
+def bench_emit_telemetry_timed():
+    return _emit_drone(timed=True)
+
+
+BENCHMARKS = [
+    Microbenchmark('frame.camera_json_base64', bench_frame_camera_json),
+    Microbenchmark('frame.optimized_binary', bench_frame_optimized_binary, batch=30),
+    Microbenchmark('frame.webrtc_binary', bench_frame_webrtc_binary),
+    Microbenchmark('compress.gzip6_binary_frame', bench_compress_gzip),
+    Microbenchmark('compress.base64_fallback', bench_compress_base64),
+    Microbenchmark('serialize.telemetry_packet', bench_serialize_telemetry),
+    Microbenchmark('stats.percentile_10k', bench_stats_percentile),
+    Microbenchmark('stats.histogram_10k', bench_stats_histogram),
+    Microbenchmark('stats.fleet_engine_100k', bench_stats_fleet_engine),
+    Microbenchmark('report.fleet_50_drones', bench_report_fleet),
+    Microbenchmark('emit.telemetry', bench_emit_telemetry, is_async=True),
+    Microbenchmark('emit.telemetry_timed', bench_emit_telemetry_timed, is_async=True)
+]
+
+
+async def _run_async(op, number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        await op()
+    return time.perf_counter() - start
+
+
+def _run_sync(op, number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        op()
+    return time.perf_counter() - start
+
+
+def _time_benchmark(bench: Microbenchmark, rounds: int, min_time: float) -> dict:
+    random.seed(SEED)
+    op = bench.setup()
+    loop = asyncio.new_event_loop() if bench.is_async else None
+    try:
+        run = (lambda number: loop.run_until_complete(_run_async(op, number))) if loop else \
+              (lambda number: _run_sync(op, number))
+
+        # Calibrate: double until a batch takes a tenth of a round, then scale up
+        number = 1
+        elapsed = run(number)
+        while elapsed < min_time / 10:
+            number *= 2
+            elapsed = run(number)
+        number = max(1, math.ceil(number * min_time / elapsed))
+
+        # As timeit does: no collector pauses from earlier benchmarks' garbage inside a round
+        gc.collect()
+        gc.disable()
+        per_op = [run(number) / (number * bench.batch) * 1e9 for _ in range(rounds)]
+    finally:
+        gc.enable()
+        if loop:
+            loop.close()
+    return {
+        'ns_per_op': statistics.median(per_op),
+        'min_ns': min(per_op),
+        'max_ns': max(per_op),
+        'stdev_ns': statistics.stdev(per_op) if len(per_op) > 1 else 0.0,
+        'rounds': rounds,
+        'ops_per_round': number
+    }
+
+
+def machine_info() -> dict:
+    from importlib import metadata
+    packages = {}
+    for name in PACKAGES:
+        try:
+            packages[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            packages[name] = None
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'packages': packages
+    }
+
+
+def _format_ns(ns: float) -> str:
+    if ns >= 1e6:
+        return f"{ns / 1e6:.2f}ms"
+    if ns >= 1e3:
+        return f"{ns / 1e3:.2f}us"
+    return f"{ns:.0f}ns"
+
+
+def select(filters: Optional[List[str]]) -> List[Microbenchmark]:
+    if not filters:
+        return BENCHMARKS
+    return [bench for bench in BENCHMARKS if any(f in bench.name for f in filters)]
+
+
+def run_benchmarks(benchmarks: List[Microbenchmark], rounds: int, min_time: float) -> dict:
+    """Time every benchmark; ones that cannot be imported here are recorded as skipped"""
+    results = {}
+    print(f"⏱️ Microbenchmarks: {len(benchmarks)} benchmark(s), {rounds} rounds of {min_time:g}s, "
+          f"Python {platform.python_version()}")
+    print(f"{'benchmark':<30} {'median':>10} {'min':>10} {'stdev':>8} {'ops/round':>10}")
+    print("-" * 72)
+    for bench in benchmarks:
+        try:
+            result = _time_benchmark(bench, rounds, min_time)
+        except ImportError as e:
+            results[bench.name] = {'skipped': str(e)}
+            print(f"{bench.name:<30} skipped ({e})")
+            continue
+        results[bench.name] = result
+        print(f"{bench.name:<30} {_format_ns(result['ns_per_op']):>10} {_format_ns(result['min_ns']):>10} "
+              f"{result['stdev_ns'] / result['ns_per_op']:>7.1%} {result['ops_per_round']:>10,}")
+    return results
+
+
+def round_spread(result: dict) -> float:
+    """Relative spread of a benchmark's rounds, (max - min) / min"""
+    return result['max_ns'] / result['min_ns'] - 1 if result.get('min_ns') else 0.0
+
+
+def compare(baseline: dict, current: dict, tolerance: float, names: Optional[List[str]] = None) -> List[str]:
+    """Print the comparison (of names only, if given) and return the regressed benchmarks"""
+    base_machine = baseline.get('machine', {})
+    current_machine = current.get('machine', {})
+    machine_changes = [f"{key} {base_machine.get(key)} -> {current_machine.get(key)}" for key in MACHINE_KEYS
+                       if base_machine.get(key) != current_machine.get(key)]
+    if machine_changes:
+        print(f"⚠️ Machine differs from the baseline ({', '.join(machine_changes)}); "
+              f"timings may not be comparable")
+    base_packages = base_machine.get('packages', {})
+    current_packages = current_machine.get('packages', {})
+    package_changes = [f"{name} {base_packages.get(name)} -> {current_packages.get(name)}"
+                       for name in sorted(set(base_packages) | set(current_packages))
+                       if base_packages.get(name) != current_packages.get(name)]
+    if package_changes:
+        print(f"⚠️ Package versions differ from the baseline ({', '.join(package_changes)}); "
+              f"timings may not be comparable")
+
+    print(f"{'benchmark':<30} {'baseline':>10} {'current':>10} {'change':>8} {'spread':>8}  status (fastest round)")
+    print("-" * 81)
+    regressions = []
+    base_results = baseline.get('benchmarks', {})
+    current_results = current.get('benchmarks', {})
+    for name in names or sorted(set(base_results) | set(current_results)):
+        base = base_results.get(name, {})
+        cur = current_results.get(name, {})
+        if 'ns_per_op' not in cur:
+            status = 'skipped' if 'skipped' in cur else 'missing'
+            print(f"{name:<30} {_format_ns(base['min_ns']) if 'min_ns' in base else '-':>10} "
+                  f"{'-':>10} {'':>8} {'':>8}  {status}")
+            continue
+        if 'ns_per_op' not in base:
+            print(f"{name:<30} {'-':>10} {_format_ns(cur['min_ns']):>10} {'':>8} {'':>8}  new")
+            continue
+        change = cur['min_ns'] / base['min_ns'] - 1
+        # A change inside either run's round-to-round spread can't be told apart from noise
+        spread = max(round_spread(base), round_spread(cur))
+        if abs(change) <= tolerance:
+            status = 'ok'
+        elif abs(change) <= spread:
+            status = 'noise'
+        elif change > 0:
+            status = '❌ REGRESSION'
+            regressions.append(name)
+        else:
+            status = '✅ faster'
+        print(f"{name:<30} {_format_ns(base['min_ns']):>10} {_format_ns(cur['min_ns']):>10} "
+              f"{change:>+8.1%} {spread:>8.1%}  {status}")
+
+    print("-" * 81)
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) beyond {tolerance:.0%} and the round spread: "
+              f"{', '.join(regressions)}")
+    else:
+        print(f"✅ No regressions beyond {tolerance:.0%} and the round spread")
+    return regressions
+
+
+def _load_results(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulator hot-path microbenchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Run the benchmarks')
+    run_parser.add_argument('--filter', nargs='+',
+                            help='Only run benchmarks whose name contains one of these (default: all)')
+    run_parser.add_argument('--rounds', type=int, default=7, help='Timed rounds per benchmark (default: 7)')
+    run_parser.add_argument('--min-time', type=float, default=0.2,
+                            help='Seconds per round, sets the ops per round (default: 0.2)')
+    run_parser.add_argument('--output', help='Write results JSON here (default: do not write)')
+    run_parser.add_argument('--compare', metavar='BASELINE',
+                            help='Compare against a baseline results file and exit 1 on regressions')
+    run_parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                            help=f'Allowed slowdown before a regression is flagged; slowdowns within the '
+                                 f'round spread are never flagged (default: {DEFAULT_TOLERANCE})')
+
+    compare_parser = commands.add_parser('compare', help='Compare a results file against a baseline')
+    compare_parser.add_argument('baseline', nargs='?', default=DEFAULT_BASELINE,
+                                help='Baseline results (default: baselines/microbench.json)')
+    compare_parser.add_argument('current', help='Results to check')
+    compare_parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                                help=f'Allowed slowdown before a regression is flagged; slowdowns within the '
+                                     f'round spread are never flagged (default: {DEFAULT_TOLERANCE})')
+
+    commands.add_parser('list', help='List the benchmarks')
+    args = parser.parse_args()
+
+    # The simulators log every frame generation error; keep benchmark output readable
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.command == 'list':
+        for bench in BENCHMARKS:
+            print(bench.name)
+        return
+
+    if args.command == 'compare':
+        regressions = compare(_load_results(args.baseline), _load_results(args.current), args.tolerance)
+        sys.exit(1 if regressions else 0)
+
+    benchmarks = select(args.filter)
+    if not benchmarks:
+        parser.error(f"no benchmark matches {' '.join(args.filter)}")
+    results = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'machine': machine_info(),
+        'settings': {'rounds': args.rounds, 'min_time_s': args.min_time},
+        'benchmarks': run_benchmarks(benchmarks, args.rounds, args.min_time)
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📁 Results written to {args.output}")
+    if args.compare:
+        print()
+        regressions = compare(_load_results(args.compare), results, args.tolerance,
+                              [bench.name for bench in benchmarks])
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
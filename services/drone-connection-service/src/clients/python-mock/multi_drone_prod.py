@@ -2,22 +2,64 @@
 import asyncio
 import argparse
 import logging
-import random
-import uuid
 import statistics
 import json
+import os
+import sys
 import time
-from typing import List, Dict
-from drone_simulator_prod import ProductionMockDrone, DroneConfig, LatencyStats
+from typing import List, Dict, Optional
+from drone_simulator_prod import ProductionMockDrone, DroneConfig, LatencyStats, PRODUCTION_CAPABILITIES
+from fleet_stats import FleetStatsEngine, LATENCY_BUCKET_LABELS
+from loop_monitor import EventLoopLagMonitor
+from send_path_timing import SendPathTimer
+from send_schedule import SEND_SCHEDULE_MODES
+from spike_detector import SpikeDetector
+from timer_wheel import HierarchicalTimerWheel
+from fleet_kinematics import FleetKinematics
+from latency_histogram import LatencyHistogram
+from ramp_profiles import RampProfile, ConnectionGate, RAMP_PROFILES
+from http_pool import HttpSessionPool
+from event_loops import install_event_loop, active_event_loop, EVENT_LOOPS
+from fleet_preflight import calibrate, plan_fleet, print_preflight_report, LARGE_FLEET_THRESHOLD
+from seeded_random import drone_rng, jetson_serial
+from soak_monitor import SoakMonitor
+from traffic_log import TrafficRecorder, TrafficLogError, BINARY_MODES
+from capacity_search import CapacitySearch, CapacitySLO, CapacitySearchError, SEARCH_MODES
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class MultiDroneProductionLatencySimulator:
-    def __init__(self, server_url: str, num_drones: int = 5):
+    def __init__(self, server_url: str, num_drones: int = 5,
+                 loop_monitor: Optional[EventLoopLagMonitor] = None,
+                 send_timer: Optional[SendPathTimer] = None, send_schedule: str = 'open',
+                 spike_detector: Optional[SpikeDetector] = None,
+                 timer_wheel: Optional[HierarchicalTimerWheel] = None,
+                 kinematics: Optional[FleetKinematics] = None,
+                 ramp: Optional[RampProfile] = None,
+                 connection_gate: Optional[ConnectionGate] = None,
+                 http_pool: Optional[HttpSessionPool] = None,
+                 max_measurements: Optional[int] = None,
+                 seed: Optional[int] = None,
+                 soak_monitor: Optional[SoakMonitor] = None,
+                 recorder: Optional[TrafficRecorder] = None):
         self.server_url = server_url
         self.num_drones = num_drones
+        self.send_schedule = send_schedule
+        self.max_measurements = max_measurements
+        self.seed = seed
+        self.soak_monitor = soak_monitor
+        self.recorder = recorder
+        self.spike_detector = spike_detector
+        self.timer_wheel = timer_wheel
+        self.kinematics = kinematics
+        self.ramp = ramp or RampProfile()
+        self.connection_gate = connection_gate or ConnectionGate()
+        self.http_pool = http_pool
+        self.drone_tasks: List[asyncio.Task] = []
         self.drones: List[ProductionMockDrone] = []
+        self.loop_monitor = loop_monitor
+        self.send_timer = send_timer or SendPathTimer()
         
         self.base_locations = [
             (18.5204, 73.8567),  # Pune
@@ -38,24 +80,26 @@ class MultiDroneProductionLatencySimulator:
         configs = []
         
         for i in range(self.num_drones):
+            drone_id = f"prod-latency-{i+1:03d}"
+            rng = drone_rng(self.seed, drone_id, 'config')
             lat, lng = self.base_locations[i % len(self.base_locations)]
-            lat += random.uniform(-0.01, 0.01)
-            lng += random.uniform(-0.01, 0.01)
+            lat += rng.uniform(-0.01, 0.01)
+            lng += rng.uniform(-0.01, 0.01)
             
             config = DroneConfig(
-                drone_id=f"prod-latency-{i+1:03d}",
-                model=random.choice(self.drone_models),
+                drone_id=drone_id,
+                model=rng.choice(self.drone_models),
                 base_lat=lat,
                 base_lng=lng,
-                jetson_serial=f"JETSON-PROD-LAT-{uuid.uuid4().hex[:8].upper()}",
-                capabilities=[
-                    'telemetry', 'camera', 'mavros', 'precision_landing',
-                    'webrtc', 'commands', 'mission_planning', 'latency_measurement'
-                ],
-                telemetry_rate=random.uniform(8.0, 12.0),
-                heartbeat_rate=random.uniform(0.08, 0.15),
-                mavros_rate=random.uniform(0.8, 1.5),
-                enable_latency_measurement=True
+                jetson_serial=jetson_serial('JETSON-PROD-LAT', self.seed, drone_id),
+                capabilities=PRODUCTION_CAPABILITIES,
+                telemetry_rate=rng.uniform(8.0, 12.0),
+                heartbeat_rate=rng.uniform(0.08, 0.15),
+                mavros_rate=rng.uniform(0.8, 1.5),
+                enable_latency_measurement=True,
+                send_schedule=self.send_schedule,
+                max_measurements=self.max_measurements,
+                seed=self.seed
             )
             
             configs.append(config)
@@ -65,20 +109,30 @@ class MultiDroneProductionLatencySimulator:
     def create_drones(self) -> List[ProductionMockDrone]:
         """Create production mock drone instances"""
         configs = self.create_drone_configs()
-        return [ProductionMockDrone(config, self.server_url) for config in configs]
+        return [ProductionMockDrone(config, self.server_url, self.loop_monitor, self.send_timer,
+                                    self.spike_detector, self.timer_wheel, self.kinematics,
+                                    self.connection_gate, self.http_pool)
+                for config in configs]
 
-    async def start_drone_batch(self, drones: List[ProductionMockDrone], batch_size: int = 3):
-        """Start drones in batches"""
-        for i in range(0, len(drones), batch_size):
-            batch = drones[i:i + batch_size]
-            logger.info(f"🚀 Starting production latency batch {i//batch_size + 1}: {len(batch)} drones")
-            
-            tasks = [asyncio.create_task(drone.run()) for drone in batch]
-            
-            if i + batch_size < len(drones):
-                await asyncio.sleep(2)
+    async def start_drones(self, drones: List[ProductionMockDrone], offsets: Optional[List[float]] = None):
+        """Start drones following the ramp profile"""
+        if offsets is None:
+            offsets = self.ramp.start_offsets(len(drones))
+        logger.info(f"🚀 Ramping up {len(drones)} production drones: {self.ramp.describe()}")
+        
+        loop = asyncio.get_running_loop()
+        ramp_start = loop.time()
+        progress_step = max(1, len(drones) // 10)
+        for i, (drone, offset) in enumerate(zip(drones, offsets)):
+            delay = ramp_start + offset - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.drone_tasks.append(asyncio.create_task(drone.run()))
+            if (i + 1) % progress_step == 0 or i + 1 == len(drones):
+                logger.info(f"🚀 Started {i + 1}/{len(drones)} drones ({loop.time() - ramp_start:.1f}s, "
+                            f"{self.connection_gate.in_flight} handshakes in flight)")
                 
-        return tasks
+        return self.drone_tasks
 
     async def run_production_latency_simulation(self, duration_minutes: int = 5):
         """Run production multi-drone latency simulation"""
@@ -87,13 +141,17 @@ class MultiDroneProductionLatencySimulator:
         logger.info(f"⏱️ Duration: {duration_minutes} minutes")
         
         self.drones = self.create_drones()
+        if self.recorder:
+            for drone in self.drones:
+                self.recorder.attach(drone.config.drone_id, drone.sio)
         
         logger.info(f"✅ Created {len(self.drones)} production latency measurement drones")
         
         self.display_production_drone_summary()
         
+        self.start_services()
         try:
-            await self.start_drone_batch(self.drones, batch_size=3)
+            await self.start_drones(self.drones)
             logger.info(f"🎬 All {len(self.drones)} production drones started")
             
             # Monitor simulation for specified duration
@@ -102,8 +160,10 @@ class MultiDroneProductionLatencySimulator:
         except KeyboardInterrupt:
             logger.info("🛑 Production latency simulation stopped by user")
         finally:
-            await self.cleanup()
+            await self.shutdown()
             self.generate_production_fleet_latency_report()
+            if self.soak_monitor:
+                self.soak_monitor.print_report()
 
     def display_production_drone_summary(self):
         """Display production drone summary"""
@@ -143,6 +203,10 @@ class MultiDroneProductionLatencySimulator:
         while time.time() < end_time:
             await asyncio.sleep(1)
             
+            if self.soak_monitor and self.soak_monitor.failed:
+                logger.error("🛑 Stopping early: soak budget exceeded")
+                break
+            
             current_time = time.time()
             if current_time - last_update >= update_interval:
                 await self.print_production_interim_report()
@@ -154,14 +218,22 @@ class MultiDroneProductionLatencySimulator:
     async def print_production_interim_report(self):
         """Print interim production latency statistics"""
         connected_count = sum(1 for drone in self.drones if drone.registered)
-        total_measurements = sum(len(drone.latency_measurements) for drone in self.drones)
+        total_measurements = sum(self.measurement_count(drone) for drone in self.drones)
         
         logger.info(f"📊 Production Interim Status:")
         logger.info(f"   Connected: {connected_count}/{len(self.drones)} drones")
         logger.info(f"   Total measurements: {total_measurements}")
         
+        if self.loop_monitor and self.loop_monitor.histogram.count:
+            lag = self.loop_monitor.histogram
+            logger.info(f"   Event-loop lag P99: {lag.percentile(99):.2f}ms (max {lag.max_ms:.2f}ms, "
+                        f"{len(self.loop_monitor.flagged_windows)} stall windows)")
+        
+        if self.spike_detector:
+            logger.info(f"   Latency spikes: {sum(self.spike_detector.spike_counts.values())}")
+        
         # Sample latency from production drones
-        sample_drones = [drone for drone in self.drones[:3] if drone.registered and drone.latency_measurements]
+        sample_drones = [drone for drone in self.drones[:3] if drone.registered and self.measurement_count(drone)]
         
         for drone in sample_drones:
             recent_telemetry = [m for m in drone.latency_measurements[-10:] if m.measurement_type == 'telemetry']
@@ -180,17 +252,20 @@ class MultiDroneProductionLatencySimulator:
         print(f"\n🚁 PRODUCTION FLEET LATENCY ANALYSIS REPORT")
         print("=" * 80)
         
-        connected_drones = [drone for drone in self.drones if drone.latency_measurements]
+        connected_drones = [drone for drone in self.drones if self.measurement_count(drone)]
         
         if not connected_drones:
             print("No latency data collected from any production drone")
             return
         
         print(f"Analyzed {len(connected_drones)} production drones with latency data")
-        print(f"Total measurements: {sum(len(drone.latency_measurements) for drone in connected_drones)}")
+        print(f"Total measurements: {sum(self.measurement_count(drone) for drone in connected_drones)}")
+        
+        # Single pass over every measurement; all sections below reuse these columns
+        engine = self.build_stats_engine(connected_drones)
         
         # Aggregate production statistics by measurement type
-        fleet_stats = self.calculate_production_fleet_statistics(connected_drones)
+        fleet_stats = self.calculate_production_fleet_statistics(connected_drones, engine)
         
         # Print production fleet-wide statistics
         print(f"\n📊 PRODUCTION FLEET-WIDE LATENCY STATISTICS:")
@@ -204,73 +279,72 @@ class MultiDroneProductionLatencySimulator:
             print(f"  Fleet median: {stats['fleet_median']:.2f}ms")
             print(f"  Fleet P95: {stats['fleet_p95']:.2f}ms")
             print(f"  Fleet P99: {stats['fleet_p99']:.2f}ms")
+            print(f"  Fleet P99.9: {stats['fleet_p999']:.2f}ms")
+            print(f"  Corrected (from intended send time): P50 {stats['fleet_corrected_p50']:.2f}ms, "
+                  f"P95 {stats['fleet_corrected_p95']:.2f}ms, P99 {stats['fleet_corrected_p99']:.2f}ms, "
+                  f"P99.9 {stats['fleet_corrected_p999']:.2f}ms")
             print(f"  Best drone avg: {stats['best_drone_avg']:.2f}ms")
             print(f"  Worst drone avg: {stats['worst_drone_avg']:.2f}ms")
             print(f"  Avg payload size: {stats['avg_payload_size']} bytes")
+            if self.loop_monitor:
+                print(f"  Simulator loop lag avg: {stats['fleet_loop_lag_avg']:.2f}ms")
+                print(f"  Network/server avg: {stats['fleet_network_avg']:.2f}ms "
+                      f"(P99: {stats['fleet_network_p99']:.2f}ms)")
         
         # Print per-drone breakdown for production
         print(f"\n📋 PRODUCTION PER-DRONE LATENCY BREAKDOWN:")
         print("-" * 50)
         
+        per_drone_stats = engine.per_drone_statistics()
         for drone in connected_drones:
-            drone_stats = drone.get_latency_statistics()
+            drone_stats = per_drone_stats.get(drone.config.drone_id)
             if drone_stats:
                 print(f"\n{drone.config.drone_id} ({drone.config.model}):")
-                for measurement_type, stat in drone_stats.items():
-                    status = self.evaluate_production_latency(measurement_type, stat.avg_ms)
-                    print(f"  {measurement_type}: {stat.avg_ms:.2f}ms avg, {stat.count} samples ({status})")
+                for measurement_type, (avg_ms, count) in drone_stats.items():
+                    status = self.evaluate_production_latency(measurement_type, avg_ms)
+                    print(f"  {measurement_type}: {avg_ms:.2f}ms avg, {count} samples ({status})")
         
         # Production network performance analysis
-        self.analyze_production_network_performance(connected_drones)
+        self.analyze_production_network_performance(connected_drones, engine)
+        
+        self.print_send_schedule_summary(connected_drones)
+        
+        self.print_ramp_summary(self.drones)
         
         # Production recommendations
         self.generate_production_recommendations(fleet_stats)
         
-        print("=" * 80)
-
-    def calculate_production_fleet_statistics(self, connected_drones: List[ProductionMockDrone]) -> Dict:
-        """Calculate production fleet-wide latency statistics"""
-        fleet_stats = {}
+        if self.loop_monitor:
+            self.loop_monitor.print_report()
         
-        all_measurements_by_type = {}
+        self.send_timer.print_report()
         
-        for drone in connected_drones:
-            for measurement in drone.latency_measurements:
-                measurement_type = measurement.measurement_type
-                if measurement_type not in all_measurements_by_type:
-                    all_measurements_by_type[measurement_type] = []
-                all_measurements_by_type[measurement_type].append(measurement)
-        
-        for measurement_type, measurements in all_measurements_by_type.items():
-            if not measurements:
-                continue
-            
-            latencies = [m.latency_ms for m in measurements]
-            payload_sizes = [m.payload_size_bytes for m in measurements]
-            
-            drone_averages = []
-            participating_drones = set()
-            
-            for drone in connected_drones:
-                drone_measurements = [m for m in drone.latency_measurements if m.measurement_type == measurement_type]
-                if drone_measurements:
-                    drone_avg = statistics.mean([m.latency_ms for m in drone_measurements])
-                    drone_averages.append(drone_avg)
-                    participating_drones.add(drone.config.drone_id)
-            
-            fleet_stats[measurement_type] = {
-                'drone_count': len(participating_drones),
-                'total_measurements': len(measurements),
-                'fleet_avg': statistics.mean(latencies),
-                'fleet_median': statistics.median(latencies),
-                'fleet_p95': self.percentile(latencies, 95),
-                'fleet_p99': self.percentile(latencies, 99),
-                'best_drone_avg': min(drone_averages) if drone_averages else 0,
-                'worst_drone_avg': max(drone_averages) if drone_averages else 0,
-                'avg_payload_size': int(statistics.mean(payload_sizes)) if payload_sizes else 0
-            }
+        if self.spike_detector:
+            self.spike_detector.print_report()
+        
+        if self.timer_wheel:
+            self.timer_wheel.print_report()
         
-        return fleet_stats
+        if self.kinematics:
+            self.kinematics.print_report()
+        
+        if self.http_pool and self.http_pool.timer:
+            self.http_pool.timer.print_report()
+        
+        print("=" * 80)
+
+    def measurement_count(self, drone) -> int:
+        return len(drone.latency_measurements)
+
+    def build_stats_engine(self, drones: List[ProductionMockDrone]) -> FleetStatsEngine:
+        """Statistics engine the fleet report runs on"""
+        return FleetStatsEngine.from_drones(drones)
+
+    def calculate_production_fleet_statistics(self, connected_drones: List[ProductionMockDrone],
+                                              engine: Optional[FleetStatsEngine] = None) -> Dict:
+        """Calculate production fleet-wide latency statistics"""
+        engine = engine or FleetStatsEngine.from_drones(connected_drones)
+        return engine.fleet_statistics()
 
     def percentile(self, data: List[float], p: float) -> float:
         """Calculate percentile"""
@@ -307,47 +381,97 @@ class MultiDroneProductionLatencySimulator:
         else:
             return 'POOR'
 
-    def analyze_production_network_performance(self, connected_drones: List[ProductionMockDrone]):
+    def analyze_production_network_performance(self, connected_drones: List[ProductionMockDrone],
+                                               engine: Optional[FleetStatsEngine] = None):
         """Analyze production network performance"""
         print(f"\n🌐 PRODUCTION NETWORK PERFORMANCE ANALYSIS:")
         print("-" * 50)
         
-        all_telemetry = []
-        all_discovery = []
-        all_registration = []
-        
-        for drone in connected_drones:
-            all_telemetry.extend([m for m in drone.latency_measurements if m.measurement_type == 'telemetry'])
-            all_discovery.extend([m for m in drone.latency_measurements if m.measurement_type == 'discovery'])
-            all_registration.extend([m for m in drone.latency_measurements if m.measurement_type == 'registration'])
+        engine = engine or FleetStatsEngine.from_drones(connected_drones)
         
-        if all_telemetry:
-            latencies = [m.latency_ms for m in all_telemetry]
-            payload_sizes = [m.payload_size_bytes for m in all_telemetry]
-            
-            total_data_bytes = sum(payload_sizes)
-            measurement_duration = max([m.receive_timestamp for m in all_telemetry]) - min([m.send_timestamp for m in all_telemetry])
-            throughput_bps = (total_data_bytes * 8) / measurement_duration if measurement_duration > 0 else 0
+        telemetry_buckets = engine.latency_histogram('telemetry')
+        telemetry_count = sum(telemetry_buckets)
+        if telemetry_count:
+            throughput = engine.throughput('telemetry')
             
             print(f"  Production telemetry analysis:")
-            print(f"    Total data transmitted: {total_data_bytes:,} bytes")
-            print(f"    Average throughput: {throughput_bps/1000:.2f} kbps")
-            print(f"    Average packet size: {statistics.mean(payload_sizes):.0f} bytes")
+            print(f"    Total data transmitted: {throughput['total_bytes']:,} bytes")
+            print(f"    Average throughput: {throughput['throughput_bps']/1000:.2f} kbps")
+            print(f"    Average packet size: {throughput['avg_payload_bytes']:.0f} bytes")
             
             print(f"  Production latency distribution:")
-            print(f"    < 30ms: {len([l for l in latencies if l < 30])} ({len([l for l in latencies if l < 30])/len(latencies)*100:.1f}%)")
-            print(f"    30-50ms: {len([l for l in latencies if 30 <= l < 50])} ({len([l for l in latencies if 30 <= l < 50])/len(latencies)*100:.1f}%)")
-            print(f"    50-100ms: {len([l for l in latencies if 50 <= l < 100])} ({len([l for l in latencies if 50 <= l < 100])/len(latencies)*100:.1f}%)")
-            print(f"    > 100ms: {len([l for l in latencies if l >= 100])} ({len([l for l in latencies if l >= 100])/len(latencies)*100:.1f}%)")
+            for label, count in zip(LATENCY_BUCKET_LABELS, telemetry_buckets):
+                print(f"    {label}: {count} ({count/telemetry_count*100:.1f}%)")
         
-        if all_discovery:
-            discovery_avg = statistics.mean([m.latency_ms for m in all_discovery])
+        discovery_avg = engine.type_mean('discovery')
+        if discovery_avg is not None:
             print(f"  Production server discovery avg: {discovery_avg:.2f}ms")
             
-        if all_registration:
-            registration_avg = statistics.mean([m.latency_ms for m in all_registration])
+        registration_avg = engine.type_mean('registration')
+        if registration_avg is not None:
             print(f"  Production registration avg: {registration_avg:.2f}ms")
 
+    def ramp_summary(self, drones: List[ProductionMockDrone]) -> Dict:
+        """Time-to-connected percentiles for the ramp profile"""
+        time_to_connected = LatencyHistogram()
+        for drone in drones:
+            if drone.time_to_connected_ms is not None:
+                time_to_connected.record(drone.time_to_connected_ms)
+        return {
+            'profile': self.ramp.name,
+            'description': self.ramp.describe(),
+            'max_concurrent_connects': self.connection_gate.max_concurrent,
+            'drones': len(drones),
+            'connected': time_to_connected.count,
+            'time_to_connected': time_to_connected.summary(),
+            'connect_slot_wait': self.connection_gate.wait_time.summary(),
+            'peak_in_flight': self.connection_gate.peak_in_flight,
+            'peak_in_flight_workers': self.connection_gate.merged_gates
+        }
+
+    def print_ramp_summary(self, drones: List[ProductionMockDrone]):
+        """Print time-to-connected for the ramp profile"""
+        summary = self.ramp_summary(drones)
+        limit = summary['max_concurrent_connects'] or 'unlimited'
+        print(f"\n🚀 RAMP-UP ({summary['description']}, concurrent handshakes: {limit}):")
+        print("-" * 50)
+        if summary['peak_in_flight_workers']:
+            peak = (f"sum of {summary['peak_in_flight_workers']} per-worker handshake peaks: "
+                    f"{summary['peak_in_flight']}")
+        else:
+            peak = f"peak handshakes in flight: {summary['peak_in_flight']}"
+        print(f"  Connected: {summary['connected']}/{summary['drones']} drones ({peak})")
+        ttc = summary['time_to_connected']
+        if ttc['count']:
+            print(f"  Time to connected: P50 {ttc['p50_ms']:.1f}ms, P95 {ttc['p95_ms']:.1f}ms, "
+                  f"P99 {ttc['p99_ms']:.1f}ms, max {ttc['max_ms']:.1f}ms")
+        wait = summary['connect_slot_wait']
+        if summary['max_concurrent_connects'] and wait['count']:
+            print(f"  Handshake slot wait: P50 {wait['p50_ms']:.1f}ms, P99 {wait['p99_ms']:.1f}ms, "
+                  f"max {wait['max_ms']:.1f}ms")
+
+    def send_schedule_summary(self, drones: List[ProductionMockDrone]) -> Dict:
+        """Aggregate send schedule adherence by stream across the fleet"""
+        summary = {}
+        for drone in drones:
+            for stream, schedule in drone.send_schedules.items():
+                totals = summary.setdefault(stream, {'sends': 0, 'late_sends': 0, 'max_behind_ms': 0.0})
+                totals['sends'] += schedule.sends
+                totals['late_sends'] += schedule.late_sends
+                totals['max_behind_ms'] = max(totals['max_behind_ms'], schedule.max_behind_ms)
+        return summary
+
+    def print_send_schedule_summary(self, drones: List[ProductionMockDrone]):
+        """Print fleet send schedule adherence"""
+        summary = self.send_schedule_summary(drones)
+        if not summary:
+            return
+        print(f"\n⏲️ SEND SCHEDULE ({self.send_schedule}-loop):")
+        print("-" * 50)
+        for stream, totals in summary.items():
+            print(f"  {stream}: {totals['sends']} sends, {totals['late_sends']} late by a full interval, "
+                  f"max {totals['max_behind_ms']:.1f}ms behind")
+
     def generate_production_recommendations(self, fleet_stats: Dict):
         """Generate production performance recommendations"""
         print(f"\n💡 PRODUCTION PERFORMANCE RECOMMENDATIONS:")
@@ -383,6 +507,36 @@ class MultiDroneProductionLatencySimulator:
         for i, recommendation in enumerate(recommendations, 1):
             print(f"  {i}. {recommendation}")
 
+    def start_services(self):
+        """Start the shared services the drones run on (call before start_drones)"""
+        if self.loop_monitor:
+            self.loop_monitor.start()
+        if self.timer_wheel:
+            self.timer_wheel.start()
+        if self.kinematics:
+            self.kinematics.start(self.timer_wheel)
+        if self.soak_monitor:
+            self.soak_monitor.start(self.drones)
+
+    async def shutdown(self):
+        """Disconnect the drones, end their tasks and stop the shared services"""
+        if self.soak_monitor:
+            await self.soak_monitor.stop()
+        await self.cleanup()
+        for task in self.drone_tasks:
+            task.cancel()
+        await asyncio.gather(*self.drone_tasks, return_exceptions=True)
+        if self.recorder:
+            self.recorder.close()
+        if self.http_pool:
+            await self.http_pool.close()
+        if self.kinematics:
+            await self.kinematics.stop()
+        if self.timer_wheel:
+            await self.timer_wheel.stop()
+        if self.loop_monitor:
+            await self.loop_monitor.stop()
+
     async def cleanup(self):
         """Clean up production drone connections"""
         logger.info("🧹 Cleaning up production drone connections...")
@@ -404,18 +558,12 @@ class MultiDroneProductionLatencySimulator:
             filename = f"production_latency_data_{int(time.time())}.json"
         
         export_data = {
-            'metadata': {
-                'timestamp': time.time(),
-                'server_url': self.server_url,
-                'num_drones': self.num_drones,
-                'connected_drones': len([d for d in self.drones if d.latency_measurements]),
-                'test_type': 'production_fleet_latency'
-            },
+            'metadata': self.production_export_metadata(),
             'drone_data': []
         }
         
         for drone in self.drones:
-            if drone.latency_measurements:
+            if self.measurement_count(drone):
                 drone_data = {
                     'drone_id': drone.config.drone_id,
                     'model': drone.config.model,
@@ -427,7 +575,10 @@ class MultiDroneProductionLatencySimulator:
                             'latency_ms': m.latency_ms,
                             'payload_bytes': m.payload_size_bytes,
                             'timestamp': m.send_timestamp,
-                            'sequence_id': m.sequence_id
+                            'sequence_id': m.sequence_id,
+                            'loop_lag_ms': m.loop_lag_ms,
+                            'intended_send_timestamp': m.intended_send_timestamp,
+                            'expected_interval_ms': m.expected_interval_ms
                         }
                         for m in drone.latency_measurements
                     ]
@@ -439,6 +590,29 @@ class MultiDroneProductionLatencySimulator:
         
         logger.info(f"📁 Production latency data exported to {filename}")
 
+    def production_export_metadata(self) -> Dict:
+        """Run metadata and instrumentation summaries for the JSON export"""
+        return {
+            'timestamp': time.time(),
+            'server_url': self.server_url,
+            'num_drones': self.num_drones,
+            'connected_drones': len([d for d in self.drones if self.measurement_count(d)]),
+            'test_type': 'production_fleet_latency',
+            'event_loop': active_event_loop(),
+            'event_loop_lag': self.loop_monitor.summary() if self.loop_monitor else None,
+            'send_path_timing': self.send_timer.summary() if self.send_timer.enabled else None,
+            'latency_spikes': self.spike_detector.summary() if self.spike_detector else None,
+            'timer_wheel': self.timer_wheel.summary() if self.timer_wheel else None,
+            'fleet_kinematics': self.kinematics.summary() if self.kinematics else None,
+            'ramp': self.ramp_summary(self.drones),
+            'soak': self.soak_monitor.summary() if self.soak_monitor else None,
+            'http_phases': self.http_pool.timer.summary() if self.http_pool and self.http_pool.timer else None,
+            'send_schedule': {
+                'mode': self.send_schedule,
+                'streams': self.send_schedule_summary(self.drones)
+            }
+        }
+
 def main():
     parser = argparse.ArgumentParser(description='Production Multi-Drone Latency Simulator')
     parser.add_argument('--server', default='http://65.1.63.189:4005', 
@@ -451,26 +625,335 @@ def main():
                        help='Export latency data to JSON file')
     parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], 
                        default='INFO', help='Log level (default: INFO)')
+    parser.add_argument('--disable-loop-monitor', action='store_true',
+                       help='Disable event-loop lag monitor')
+    parser.add_argument('--loop-lag-threshold', type=float, default=50.0,
+                       help='Flag windows with event-loop lag above this many ms (default: 50)')
+    parser.add_argument('--detect-slow-callbacks', action='store_true',
+                       help='Use asyncio debug mode to name slow callbacks (adds overhead)')
+    parser.add_argument('--send-path-timing', action='store_true',
+                       help='Time snapshot/payload/serialize/emit stages of every send')
+    parser.add_argument('--spike-threshold', type=float, default=4.0,
+                       help='EWMA z-score that flags a latency spike (default: 4.0)')
+    parser.add_argument('--disable-spike-detection', action='store_true',
+                       help='Disable streaming latency spike detection')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Shard drones across this many worker processes (default: 1)')
+    parser.add_argument('--send-schedule', choices=SEND_SCHEDULE_MODES, default='open',
+                       help='open: fixed intended send times, closed: sleep after each send (default: open)')
+    parser.add_argument('--timer-wheel', action='store_true',
+                       help='Drive every drone stream from one fleet-level timer wheel instead of per-stream tasks '
+                            '(open-loop sends only)')
+    parser.add_argument('--wheel-tick-ms', type=float, default=5.0,
+                       help='Timer wheel tick resolution in ms (default: 5.0)')
+    parser.add_argument('--ramp', choices=RAMP_PROFILES, default='step',
+                       help='Drone start-up profile (default: step)')
+    parser.add_argument('--ramp-rate', type=float, default=1.5,
+                       help='Drones started per second for linear/poisson ramps (default: 1.5)')
+    parser.add_argument('--ramp-step-size', type=int, default=3,
+                       help='Drones started per step for the step ramp (default: 3)')
+    parser.add_argument('--ramp-step-interval', type=float, default=2.0,
+                       help='Seconds between steps for the step ramp (default: 2.0)')
+    parser.add_argument('--max-concurrent-connects', type=int, default=0,
+                       help='Limit concurrent discover/register/connect handshakes, 0 for no limit (default: 0)')
+    parser.add_argument('--per-drone-http-sessions', action='store_true',
+                       help='Open a new HTTP session per discovery/registration instead of one shared pool')
+    parser.add_argument('--http-pool-limit', type=int, default=100,
+                       help='Max pooled HTTP connections per process, 0 for no limit (default: 100)')
+    parser.add_argument('--dns-cache-ttl', type=int, default=300,
+                       help='Seconds to cache DNS lookups in the shared HTTP pool (default: 300)')
+    parser.add_argument('--per-drone-animation', action='store_true',
+                       help='Animate each drone separately instead of one vectorized fleet state array')
+    parser.add_argument('--skip-preflight', action='store_true',
+                       help=f'Skip the resource preflight that runs above {LARGE_FLEET_THRESHOLD} drones')
+    parser.add_argument('--preflight', action='store_true',
+                       help='Run the resource preflight whatever the fleet size')
+    parser.add_argument('--force', action='store_true',
+                       help='Run even if the preflight projects that the host cannot hold the fleet')
+    parser.add_argument('--no-auto-shard', action='store_true',
+                       help='Refuse instead of sharding across workers when one process would saturate')
+    parser.add_argument('--calibration-drones', type=int, default=5,
+                       help='Drones in the preflight calibration run (default: 5)')
+    parser.add_argument('--calibration-seconds', type=float, default=10.0,
+                       help='Length of the preflight calibration run (default: 10)')
+    parser.add_argument('--cpu-budget', type=float, default=0.8,
+                       help='Fraction of each core the fleet may use (default: 0.8)')
+    parser.add_argument('--memory-budget', type=float, default=0.8,
+                       help='Fraction of available memory the fleet may use (default: 0.8)')
+    parser.add_argument('--loop', choices=EVENT_LOOPS, default='asyncio',
+                       help='Event loop implementation, uvloop falls back to asyncio if missing (default: asyncio)')
+    parser.add_argument('--max-measurements', type=int,
+                       help='Keep only the latest N latency measurements per drone, 0 stores none '
+                            '(default: unbounded)')
+    parser.add_argument('--coordinator', metavar='HOST:PORT',
+                       help='Run as cluster coordinator listening on HOST:PORT; drones run on --agents agents')
+    parser.add_argument('--agents', type=int, default=1,
+                       help='Agents the coordinator waits for before starting (default: 1)')
+    parser.add_argument('--start-delay', type=float, default=5.0,
+                       help='Seconds between assigning drones and the synchronized agent start (default: 5.0)')
+    parser.add_argument('--agent', metavar='HOST:PORT',
+                       help='Run as a cluster agent for the coordinator at HOST:PORT')
+    parser.add_argument('--agent-name',
+                       help='Agent name shown in the coordinator report (default: hostname-pid)')
+    parser.add_argument('--scenario', metavar='FILE',
+                       help='JSON scenario describing a mixed fleet of drone classes (overrides --drones)')
+    parser.add_argument('--seed', type=int,
+                       help='Seed every drone\'s random streams, derived per drone ID, for reproducible runs '
+                            '(default: unseeded)')
+    parser.add_argument('--soak', action='store_true',
+                       help='Soak mode: sample RSS, tasks and per-drone containers and flag monotonic growth')
+    parser.add_argument('--soak-interval', type=float, default=60.0,
+                       help='Seconds between soak samples (default: 60)')
+    parser.add_argument('--soak-warmup', type=float, default=300.0,
+                       help='Seconds before the soak baseline is taken (default: 300)')
+    parser.add_argument('--soak-rss-budget-mb', type=float,
+                       help='Fail the soak run when RSS grows this much over the baseline (default: no budget)')
+    parser.add_argument('--soak-task-budget', type=int,
+                       help='Fail the soak run when asyncio tasks grow this much over the baseline '
+                            '(default: no budget)')
+    parser.add_argument('--soak-tracemalloc', action='store_true',
+                       help='Also report the allocation sites that grew most (slows the run)')
+    parser.add_argument('--record', metavar='FILE',
+                       help='Append every emit and received event of every drone to a traffic log '
+                            '(replay with traffic_log.py)')
+    parser.add_argument('--record-binary', choices=BINARY_MODES, default='size',
+                       help='Store binary payloads (camera frames) by size only or in full (default: size)')
+    parser.add_argument('--capacity-search', choices=SEARCH_MODES,
+                       help='Search for the largest fleet within the SLOs instead of one --drones run')
+    parser.add_argument('--capacity-start', type=int, default=10,
+                       help='Drones in the first capacity stage (default: 10)')
+    parser.add_argument('--capacity-step', type=int, default=10,
+                       help='Drones added per stage in the step search (default: 10)')
+    parser.add_argument('--capacity-max', type=int, default=200,
+                       help='Largest fleet the capacity search tries (default: 200)')
+    parser.add_argument('--capacity-resolution', type=int, default=10,
+                       help='Bisect until the knee is known to within this many drones (default: 10)')
+    parser.add_argument('--capacity-hold', type=float, default=60.0,
+                       help='Seconds of each stage measured once the fleet has settled (default: 60)')
+    parser.add_argument('--capacity-settle', type=float, default=10.0,
+                       help='Seconds between registration and the measurement window (default: 10)')
+    parser.add_argument('--capacity-cooldown', type=float, default=5.0,
+                       help='Seconds between stages for the server to drain (default: 5)')
+    parser.add_argument('--slo-p99-ms', type=float, default=250.0,
+                       help='Capacity SLO: telemetry P99 round trip in ms (default: 250)')
+    parser.add_argument('--slo-max-loss', type=float, default=1.0,
+                       help='Capacity SLO: percent of telemetry left unacked (default: 1.0)')
+    parser.add_argument('--slo-min-ack-rate', type=float, default=0.95,
+                       help='Capacity SLO: acks over telemetry expected at the configured rates (default: 0.95)')
     
     args = parser.parse_args()
+    install_event_loop(args.loop)
     
     logging.getLogger().setLevel(getattr(logging, args.log_level))
     
+    if args.agent:
+        # Imported here: fleet_cluster builds on this module
+        from fleet_cluster import run_agent
+        try:
+            asyncio.run(run_agent(args.agent, args.agent_name))
+        except KeyboardInterrupt:
+            logger.info("🛑 Cluster agent stopped by user")
+        except Exception as e:
+            logger.error(f"❌ Cluster agent failed: {e}")
+        return
+    
     if args.drones <= 0:
         logger.error("❌ Number of drones must be positive")
         return
         
-    if args.drones > 50:
-        logger.warning(f"⚠️ {args.drones} production drones is a lot!")
-        response = input("Continue? (y/N): ")
-        if response.lower() != 'y':
-            return
-    
     if args.duration <= 0:
         logger.error("❌ Duration must be positive")
         return
     
-    simulator = MultiDroneProductionLatencySimulator(args.server, args.drones)
+    if args.workers <= 0:
+        logger.error("❌ Number of workers must be positive")
+        return
+    
+    if args.timer_wheel and args.send_schedule == 'closed':
+        logger.error("❌ --timer-wheel fires on a fixed grid (open-loop); it can't run with --send-schedule closed")
+        return
+    
+    if args.workers > (os.cpu_count() or 1):
+        logger.warning(f"⚠️ {args.workers} workers on {os.cpu_count()} cores: scaling will flatten past core count")
+    
+    if args.coordinator and args.agents <= 0:
+        logger.error("❌ Number of agents must be positive")
+        return
+    
+    if args.soak and (args.workers > 1 or args.coordinator):
+        logger.error("❌ Soak mode samples this process only (drop --workers/--coordinator)")
+        return
+    
+    if args.record and (args.workers > 1 or args.coordinator):
+        logger.error("❌ Traffic recording covers this process only (drop --workers/--coordinator)")
+        return
+    
+    if args.capacity_search and (args.workers > 1 or args.coordinator or args.scenario or args.soak or args.record):
+        logger.error("❌ Capacity search runs its own single-process stages "
+                     "(drop --workers/--coordinator/--scenario/--soak/--record)")
+        return
+    
+    if args.capacity_search and args.max_measurements is not None:
+        logger.error("❌ Capacity search needs every measurement of a stage window (drop --max-measurements)")
+        return
+    
+    if args.soak and args.soak_interval <= 0:
+        logger.error("❌ Soak interval must be positive")
+        return
+    
+    scenario = None
+    if args.scenario:
+        # Imported here: fleet_scenario builds on this module
+        from fleet_scenario import load_scenario, ScenarioError
+        try:
+            scenario = load_scenario(args.scenario)
+        except ScenarioError as e:
+            logger.error(f"❌ Invalid scenario: {e}")
+            return
+        if args.workers > 1 or args.coordinator:
+            logger.error("❌ Scenario fleets run in a single process (drop --workers/--coordinator)")
+            return
+        args.drones = scenario.total_drones
+        logger.info(f"🧬 Scenario '{scenario.name}': {scenario.describe()} ({args.drones} drones)")
+    
+    try:
+        ramp = RampProfile(args.ramp, args.ramp_rate, args.ramp_step_size, args.ramp_step_interval,
+                           seed=args.seed)
+    except ValueError as e:
+        logger.error(f"❌ {e}")
+        return
+    
+    if args.capacity_search:
+        def build_stage(num_drones: int) -> MultiDroneProductionLatencySimulator:
+            # Fresh instrumentation per stage so nothing carries over between fleet sizes
+            return MultiDroneProductionLatencySimulator(
+                args.server, num_drones,
+                None if args.disable_loop_monitor else EventLoopLagMonitor(lag_threshold_ms=args.loop_lag_threshold),
+                send_schedule=args.send_schedule,
+                timer_wheel=HierarchicalTimerWheel(tick_ms=args.wheel_tick_ms) if args.timer_wheel else None,
+                kinematics=(None if args.per_drone_animation or args.seed is not None
+                            else FleetKinematics(capacity=num_drones)),
+                ramp=ramp,
+                connection_gate=ConnectionGate(args.max_concurrent_connects),
+                http_pool=None if args.per_drone_http_sessions else HttpSessionPool(
+                    limit=args.http_pool_limit, dns_cache_ttl=args.dns_cache_ttl),
+                seed=args.seed
+            )
+        
+        search = CapacitySearch(build_stage, CapacitySLO(args.slo_p99_ms, args.slo_max_loss, args.slo_min_ack_rate),
+                                args.capacity_search, args.capacity_start, args.capacity_step, args.capacity_max,
+                                args.capacity_resolution, args.capacity_hold, args.capacity_settle,
+                                args.capacity_cooldown)
+        try:
+            search.validate()
+        except CapacitySearchError as e:
+            logger.error(f"❌ Invalid capacity search: {e}")
+            return
+        try:
+            asyncio.run(search.run())
+        except KeyboardInterrupt:
+            logger.info("🛑 Capacity search stopped by user")
+        except Exception as e:
+            logger.error(f"❌ Capacity search failed: {e}")
+        search.print_report()
+        if args.export and search.stages:
+            search.export()
+        return
+    
+    # A coordinator runs no drones itself, so this host's capacity does not matter
+    if not args.skip_preflight and not args.coordinator and (args.preflight or args.drones > LARGE_FLEET_THRESHOLD):
+        logger.info(f"🧪 Preflight: calibrating with {args.calibration_drones} drones "
+                    f"for {args.calibration_seconds:g}s")
+        calibration_simulator = MultiDroneProductionLatencySimulator(
+            args.server, min(args.calibration_drones, args.drones), send_schedule=args.send_schedule,
+            kinematics=None if args.per_drone_animation else FleetKinematics(),
+            http_pool=None if args.per_drone_http_sessions else HttpSessionPool(
+                limit=args.http_pool_limit, dns_cache_ttl=args.dns_cache_ttl),
+            max_measurements=args.max_measurements
+        )
+        try:
+            calibration = asyncio.run(calibrate(calibration_simulator, args.calibration_seconds))
+        except Exception as e:
+            logger.warning(f"⚠️ Preflight calibration failed: {e}")
+            calibration = None
+        
+        preflight = plan_fleet(args.drones, args.workers, calibration, args.cpu_budget, args.memory_budget,
+                               auto_shard=not (args.no_auto_shard or scenario or args.soak or args.record))
+        print_preflight_report(preflight)
+        
+        if preflight.refused:
+            if not args.force:
+                logger.error("❌ Preflight refused the fleet (use --force to run anyway)")
+                sys.exit(1)
+            logger.warning("⚠️ Preflight refused the fleet, running anyway (--force)")
+        elif preflight.verdict == 'shard':
+            logger.info(f"🧩 Preflight: auto-sharding across {preflight.workers} workers")
+            args.workers = preflight.workers
+    
+    loop_monitor = None
+    if not args.disable_loop_monitor:
+        loop_monitor = EventLoopLagMonitor(
+            lag_threshold_ms=args.loop_lag_threshold,
+            detect_slow_callbacks=args.detect_slow_callbacks
+        )
+    
+    spike_detector = None
+    if not args.disable_spike_detection:
+        spike_detector = SpikeDetector(z_threshold=args.spike_threshold)
+    
+    timer_wheel = HierarchicalTimerWheel(tick_ms=args.wheel_tick_ms) if args.timer_wheel else None
+    # Seeded drones animate in lockstep with their own telemetry instead of the shared fleet array
+    kinematics = None if args.per_drone_animation or args.seed is not None else FleetKinematics(capacity=args.drones)
+    if args.seed is not None:
+        logger.info(f"🎲 Seed {args.seed}: per-drone random streams, motion in lockstep with telemetry")
+    
+    connection_gate = ConnectionGate(args.max_concurrent_connects)
+    http_pool = None
+    if not args.per_drone_http_sessions:
+        http_pool = HttpSessionPool(limit=args.http_pool_limit, dns_cache_ttl=args.dns_cache_ttl)
+    
+    soak_monitor = None
+    if args.soak:
+        soak_monitor = SoakMonitor(args.soak_interval, args.soak_warmup, args.soak_rss_budget_mb,
+                                   args.soak_task_budget, args.soak_tracemalloc)
+    
+    recorder = None
+    if args.record:
+        try:
+            recorder = TrafficRecorder(args.record, args.record_binary)
+        except (OSError, TrafficLogError) as e:
+            logger.error(f"❌ Cannot record traffic: {e}")
+            return
+    
+    if scenario:
+        from fleet_scenario import ScenarioFleetSimulator
+        simulator = ScenarioFleetSimulator(scenario, args.server, loop_monitor,
+                                           SendPathTimer(enabled=args.send_path_timing),
+                                           args.send_schedule, spike_detector, timer_wheel, kinematics, ramp,
+                                           connection_gate, http_pool, args.max_measurements, args.seed,
+                                           soak_monitor, recorder)
+    elif args.coordinator:
+        # Imported here: fleet_cluster builds on this module
+        from fleet_cluster import ClusterCoordinator
+        simulator = ClusterCoordinator(args.server, args.drones, args.agents, args.coordinator, args.start_delay,
+                                       loop_monitor, SendPathTimer(enabled=args.send_path_timing),
+                                       args.send_schedule, spike_detector, timer_wheel, kinematics, ramp,
+                                       connection_gate, http_pool, args.max_measurements, args.seed)
+    elif args.workers > 1:
+        # Imported here: fleet_shards builds on this module
+        from fleet_shards import ShardedProductionLatencySimulator
+        simulator = ShardedProductionLatencySimulator(args.server, args.drones, args.workers, loop_monitor,
+                                                      SendPathTimer(enabled=args.send_path_timing),
+                                                      args.send_schedule, spike_detector, timer_wheel,
+                                                      kinematics, ramp, connection_gate, http_pool,
+                                                      args.max_measurements, args.seed)
+    else:
+        simulator = MultiDroneProductionLatencySimulator(args.server, args.drones, loop_monitor,
+                                                         SendPathTimer(enabled=args.send_path_timing),
+                                                         args.send_schedule, spike_detector, timer_wheel,
+                                                         kinematics, ramp, connection_gate, http_pool,
+                                                         args.max_measurements, args.seed, soak_monitor,
+                                                         recorder)
     
     try:
         asyncio.run(simulator.run_production_latency_simulation(args.duration))
@@ -482,6 +965,9 @@ def main():
         logger.info("🛑 Production latency simulator stopped by user")
     except Exception as e:
         logger.error(f"❌ Production simulator failed: {e}")
+    
+    if soak_monitor and soak_monitor.failed:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
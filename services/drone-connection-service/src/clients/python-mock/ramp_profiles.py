@@ -0,0 +1,96 @@
+# services/drone-connection-service/src/clients/python-mock/ramp_profiles.py
+"""
+Fleet ramp-up profiles and connection-storm limiting
+
+A ramp profile decides when each drone starts its discover/register/connect
+handshake, relative to the start of the run:
+
+  linear   one drone every 1/rate seconds
+  step     step_size drones every step_interval seconds (3 every 2s is the
+           original batch start-up)
+  poisson  exponential inter-arrival times with mean 1/rate
+  burst    the whole fleet at once, e.g. a reconnect storm after a server restart
+
+A ConnectionGate optionally caps how many handshakes are in flight at once
+and records how long drones queued for a slot.
+"""
+import asyncio
+import contextlib
+import random
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+from latency_histogram import LatencyHistogram
+
+RAMP_PROFILES = ['linear', 'step', 'poisson', 'burst']
+
+
+@dataclass
+class RampProfile:
+    name: str = 'step'
+    rate: float = 1.5
+    step_size: int = 3
+    step_interval: float = 2.0
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        if self.name not in RAMP_PROFILES:
+            raise ValueError(f"Unknown ramp profile: {self.name}")
+        if self.name in ('linear', 'poisson') and self.rate <= 0:
+            raise ValueError("Ramp rate must be positive")
+        if self.name == 'step' and self.step_size <= 0:
+            raise ValueError("Ramp step size must be positive")
+
+    def start_offsets(self, count: int) -> List[float]:
+        """Start time of each drone in seconds from the beginning of the ramp"""
+        if self.name == 'burst':
+            return [0.0] * count
+        if self.name == 'linear':
+            return [i / self.rate for i in range(count)]
+        if self.name == 'step':
+            return [(i // self.step_size) * self.step_interval for i in range(count)]
+
+        rng = random.Random(self.seed)
+        offsets = []
+        t = 0.0
+        for i in range(count):
+            offsets.append(t)
+            t += rng.expovariate(self.rate)
+        return offsets
+
+    def describe(self) -> str:
+        if self.name == 'burst':
+            return "burst (all drones at once)"
+        if self.name == 'step':
+            return f"step ({self.step_size} drones every {self.step_interval:g}s)"
+        return f"{self.name} ({self.rate:g} drones/s)"
+
+
+class ConnectionGate:
+    """Limits concurrent discover/register/connect handshakes"""
+
+    def __init__(self, max_concurrent: int = 0):
+        self.max_concurrent = max_concurrent
+        self._semaphore = asyncio.Semaphore(max_concurrent) if max_concurrent > 0 else None
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        # Per-worker gates summed into this one; peak_in_flight is then a sum of their peaks
+        self.merged_gates = 0
+        self.wait_time = LatencyHistogram()
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        """Hold one handshake slot; wait time is recorded in wait_time"""
+        wait_start = time.time()
+        if self._semaphore:
+            await self._semaphore.acquire()
+        self.wait_time.record((time.time() - wait_start) * 1000)
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            if self._semaphore:
+                self._semaphore.release()
@@ -0,0 +1,39 @@
+# services/drone-connection-service/src/clients/python-mock/seeded_random.py
+"""
+Seeded per-drone randomness for reproducible runs
+
+Without a seed the simulators draw from the global random module and take
+Jetson serials from uuid4, as they always have. With --seed every drone gets
+one random.Random per stream (config, motion, heartbeat, ...), seeded from
+the run seed, the drone ID and the stream name. A stream's values therefore
+do not depend on how the event loop interleaves it with the drone's other
+streams or with other drones, and two runs with the same seed draw the same
+values in every stream:
+
+  rngs = drone_rngs(seed, 'prod-latency-001', ('motion', 'heartbeat'))
+  rngs['heartbeat'].uniform(20, 60)
+
+String seeds are hashed with SHA-512 by random.seed, so sequences are the
+same across processes, hosts and PYTHONHASHSEED values.
+"""
+import random
+import uuid
+from typing import Dict, Iterable, Optional
+
+
+def drone_rng(seed: Optional[int], drone_id: str, stream: str):
+    """random.Random for one stream of one drone, or the global random module without a seed"""
+    if seed is None:
+        return random
+    return random.Random(f"{seed}:{drone_id}:{stream}")
+
+
+def drone_rngs(seed: Optional[int], drone_id: str, streams: Iterable[str]) -> Dict[str, object]:
+    return {stream: drone_rng(seed, drone_id, stream) for stream in streams}
+
+
+def jetson_serial(prefix: str, seed: Optional[int], drone_id: str) -> str:
+    """PREFIX-XXXXXXXX serial: derived from the seed and drone ID, or from uuid4 without a seed"""
+    if seed is None:
+        return f"{prefix}-{uuid.uuid4().hex[:8].upper()}"
+    return f"{prefix}-{drone_rng(seed, drone_id, 'serial').getrandbits(32):08X}"
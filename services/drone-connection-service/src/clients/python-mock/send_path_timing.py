@@ -0,0 +1,166 @@
+# services/drone-connection-service/src/clients/python-mock/send_path_timing.py
+"""
+Per-stage send-path timing
+
+Breaks the time spent sending each stream message into stages (state
+snapshot, payload generation, compression, serialization and enqueueing)
+using perf_counter_ns. Disabled timers return immediately, so the
+instrumentation can stay in the hot path.
+
+`await sio.emit(...)` only encodes the packet and puts it on engine.io's
+send queue; a background write loop does the websocket write later. The
+last stage is therefore "enqueue", the emit minus serialization, and
+transport time is not part of the breakdown.
+
+Serialization is timed by replacing socketio.packet.Packet.json, which is
+process-global: every Socket.IO client in the process encodes through the
+wrapper once any timer is enabled. Packets outside a timed emit go straight
+to json with one extra global lookup and are not recorded.
+"""
+import json
+import time
+from typing import Dict, Optional, Tuple
+
+from latency_histogram import LatencyHistogram
+
+STAGE_ORDER = ['snapshot', 'generate', 'compress', 'payload', 'serialize', 'enqueue']
+
+# (timer, event_type) for the emit currently encoding its packet. python-socketio
+# encodes synchronously before its first await, so this cannot be clobbered by
+# another coroutine between being set and being read.
+_active_emit: Optional[Tuple['SendPathTimer', str]] = None
+_hook_installed = False
+
+
+class _TimingJSON:
+    """json module stand-in that times Socket.IO packet serialization"""
+
+    @staticmethod
+    def dumps(*args, **kwargs):
+        active = _active_emit
+        if active is None:
+            return json.dumps(*args, **kwargs)
+        start_ns = time.perf_counter_ns()
+        result = json.dumps(*args, **kwargs)
+        active[0]._serialize_ns += time.perf_counter_ns() - start_ns
+        return result
+
+    @staticmethod
+    def loads(*args, **kwargs):
+        return json.loads(*args, **kwargs)
+
+
+def install_serialization_hook():
+    """Route Socket.IO packet encoding through the timing json wrapper (for the whole process)"""
+    global _hook_installed
+    if _hook_installed:
+        return
+    from socketio import packet
+    packet.Packet.json = _TimingJSON
+    _hook_installed = True
+
+
+class SendPathTimer:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._serialize_ns = 0
+        if enabled:
+            install_serialization_hook()
+
+    def now(self) -> int:
+        """Stage start mark (0 when disabled)"""
+        if not self.enabled:
+            return 0
+        return time.perf_counter_ns()
+
+    def mark(self, event_type: str, stage: str, start_ns: int) -> int:
+        """Record a stage ending now and return the mark for the next stage"""
+        if not self.enabled:
+            return 0
+        now_ns = time.perf_counter_ns()
+        self._record(event_type, stage, now_ns - start_ns)
+        return now_ns
+
+    async def emit(self, sio, event_type: str, event_name: str, data):
+        """Emit through Socket.IO, splitting serialization from handing the packet to engine.io"""
+        if not self.enabled:
+            return await sio.emit(event_name, data)
+
+        global _active_emit
+        self._serialize_ns = 0
+        start_ns = time.perf_counter_ns()
+        _active_emit = (self, event_type)
+        try:
+            return await sio.emit(event_name, data)
+        finally:
+            _active_emit = None
+            total_ns = time.perf_counter_ns() - start_ns
+            serialize_ns = self._serialize_ns
+            self._record(event_type, 'serialize', serialize_ns)
+            self._record(event_type, 'enqueue', max(0, total_ns - serialize_ns))
+
+    def _record(self, event_type: str, stage: str, elapsed_ns: int):
+        key = (event_type, stage)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram()
+        histogram.record(elapsed_ns / 1e6)
+
+    def export_state(self) -> dict:
+        """Mergeable snapshot of the stage histograms"""
+        return {f"{event_type}|{stage}": histogram.to_dict()
+                for (event_type, stage), histogram in self.histograms.items()}
+
+    def merge_state(self, state: dict):
+        """Add another timer's export_state() into this one"""
+        for key, data in state.items():
+            event_type, stage = key.split('|', 1)
+            histogram = self.histograms.get((event_type, stage))
+            if histogram is None:
+                histogram = self.histograms[(event_type, stage)] = LatencyHistogram()
+            histogram.merge(LatencyHistogram.from_dict(data))
+
+    def event_types(self):
+        return sorted({event_type for event_type, _ in self.histograms})
+
+    def stages(self, event_type: str):
+        present = {stage for et, stage in self.histograms if et == event_type}
+        return [stage for stage in STAGE_ORDER if stage in present] + sorted(present - set(STAGE_ORDER))
+
+    def summary(self) -> dict:
+        """Per event type, per stage timing summary"""
+        return {
+            event_type: {
+                stage: self.histograms[(event_type, stage)].summary()
+                for stage in self.stages(event_type)
+            }
+            for event_type in self.event_types()
+        }
+
+    def report_lines(self):
+        """Formatted breakdown lines shared by print and log reports"""
+        lines = []
+        for event_type in self.event_types():
+            stages = self.stages(event_type)
+            total_ms = sum(self.histograms[(event_type, s)].total_ms for s in stages)
+            lines.append(f"{event_type.upper()} ({self.histograms[(event_type, stages[-1])].count} sends):")
+            for stage in stages:
+                histogram = self.histograms[(event_type, stage)]
+                share = histogram.total_ms / total_ms * 100 if total_ms > 0 else 0.0
+                lines.append(f"  {stage:<10} avg {histogram.mean * 1000:8.1f}us  "
+                             f"P99 {histogram.percentile(99) * 1000:8.1f}us  "
+                             f"max {histogram.max_ms * 1000:8.1f}us  ({share:.1f}%)")
+        if lines:
+            lines.append("enqueue = sio.emit handing the packet to engine.io's send queue; "
+                         "the websocket write (transport time) is not measured")
+        return lines
+
+    def print_report(self):
+        """Print send-path stage breakdown"""
+        if not self.enabled or not self.histograms:
+            return
+        print(f"\n🔬 SEND-PATH TIMING BREAKDOWN")
+        print("-" * 50)
+        for line in self.report_lines():
+            print(f"  {line}")
@@ -0,0 +1,87 @@
+# services/drone-connection-service/src/clients/python-mock/send_schedule.py
+"""
+Periodic send scheduling for drone streams
+
+Closed-loop streams sleep for `interval` after every emit, so a stalled
+emit pushes every later send back and the sends that should have happened
+during the stall are never measured (coordinated omission). Open-loop
+streams send on a fixed grid of intended send times instead: a late stream
+catches up immediately, and latency is measured from the intended time, so
+stalls show up in the percentiles the way a real 10 Hz drone would see them.
+
+Both modes return the intended send time, so corrected latency is always
+based on how late the send went out. For a closed-loop stream the intended
+time is one interval after the previous send: a stall delays that one send
+and the lateness is added to its latency, but the stream does not catch up.
+"""
+import asyncio
+import time
+from typing import Optional
+
+SEND_SCHEDULE_MODES = ['open', 'closed']
+
+
+class SendSchedule:
+    def __init__(self, interval: float, mode: str = 'open'):
+        if mode not in SEND_SCHEDULE_MODES:
+            raise ValueError(f"Unknown send schedule mode: {mode}")
+        self.interval = interval
+        self.mode = mode
+        self.sends = 0
+        self.late_sends = 0
+        self.max_behind_ms = 0.0
+        self._next: Optional[float] = None
+        self._wall_offset = 0.0
+
+    @property
+    def open_loop(self) -> bool:
+        return self.mode == 'open'
+
+    async def next_send(self) -> float:
+        """Wait for the next send slot and return its intended time.time() timestamp"""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+
+        if self._next is None:
+            self._next = now
+            self._wall_offset = time.time() - now
+        elif not self.open_loop:
+            await asyncio.sleep(self.interval)
+            intended = self._next
+            self.record_send((loop.time() - intended) * 1000)
+            self._next = loop.time() + self.interval
+            return intended + self._wall_offset
+        elif self._next > now:
+            await asyncio.sleep(self._next - now)
+
+        intended = self._next
+        self.record_send((loop.time() - intended) * 1000)
+        self._next = intended + self.interval
+        return intended + self._wall_offset
+
+    def record_send(self, behind_ms: float):
+        """Account one send that went out behind_ms after its intended time"""
+        if behind_ms > self.max_behind_ms:
+            self.max_behind_ms = behind_ms
+        if behind_ms >= self.interval * 1000:
+            self.late_sends += 1
+        self.sends += 1
+
+    @classmethod
+    def from_summary(cls, summary: dict) -> 'SendSchedule':
+        """Rebuild schedule counters from summary() output (e.g. from a fleet worker)"""
+        schedule = cls(summary['interval_ms'] / 1000, summary['mode'])
+        schedule.sends = summary['sends']
+        schedule.late_sends = summary['late_sends']
+        schedule.max_behind_ms = summary['max_behind_ms']
+        return schedule
+
+    def summary(self) -> dict:
+        """Schedule adherence for reports and JSON export"""
+        return {
+            'mode': self.mode,
+            'interval_ms': self.interval * 1000,
+            'sends': self.sends,
+            'late_sends': self.late_sends,
+            'max_behind_ms': self.max_behind_ms
+        }
@@ -0,0 +1,323 @@
+# services/drone-connection-service/src/clients/python-mock/soak_monitor.py
+"""
+Soak-test monitor for multi-hour fleet runs
+
+Simulated drones accumulate state over a long run: latency measurements
+(unbounded unless --max-measurements is set), intended send times, pending
+measurements and stream tasks. Every --soak-interval seconds this monitor
+samples process RSS, the number of asyncio tasks, the fleet's per-drone
+container sizes and, with --soak-tracemalloc, the allocation sites that
+grew most since the end of warm-up.
+
+After warm-up every series is checked for monotonic growth: one that rose
+(or held) in at least 90% of the sample steps and ends more than 1% above
+its baseline is flagged with its growth rate per hour. RSS and task growth
+over the baseline can be given budgets; a run that exceeds one is stopped
+early and the fleet runner exits non-zero:
+
+  python multi_drone_prod.py --drones 50 --duration 240 --soak \\
+      --soak-interval 60 --soak-rss-budget-mb 200 --soak-task-budget 50
+"""
+import asyncio
+import logging
+import os
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+# Per-drone containers that grow with run time unless something bounds them
+DRONE_CONTAINERS = ('latency_measurements', 'intended_send_times', 'pending_measurements', 'tasks',
+                    'wheel_handles')
+GROWTH_HINTS = {
+    'latency_measurements': 'bound it with --max-measurements N',
+    'tasks': 'stream tasks left behind by reconnects',
+    'asyncio_tasks': 'tasks that never finish (stream loops, un-awaited sends)'
+}
+MONOTONIC_FRACTION = 0.9
+MIN_RELATIVE_GROWTH = 0.01
+MIN_TREND_SAMPLES = 4
+TOP_ALLOCATIONS = 10
+
+
+def current_rss_mb() -> float:
+    """Resident set size now (the ru_maxrss fallback is a high-water mark)"""
+    if psutil:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return 0.0
+
+
+def drone_object_counts(drones: list) -> Dict[str, Dict[str, int]]:
+    """Fleet total and largest single-drone size of every growable container"""
+    counts = {}
+    for name in DRONE_CONTAINERS:
+        sizes = [len(getattr(drone, name)) for drone in drones if hasattr(drone, name)]
+        if sizes:
+            counts[name] = {'total': sum(sizes), 'max': max(sizes)}
+    return counts
+
+
+@dataclass
+class SoakSample:
+    elapsed_s: float
+    rss_mb: float
+    asyncio_tasks: int
+    objects: Dict[str, int]          # fleet total per container
+    traced_mb: Optional[float] = None
+
+
+@dataclass
+class GrowthTrend:
+    series: str
+    first: float
+    last: float
+    rate_per_hour: float             # least-squares slope
+    rising_fraction: float           # share of sample steps that did not go down
+
+    @property
+    def monotonic(self) -> bool:
+        threshold = abs(self.first) * (1 + MIN_RELATIVE_GROWTH) if self.first else 0
+        return (self.rising_fraction >= MONOTONIC_FRACTION and self.rate_per_hour > 0
+                and self.last > threshold)
+
+
+def growth_trend(series: str, times: List[float], values: List[float]) -> GrowthTrend:
+    n = len(values)
+    mean_t = sum(times) / n
+    mean_v = sum(values) / n
+    variance = sum((t - mean_t) ** 2 for t in times)
+    slope = sum((t - mean_t) * (v - mean_v) for t, v in zip(times, values)) / variance if variance else 0.0
+    rising = sum(1 for a, b in zip(values, values[1:]) if b >= a) / (n - 1) if n > 1 else 0.0
+    return GrowthTrend(series, values[0], values[-1], slope * 3600, rising)
+
+
+class SoakMonitor:
+    def __init__(self, interval_s: float = 60.0, warmup_s: float = 300.0,
+                 rss_budget_mb: Optional[float] = None, task_budget: Optional[int] = None,
+                 trace_allocations: bool = False):
+        self.interval = interval_s
+        self.warmup = warmup_s
+        self.rss_budget_mb = rss_budget_mb
+        self.task_budget = task_budget
+        self.trace_allocations = trace_allocations
+
+        self.samples: List[SoakSample] = []
+        self.baseline: Optional[SoakSample] = None
+        self.largest_drone: Dict[str, int] = {}
+        self.top_allocations: List[dict] = []
+        self.failure: Optional[str] = None
+
+        self.drones: list = []
+        self.started_at = 0.0
+        self._baseline_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._started_tracing = False
+        self._task: Optional[asyncio.Task] = None
+        self.running = False
+
+    @property
+    def failed(self) -> bool:
+        return self.failure is not None
+
+    def start(self, drones: list):
+        """Start sampling the given fleet on the running loop (idempotent)"""
+        if self.running:
+            return
+        self.drones = drones
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self.started_at = time.time()
+        self.running = True
+        self.sample()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"🧪 Soak monitor started (sample every {self.interval:g}s, warm-up {self.warmup:g}s"
+                    f"{', tracemalloc on' if self.trace_allocations else ''})")
+
+    async def stop(self):
+        """Take a last sample and stop"""
+        if not self.running:
+            return
+        self.running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self.sample()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    async def _run(self):
+        while self.running:
+            await asyncio.sleep(self.interval)
+            self.sample()
+
+    def sample(self) -> SoakSample:
+        """Record RSS, task and container counts; set the baseline once warm-up is over"""
+        counts = drone_object_counts(self.drones)
+        for name, count in counts.items():
+            self.largest_drone[name] = max(self.largest_drone.get(name, 0), count['max'])
+        tracing = tracemalloc.is_tracing()
+        sample = SoakSample(
+            elapsed_s=time.time() - self.started_at,
+            rss_mb=current_rss_mb(),
+            asyncio_tasks=len(asyncio.all_tasks()),
+            objects={name: count['total'] for name, count in counts.items()},
+            traced_mb=tracemalloc.get_traced_memory()[0] / (1024 * 1024) if tracing else None
+        )
+        self.samples.append(sample)
+
+        if self.baseline is None:
+            if sample.elapsed_s >= self.warmup:
+                self.baseline = sample
+                if tracing:
+                    self._baseline_snapshot = self.snapshot()
+                logger.info(f"🧪 Soak baseline after warm-up: RSS {sample.rss_mb:.1f}MB, "
+                            f"{sample.asyncio_tasks} tasks")
+            return sample
+
+        if tracing and self._baseline_snapshot is not None:
+            self.top_allocations = self.allocation_growth()
+        self.check_budgets(sample)
+        logger.info(f"🧪 Soak @ {sample.elapsed_s / 60:.1f}min: RSS {sample.rss_mb:.1f}MB "
+                    f"({sample.rss_mb - self.baseline.rss_mb:+.1f}MB), {sample.asyncio_tasks} tasks, "
+                    f"{sample.objects.get('latency_measurements', 0):,} measurements")
+        return sample
+
+    def check_budgets(self, sample: SoakSample):
+        rss_growth = sample.rss_mb - self.baseline.rss_mb
+        if self.rss_budget_mb is not None and rss_growth > self.rss_budget_mb:
+            self.fail(f"RSS grew {rss_growth:.1f}MB over the warm-up baseline (budget {self.rss_budget_mb:g}MB)")
+        task_growth = sample.asyncio_tasks - self.baseline.asyncio_tasks
+        if self.task_budget is not None and task_growth > self.task_budget:
+            self.fail(f"asyncio tasks grew by {task_growth} over the warm-up baseline (budget {self.task_budget})")
+
+    def fail(self, reason: str):
+        if self.failure is None:
+            self.failure = reason
+            logger.error(f"❌ Soak budget exceeded: {reason}")
+
+    @staticmethod
+    def snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap*>')
+        ))
+
+    def allocation_growth(self) -> List[dict]:
+        """Allocation sites with the largest growth since the warm-up baseline"""
+        stats = self.snapshot().compare_to(self._baseline_snapshot, 'lineno')
+        return [{'site': str(stat.traceback), 'size_diff_kb': stat.size_diff / 1024, 'count_diff': stat.count_diff}
+                for stat in stats[:TOP_ALLOCATIONS] if stat.size_diff > 0]
+
+    def trends(self) -> List[GrowthTrend]:
+        """Growth trend of every sampled series since the warm-up baseline"""
+        if self.baseline is None:
+            return []
+        after = [s for s in self.samples if s.elapsed_s >= self.baseline.elapsed_s]
+        if len(after) < MIN_TREND_SAMPLES:
+            return []
+        series = {
+            'rss_mb': [s.rss_mb for s in after],
+            'asyncio_tasks': [s.asyncio_tasks for s in after]
+        }
+        if all(s.traced_mb is not None for s in after):
+            series['traced_mb'] = [s.traced_mb for s in after]
+        for name in after[0].objects:
+            series[name] = [s.objects.get(name, 0) for s in after]
+        times = [s.elapsed_s for s in after]
+        return [growth_trend(name, times, values) for name, values in series.items()]
+
+    def growing(self) -> List[GrowthTrend]:
+        return [trend for trend in self.trends() if trend.monotonic]
+
+    def summary(self) -> dict:
+        """Soak statistics for reports and JSON export"""
+        first = self.samples[0] if self.samples else None
+        last = self.samples[-1] if self.samples else None
+        return {
+            'interval_s': self.interval,
+            'warmup_s': self.warmup,
+            'rss_budget_mb': self.rss_budget_mb,
+            'task_budget': self.task_budget,
+            'samples': len(self.samples),
+            'elapsed_s': last.elapsed_s if last else 0.0,
+            'rss_mb': {
+                'start': first.rss_mb if first else None,
+                'baseline': self.baseline.rss_mb if self.baseline else None,
+                'end': last.rss_mb if last else None,
+                'peak': max(s.rss_mb for s in self.samples) if self.samples else None
+            },
+            'largest_drone': self.largest_drone,
+            'growing': [asdict(trend) for trend in self.growing()],
+            'top_allocations': self.top_allocations,
+            'failure': self.failure,
+            'series': [asdict(s) for s in self.samples]
+        }
+
+    def print_report(self):
+        """Print soak-test report"""
+        print(f"\n🧪 SOAK TEST (memory growth and leak detection)")
+        print("-" * 50)
+        if not self.samples:
+            print("  No soak samples collected")
+            return
+        first, last = self.samples[0], self.samples[-1]
+        print(f"  Samples: {len(self.samples)} every {self.interval:g}s over {last.elapsed_s / 60:.1f} min "
+              f"(warm-up {self.warmup:g}s)")
+        if self.baseline is None:
+            print("  Run ended before warm-up: no baseline, growth not checked")
+        baseline = self.baseline or first
+        print(f"  RSS: start {first.rss_mb:.1f}MB, baseline {baseline.rss_mb:.1f}MB, end {last.rss_mb:.1f}MB "
+              f"(peak {max(s.rss_mb for s in self.samples):.1f}MB)")
+        print(f"  asyncio tasks: baseline {baseline.asyncio_tasks}, end {last.asyncio_tasks}")
+        if last.objects:
+            print(f"  Per-drone containers (fleet total / largest drone):")
+            for name, total in last.objects.items():
+                print(f"    {name:<22} {total:>10,} / {self.largest_drone.get(name, 0):,}")
+
+        if self.baseline is not None:
+            growing = self.growing()
+            if growing:
+                print(f"  Monotonic growth since warm-up:")
+                for trend in growing:
+                    print(f"    ⚠️ {trend.series}: {trend.first:,.1f} → {trend.last:,.1f} "
+                          f"({trend.rate_per_hour:+,.1f}/h, rising in {trend.rising_fraction * 100:.0f}% of samples)")
+                    if trend.series in GROWTH_HINTS:
+                        print(f"      ↳ {GROWTH_HINTS[trend.series]}")
+            elif len(self.samples) - self.samples.index(self.baseline) < MIN_TREND_SAMPLES:
+                print(f"  Too few samples after warm-up to judge growth (need {MIN_TREND_SAMPLES})")
+            else:
+                print(f"  ✅ No monotonic growth since warm-up")
+
+        if self.top_allocations:
+            print(f"  Top allocation growth since warm-up (tracemalloc):")
+            for allocation in self.top_allocations:
+                print(f"    {allocation['size_diff_kb']:+10.1f}KB {allocation['count_diff']:+8d} blocks  "
+                      f"{allocation['site']}")
+
+        if self.failure:
+            print(f"  ❌ FAILED: {self.failure}")
+        elif self.rss_budget_mb is not None or self.task_budget is not None:
+            print(f"  ✅ Within budget")
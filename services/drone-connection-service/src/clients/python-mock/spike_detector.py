@@ -0,0 +1,233 @@
+# services/drone-connection-service/src/clients/python-mock/spike_detector.py
+"""
+Streaming EWMA latency anomaly detector with spike capture
+
+Keeps an exponentially weighted mean/variance per (drone, stream) and fires
+when a measurement's z-score against that baseline crosses a threshold.
+Each spike is captured as a compact record holding the measurements around
+it, the loop lag, the last server queue feedback and the connection state,
+so spikes can be correlated across the fleet without keeping every sample.
+"""
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SpikeRecord:
+    drone_id: str
+    stream: str
+    timestamp: float
+    latency_ms: float
+    baseline_ms: float
+    baseline_std_ms: float
+    z_score: float
+    loop_lag_ms: float
+    context: dict = field(default_factory=dict)
+    window_before: List[list] = field(default_factory=list)
+    window_after: List[list] = field(default_factory=list)
+    peak_latency_ms: float = 0.0
+
+
+class EwmaBaseline:
+    """Exponentially weighted mean and variance of one latency stream"""
+
+    __slots__ = ('alpha', 'mean', 'variance', 'count')
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.mean = 0.0
+        self.variance = 0.0
+        self.count = 0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def update(self, value: float):
+        if self.count == 0:
+            self.mean = value
+        else:
+            delta = value - self.mean
+            self.mean += self.alpha * delta
+            self.variance = (1 - self.alpha) * (self.variance + self.alpha * delta * delta)
+        self.count += 1
+
+
+class SpikeDetector:
+    def __init__(self, z_threshold: float = 4.0, alpha: float = 0.05, warmup_samples: int = 20,
+                 min_std_ms: float = 1.0, window_before: int = 10, window_after: int = 10,
+                 max_records: int = 1000):
+        self.z_threshold = z_threshold
+        self.alpha = alpha
+        self.warmup_samples = warmup_samples
+        self.min_std_ms = min_std_ms
+        self.window_before = window_before
+        self.window_after = window_after
+
+        self.records: Deque[SpikeRecord] = deque(maxlen=max_records)
+        self.spike_counts: Dict[Tuple[str, str], int] = {}
+        self.observed = 0
+
+        self._baselines: Dict[Tuple[str, str], EwmaBaseline] = {}
+        self._recent: Dict[Tuple[str, str], Deque[list]] = {}
+        self._pending: Dict[Tuple[str, str], SpikeRecord] = {}
+
+    def observe(self, drone_id: str, measurement, context: Optional[Callable[[], dict]] = None):
+        """Feed one measurement; context() is only called when a spike fires"""
+        key = (drone_id, measurement.measurement_type)
+        latency_ms = measurement.latency_ms
+        sample = [round(measurement.receive_timestamp, 3), round(latency_ms, 3),
+                  round(getattr(measurement, 'loop_lag_ms', 0.0), 3)]
+        self.observed += 1
+
+        baseline = self._baselines.get(key)
+        if baseline is None:
+            baseline = self._baselines[key] = EwmaBaseline(self.alpha)
+            self._recent[key] = deque(maxlen=self.window_before)
+        recent = self._recent[key]
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            pending.window_after.append(sample)
+            pending.peak_latency_ms = max(pending.peak_latency_ms, latency_ms)
+            if len(pending.window_after) >= self.window_after:
+                self._finish(key)
+        elif baseline.count >= self.warmup_samples:
+            std = max(baseline.std, self.min_std_ms)
+            z_score = (latency_ms - baseline.mean) / std
+            if z_score >= self.z_threshold:
+                record = SpikeRecord(
+                    drone_id=drone_id,
+                    stream=measurement.measurement_type,
+                    timestamp=measurement.receive_timestamp,
+                    latency_ms=latency_ms,
+                    baseline_ms=baseline.mean,
+                    baseline_std_ms=baseline.std,
+                    z_score=z_score,
+                    loop_lag_ms=getattr(measurement, 'loop_lag_ms', 0.0),
+                    context=context() if context else {},
+                    window_before=list(recent),
+                    peak_latency_ms=latency_ms
+                )
+                self.spike_counts[key] = self.spike_counts.get(key, 0) + 1
+                self._pending[key] = record
+                if self.window_after <= 0:
+                    self._finish(key)
+
+        baseline.update(latency_ms)
+        recent.append(sample)
+
+    def _finish(self, key: Tuple[str, str]):
+        record = self._pending.pop(key)
+        self.records.append(record)
+        feedback = record.context.get('server_feedback') or {}
+        logger.warning(f"📈 [{record.drone_id}] {record.stream} latency spike: {record.latency_ms:.1f}ms "
+                       f"(z={record.z_score:.1f}, baseline {record.baseline_ms:.1f}±{record.baseline_std_ms:.1f}ms, "
+                       f"peak {record.peak_latency_ms:.1f}ms), loop lag {record.loop_lag_ms:.1f}ms"
+                       + (f", feedback {feedback}" if feedback else ""))
+
+    def flush(self):
+        """Finish spikes still collecting their trailing window"""
+        for key in list(self._pending):
+            self._finish(key)
+
+    def export_state(self) -> dict:
+        """Mergeable snapshot of spike counts and records
+
+        Spikes still collecting their trailing window are exported separately
+        under 'pending' and keep collecting here; only flush() finishes them.
+        """
+        return {
+            'observed': self.observed,
+            'spike_counts': [[drone_id, stream, count] for (drone_id, stream), count in self.spike_counts.items()],
+            'records': [asdict(r) for r in self.records],
+            'pending': [asdict(r) for r in self._pending.values()]
+        }
+
+    def merge_state(self, state: dict):
+        """Add another detector's export_state() into this one"""
+        self.observed += state['observed']
+        for drone_id, stream, count in state['spike_counts']:
+            key = (drone_id, stream)
+            self.spike_counts[key] = self.spike_counts.get(key, 0) + count
+        self.records.extend(SpikeRecord(**r) for r in state['records'])
+        for r in state['pending']:
+            self._pending[(r['drone_id'], r['stream'])] = SpikeRecord(**r)
+
+    def clusters(self, gap_seconds: float = 1.0) -> List[dict]:
+        """Group spikes from different drones that happened close together"""
+        ordered = sorted(self.records, key=lambda r: r.timestamp)
+        clusters = []
+        current: List[SpikeRecord] = []
+        for record in ordered:
+            if current and record.timestamp - current[-1].timestamp > gap_seconds:
+                clusters.append(current)
+                current = []
+            current.append(record)
+        if current:
+            clusters.append(current)
+
+        result = []
+        for group in clusters:
+            drones = sorted({r.drone_id for r in group})
+            result.append({
+                'start': group[0].timestamp,
+                'end': group[-1].timestamp,
+                'spikes': len(group),
+                'drones': drones,
+                'streams': sorted({r.stream for r in group}),
+                'max_latency_ms': max(r.peak_latency_ms for r in group),
+                'max_loop_lag_ms': max(r.loop_lag_ms for r in group)
+            })
+        return result
+
+    def summary(self) -> dict:
+        """Spike counts, fleet clusters and compact records for JSON export"""
+        self.flush()
+        by_stream: Dict[str, int] = {}
+        for (_, stream), count in self.spike_counts.items():
+            by_stream[stream] = by_stream.get(stream, 0) + count
+        return {
+            'z_threshold': self.z_threshold,
+            'alpha': self.alpha,
+            'observed': self.observed,
+            'spikes_total': sum(self.spike_counts.values()),
+            'spikes_by_stream': by_stream,
+            'clusters': self.clusters(),
+            'records': [asdict(r) for r in self.records]
+        }
+
+    def print_report(self, min_cluster_drones: int = 2):
+        """Print spike summary and fleet-wide spike clusters"""
+        self.flush()
+        total = sum(self.spike_counts.values())
+        print(f"\n📈 LATENCY SPIKES (EWMA z >= {self.z_threshold:g})")
+        print("-" * 50)
+        print(f"  Measurements observed: {self.observed}, spikes: {total}")
+        if not total:
+            return
+
+        by_drone: Dict[str, int] = {}
+        for (drone_id, stream), count in sorted(self.spike_counts.items()):
+            by_drone[drone_id] = by_drone.get(drone_id, 0) + count
+        worst = sorted(by_drone.items(), key=lambda item: item[1], reverse=True)[:5]
+        print("  Most affected drones: " + ", ".join(f"{d} ({c})" for d, c in worst))
+
+        for record in sorted(self.records, key=lambda r: r.z_score, reverse=True)[:5]:
+            print(f"    {time.strftime('%H:%M:%S', time.localtime(record.timestamp))} "
+                  f"{record.drone_id} {record.stream}: {record.latency_ms:.1f}ms "
+                  f"(z={record.z_score:.1f}, baseline {record.baseline_ms:.1f}ms, "
+                  f"loop lag {record.loop_lag_ms:.1f}ms)")
+
+        fleet_events = [c for c in self.clusters() if len(c['drones']) >= min_cluster_drones]
+        print(f"  Fleet-wide spike clusters (>= {min_cluster_drones} drones within 1s): {len(fleet_events)}")
+        for cluster in fleet_events[:5]:
+            print(f"    {time.strftime('%H:%M:%S', time.localtime(cluster['start']))} "
+                  f"{len(cluster['drones'])} drones, {cluster['spikes']} spikes, "
+                  f"max {cluster['max_latency_ms']:.1f}ms, max loop lag {cluster['max_loop_lag_ms']:.1f}ms")
@@ -0,0 +1,541 @@
+# services/drone-connection-service/src/clients/python-mock/standin_server.py
+"""
+In-process stand-in for the drone-connection service
+
+Implements the part of the service protocol the simulators use, on
+python-socketio's AsyncServer and aiohttp, so the client side can be
+benchmarked offline and in CI:
+
+  POST /drone/discover, POST /drone/register    (handlers/droneRegistry.ts)
+  drone_register_real -> registration_success   (handlers/realDroneHandler.ts)
+  telemetry_real -> telemetry_ack, heartbeat_real -> heartbeat_ack
+  camera_frame_binary / camera_frame -> camera_frame_ack with queueSize
+                                                 (cameraHandler.ts)
+  command, precision_landing_command, waypoint_mission injection, with
+  command_response round trips timed per command type
+
+Acks can be delayed (fixed + uniform jitter) and dropped with a given
+probability. Camera frames go into a per drone/camera queue of
+--max-queue-size frames that drains at --queue-drain-fps; a full queue
+skips its oldest frame, as the real camera handler does. Every received
+event is counted per event and drone, with payload bytes and one-way
+transit time from the payload timestamp (same host clock).
+
+telemetry_ack echoes only the timestamp, like realDroneHandler.ts; with
+--echo-sequence-id it also echoes the telemetry sequence_id so clients can
+match acks to sends by sequence.
+
+Run standalone (Ctrl-C prints the receive report):
+
+  python standin_server.py --port 4005 --ack-delay-ms 5 --ack-jitter-ms 2
+
+or embed it in a benchmark:
+
+  async with StandinServer(StandinConfig(port=0)) as server:
+      ...  # point drones at server.url
+"""
+import argparse
+import asyncio
+import itertools
+import logging
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import socketio
+from aiohttp import web
+
+from latency_histogram import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 4005
+COMMAND_TYPES = ['arm', 'disarm', 'takeoff', 'land', 'rtl']
+
+
+@dataclass
+class StandinConfig:
+    host: str = '127.0.0.1'
+    port: int = DEFAULT_PORT             # 0 picks a free port
+    ack_delay_ms: float = 0.0
+    ack_jitter_ms: float = 0.0           # uniform, added to the delay
+    ack_loss: float = 0.0                # probability an ack is not sent
+    max_queue_size: int = 3              # frames per drone/camera before the oldest is skipped
+    queue_drain_fps: float = 30.0        # 0: queues never drain
+    echo_sequence_id: bool = False       # the real server acks with the timestamp only
+    log_events: bool = False
+
+
+def _payload_bytes(data) -> int:
+    """Approximate payload size without re-serializing it"""
+    if isinstance(data, (bytes, bytearray, str)):
+        return len(data)
+    if isinstance(data, dict):
+        return sum(len(k) + _payload_bytes(v) for k, v in data.items())
+    if isinstance(data, (list, tuple)):
+        return sum(_payload_bytes(v) for v in data)
+    return 8
+
+
+class EventStats:
+    """Server-side receive statistics of one event"""
+
+    __slots__ = ('messages', 'bytes', 'first_receive', 'last_receive', 'transit', 'by_drone')
+
+    def __init__(self):
+        self.messages = 0
+        self.bytes = 0
+        self.first_receive: Optional[float] = None
+        self.last_receive: Optional[float] = None
+        self.transit = LatencyHistogram()
+        self.by_drone: Dict[str, int] = {}
+
+    def record(self, drone_id: str, data, now: float):
+        self.messages += 1
+        self.bytes += _payload_bytes(data)
+        if self.first_receive is None:
+            self.first_receive = now
+        self.last_receive = now
+        self.by_drone[drone_id] = self.by_drone.get(drone_id, 0) + 1
+        sent = data.get('timestamp') if isinstance(data, dict) else None
+        if isinstance(sent, (int, float)):
+            self.transit.record(max(0.0, now * 1000 - sent))
+
+    def summary(self) -> dict:
+        duration = (self.last_receive - self.first_receive) if self.messages > 1 else 0
+        return {
+            'messages': self.messages,
+            'bytes': self.bytes,
+            'drones': len(self.by_drone),
+            'messages_per_s': self.messages / duration if duration > 0 else 0.0,
+            'bytes_per_s': self.bytes / duration if duration > 0 else 0.0,
+            'transit_ms': self.transit.summary()
+        }
+
+
+class FrameQueue:
+    """Server frame queue of one drone camera, drained lazily at a fixed rate"""
+
+    __slots__ = ('max_size', 'drain_interval', 'frames', 'last_drain', 'received', 'skipped', 'max_seen')
+
+    def __init__(self, max_size: int, drain_fps: float):
+        self.max_size = max_size
+        self.drain_interval = 1.0 / drain_fps if drain_fps > 0 else None
+        self.frames = 0
+        self.last_drain = time.monotonic()
+        self.received = 0
+        self.skipped = 0
+        self.max_seen = 0
+
+    def drain(self, now: float):
+        if self.drain_interval is None:
+            return
+        drained = int((now - self.last_drain) / self.drain_interval)
+        if drained:
+            self.frames = max(0, self.frames - drained)
+            self.last_drain += drained * self.drain_interval
+        if not self.frames:
+            self.last_drain = now
+
+    def push(self) -> int:
+        """Queue one frame and return the queue size reported in the ack"""
+        self.drain(time.monotonic())
+        self.received += 1
+        if self.frames >= self.max_size:
+            self.skipped += 1
+        else:
+            self.frames += 1
+        self.max_seen = max(self.max_seen, self.frames)
+        return self.frames
+
+
+class StandinServer:
+    """Stand-in drone-connection service for offline benchmarks"""
+
+    def __init__(self, config: Optional[StandinConfig] = None):
+        self.config = config or StandinConfig()
+        self.sio = socketio.AsyncServer(async_mode='aiohttp', cors_allowed_origins='*')
+        self.app = web.Application()
+        self.sio.attach(self.app)
+        self.app.router.add_post('/drone/discover', self.handle_discover)
+        self.app.router.add_post('/drone/register', self.handle_register)
+        self.runner: Optional[web.AppRunner] = None
+        self.port: Optional[int] = None
+
+        self.sessions: Dict[str, str] = {}       # sid -> drone id
+        self.drone_sids: Dict[str, str] = {}     # drone id -> sid
+        self.http_requests: Dict[str, int] = {'discover': 0, 'register': 0}
+        self.events: Dict[str, EventStats] = {}
+        self.frame_queues: Dict[str, FrameQueue] = {}
+        self.acks_sent = 0
+        self.acks_dropped = 0
+        self.started_at: Optional[float] = None
+
+        self._command_ids = itertools.count(1)
+        self.pending_commands: Dict[object, tuple] = {}
+        self.command_rtt: Dict[str, LatencyHistogram] = {}
+        self.commands_sent: Dict[str, int] = {}
+
+        self.sio.on('connect', self.on_connect)
+        self.sio.on('disconnect', self.on_disconnect)
+        self.sio.on('drone_register_real', self.on_register)
+        self.sio.on('telemetry_real', self.on_telemetry)
+        self.sio.on('heartbeat_real', self.on_heartbeat)
+        self.sio.on('camera_frame_binary', self.on_camera_frame)
+        self.sio.on('camera_frame', self.on_camera_frame)
+        self.sio.on('command_response', self.on_command_response)
+        self.sio.on('*', self.on_other_event)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.config.host}:{self.port}"
+
+    @property
+    def registered_drones(self) -> List[str]:
+        return list(self.drone_sids)
+
+    async def start(self):
+        self.runner = web.AppRunner(self.app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.config.host, self.config.port).start()
+        self.port = self.runner.addresses[0][1]
+        self.started_at = time.time()
+        logger.info(f"🧪 Stand-in drone-connection server on {self.url}")
+        return self
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def __aenter__(self) -> 'StandinServer':
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    # HTTP
+
+    async def handle_discover(self, request: web.Request) -> web.Response:
+        self.http_requests['discover'] += 1
+        return web.json_response({
+            'success': True,
+            'message': 'FlyOS Drone Connection Service (stand-in)',
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'serverInfo': {
+                'serverUrl': self.url,
+                'websocketUrl': self.url.replace('http', 'ws'),
+                'apiVersion': '1.0',
+                'supportedFeatures': ['telemetry', 'commands', 'camera_webrtc', 'mavros_logging',
+                                      'precision_landing', 'mission_planning', 'real_time_control']
+            }
+        })
+
+    async def handle_register(self, request: web.Request) -> web.Response:
+        self.http_requests['register'] += 1
+        try:
+            data = await request.json()
+        except ValueError:
+            data = {}
+        drone_id = data.get('droneId')
+        if not drone_id or not data.get('jetsonSerial'):
+            return web.json_response({'success': False, 'error': 'Missing required fields: droneId, jetsonSerial'},
+                                     status=400)
+        return web.json_response({
+            'success': True,
+            'message': 'Registration successful',
+            'droneId': drone_id,
+            'sessionToken': f"{drone_id}_{int(time.time() * 1000)}_{uuid.uuid4().hex[:9]}"
+        })
+
+    # Socket.IO
+
+    def record(self, event: str, sid: str, data) -> Optional[str]:
+        """Count a received event; returns the sender's drone id if registered"""
+        drone_id = self.sessions.get(sid)
+        stats = self.events.get(event)
+        if stats is None:
+            stats = self.events[event] = EventStats()
+        stats.record(drone_id or 'unregistered', data, time.time())
+        if self.config.log_events:
+            logger.debug(f"📥 {event} from {drone_id or sid}")
+        return drone_id
+
+    async def ack(self, sid: str, event: str, data: dict):
+        """Send an ack after the configured delay, unless it is dropped"""
+        if self.config.ack_loss and random.random() < self.config.ack_loss:
+            self.acks_dropped += 1
+            return
+        delay_ms = self.config.ack_delay_ms
+        if self.config.ack_jitter_ms:
+            delay_ms += random.uniform(0, self.config.ack_jitter_ms)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+        await self.sio.emit(event, data, to=sid)
+        self.acks_sent += 1
+
+    async def on_connect(self, sid, environ, auth=None):
+        self.record('connect', sid, None)
+
+    async def on_disconnect(self, sid, *args):
+        drone_id = self.sessions.pop(sid, None)
+        if drone_id and self.drone_sids.get(drone_id) == sid:
+            del self.drone_sids[drone_id]
+        self.record('disconnect', sid, None)
+
+    async def on_register(self, sid, data):
+        self.record('drone_register_real', sid, data)
+        drone_id = data.get('droneId') if isinstance(data, dict) else None
+        if not drone_id:
+            await self.sio.emit('registration_failed', {'error': 'Missing required drone identification'}, to=sid)
+            return
+        self.sessions[sid] = drone_id
+        self.drone_sids[drone_id] = sid
+        capabilities = data.get('capabilities') or []
+        has_webrtc = 'webrtc' in capabilities or 'camera_webrtc' in capabilities
+        await self.sio.emit('registration_success', {
+            'droneId': drone_id,
+            'status': 'connected',
+            'serverCapabilities': ['telemetry', 'commands', 'camera_webrtc', 'mavros_logging',
+                                   'precision_landing', 'mission_planning'],
+            'webrtcSupported': has_webrtc,
+            'recommendedDataRates': {'telemetry': '10Hz', 'mavros': '1Hz', 'heartbeat': '0.1Hz',
+                                     'camera': 'webrtc_datachannel' if has_webrtc else 'websocket'}
+        }, to=sid)
+
+    async def on_telemetry(self, sid, data):
+        if not self.record('telemetry_real', sid, data) or not isinstance(data, dict):
+            return
+        timestamp = data.get('timestamp')
+        ack = {
+            'timestamp': timestamp,
+            'status': 'received',
+            'connectionQuality': 100,
+            'latency': time.time() * 1000 - timestamp if isinstance(timestamp, (int, float)) else None
+        }
+        if self.config.echo_sequence_id and 'sequence_id' in data:
+            ack['sequence_id'] = data['sequence_id']
+        await self.ack(sid, 'telemetry_ack', ack)
+
+    async def on_heartbeat(self, sid, data):
+        if not self.record('heartbeat_real', sid, data):
+            return
+        await self.ack(sid, 'heartbeat_ack', {
+            'serverTimestamp': time.time() * 1000,
+            'connectionQuality': 100,
+            'recommendedDataRate': '10Hz',
+            'webrtcRecommended': True
+        })
+
+    async def on_camera_frame(self, sid, data):
+        event = 'camera_frame_binary' if isinstance(data, dict) and 'frameData' in data else 'camera_frame'
+        drone_id = self.record(event, sid, data)
+        if not drone_id or not isinstance(data, dict) or data.get('droneId') != drone_id:
+            return
+        start = time.time()
+        camera = data.get('camera', 'front')
+        key = f"{drone_id}:{camera}"
+        queue = self.frame_queues.get(key)
+        if queue is None:
+            queue = self.frame_queues[key] = FrameQueue(self.config.max_queue_size, self.config.queue_drain_fps)
+        queue_size = queue.push()
+        metadata = data.get('metadata') or {}
+        original, compressed = metadata.get('originalSize'), metadata.get('compressedSize')
+        await self.ack(sid, 'camera_frame_ack', {
+            'droneId': drone_id,
+            'camera': camera,
+            'frameNumber': data.get('frameNumber', metadata.get('frameNumber', 0)),
+            'status': 'processed',
+            'compressionRatio': original / compressed if original and compressed else 1.0,
+            'queueSize': queue_size,
+            'processingTime': (time.time() - start) * 1000
+        })
+
+    async def on_command_response(self, sid, data):
+        self.record('command_response', sid, data)
+        if not isinstance(data, dict):
+            return
+        pending = self.pending_commands.pop(data.get('commandId'), None)
+        if pending is None:
+            return
+        command_type, sent = pending
+        histogram = self.command_rtt.get(command_type)
+        if histogram is None:
+            histogram = self.command_rtt[command_type] = LatencyHistogram()
+        histogram.record((time.time() - sent) * 1000)
+
+    async def on_other_event(self, event, sid, data=None):
+        self.record(event, sid, data)
+
+    # Injection
+
+    async def inject(self, drone_id: str, event: str, data: dict) -> bool:
+        """Emit any server-to-drone event to a registered drone"""
+        sid = self.drone_sids.get(drone_id)
+        if sid is None:
+            return False
+        await self.sio.emit(event, data, to=sid)
+        return True
+
+    async def send_command(self, drone_id: str, command_type: str, parameters: Optional[dict] = None):
+        """Send a command like commandHandler.ts; the command_response round trip is timed"""
+        command_id = next(self._command_ids)
+        now = time.time()
+        self.pending_commands[command_id] = (command_type, now)
+        sent = await self.inject(drone_id, 'command', {
+            'id': command_id,
+            'type': command_type,
+            'parameters': parameters or {},
+            'timestamp': now * 1000,
+            'userId': 'standin'
+        })
+        if not sent:
+            del self.pending_commands[command_id]
+            return None
+        self.commands_sent[command_type] = self.commands_sent.get(command_type, 0) + 1
+        return command_id
+
+    async def send_precision_landing(self, drone_id: str, action: str = 'start') -> bool:
+        return await self.inject(drone_id, 'precision_landing_command', {
+            'id': next(self._command_ids), 'action': action, 'timestamp': time.time() * 1000
+        })
+
+    async def send_waypoint_mission(self, drone_id: str, action: str, mission_id: str = 'standin-mission') -> bool:
+        return await self.inject(drone_id, 'waypoint_mission', {
+            'action': action, 'missionId': mission_id, 'timestamp': time.time() * 1000
+        })
+
+    # Reporting
+
+    def summary(self) -> dict:
+        return {
+            'registered_drones': len(self.drone_sids),
+            'http_requests': dict(self.http_requests),
+            'acks_sent': self.acks_sent,
+            'acks_dropped': self.acks_dropped,
+            'events': {event: stats.summary() for event, stats in self.events.items()},
+            'frame_queues': {key: {'received': q.received, 'skipped': q.skipped, 'max_queue_size': q.max_seen}
+                             for key, q in self.frame_queues.items()},
+            'commands': {command_type: {'sent': self.commands_sent.get(command_type, 0),
+                                        'rtt_ms': self.command_rtt[command_type].summary()
+                                        if command_type in self.command_rtt else None}
+                         for command_type in self.commands_sent}
+        }
+
+    def print_report(self):
+        """Print server-side receive statistics"""
+        print("\n🧪 STAND-IN SERVER RECEIVE STATS")
+        print("=" * 60)
+        uptime = time.time() - self.started_at if self.started_at else 0
+        print(f"Uptime: {uptime:.1f}s, registered drones: {len(self.drone_sids)}, "
+              f"HTTP discover/register: {self.http_requests['discover']}/{self.http_requests['register']}")
+        print(f"Acks sent: {self.acks_sent:,}, dropped: {self.acks_dropped:,} "
+              f"(delay {self.config.ack_delay_ms:g}ms + up to {self.config.ack_jitter_ms:g}ms, "
+              f"loss {self.config.ack_loss:.1%})")
+
+        print(f"\n{'event':<24} {'msgs':>8} {'drones':>7} {'msg/s':>8} {'kB/s':>8} {'transit P50':>12} {'P99':>9}")
+        print("-" * 80)
+        for event, stats in sorted(self.events.items(), key=lambda item: -item[1].messages):
+            s = stats.summary()
+            transit = s['transit_ms']
+            p50 = f"{transit['p50_ms']:.2f}ms" if transit['count'] else '-'
+            p99 = f"{transit['p99_ms']:.2f}ms" if transit['count'] else '-'
+            print(f"{event:<24} {s['messages']:>8,} {s['drones']:>7} {s['messages_per_s']:>8.1f} "
+                  f"{s['bytes_per_s'] / 1024:>8.1f} {p50:>12} {p99:>9}")
+
+        if self.frame_queues:
+            received = sum(q.received for q in self.frame_queues.values())
+            skipped = sum(q.skipped for q in self.frame_queues.values())
+            print(f"\nCamera queues: {len(self.frame_queues)}, frames {received:,}, skipped {skipped:,} "
+                  f"({skipped / received:.1%}), max size {self.config.max_queue_size}, "
+                  f"drain {self.config.queue_drain_fps:g} fps")
+
+        if self.commands_sent:
+            print("\nCommand round trips (command -> command_response):")
+            for command_type, sent in self.commands_sent.items():
+                histogram = self.command_rtt.get(command_type)
+                if histogram is None or not histogram.count:
+                    print(f"  {command_type}: {sent} sent, no responses")
+                    continue
+                print(f"  {command_type}: {sent} sent, {histogram.count} responses, "
+                      f"P50 {histogram.percentile(50):.1f}ms, P99 {histogram.percentile(99):.1f}ms")
+        print("=" * 60)
+
+
+async def _inject_commands(server: StandinServer, interval: float, command_types: List[str]):
+    """Send a random command to a random registered drone every interval seconds"""
+    while True:
+        await asyncio.sleep(interval)
+        drones = server.registered_drones
+        if drones:
+            await server.send_command(random.choice(drones), random.choice(command_types))
+
+
+async def serve(config: StandinConfig, command_interval: float = 0.0, command_types: List[str] = None,
+                report_interval: float = 0.0):
+    server = StandinServer(config)
+    await server.start()
+    tasks = []
+    if command_interval > 0:
+        tasks.append(asyncio.create_task(_inject_commands(server, command_interval,
+                                                          command_types or COMMAND_TYPES)))
+    try:
+        while True:
+            await asyncio.sleep(report_interval or 3600)
+            if report_interval:
+                server.print_report()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await server.stop()
+        server.print_report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stand-in drone-connection server for offline benchmarks')
+    parser.add_argument('--host', default='127.0.0.1', help='Listen address (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Listen port (default: {DEFAULT_PORT})')
+    parser.add_argument('--ack-delay-ms', type=float, default=0.0, help='Delay before every ack (default: 0)')
+    parser.add_argument('--ack-jitter-ms', type=float, default=0.0,
+                        help='Uniform random extra ack delay up to this many ms (default: 0)')
+    parser.add_argument('--ack-loss', type=float, default=0.0,
+                        help='Probability an ack is never sent (default: 0)')
+    parser.add_argument('--max-queue-size', type=int, default=3,
+                        help='Camera frames queued per drone/camera before the oldest is skipped (default: 3)')
+    parser.add_argument('--queue-drain-fps', type=float, default=30.0,
+                        help='Rate each camera queue drains at, 0 never drains (default: 30)')
+    parser.add_argument('--echo-sequence-id', action='store_true',
+                        help='Echo the telemetry sequence_id in telemetry_ack (default: timestamp only, as the real server)')
+    parser.add_argument('--command-interval', type=float, default=0.0,
+                        help='Send a random command to a random drone every N seconds (default: off)')
+    parser.add_argument('--commands', nargs='+', default=COMMAND_TYPES,
+                        help=f"Command types to inject (default: {' '.join(COMMAND_TYPES)})")
+    parser.add_argument('--report-interval', type=float, default=0.0,
+                        help='Print the receive report every N seconds (default: only on exit)')
+    parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], default='INFO',
+                        help='Logging level (default: INFO)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=getattr(logging, args.log_level),
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    config = StandinConfig(
+        host=args.host,
+        port=args.port,
+        ack_delay_ms=args.ack_delay_ms,
+        ack_jitter_ms=args.ack_jitter_ms,
+        ack_loss=args.ack_loss,
+        max_queue_size=args.max_queue_size,
+        queue_drain_fps=args.queue_drain_fps,
+        echo_sequence_id=args.echo_sequence_id,
+        log_events=args.log_level == 'DEBUG'
+    )
+    try:
+        asyncio.run(serve(config, args.command_interval, args.commands, args.report_interval))
+    except KeyboardInterrupt:
+        logger.info("🛑 Stand-in server stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,32 @@
 # services/drone-connection-service/src/clients/python-mock/test_single_drone.py
 """
 Single drone test script for debugging and validation
+
+The latency test sends telemetry probes and matches each telemetry_ack on
+its echoed timestamp, as the real server acks (or on the sequence_id when
+the stand-in runs with --echo-sequence-id). A probe without an ack inside --ack-timeout counts
+as lost. Closed-loop probes keep one probe in flight, and their RTT is
+also reported with HDR-style back-fill of the probes a slow ack held back;
+open-loop probes go out on a fixed --rate grid whether or not earlier acks
+came back, and their RTT is also reported from the intended send time.
+
+Offline, against the stand-in server:
+
+  python standin_server.py --port 4005 --ack-delay-ms 5 &
+  python test_single_drone.py --server http://127.0.0.1:4005 --test latency --samples 500 --rate 50
 """
 import asyncio
 import argparse
+import json
 import logging
 import sys
 import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
 from drone_simulator_prod import ProductionMockDrone as MockDrone, DroneConfig
+from event_loops import install_event_loop, EVENT_LOOPS
+from latency_histogram import LatencyHistogram
+from send_schedule import SendSchedule
 
 # Configure logging
 logging.basicConfig(
@@ -20,11 +39,170 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+PROBE_MODES = ['closed', 'open']
+
+
+@dataclass
+class TelemetryProbe:
+    sequence_id: int
+    timestamp_ms: float
+    intended_time: float
+    ack: asyncio.Future
+
+
+class AckLatencyProbe:
+    """Telemetry probes timed to the telemetry_ack that answers each one"""
+
+    def __init__(self, drone: MockDrone, ack_timeout: float = 2.0):
+        self.drone = drone
+        self.ack_timeout = ack_timeout
+        self.pending: Dict[int, TelemetryProbe] = {}
+        self.by_timestamp: Dict[float, int] = {}
+        self.expired = set()
+        self.late_acks = 0
+        self.unmatched_acks = 0
+        self.payload_bytes = drone.calculate_telemetry_size()
+        # Takes over the drone's own telemetry_ack handler
+        drone.sio.on('telemetry_ack', self.on_ack)
+
+    async def on_ack(self, data):
+        received = time.time()
+        if not isinstance(data, dict):
+            return
+        sequence_id = data.get('sequence_id')
+        if sequence_id is None:
+            sequence_id = self.by_timestamp.get(data.get('timestamp'))
+        probe = self.pending.get(sequence_id)
+        if probe is None or probe.ack.done():
+            if sequence_id in self.expired:
+                self.expired.discard(sequence_id)
+                self.late_acks += 1
+            else:
+                self.unmatched_acks += 1
+            return
+        probe.ack.set_result(received)
+
+    async def send(self, intended_time: float) -> TelemetryProbe:
+        """Emit one telemetry probe and register it for its ack"""
+        drone = self.drone
+        drone.sequence_counters['telemetry'] += 1
+        current_time = time.time() * 1000
+        telemetry_data = drone.state.snapshot()
+        telemetry_data.update({
+            'timestamp': current_time,
+            'jetsonTimestamp': current_time,
+            'droneType': 'REAL',
+            'sessionId': drone.session_token,
+            'sequence_id': drone.sequence_counters['telemetry']
+        })
+        probe = TelemetryProbe(drone.sequence_counters['telemetry'], current_time, intended_time,
+                               asyncio.get_running_loop().create_future())
+        self.pending[probe.sequence_id] = probe
+        self.by_timestamp[current_time] = probe.sequence_id
+        await drone.sio.emit('telemetry_real', telemetry_data)
+        return probe
+
+    async def wait_ack(self, probe: TelemetryProbe) -> Optional[float]:
+        """time.time() the ack arrived, or None if it didn't within the timeout"""
+        try:
+            return await asyncio.wait_for(probe.ack, self.ack_timeout)
+        except asyncio.TimeoutError:
+            self.expired.add(probe.sequence_id)
+            return None
+        finally:
+            self.pending.pop(probe.sequence_id, None)
+            self.by_timestamp.pop(probe.timestamp_ms, None)
+
+    async def run_closed(self, samples: int, rate: float) -> dict:
+        """One probe in flight; the next goes out after the ack (or timeout), at most at rate Hz"""
+        interval = 1.0 / rate if rate > 0 else 0.0
+        late_before = self.late_acks
+        rtt = LatencyHistogram()
+        corrected = LatencyHistogram()
+        lost = 0
+        started = time.time()
+        finished = started
+        for _ in range(samples):
+            probe = await self.send(time.time())
+            received = await self.wait_ack(probe)
+            if received is None:
+                lost += 1
+            else:
+                rtt.record(received * 1000 - probe.timestamp_ms)
+                # This sender blocks on the ack, so an RTT over the interval suppressed later probes
+                corrected.record_corrected(received * 1000 - probe.timestamp_ms, interval * 1000)
+                finished = received
+            remaining = probe.timestamp_ms / 1000 + interval - time.time()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+        result = self.result('closed', samples, rate, rtt, lost, self.late_acks - late_before,
+                             max(finished, time.time()) - started)
+        result['rtt_backfilled'] = corrected.summary()
+        return result
+
+    async def run_open(self, samples: int, rate: float) -> dict:
+        """Probes on a fixed rate Hz grid regardless of outstanding acks"""
+        schedule = SendSchedule(1.0 / rate, 'open')
+        late_before = self.late_acks
+        waits = []
+        started = time.time()
+        for _ in range(samples):
+            probe = await self.send(await schedule.next_send())
+            waits.append((probe, asyncio.create_task(self.wait_ack(probe))))
+        sent_until = time.time()
+        
+        rtt = LatencyHistogram()
+        corrected = LatencyHistogram()
+        lost = 0
+        finished = sent_until
+        for probe, wait in waits:
+            received = await wait
+            if received is None:
+                lost += 1
+                continue
+            rtt.record(received * 1000 - probe.timestamp_ms)
+            corrected.record((received - probe.intended_time) * 1000)
+            finished = max(finished, received)
+        
+        result = self.result('open', samples, rate, rtt, lost, self.late_acks - late_before, finished - started)
+        result['rtt_from_intended'] = corrected.summary()
+        result['schedule'] = schedule.summary()
+        return result
+
+    def result(self, mode: str, sent: int, rate: float, rtt: LatencyHistogram, lost: int,
+               late_acks: int, duration_s: float) -> dict:
+        duration_s = max(duration_s, 1e-6)
+        return {
+            'mode': mode,
+            'rate_hz': rate,
+            'ack_timeout_s': self.ack_timeout,
+            'sent': sent,
+            'acked': rtt.count,
+            'lost': lost,
+            'loss_pct': lost / sent * 100 if sent else 0.0,
+            'late_acks': late_acks,
+            'duration_s': duration_s,
+            'send_rate_hz': sent / duration_s,
+            'ack_rate_hz': rtt.count / duration_s,
+            'bytes_per_s': sent * self.payload_bytes / duration_s,
+            'rtt': rtt.summary()
+        }
+
+
 class SingleDroneTest:
-    def __init__(self, server_url: str, drone_id: str = "test-drone-001"):
+    def __init__(self, server_url: str, drone_id: str = "test-drone-001",
+                 samples: int = 100, rate: float = 10.0, probe_modes: Optional[List[str]] = None,
+                 ack_timeout: float = 2.0, max_loss_pct: float = 1.0, sustained_duration: float = 0.0):
         self.server_url = server_url
         self.drone_id = drone_id
+        self.samples = samples
+        self.rate = rate
+        self.probe_modes = probe_modes or PROBE_MODES
+        self.ack_timeout = ack_timeout
+        self.max_loss_pct = max_loss_pct
+        self.sustained_duration = sustained_duration
         self.test_results = {}
+        self.latency_results: Dict[str, dict] = {}
         
     async def test_connection_flow(self):
         """Test the complete connection flow"""
@@ -221,8 +399,8 @@ class SingleDroneTest:
             return False
             
     async def test_latency(self):
-        """Test connection latency"""
-        logger.info("⚡ Testing connection latency...")
+        """Measure telemetry round trips to the matching telemetry_ack"""
+        logger.info("⚡ Testing telemetry ack latency...")
         
         config = DroneConfig(
             drone_id=f"{self.drone_id}-latency",
@@ -242,54 +420,89 @@ class SingleDroneTest:
                 logger.error("❌ Connection failed for latency test")
                 return False
                 
-            # Measure telemetry latency
-            latencies = []
-            
-            for i in range(10):
-                start_time = time.time()
-                
-                # Send telemetry
-                telemetry_data = {
-                    'timestamp': start_time * 1000,
-                    'test_sequence': i,
-                    'latitude': 18.5204,
-                    'longitude': 73.8567
-                }
-                
-                await drone.sio.emit('telemetry_real', telemetry_data)
-                
-                # Wait for ack (this is simplified - in real test we'd wait for actual ack)
+            wait_start = time.time()
+            while not drone.registered and (time.time() - wait_start) < 10:
                 await asyncio.sleep(0.1)
+            if not drone.registered:
+                logger.error("❌ WebSocket registration timeout for latency test")
+                return False
                 
-                end_time = time.time()
-                latency = (end_time - start_time) * 1000  # Convert to ms
-                latencies.append(latency)
+            # Only probe telemetry on the link: stop the drone's own streams
+            for task in drone.tasks:
+                task.cancel()
+            drone.tasks.clear()
+            
+            probe = AckLatencyProbe(drone, self.ack_timeout)
+            for mode in self.probe_modes:
+                samples = self.samples
+                if mode == 'open' and self.sustained_duration:
+                    samples = max(1, int(self.sustained_duration * 60 * self.rate))
+                logger.info(f"📡 {mode}-loop probe: {samples} samples at {self.rate:g} Hz "
+                            f"(ack timeout {self.ack_timeout:g}s)")
+                if mode == 'closed':
+                    result = await probe.run_closed(samples, self.rate)
+                else:
+                    result = await probe.run_open(samples, self.rate)
+                self.latency_results[mode] = result
+                self.log_probe_result(result)
                 
-            avg_latency = sum(latencies) / len(latencies)
-            min_latency = min(latencies)
-            max_latency = max(latencies)
-            
-            self.test_results['latency'] = {
-                'average': avg_latency,
-                'min': min_latency,
-                'max': max_latency,
-                'samples': latencies
-            }
-            
-            logger.info(f"📊 Latency results:")
-            logger.info(f"   Average: {avg_latency:.2f}ms")
-            logger.info(f"   Min: {min_latency:.2f}ms")
-            logger.info(f"   Max: {max_latency:.2f}ms")
-            
-            # Cleanup
-            await drone.disconnect()
-            return True
+            passed = all(r['acked'] and r['loss_pct'] <= self.max_loss_pct
+                         for r in self.latency_results.values())
+            self.test_results['latency'] = passed
+            if not passed:
+                logger.error(f"❌ Ack loss above {self.max_loss_pct:g}% (or no acks at all)")
+            return passed
             
         except Exception as e:
             logger.error(f"❌ Latency test failed: {e}")
             self.test_results['latency_exception'] = str(e)
             return False
             
+        finally:
+            try:
+                await drone.disconnect()
+            except:
+                pass
+                
+    def log_probe_result(self, result: dict):
+        """Log one probe's RTT percentiles, loss and throughput"""
+        rtt = result['rtt']
+        logger.info(f"📊 {result['mode'].capitalize()}-loop latency results:")
+        logger.info(f"   Sent: {result['sent']}, acked: {result['acked']}, "
+                    f"lost: {result['lost']} ({result['loss_pct']:.2f}%), late acks: {result['late_acks']}")
+        logger.info(f"   RTT: min {rtt['min_ms']:.2f}ms, avg {rtt['avg_ms']:.2f}ms, P50 {rtt['p50_ms']:.2f}ms, "
+                    f"P95 {rtt['p95_ms']:.2f}ms, P99 {rtt['p99_ms']:.2f}ms, max {rtt['max_ms']:.2f}ms")
+        if 'rtt_from_intended' in result:
+            corrected = result['rtt_from_intended']
+            schedule = result['schedule']
+            logger.info(f"   RTT from intended send: P50 {corrected['p50_ms']:.2f}ms, "
+                        f"P99 {corrected['p99_ms']:.2f}ms, max {corrected['max_ms']:.2f}ms "
+                        f"({schedule['late_sends']} late sends, max {schedule['max_behind_ms']:.1f}ms behind)")
+        if 'rtt_backfilled' in result:
+            corrected = result['rtt_backfilled']
+            logger.info(f"   RTT with back-filled missed probes: P50 {corrected['p50_ms']:.2f}ms, "
+                        f"P99 {corrected['p99_ms']:.2f}ms, max {corrected['max_ms']:.2f}ms")
+        logger.info(f"   Throughput: {result['send_rate_hz']:.1f} msg/s sent, "
+                    f"{result['ack_rate_hz']:.1f} acks/s, {result['bytes_per_s'] / 1024:.1f} KB/s")
+        
+    def export_results(self, filename: str = None):
+        """Export test results and latency probe data to JSON"""
+        if not filename:
+            filename = f"latency_test_results_{int(time.time())}.json"
+            
+        export_data = {
+            'timestamp': time.time(),
+            'server_url': self.server_url,
+            'drone_id': self.drone_id,
+            'test_results': self.test_results,
+            'latency': self.latency_results
+        }
+        
+        with open(filename, 'w') as f:
+            json.dump(export_data, f, indent=2)
+            
+        logger.info(f"📁 Test results exported to {filename}")
+        
     def print_results(self):
         """Print test results summary"""
         logger.info("📊 TEST RESULTS SUMMARY")
@@ -346,10 +559,32 @@ def main():
     parser.add_argument('--drone-id', default='test-drone-001', help='Drone ID for testing')
     parser.add_argument('--test', choices=['all', 'connection', 'reconnection', 'latency'], 
                        default='all', help='Which test to run')
+    parser.add_argument('--loop', choices=EVENT_LOOPS, default='asyncio',
+                       help='Event loop implementation, uvloop falls back to asyncio if missing (default: asyncio)')
+    parser.add_argument('--samples', type=int, default=100,
+                       help='Telemetry probes per latency probe mode (default: 100)')
+    parser.add_argument('--rate', type=float, default=10.0,
+                       help='Probe rate in Hz; closed-loop probes never exceed it (default: 10)')
+    parser.add_argument('--probe', choices=PROBE_MODES + ['both'], default='both',
+                       help='Closed-loop (one in flight), open-loop (fixed rate) or both (default: both)')
+    parser.add_argument('--ack-timeout', type=float, default=2.0,
+                       help='Seconds to wait for a telemetry_ack before counting the probe lost (default: 2)')
+    parser.add_argument('--max-loss', type=float, default=1.0,
+                       help='Fail the latency test above this ack loss percentage (default: 1)')
+    parser.add_argument('--sustained-duration', type=float, default=0.0,
+                       help='Run the open-loop probe for this many minutes instead of --samples (default: off)')
+    parser.add_argument('--export', action='store_true', help='Export results to latency_test_results_*.json')
     
     args = parser.parse_args()
+    if args.samples <= 0:
+        parser.error('--samples must be positive')
+    if args.rate <= 0:
+        parser.error('--rate must be positive')
+    install_event_loop(args.loop)
     
-    tester = SingleDroneTest(args.server, args.drone_id)
+    tester = SingleDroneTest(args.server, args.drone_id, args.samples, args.rate,
+                             PROBE_MODES if args.probe == 'both' else [args.probe],
+                             args.ack_timeout, args.max_loss, args.sustained_duration)
     
     try:
         if args.test == 'all':
@@ -362,6 +597,8 @@ def main():
             asyncio.run(tester.test_latency())
             
         tester.print_results()
+        if args.export:
+            tester.export_results()
         
     except KeyboardInterrupt:
         logger.info("🛑 Test stopped by user")
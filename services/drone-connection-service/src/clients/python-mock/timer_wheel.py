@@ -0,0 +1,394 @@
+# services/drone-connection-service/src/clients/python-mock/timer_wheel.py
+"""
+Fleet-level hierarchical timer wheel
+
+Every ProductionMockDrone normally runs one coroutine per stream, each with
+its own asyncio.sleep. At 1,000 drones that is 4,000+ timers in the loop's
+heap and a context switch per wake-up. The wheel replaces them with one
+scheduler task: drones register periodic stream callbacks, the scheduler
+advances a three-level hashed wheel once per tick and hands each tick's due
+callbacks to a few dispatcher batches.
+
+Periodic timers keep a fixed grid of intended fire times (open loop), and
+callbacks receive the intended time.time() timestamp, so they plug straight
+into coordinated-omission-corrected measurement.
+
+Run directly to benchmark:  python timer_wheel.py --drones 100 1000 5000
+"""
+import argparse
+import asyncio
+import logging
+import math
+import time
+from typing import Callable, List, Optional
+
+from latency_histogram import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+LEVEL0_BITS = 8                  # 256 ticks
+LEVEL_BITS = 6                   # 64 slots per upper level
+LEVEL0_SIZE = 1 << LEVEL0_BITS
+LEVEL_SIZE = 1 << LEVEL_BITS
+LEVEL1_SPAN = LEVEL0_SIZE * LEVEL_SIZE
+LEVEL2_SHIFT = LEVEL0_BITS + LEVEL_BITS
+
+
+class TimerHandle:
+    """A periodic timer registered with the wheel"""
+
+    __slots__ = ('deadline', 'interval', 'callback', 'is_async', 'schedule', 'active')
+
+    def __init__(self, deadline: float, interval: float, callback: Callable, schedule=None):
+        self.deadline = deadline
+        self.interval = interval
+        self.callback = callback
+        self.is_async = asyncio.iscoroutinefunction(callback)
+        self.schedule = schedule
+        self.active = True
+
+    def cancel(self):
+        self.active = False
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class HierarchicalTimerWheel:
+    def __init__(self, tick_ms: float = 5.0, dispatchers: int = 4):
+        self.tick = tick_ms / 1000.0
+        self.dispatchers = max(1, dispatchers)
+
+        self._level0: List[List[TimerHandle]] = [[] for _ in range(LEVEL0_SIZE)]
+        self._level1: List[List[TimerHandle]] = [[] for _ in range(LEVEL_SIZE)]
+        self._level2: List[List[TimerHandle]] = [[] for _ in range(LEVEL_SIZE)]
+        self._current_tick = 0
+        self._start: Optional[float] = None
+        self._wall_offset = 0.0
+
+        self.timers = 0
+        self.fires = 0
+        self.ticks = 0
+        self.fire_lateness = LatencyHistogram()
+        self.dispatch_time = LatencyHistogram()
+        # Wheels run in other processes and folded in with merge_state
+        self.merged_wheels = 0
+
+        self._task: Optional[asyncio.Task] = None
+        self._sleeper: Optional[asyncio.Future] = None
+        self._sleep_until_tick = 0
+        self.running = False
+
+    def _ensure_started(self):
+        if self._start is None:
+            loop = asyncio.get_running_loop()
+            self._start = loop.time()
+            self._wall_offset = time.time() - self._start
+
+    def schedule_periodic(self, interval: float, callback: Callable, first_delay: float = 0.0,
+                          schedule=None) -> TimerHandle:
+        """Fire callback(intended_time) every interval seconds until the handle is cancelled"""
+        self._ensure_started()
+        now = asyncio.get_running_loop().time()
+        handle = TimerHandle(now + first_delay, interval, callback, schedule)
+        target = self._insert(handle)
+        self.timers += 1
+        if self._sleeper is not None and not self._sleeper.done() and target < self._sleep_until_tick:
+            # The scheduler is skipping idle ticks past this timer's slot
+            self._sleeper.set_result(None)
+        return handle
+
+    def _insert(self, handle: TimerHandle) -> int:
+        target = max(self._current_tick + 1, math.ceil((handle.deadline - self._start) / self.tick))
+        delta = target - self._current_tick
+        if delta < LEVEL0_SIZE:
+            self._level0[target & (LEVEL0_SIZE - 1)].append(handle)
+        elif delta < LEVEL1_SPAN:
+            self._level1[(target >> LEVEL0_BITS) & (LEVEL_SIZE - 1)].append(handle)
+        elif delta < LEVEL1_SPAN * LEVEL_SIZE:
+            self._level2[(target >> LEVEL2_SHIFT) & (LEVEL_SIZE - 1)].append(handle)
+        else:
+            # Beyond the wheel's range: park in the slot cascaded last and re-insert from there
+            self._level2[((self._current_tick >> LEVEL2_SHIFT) - 1) & (LEVEL_SIZE - 1)].append(handle)
+        return target
+
+    def _cascade(self, slots: List[List[TimerHandle]], index: int):
+        handles = slots[index]
+        slots[index] = []
+        for handle in handles:
+            if handle.active:
+                self._insert(handle)
+
+    def _advance(self) -> List[TimerHandle]:
+        """Move one tick forward and return the timers that are due"""
+        self._current_tick += 1
+        tick = self._current_tick
+        if tick & (LEVEL0_SIZE - 1) == 0:
+            if (tick >> LEVEL0_BITS) & (LEVEL_SIZE - 1) == 0:
+                self._cascade(self._level2, (tick >> LEVEL2_SHIFT) & (LEVEL_SIZE - 1))
+            self._cascade(self._level1, (tick >> LEVEL0_BITS) & (LEVEL_SIZE - 1))
+        index = tick & (LEVEL0_SIZE - 1)
+        due = self._level0[index]
+        self._level0[index] = []
+        return due
+
+    def _ticks_until_due(self) -> int:
+        """Ticks until the next non-empty level-0 slot or the next cascade, whichever is first"""
+        offset = self._current_tick & (LEVEL0_SIZE - 1)
+        for ahead in range(1, LEVEL0_SIZE - offset):
+            if self._level0[offset + ahead]:
+                return ahead
+        return LEVEL0_SIZE - offset
+
+    def start(self):
+        """Start the scheduler task on the running loop (idempotent)"""
+        if self.running:
+            return
+        self._ensure_started()
+        self.running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"🎡 Timer wheel started (tick: {self.tick * 1000:.1f}ms, dispatchers: {self.dispatchers})")
+
+    async def stop(self):
+        """Stop the scheduler task"""
+        if not self.running:
+            return
+        self.running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while self.running:
+            # Idle ticks are skipped: sleep straight to the next tick with work or a cascade
+            self._sleep_until_tick = self._current_tick + self._ticks_until_due()
+            next_tick_at = self._start + self._sleep_until_tick * self.tick
+            if next_tick_at > loop.time():
+                self._sleeper = loop.create_future()
+                timer = loop.call_at(next_tick_at, _wake, self._sleeper)
+                try:
+                    await self._sleeper
+                finally:
+                    timer.cancel()
+                    self._sleeper = None
+
+            now = loop.time()
+            due: List[TimerHandle] = []
+            # Catch up on every tick that elapsed, batching all due timers
+            while self._start + (self._current_tick + 1) * self.tick <= now:
+                due.extend(self._advance())
+                self.ticks += 1
+            if due:
+                dispatch_start = time.perf_counter()
+                await self._dispatch(due, now)
+                self.dispatch_time.record((time.perf_counter() - dispatch_start) * 1000)
+
+    async def _dispatch(self, due: List[TimerHandle], now: float):
+        ready = []
+        for handle in due:
+            if not handle.active:
+                continue
+            intended = handle.deadline
+            behind_ms = (now - intended) * 1000
+            self.fire_lateness.record(behind_ms)
+            if handle.schedule is not None:
+                handle.schedule.record_send(behind_ms)
+            ready.append((handle, intended + self._wall_offset))
+            handle.deadline = intended + handle.interval
+            self._insert(handle)
+        self.fires += len(ready)
+
+        async_ready = []
+        for handle, intended_time in ready:
+            if handle.is_async:
+                async_ready.append((handle.callback, intended_time))
+            else:
+                self._call(handle.callback, intended_time)
+        if not async_ready:
+            return
+
+        size = math.ceil(len(async_ready) / self.dispatchers)
+        batches = [async_ready[i:i + size] for i in range(0, len(async_ready), size)]
+        if len(batches) == 1:
+            await self._run_batch(batches[0])
+        else:
+            await asyncio.gather(*(self._run_batch(batch) for batch in batches))
+
+    @staticmethod
+    def _call(callback: Callable, intended_time: float):
+        try:
+            callback(intended_time)
+        except Exception as e:
+            logger.error(f"❌ Timer callback {getattr(callback, '__qualname__', callback)} failed: {e}")
+
+    @staticmethod
+    async def _run_batch(batch):
+        for callback, intended_time in batch:
+            try:
+                await callback(intended_time)
+            except Exception as e:
+                logger.error(f"❌ Timer callback {getattr(callback, '__qualname__', callback)} failed: {e}")
+
+    def export_state(self) -> dict:
+        """Mergeable snapshot of the scheduler statistics (for sharded fleet workers)"""
+        return {
+            'timers': self.timers,
+            'ticks': self.ticks,
+            'fires': self.fires,
+            'fire_lateness': self.fire_lateness.to_dict(),
+            'dispatch_time': self.dispatch_time.to_dict()
+        }
+
+    def merge_state(self, state: dict):
+        """Add another wheel's export_state() into this one"""
+        self.timers += state['timers']
+        self.ticks += state['ticks']
+        self.fires += state['fires']
+        self.fire_lateness.merge(LatencyHistogram.from_dict(state['fire_lateness']))
+        self.dispatch_time.merge(LatencyHistogram.from_dict(state['dispatch_time']))
+        self.merged_wheels += 1
+
+    def summary(self) -> dict:
+        """Scheduler statistics for reports and JSON export"""
+        return {
+            'tick_ms': self.tick * 1000,
+            'dispatchers': self.dispatchers,
+            'timers': self.timers,
+            'ticks': self.ticks,
+            'fires': self.fires,
+            'fire_lateness': self.fire_lateness.summary(),
+            'dispatch_time': self.dispatch_time.summary(),
+            'merged_wheels': self.merged_wheels
+        }
+
+    def print_report(self):
+        """Print timer wheel scheduling report"""
+        print("\n🎡 TIMER WHEEL SCHEDULER")
+        print("-" * 50)
+        print(f"  Timers registered: {self.timers}, ticks: {self.ticks}, fires: {self.fires}")
+        if self.merged_wheels:
+            print(f"  Merged from {self.merged_wheels} worker processes: counts are summed across wheels")
+        lateness = self.fire_lateness
+        if lateness.count:
+            print(f"  Fire lateness: avg {lateness.mean:.2f}ms, P99 {lateness.percentile(99):.2f}ms, "
+                  f"max {lateness.max_ms:.2f}ms")
+        if self.dispatch_time.count:
+            print(f"  Dispatch per tick: avg {self.dispatch_time.mean:.2f}ms, "
+                  f"P99 {self.dispatch_time.percentile(99):.2f}ms")
+
+
+class _BenchDrone:
+    """Stream-shaped workload with the production rates (10 Hz / 0.1 Hz / 1 Hz / 10 Hz animate)"""
+
+    RATES = {'telemetry': 10.0, 'heartbeat': 0.1, 'mavros': 1.0, 'animate': 10.0}
+
+    def __init__(self):
+        self.counts = {name: 0 for name in self.RATES}
+        self.x = 0.0
+
+    async def telemetry(self, intended_time=None):
+        self.counts['telemetry'] += 1
+
+    async def heartbeat(self, intended_time=None):
+        self.counts['heartbeat'] += 1
+
+    async def mavros(self, intended_time=None):
+        self.counts['mavros'] += 1
+
+    def animate(self, intended_time=None):
+        self.counts['animate'] += 1
+        self.x += 0.1
+
+    async def sleep_loop(self, name: str, lateness: LatencyHistogram, first_delay: float):
+        interval = 1.0 / self.RATES[name]
+        step = getattr(self, name)
+        loop = asyncio.get_running_loop()
+        next_at = loop.time() + first_delay
+        await asyncio.sleep(first_delay)
+        while True:
+            lateness.record((loop.time() - next_at) * 1000)
+            if asyncio.iscoroutinefunction(step):
+                await step()
+            else:
+                step()
+            next_at += interval
+            await asyncio.sleep(max(0.0, next_at - loop.time()))
+
+
+async def _bench_run(mode: str, num_drones: int, duration: float, tick_ms: float) -> dict:
+    drones = [_BenchDrone() for _ in range(num_drones)]
+    lateness = LatencyHistogram()
+    tasks = []
+    wheel = None
+
+    if mode == 'wheel':
+        wheel = HierarchicalTimerWheel(tick_ms=tick_ms)
+        for i, drone in enumerate(drones):
+            for name, rate in _BenchDrone.RATES.items():
+                # Stagger start times like batched drone start-up does
+                wheel.schedule_periodic(1.0 / rate, getattr(drone, name), first_delay=(i % 100) / 1000)
+        wheel.start()
+    else:
+        for i, drone in enumerate(drones):
+            for name in _BenchDrone.RATES:
+                tasks.append(asyncio.create_task(drone.sleep_loop(name, lateness, (i % 100) / 1000)))
+
+    cpu_start = time.process_time()
+    await asyncio.sleep(duration)
+    cpu = time.process_time() - cpu_start
+
+    if wheel:
+        await wheel.stop()
+        lateness = wheel.fire_lateness
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    # Each stream fires once at start, then once per interval
+    expected = num_drones * sum(math.floor(duration * rate) + 1 for rate in _BenchDrone.RATES.values())
+    achieved = sum(sum(d.counts.values()) for d in drones)
+    telemetry_rate = sum(d.counts['telemetry'] for d in drones) / num_drones / duration
+    return {
+        'mode': mode,
+        'drones': num_drones,
+        'cpu_s_per_s': cpu / duration,
+        'cpu_us_per_drone_s': cpu / duration / num_drones * 1e6,
+        'rate_accuracy': achieved / expected if expected else 0.0,
+        'telemetry_hz': telemetry_rate,
+        'lateness_p99_ms': lateness.percentile(99),
+        'lateness_max_ms': lateness.max_ms
+    }
+
+
+def benchmark(drone_counts: List[int], duration: float, tick_ms: float):
+    """Compare per-stream sleep loops against the timer wheel"""
+    print(f"🎡 Timer wheel benchmark: {duration:.0f}s per run, tick {tick_ms:.1f}ms")
+    print(f"{'mode':<7} {'drones':>7} {'CPU s/s':>8} {'CPU us/drone/s':>15} {'rate acc':>9} "
+          f"{'telem Hz':>9} {'late P99':>9} {'late max':>9}")
+    print("-" * 80)
+    for num_drones in drone_counts:
+        for mode in ('sleep', 'wheel'):
+            r = asyncio.run(_bench_run(mode, num_drones, duration, tick_ms))
+            print(f"{r['mode']:<7} {r['drones']:>7} {r['cpu_s_per_s']:>8.3f} {r['cpu_us_per_drone_s']:>15.1f} "
+                  f"{r['rate_accuracy'] * 100:>8.1f}% {r['telemetry_hz']:>9.2f} "
+                  f"{r['lateness_p99_ms']:>7.1f}ms {r['lateness_max_ms']:>7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Timer wheel vs per-stream sleep benchmark')
+    parser.add_argument('--drones', type=int, nargs='+', default=[100, 1000, 5000],
+                        help='Fleet sizes to benchmark (default: 100 1000 5000)')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per run (default: 10)')
+    parser.add_argument('--tick-ms', type=float, default=5.0, help='Wheel tick in ms (default: 5)')
+    args = parser.parse_args()
+    benchmark(args.drones, args.duration, args.tick_ms)
+
+
+if __name__ == "__main__":
+    main()
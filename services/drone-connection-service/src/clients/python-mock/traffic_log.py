@@ -0,0 +1,424 @@
+# services/drone-connection-service/src/clients/python-mock/traffic_log.py
+"""
+Traffic record and replay
+
+A TrafficRecorder attached to a drone's Socket.IO client appends every
+outbound emit and every inbound event to a binary log: direction, time,
+drone ID, event name, payload size and a compact payload (compact JSON,
+zlib-compressed above 512 bytes). Binary values such as camera frames are
+kept as their length only unless --record-binary full is given. The file
+is append-only and every record is length-prefixed, so a log cut short by
+a crash still reads up to its last complete record. Record times are
+time.monotonic() offsets from the wall-clock start in the file header, so
+a clock step during the run does not distort the replay schedule.
+
+Record a fleet run with
+
+  python multi_drone_prod.py --drones 20 --duration 10 --record run.flytraffic
+
+then inspect it, or replay the outbound side against any server with the
+original timing or N times faster:
+
+  python traffic_log.py info run.flytraffic
+  python traffic_log.py replay run.flytraffic --server http://127.0.0.1:4005 --speed 4
+
+The replayer opens one Socket.IO connection per recorded drone and re-emits
+its events at their recorded offsets (divided by --speed), shifting payload
+timestamps to the replay clock unless --keep-timestamps is set. HTTP
+discovery/registration and reconnects are not replayed; the recorded
+drone_register_real emit registers the socket. The report compares
+replayed inbound events with the recording.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import os
+import struct
+import time
+import zlib
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+import socketio
+
+from latency_histogram import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'FLYTRAF1'
+# time.time() the log was started
+LOG_HEADER = struct.Struct('>d')
+OUTBOUND = 0
+INBOUND = 1
+DIRECTIONS = {OUTBOUND: 'out', INBOUND: 'in'}
+# length of the rest, direction, seconds since the log start, payload size, flags
+RECORD_HEADER = struct.Struct('>IBdIB')
+FLAG_ZLIB = 0x01
+COMPRESS_ABOVE = 512
+BINARY_TAG = '$bytes'
+BINARY_SIZE_TAG = '$bytes_len'
+BINARY_MODES = ['size', 'full']
+TIMESTAMP_FIELDS = ('timestamp', 'jetsonTimestamp')
+
+
+class TrafficLogError(ValueError):
+    """Raised for files that are not traffic logs"""
+
+
+@dataclass
+class TrafficRecord:
+    direction: int
+    timestamp: float        # wall clock: log start + the record's monotonic offset
+    drone_id: str
+    event: str
+    size: int
+    payload: Any
+
+
+def _compact(value, keep_binary: bool, binary: List[int]):
+    """JSON-safe copy of a payload; adds raw and base64 binary byte counts to binary"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        raw = bytes(value)
+        binary[0] += len(raw)
+        if keep_binary:
+            encoded = base64.b64encode(raw).decode()
+            binary[1] += len(encoded)
+            return {BINARY_TAG: encoded}
+        return {BINARY_SIZE_TAG: len(raw)}
+    if isinstance(value, dict):
+        return {key: _compact(item, keep_binary, binary) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_compact(item, keep_binary, binary) for item in value]
+    return value
+
+
+def _expand(value):
+    """Inverse of _compact; size-only binary values come back zero-filled"""
+    if isinstance(value, dict):
+        if len(value) == 1 and BINARY_TAG in value:
+            return base64.b64decode(value[BINARY_TAG])
+        if len(value) == 1 and BINARY_SIZE_TAG in value:
+            return bytes(value[BINARY_SIZE_TAG])
+        return {key: _expand(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_expand(item) for item in value]
+    return value
+
+
+class TrafficRecorder:
+    """Append-only binary log of one process's drone traffic"""
+
+    def __init__(self, path: str, binary: str = 'size'):
+        if binary not in BINARY_MODES:
+            raise ValueError(f"Unknown binary mode: {binary}")
+        self.path = path
+        self.keep_binary = binary == 'full'
+        self.records = 0
+        self.bytes_written = 0
+        # Appending to an existing log continues its timeline
+        appending = os.path.exists(path) and os.path.getsize(path) > 0
+        self.log_start = _read_header(path) if appending else time.time()
+        self.file = open(path, 'ab', buffering=1 << 16)
+        if not appending:
+            self.file.write(MAGIC + LOG_HEADER.pack(self.log_start))
+        self._offset_at_open = time.time() - self.log_start
+        self._monotonic_at_open = time.monotonic()
+        logger.info(f"📼 Recording traffic to {path} (binary payloads: {binary})")
+
+    def attach(self, drone_id: str, sio: socketio.AsyncClient):
+        """Record every emit and every received event of one drone's client"""
+        emit = sio.emit
+        # Private AsyncClient API (every received event passes through it); tied to the
+        # python-socketio version pinned in requirements.txt, re-check when upgrading
+        trigger_event = sio._trigger_event
+
+        async def recorded_emit(event, data=None, *args, **kwargs):
+            self.record(OUTBOUND, drone_id, event, data)
+            return await emit(event, data, *args, **kwargs)
+
+        async def recorded_trigger_event(event, namespace, *args):
+            if not event.startswith('__'):  # python-socketio internals such as __disconnect_final
+                self.record(INBOUND, drone_id, event, args[0] if len(args) == 1 else list(args) or None)
+            return await trigger_event(event, namespace, *args)
+
+        sio.emit = recorded_emit
+        sio._trigger_event = recorded_trigger_event
+
+    def record(self, direction: int, drone_id: str, event: str, data):
+        if self.file.closed:
+            return
+        binary = [0, 0]
+        try:
+            payload = json.dumps(_compact(data, self.keep_binary, binary), separators=(',', ':')).encode()
+        except (TypeError, ValueError) as e:
+            logger.debug(f"📼 Unrecordable {event} payload: {e}")
+            payload, binary = b'null', [0, 0]
+        # JSON fields plus raw binary, however the binary part is stored
+        size = len(payload) - binary[1] + binary[0]
+        flags = 0
+        if len(payload) > COMPRESS_ABOVE:
+            payload = zlib.compress(payload, 1)
+            flags |= FLAG_ZLIB
+        drone = drone_id.encode()[:255]
+        name = str(event).encode()[:255]
+        body = bytes([len(drone)]) + drone + bytes([len(name)]) + name + payload
+        offset = self._offset_at_open + time.monotonic() - self._monotonic_at_open
+        header = RECORD_HEADER.pack(RECORD_HEADER.size - 4 + len(body), direction, offset, size, flags)
+        self.file.write(header + body)
+        self.records += 1
+        self.bytes_written += len(header) + len(body)
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.file.close()
+        logger.info(f"📼 Recorded {self.records:,} events ({self.bytes_written / 1024:.1f} KB) to {self.path}")
+
+
+def _read_start(f, path: str) -> float:
+    """Check the magic and return the log's start time"""
+    magic = f.read(len(MAGIC))
+    header = f.read(LOG_HEADER.size)
+    if magic != MAGIC or len(header) < LOG_HEADER.size:
+        raise TrafficLogError(f"{path}: not a traffic log")
+    return LOG_HEADER.unpack(header)[0]
+
+
+def _read_header(path: str) -> float:
+    with open(path, 'rb') as f:
+        return _read_start(f, path)
+
+
+def read_records(path: str) -> Iterator[TrafficRecord]:
+    """Iterate a traffic log, stopping quietly at a truncated last record"""
+    with open(path, 'rb') as f:
+        log_start = _read_start(f, path)
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            length, direction, timestamp, size, flags = RECORD_HEADER.unpack(header)
+            body = f.read(length - (RECORD_HEADER.size - 4))
+            if len(body) < length - (RECORD_HEADER.size - 4):
+                logger.warning(f"⚠️ {path}: truncated last record ignored")
+                return
+            drone_end = 1 + body[0]
+            drone_id = body[1:drone_end].decode()
+            event_end = drone_end + 1 + body[drone_end]
+            event = body[drone_end + 1:event_end].decode()
+            payload = body[event_end:]
+            if flags & FLAG_ZLIB:
+                payload = zlib.decompress(payload)
+            yield TrafficRecord(direction, log_start + timestamp, drone_id, event, size, json.loads(payload))
+
+
+def summarize(records: List[TrafficRecord]) -> dict:
+    """Drones, duration and per-direction event counts and bytes of a log"""
+    counts = {name: Counter() for name in DIRECTIONS.values()}
+    sizes = {name: Counter() for name in DIRECTIONS.values()}
+    for record in records:
+        direction = DIRECTIONS.get(record.direction, 'out')
+        counts[direction][record.event] += 1
+        sizes[direction][record.event] += record.size
+    duration = records[-1].timestamp - records[0].timestamp if records else 0.0
+    return {
+        'records': len(records),
+        'drones': len({record.drone_id for record in records}),
+        'duration_s': duration,
+        'events': {direction: dict(counter) for direction, counter in counts.items()},
+        'bytes': {direction: dict(counter) for direction, counter in sizes.items()}
+    }
+
+
+def print_summary(path: str, summary: dict):
+    print(f"\n📼 TRAFFIC LOG: {path}")
+    print("=" * 60)
+    print(f"  {summary['records']:,} records from {summary['drones']} drones over {summary['duration_s']:.1f}s")
+    for direction, label in (('out', 'Outbound emits'), ('in', 'Inbound events')):
+        events = summary['events'][direction]
+        if not events:
+            continue
+        print(f"  {label}:")
+        for event, count in sorted(events.items(), key=lambda item: -item[1]):
+            size = summary['bytes'][direction][event]
+            print(f"    {event:<24} {count:>8,}  {size / 1024:>10.1f} KB")
+    print("=" * 60)
+
+
+def shift_timestamps(payload, shift_ms: float):
+    """Move the payload's send-time fields onto the replay clock"""
+    if isinstance(payload, dict):
+        for field in TIMESTAMP_FIELDS:
+            if isinstance(payload.get(field), (int, float)):
+                payload[field] = payload[field] + shift_ms
+    return payload
+
+
+class TrafficReplayer:
+    """Re-emit a log's outbound traffic against a server"""
+
+    def __init__(self, path: str, server_url: str, speed: float = 1.0, keep_timestamps: bool = False,
+                 drone_ids: Optional[List[str]] = None, connect_timeout: float = 15.0):
+        if speed <= 0:
+            raise ValueError("Replay speed must be positive")
+        self.path = path
+        self.server_url = server_url
+        self.speed = speed
+        self.keep_timestamps = keep_timestamps
+        self.connect_timeout = connect_timeout
+
+        self.records = list(read_records(path))
+        if drone_ids:
+            self.records = [r for r in self.records if r.drone_id in drone_ids]
+        self.recorded = summarize(self.records)
+        self.outbound: Dict[str, List[TrafficRecord]] = defaultdict(list)
+        for record in self.records:
+            if record.direction == OUTBOUND:
+                self.outbound[record.drone_id].append(record)
+
+        self.sent = Counter()
+        self.received = Counter()
+        self.emit_lag = LatencyHistogram()
+        self.connect_failures = 0
+        self.started_at = 0.0
+        self.finished_at = 0.0
+
+    async def replay_drone(self, drone_id: str, records: List[TrafficRecord], t0: float, start: float):
+        loop = asyncio.get_running_loop()
+        sio = socketio.AsyncClient(reconnection=False)
+
+        async def on_any(event, *args):
+            self.received[event] += 1
+
+        sio.on('*', on_any)
+        delay = start + (records[0].timestamp - t0) / self.speed - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        try:
+            await asyncio.wait_for(sio.connect(self.server_url.replace('http', 'ws')), self.connect_timeout)
+        except Exception as e:
+            logger.error(f"❌ [{drone_id}] Replay connection failed: {e}")
+            self.connect_failures += 1
+            return
+        try:
+            for record in records:
+                due = start + (record.timestamp - t0) / self.speed
+                delay = due - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self.emit_lag.record(max(0.0, loop.time() - due) * 1000)
+                payload = _expand(record.payload)
+                if not self.keep_timestamps:
+                    shift_timestamps(payload, (time.time() - record.timestamp) * 1000)
+                await sio.emit(record.event, payload)
+                self.sent[record.event] += 1
+            # Let the server answer the last emits before closing
+            await asyncio.sleep(min(1.0, 1.0 / self.speed))
+        finally:
+            await sio.disconnect()
+
+    async def run(self):
+        """Replay every drone concurrently on the recorded schedule"""
+        if not self.outbound:
+            logger.warning(f"⚠️ {self.path}: no outbound traffic to replay")
+            return
+        t0 = min(records[0].timestamp for records in self.outbound.values())
+        logger.info(f"🔁 Replaying {sum(map(len, self.outbound.values())):,} emits from {len(self.outbound)} drones "
+                    f"({self.recorded['duration_s']:.1f}s recorded) at {self.speed:g}x against {self.server_url}")
+        loop = asyncio.get_running_loop()
+        self.started_at = time.time()
+        start = loop.time() + 0.5
+        await asyncio.gather(*(self.replay_drone(drone_id, records, t0, start)
+                               for drone_id, records in self.outbound.items()))
+        self.finished_at = time.time()
+
+    def summary(self) -> dict:
+        return {
+            'log': self.path,
+            'server_url': self.server_url,
+            'speed': self.speed,
+            'drones': len(self.outbound),
+            'connect_failures': self.connect_failures,
+            'duration_s': self.finished_at - self.started_at,
+            'sent': dict(self.sent),
+            'received': dict(self.received),
+            'recorded': self.recorded,
+            'emit_lag': self.emit_lag.summary()
+        }
+
+    def print_report(self):
+        """Print replay report"""
+        recorded_out = self.recorded['events']['out']
+        recorded_in = self.recorded['events']['in']
+        print(f"\n🔁 TRAFFIC REPLAY REPORT")
+        print("=" * 60)
+        print(f"Log: {self.path} ({len(self.outbound)} drones, {self.recorded['duration_s']:.1f}s recorded)")
+        print(f"Server: {self.server_url} at {self.speed:g}x, replay took {self.finished_at - self.started_at:.1f}s")
+        if self.connect_failures:
+            print(f"❌ {self.connect_failures} drones failed to connect")
+        lag = self.emit_lag
+        if lag.count:
+            print(f"Emit lag behind schedule: P50 {lag.percentile(50):.2f}ms, P99 {lag.percentile(99):.2f}ms, "
+                  f"max {lag.max_ms:.2f}ms")
+        print(f"\n📤 OUTBOUND (recorded → replayed):")
+        for event, count in sorted(recorded_out.items(), key=lambda item: -item[1]):
+            print(f"  {event:<24} {count:>8,} → {self.sent.get(event, 0):,}")
+        inbound = {event for event in set(recorded_in) | set(self.received)
+                   if event not in ('connect', 'disconnect') and not event.startswith('__')}
+        if inbound:
+            print(f"\n📥 INBOUND (recorded → replayed):")
+            for event in sorted(inbound, key=lambda e: -recorded_in.get(e, 0)):
+                print(f"  {event:<24} {recorded_in.get(event, 0):>8,} → {self.received.get(event, 0):,}")
+        print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or replay a recorded drone traffic log')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    info_parser = subparsers.add_parser('info', help='Summarize a traffic log')
+    info_parser.add_argument('log', help='Traffic log written by --record')
+
+    replay_parser = subparsers.add_parser('replay', help='Re-emit the recorded outbound traffic')
+    replay_parser.add_argument('log', help='Traffic log written by --record')
+    replay_parser.add_argument('--server', default='http://127.0.0.1:4005',
+                               help='Server URL (default: http://127.0.0.1:4005)')
+    replay_parser.add_argument('--speed', type=float, default=1.0,
+                               help='Replay N times faster than recorded (default: 1)')
+    replay_parser.add_argument('--drone', action='append', dest='drones', metavar='DRONE_ID',
+                               help='Replay only this drone (repeatable; default: all)')
+    replay_parser.add_argument('--keep-timestamps', action='store_true',
+                               help='Send payload timestamps as recorded instead of shifting them to now')
+    replay_parser.add_argument('--output', help='Write the replay summary as JSON')
+    parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        help='Logging level (default: INFO)')
+
+    args = parser.parse_args()
+    logging.basicConfig(level=getattr(logging, args.log_level),
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    try:
+        if args.command == 'info':
+            print_summary(args.log, summarize(list(read_records(args.log))))
+            return
+        replayer = TrafficReplayer(args.log, args.server, args.speed, args.keep_timestamps, args.drones)
+    except (OSError, TrafficLogError, ValueError) as e:
+        logger.error(f"❌ {e}")
+        raise SystemExit(1)
+
+    try:
+        asyncio.run(replayer.run())
+    except KeyboardInterrupt:
+        logger.info("🛑 Replay stopped by user")
+    replayer.print_report()
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(replayer.summary(), f, indent=2)
+        logger.info(f"📁 Replay summary written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()